@@ -0,0 +1,22 @@
+-- Indexes backing keyset (cursor) pagination in the DAL and list APIs.
+-- Each index matches a (filter, sort keys..., id) seek so a page is a single
+-- index range scan regardless of how deep the cursor is.
+
+-- FeedbackRepository.findByInstructor / findByClassCode / findByDateRange
+-- (undated legacy rows are keyed as 1970-01-01 so the sort key is never NULL)
+CREATE INDEX IF NOT EXISTS idx_parsed_feedback_instructor_keyset
+ON parsed_student_feedback(instructor, (COALESCE(class_date, DATE '1970-01-01')) DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_parsed_feedback_class_code_keyset
+ON parsed_student_feedback(class_code, (COALESCE(class_date, DATE '1970-01-01')) DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_parsed_feedback_class_date_keyset
+ON parsed_student_feedback((COALESCE(class_date, DATE '1970-01-01')) DESC, id DESC);
+
+-- /api/students and StudentRepository.findByInstructorCourses (name, id)
+CREATE INDEX IF NOT EXISTS idx_users_name_id
+ON users(name, id);
+
+-- /api/recording/upload listing (newest first per instructor)
+CREATE INDEX IF NOT EXISTS idx_speech_recordings_instructor_keyset
+ON speech_recordings(instructor_id, created_at DESC, id DESC);
@@ -0,0 +1,26 @@
+-- Full-text search index for speech transcripts.
+-- search_vector is a generated tsvector kept in sync by Postgres itself; the
+-- trigram index backs the partial-word (ILIKE) fallback used for prefixes and
+-- misspelt names that the english stemmer does not match.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE speech_transcriptions
+ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (to_tsvector('english'::regconfig, COALESCE(transcription_text, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_speech_transcriptions_search_vector
+ON speech_transcriptions USING GIN (search_vector);
+
+CREATE INDEX IF NOT EXISTS idx_speech_transcriptions_text_trgm
+ON speech_transcriptions USING GIN (transcription_text gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_speech_transcriptions_recording
+ON speech_transcriptions(recording_id);
+
+-- Filters applied inside the search query (student, date range, speech type)
+CREATE INDEX IF NOT EXISTS idx_speech_recordings_student_created
+ON speech_recordings(student_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_speech_recordings_type_created
+ON speech_recordings(speech_type, created_at DESC);
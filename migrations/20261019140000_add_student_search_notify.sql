@@ -0,0 +1,52 @@
+-- Change notifications for the in-process student autocomplete index
+-- (src/lib/services/student-autocomplete.ts). Each trigger publishes the
+-- affected student id on the student_search_changed channel; Postgres folds
+-- identical notifications within a transaction, so bulk feedback imports
+-- send one message per student rather than one per row.
+
+CREATE OR REPLACE FUNCTION notify_student_search_changed() RETURNS trigger AS $$
+DECLARE
+    id_column TEXT := CASE WHEN TG_TABLE_NAME IN ('students', 'users') THEN 'id' ELSE 'student_id' END;
+    new_id TEXT;
+    old_id TEXT;
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        new_id := to_jsonb(NEW) ->> id_column;
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        old_id := to_jsonb(OLD) ->> id_column;
+    END IF;
+
+    IF new_id IS NOT NULL THEN
+        PERFORM pg_notify('student_search_changed', new_id);
+    END IF;
+    -- Rows moved between students (or deleted) also change the old student
+    IF old_id IS NOT NULL AND old_id IS DISTINCT FROM new_id THEN
+        PERFORM pg_notify('student_search_changed', old_id);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_students_search_changed ON students;
+CREATE TRIGGER trg_students_search_changed
+AFTER INSERT OR UPDATE OR DELETE ON students
+FOR EACH ROW EXECUTE FUNCTION notify_student_search_changed();
+
+-- Only name changes matter for users; other roles are filtered out by the
+-- autocomplete loader, which ignores ids that are not students
+DROP TRIGGER IF EXISTS trg_users_search_changed ON users;
+CREATE TRIGGER trg_users_search_changed
+AFTER UPDATE OF name ON users
+FOR EACH ROW EXECUTE FUNCTION notify_student_search_changed();
+
+DROP TRIGGER IF EXISTS trg_enrollments_search_changed ON enrollments;
+CREATE TRIGGER trg_enrollments_search_changed
+AFTER INSERT OR UPDATE OR DELETE ON enrollments
+FOR EACH ROW EXECUTE FUNCTION notify_student_search_changed();
+
+DROP TRIGGER IF EXISTS trg_parsed_feedback_search_changed ON parsed_student_feedback;
+CREATE TRIGGER trg_parsed_feedback_search_changed
+AFTER INSERT OR DELETE OR UPDATE OF student_id ON parsed_student_feedback
+FOR EACH ROW EXECUTE FUNCTION notify_student_search_changed();
@@ -0,0 +1,39 @@
+-- Incremental feedback ingestion (FeedbackStoragePostgres.parseAndStoreFeedback).
+-- feedback_source_files remembers the content hash of every document that has
+-- been ingested, so a re-run only parses the ones that changed. Each feedback
+-- row gets a stable record_key (file, student, unit, lesson, occurrence) and a
+-- row_hash of its stored columns; the diff between the parsed records and the
+-- stored keys/hashes decides which rows are inserted, updated or deleted.
+-- feedback_parsing_status gains the progress of the run in flight.
+
+CREATE TABLE IF NOT EXISTS feedback_source_files (
+    file_path TEXT PRIMARY KEY,
+    feedback_type TEXT NOT NULL CHECK (feedback_type IN ('primary', 'secondary')),
+    content_hash TEXT NOT NULL,
+    size BIGINT NOT NULL,
+    mtime_ms DOUBLE PRECISION NOT NULL,
+    record_count INTEGER NOT NULL DEFAULT 0,
+    ingested_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
+ALTER TABLE parsed_student_feedback
+ADD COLUMN IF NOT EXISTS record_key TEXT,
+ADD COLUMN IF NOT EXISTS row_hash TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_parsed_feedback_record_key
+ON parsed_student_feedback(record_key);
+
+CREATE INDEX IF NOT EXISTS idx_parsed_feedback_file_path
+ON parsed_student_feedback(file_path);
+
+ALTER TABLE feedback_parsing_status
+ADD COLUMN IF NOT EXISTS mode TEXT,
+ADD COLUMN IF NOT EXISTS phase TEXT,
+ADD COLUMN IF NOT EXISTS files_total INTEGER DEFAULT 0,
+ADD COLUMN IF NOT EXISTS files_changed INTEGER DEFAULT 0,
+ADD COLUMN IF NOT EXISTS files_parsed INTEGER DEFAULT 0,
+ADD COLUMN IF NOT EXISTS files_removed INTEGER DEFAULT 0,
+ADD COLUMN IF NOT EXISTS records_inserted INTEGER DEFAULT 0,
+ADD COLUMN IF NOT EXISTS records_updated INTEGER DEFAULT 0,
+ADD COLUMN IF NOT EXISTS records_deleted INTEGER DEFAULT 0,
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW());
@@ -0,0 +1,25 @@
+-- Content-addressed cache of AI model results (src/lib/ai-result-cache.ts).
+-- cache_key is a sha256 over the normalized inputs, prompt template version,
+-- model id and generation parameters, so a row never goes stale: changed
+-- inputs get a new key. Rows expire by created_at and are evicted least
+-- recently used first (last_hit_at) when the table outgrows its byte budget.
+
+CREATE TABLE IF NOT EXISTS ai_result_cache (
+    cache_key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    result JSONB NOT NULL,
+    bytes INTEGER NOT NULL,
+    estimated_tokens INTEGER NOT NULL DEFAULT 0,
+    call_ms INTEGER NOT NULL DEFAULT 0,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+    last_hit_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_ai_result_cache_created
+ON ai_result_cache(created_at);
+
+CREATE INDEX IF NOT EXISTS idx_ai_result_cache_last_used
+ON ai_result_cache((COALESCE(last_hit_at, created_at)));
@@ -0,0 +1,18 @@
+-- Rolling chronological analysis state per student
+-- (DebateRecommendationEngine.analyzeChronologicalFeedback).
+-- summary is the latest descriptive analysis, kept bounded so it can stand in
+-- for the full history; analysis is the structured result built from it.
+-- session_fingerprints records which feedback sessions the summary already
+-- covers, so new feedback is sent to the model as a delta. A changed
+-- prompt_version, or an edited or removed session, forces a full re-analysis.
+
+CREATE TABLE IF NOT EXISTS student_analysis_state (
+    student_name TEXT PRIMARY KEY,
+    prompt_version TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    analysis JSONB NOT NULL,
+    session_fingerprints JSONB NOT NULL DEFAULT '[]',
+    last_session_date TEXT,
+    incremental_updates INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
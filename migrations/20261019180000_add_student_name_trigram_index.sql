@@ -0,0 +1,11 @@
+-- Trigram indexes for fuzzy student-name resolution (StudentNameResolver).
+-- Names are matched case-insensitively, so the indexes are on lower(name);
+-- they serve equality, LIKE '%...%' and the similarity operators alike.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_students_name_trgm
+ON students USING GIN (lower(name) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_parsed_student_feedback_student_name_trgm
+ON parsed_student_feedback USING GIN (lower(student_name) gin_trgm_ops);
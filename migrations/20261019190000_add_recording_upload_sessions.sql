@@ -0,0 +1,31 @@
+-- Resumable, chunked recording uploads (src/lib/recording-upload-sessions.ts).
+-- A session is opened with the recording's metadata and total size; chunks
+-- are appended at received_bytes to a partial file on the upload volume, so
+-- a dropped connection resumes from the last acknowledged byte. Sessions not
+-- touched before expires_at are removed together with their partial file
+-- and the speech_recordings row still in 'uploading'.
+
+CREATE TABLE IF NOT EXISTS recording_upload_sessions (
+    id UUID PRIMARY KEY,
+    recording_id UUID NOT NULL REFERENCES speech_recordings(id) ON DELETE CASCADE,
+    instructor_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    original_filename TEXT NOT NULL,
+    mime_type TEXT NOT NULL,
+    total_bytes BIGINT NOT NULL CHECK (total_bytes > 0),
+    received_bytes BIGINT NOT NULL DEFAULT 0,
+    partial_path TEXT NOT NULL,
+    -- Upload form fields used once the audio is complete (transcript,
+    -- duration, feedback options)
+    options JSONB NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'uploading'
+        CHECK (status IN ('uploading', 'completing', 'completed')),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_recording_upload_sessions_expires
+ON recording_upload_sessions(expires_at) WHERE status <> 'completed';
+
+CREATE INDEX IF NOT EXISTS idx_recording_upload_sessions_instructor
+ON recording_upload_sessions(instructor_id, created_at DESC);
@@ -0,0 +1,381 @@
+#!/usr/bin/env tsx
+
+/**
+ * Throughput benchmark for the AI analysis pipeline, run against the local
+ * LLM stand-in (scripts/llm-standin-server.ts) so it needs no network, keys
+ * or quota.
+ *
+ *   npx tsx scripts/benchmark-ai-pipeline.ts [options]
+ *
+ *   --students N           synthetic students per scenario (default 12)
+ *   --sessions N           feedback sessions per student (default 6)
+ *   --duplicates N         concurrent callers per student in the
+ *                          recommendation scenarios (default 2)
+ *   --scenarios LIST       comma-separated subset of individual, batch,
+ *                          chronological, deepseek (default all)
+ *   --latency SPEC         stand-in latency, e.g. fixed:300, uniform:100-900,
+ *                          lognormal:400,0.3 (the default)
+ *   --tokens-per-sec N     stand-in output rate (default 200)
+ *   --rate-429 P           share of calls answered 429 (default 0)
+ *   --rate-500 P           share of calls answered 500 (default 0)
+ *   --rpm-per-key N        stand-in per-key quota; also GEMINI_RPM for the
+ *                          scheduler (default 600)
+ *   --seed N               stand-in random seed (default 1)
+ *   --no-cache             run with AI_RESULT_CACHE=off
+ *   --use-services         use the configured Postgres and Redis instead of
+ *                          an isolated run with the in-memory cache only
+ *   --save-baseline        store this run's numbers as the comparison baseline
+ *
+ * Each scenario runs twice on its own synthetic students, cold and then
+ * warm (same inputs again): GeminiAnalyzer.analyzeStudentsBatch,
+ * GeminiBatchAnalyzer.analyzeStudentsBatch, DebateRecommendationEngine and
+ * DeepSeekRecommendationEngine. Reports wall time, analyses/sec, model
+ * requests, peak concurrent requests at the stand-in, injected errors and
+ * scheduler retries, and AI result cache and single-flight counters.
+ * Application logging is silenced while timing.
+ */
+
+import fs from 'fs';
+import path from 'path';
+import type { StoredStudentFeedback } from '../src/lib/feedback-storage';
+import type { DebateFeedbackSession } from '../src/lib/debate-recommendation-engine';
+import { startStandInServer, type StandInOptions, type StandInServer } from './llm-standin-server';
+
+const FIXTURE_DIR = path.join(__dirname, 'fixtures', 'ai-pipeline-benchmark');
+const BASELINE_PATH = path.join(FIXTURE_DIR, 'baseline.json');
+
+const SCENARIOS = ['individual', 'batch', 'chronological', 'deepseek'] as const;
+type Scenario = typeof SCENARIOS[number];
+
+const SCENARIO_LABELS: Record<Scenario, string> = {
+  individual: 'GeminiAnalyzer (per student)',
+  batch: 'GeminiBatchAnalyzer',
+  chronological: 'DebateRecommendationEngine',
+  deepseek: 'DeepSeekRecommendationEngine'
+};
+
+// Every scenario gets its own students, so one scenario's cached results
+// never make another's cold pass warm
+const SCENARIO_SURNAMES: Record<Scenario, string> = {
+  individual: 'Rao',
+  batch: 'Chen',
+  chronological: 'Okafor',
+  deepseek: 'Silva'
+};
+
+const FIRST_NAMES = [
+  'Asha', 'Ben', 'Chloe', 'Dev', 'Elena', 'Farah', 'Gabriel', 'Hana', 'Isaac', 'Jia', 'Kiran', 'Leo',
+  'Maya', 'Nikhil', 'Olivia', 'Priya', 'Quinn', 'Rohan', 'Sara', 'Tomas', 'Uma', 'Victor', 'Wen', 'Yusuf'
+];
+
+const STRENGTHS = [
+  'Clear signposting between points',
+  'Confident opening hook',
+  'Good use of real-world examples',
+  'Offered several relevant POIs',
+  'Kept to the speech time'
+];
+const IMPROVEMENTS = [
+  'Rebuttals restated the case instead of answering the opponent',
+  'Needs more depth on the second argument',
+  'Spoke quickly and dropped volume at the end',
+  'Examples were not tied back to the motion',
+  'Conclusion did not summarise the clash'
+];
+const MOTIONS = [
+  'This house would ban homework',
+  'This house believes social media does more harm than good',
+  'This house would make voting compulsory',
+  'This house would replace exams with coursework'
+];
+
+interface PassResult {
+  analyses: number;
+  failed: number;
+  wallMs: number;
+  analysesPerSec: number;
+  modelRequests: number;
+  peakInFlight: number;
+  injected429: number;
+  injected500: number;
+  schedulerRetries: number;
+  cacheHits: number;
+  cacheMisses: number;
+  singleFlightJoined: number;
+}
+
+interface BenchmarkResult {
+  settings: Record<string, unknown>;
+  scenarios: Partial<Record<Scenario, { cold: PassResult; warm: PassResult }>>;
+  recordedAt: string;
+}
+
+function syntheticFeedback(studentName: string, studentIndex: number, sessions: number): StoredStudentFeedback[] {
+  return Array.from({ length: sessions }, (_, session): StoredStudentFeedback => {
+    const pick = <T>(list: T[], offset: number) => list[(studentIndex * 7 + session * 3 + offset) % list.length];
+    const date = new Date(Date.UTC(2026, 0, 5) + session * 7 * 86400000).toISOString();
+    const rubric: Record<string, number> = {};
+    for (let i = 1; i <= 8; i++) {
+      rubric[`rubric_${i}`] = 1 + ((studentIndex + session + i) % 5);
+    }
+    return {
+      id: `${studentName}-${session + 1}`,
+      student_name: studentName,
+      class_code: `BENCH${(studentIndex % 3) + 1}`,
+      class_name: 'Benchmark Debate Class',
+      unit_number: `${Math.floor(session / 4) + 1}.${(session % 4) + 1}`,
+      motion: pick(MOTIONS, 0),
+      feedback_type: studentIndex % 2 === 0 ? 'secondary' : 'primary',
+      content: `${studentName} argued ${pick(MOTIONS, 0).toLowerCase()}. ${pick(STRENGTHS, 1)}. ${pick(IMPROVEMENTS, 2)}.`,
+      best_aspects: pick(STRENGTHS, 1),
+      improvement_areas: pick(IMPROVEMENTS, 2),
+      teacher_comments: `Focus next time: ${pick(IMPROVEMENTS, 4).toLowerCase()}.`,
+      duration: `${3 + (session % 3)}:${String((studentIndex * 13) % 60).padStart(2, '0')}`,
+      file_path: `benchmark/${studentName}.docx`,
+      instructor: 'Benchmark',
+      parsed_at: date,
+      rubric_scores: rubric
+    };
+  });
+}
+
+function toSessions(feedbacks: StoredStudentFeedback[]): DebateFeedbackSession[] {
+  return feedbacks.map(feedback => ({
+    id: feedback.id,
+    date: feedback.parsed_at.slice(0, 10),
+    unitNumber: feedback.unit_number,
+    motion: feedback.motion,
+    content: feedback.content,
+    bestAspects: feedback.best_aspects,
+    improvementAreas: feedback.improvement_areas,
+    teacherComments: feedback.teacher_comments,
+    duration: feedback.duration,
+    rawFeedback: feedback.content,
+    rubricScores: feedback.rubric_scores
+  }));
+}
+
+function formatDelta(current: number, baseline: number | undefined, lowerIsBetter = true): string {
+  if (baseline === undefined || baseline === 0) return '';
+  const change = ((current - baseline) / baseline) * 100;
+  const better = lowerIsBetter ? change < 0 : change > 0;
+  const sign = change >= 0 ? '+' : '';
+  return `${sign}${change.toFixed(1)}%${Math.abs(change) >= 5 ? (better ? ' ✅' : ' ⚠️') : ''}`;
+}
+
+function report(result: BenchmarkResult, baseline: BenchmarkResult | null): void {
+  const row = (label: string, cold: string, warm: string, delta = '') =>
+    console.log(`   ${label.padEnd(22)} ${cold.padStart(10)} ${warm.padStart(10)}   ${delta}`);
+
+  if (baseline && JSON.stringify(baseline.settings) !== JSON.stringify(result.settings)) {
+    console.log('\n⚠️ Baseline was recorded with different settings; changes are not comparable');
+  }
+
+  for (const scenario of SCENARIOS) {
+    const passes = result.scenarios[scenario];
+    if (!passes) continue;
+    const base = baseline?.scenarios[scenario];
+    const { cold, warm } = passes;
+
+    console.log(`\n📊 ${SCENARIO_LABELS[scenario]}`);
+    row('metric', 'cold', 'warm', 'cold change');
+    row('analyses / failed', `${cold.analyses}/${cold.failed}`, `${warm.analyses}/${warm.failed}`);
+    row('wall s', (cold.wallMs / 1000).toFixed(2), (warm.wallMs / 1000).toFixed(2),
+      formatDelta(cold.wallMs, base?.cold.wallMs));
+    row('analyses/sec', cold.analysesPerSec.toFixed(2), warm.analysesPerSec.toFixed(2),
+      formatDelta(cold.analysesPerSec, base?.cold.analysesPerSec, false));
+    row('model requests', String(cold.modelRequests), String(warm.modelRequests),
+      formatDelta(cold.modelRequests, base?.cold.modelRequests));
+    row('peak concurrent', String(cold.peakInFlight), String(warm.peakInFlight),
+      formatDelta(cold.peakInFlight, base?.cold.peakInFlight, false));
+    row('injected 429 / 500', `${cold.injected429}/${cold.injected500}`, `${warm.injected429}/${warm.injected500}`);
+    row('scheduler retries', String(cold.schedulerRetries), String(warm.schedulerRetries));
+    row('cache hits / misses', `${cold.cacheHits}/${cold.cacheMisses}`, `${warm.cacheHits}/${warm.cacheMisses}`);
+    row('single-flight joins', String(cold.singleFlightJoined), String(warm.singleFlightJoined));
+  }
+
+  if (baseline) {
+    console.log(`\n   (baseline recorded ${baseline.recordedAt})`);
+  }
+}
+
+async function main() {
+  const args = process.argv.slice(2);
+  const flag = (name: string) => args.includes(name);
+  const text = (name: string) => {
+    const index = args.indexOf(name);
+    return index >= 0 ? args[index + 1] : undefined;
+  };
+  const option = (name: string, fallback: number) => {
+    const value = Number(text(name));
+    return text(name) === undefined || Number.isNaN(value) ? fallback : value;
+  };
+
+  const studentCount = Math.max(1, Math.min(FIRST_NAMES.length, option('--students', 12)));
+  const sessionCount = Math.max(1, option('--sessions', 6));
+  const duplicates = Math.max(1, option('--duplicates', 2));
+  const scenarios = (text('--scenarios')?.split(',') ?? [...SCENARIOS]) as Scenario[];
+  const unknown = scenarios.filter(scenario => !SCENARIOS.includes(scenario));
+  if (unknown.length > 0) {
+    throw new Error(`Unknown scenarios: ${unknown.join(', ')} (use ${SCENARIOS.join(', ')})`);
+  }
+  const standInOptions: StandInOptions = {
+    port: 0,
+    latency: text('--latency') ?? 'lognormal:400,0.3',
+    tokensPerSec: option('--tokens-per-sec', 200),
+    rate429: option('--rate-429', 0),
+    rate500: option('--rate-500', 0),
+    rpmPerKey: option('--rpm-per-key', 600),
+    seed: option('--seed', 1)
+  };
+
+  const server: StandInServer = await startStandInServer(standInOptions);
+
+  // The app reads these when its modules load, so they are set before the
+  // dynamic imports below
+  process.env.GEMINI_API_BASE_URL = server.url;
+  for (let i = 1; i <= 4; i++) {
+    process.env[`GEMINI_API_KEY_${i}`] = `standin-key-${i}`;
+  }
+  process.env.OPENROUTER_API_KEY = 'standin-key';
+  process.env.OPENROUTER_API_URL = `${server.url}/v1/chat/completions`;
+  process.env.GEMINI_RPM = String(standInOptions.rpmPerKey);
+  if (flag('--no-cache')) {
+    process.env.AI_RESULT_CACHE = 'off';
+  }
+  if (!flag('--use-services')) {
+    // Nothing listens on port 1: Postgres and Redis calls fail at once and
+    // the cache and single-flight run in memory, with no benchmark rows
+    // left in a real database
+    process.env.DATABASE_URL = 'postgresql://benchmark@127.0.0.1:1/benchmark';
+    delete process.env.DATABASE_READ_URL;
+    process.env.REDIS_URL = 'redis://127.0.0.1:1';
+  }
+
+  const { GeminiAnalyzer } = await import('../src/lib/gemini-analysis');
+  const { GeminiBatchAnalyzer } = await import('../src/lib/gemini-batch-analyzer');
+  const { debateRecommendationEngine } = await import('../src/lib/debate-recommendation-engine');
+  const { deepSeekRecommendationEngine } = await import('../src/lib/deepseek-recommendation-engine');
+  const { getGeminiScheduler } = await import('../src/lib/gemini-scheduler');
+  const { getAIResultCache } = await import('../src/lib/ai-result-cache');
+  const { aiSingleFlight } = await import('../src/lib/ai-single-flight');
+
+  // Analyses produced by one pass of a scenario, and how many failed
+  const runners: Record<Scenario, (students: Map<string, StoredStudentFeedback[]>) => Promise<{ analyses: number; failed: number }>> = {
+    individual: async students => {
+      const result = await new GeminiAnalyzer().analyzeStudentsBatch(students, students.size);
+      return { analyses: result.analyses.length, failed: result.totalFailed };
+    },
+    batch: async students => {
+      const result = await new GeminiBatchAnalyzer().analyzeStudentsBatch(students);
+      return { analyses: result.analyses.length, failed: result.totalFailed };
+    },
+    chronological: async students => {
+      const outcomes = await Promise.allSettled(Array.from(students).flatMap(([name, feedbacks]) =>
+        Array.from({ length: duplicates }, () =>
+          debateRecommendationEngine.analyzeChronologicalFeedback(name, toSessions(feedbacks)))
+      ));
+      const analyses = outcomes.filter(outcome => outcome.status === 'fulfilled').length;
+      return { analyses, failed: outcomes.length - analyses };
+    },
+    deepseek: async students => {
+      const outcomes = await Promise.allSettled(Array.from(students).flatMap(([name, feedbacks]) =>
+        Array.from({ length: duplicates }, () =>
+          deepSeekRecommendationEngine.analyzeChronologicalFeedback(name, toSessions(feedbacks)))
+      ));
+      const analyses = outcomes.filter(outcome => outcome.status === 'fulfilled').length;
+      return { analyses, failed: outcomes.length - analyses };
+    }
+  };
+
+  const runPass = async (scenario: Scenario, students: Map<string, StoredStudentFeedback[]>): Promise<PassResult> => {
+    const scheduler = getGeminiScheduler().getStats();
+    const cache = getAIResultCache()?.getStats();
+    const flights = aiSingleFlight.getStats();
+    server.reset();
+
+    const start = process.hrtime.bigint();
+    const outcome = await runners[scenario](students);
+    const wallMs = Number(process.hrtime.bigint() - start) / 1e6;
+
+    const serverStats = server.stats();
+    const schedulerAfter = getGeminiScheduler().getStats();
+    const cacheAfter = getAIResultCache()?.getStats();
+    const flightsAfter = aiSingleFlight.getStats();
+    const hits = (stats?: typeof cache) => stats ? stats.memoryHits + stats.storeHits : 0;
+
+    return {
+      ...outcome,
+      wallMs,
+      analysesPerSec: outcome.analyses / (wallMs / 1000),
+      modelRequests: serverStats.requests,
+      peakInFlight: serverStats.peakInFlight,
+      injected429: serverStats.injected.rateLimited + serverStats.injected.quotaExceeded,
+      injected500: serverStats.injected.serverErrors,
+      schedulerRetries: schedulerAfter.retried - scheduler.retried,
+      cacheHits: hits(cacheAfter) - hits(cache),
+      cacheMisses: (cacheAfter?.misses ?? 0) - (cache?.misses ?? 0),
+      singleFlightJoined: flightsAfter.joinedLocal + flightsAfter.joinedRemote - flights.joinedLocal - flights.joinedRemote
+    };
+  };
+
+  console.log(`🧪 AI pipeline benchmark: ${studentCount} students x ${sessionCount} sessions, ` +
+    `stand-in ${standInOptions.latency} at ${standInOptions.tokensPerSec} tokens/sec`);
+
+  const result: BenchmarkResult = {
+    settings: { studentCount, sessionCount, duplicates, noCache: flag('--no-cache'), ...standInOptions, port: undefined },
+    scenarios: {},
+    recordedAt: ''
+  };
+
+  const log = console.log;
+  const warn = console.warn;
+  const error = console.error;
+  try {
+    for (const scenario of scenarios) {
+      const students = new Map<string, StoredStudentFeedback[]>();
+      FIRST_NAMES.slice(0, studentCount).forEach((firstName, index) => {
+        const name = `${firstName} ${SCENARIO_SURNAMES[scenario]}`;
+        students.set(name, syntheticFeedback(name, index, sessionCount));
+      });
+
+      log(`   running ${SCENARIO_LABELS[scenario]}...`);
+      console.log = () => {};
+      console.warn = () => {};
+      console.error = () => {};
+      const cold = await runPass(scenario, students);
+      const warm = await runPass(scenario, students);
+      console.log = log;
+      console.warn = warn;
+      console.error = error;
+      result.scenarios[scenario] = { cold, warm };
+    }
+  } finally {
+    console.log = log;
+    console.warn = warn;
+    console.error = error;
+    await server.close();
+  }
+  result.recordedAt = new Date().toISOString();
+
+  fs.mkdirSync(FIXTURE_DIR, { recursive: true });
+  const baseline: BenchmarkResult | null = fs.existsSync(BASELINE_PATH)
+    ? JSON.parse(fs.readFileSync(BASELINE_PATH, 'utf8'))
+    : null;
+  report(result, baseline);
+
+  if (flag('--save-baseline')) {
+    fs.writeFileSync(BASELINE_PATH, JSON.stringify(result, null, 2) + '\n');
+    console.log(`\n💾 Baseline saved to ${BASELINE_PATH}`);
+  }
+}
+
+main()
+  .then(() => {
+    // Pool monitors and Redis reconnects would keep the process alive
+    process.exit(0);
+  })
+  .catch(error => {
+    console.error('❌ Benchmark failed:', error);
+    process.exit(1);
+  });
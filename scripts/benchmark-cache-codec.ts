@@ -0,0 +1,167 @@
+#!/usr/bin/env tsx
+
+/**
+ * Compares the cache codecs on payloads shaped like our largest cache
+ * entries (StudentGrowthData for a class, dashboard metrics).
+ *
+ *   npx tsx scripts/benchmark-cache-codec.ts [students] [iterations]
+ *
+ * Reports stored size and median encode/decode time for plain JSON (what
+ * cacheSet stored before the codec layer) and each codec/compression pair.
+ */
+
+import {
+  Compression,
+  decodeCacheValue,
+  encodeCacheValue,
+  getCodec,
+} from '../src/lib/cache/cache-codec';
+
+const SKILLS = ['speaking', 'argumentation', 'critical_thinking', 'research', 'writing', 'confidence'];
+const LEVELS = ['beginner', 'intermediate', 'advanced', 'expert'];
+const TRENDS = ['improving', 'stable', 'declining'];
+
+function isoDay(offset: number): string {
+  return new Date(Date.UTC(2024, 0, 1) + offset * 86400000).toISOString().slice(0, 10);
+}
+
+function studentGrowth(seed: number) {
+  const rand = (i: number) => ((Math.sin(seed * 997 + i) + 1) / 2);
+
+  return {
+    overall: {
+      score: Math.round(rand(1) * 1000) / 10,
+      trend: Math.round((rand(2) - 0.5) * 200) / 10,
+      level: LEVELS[seed % LEVELS.length],
+      percentile: Math.round(rand(3) * 100),
+      description: 'Steady progress across speaking and argumentation with stronger rebuttals',
+      history: Array.from({ length: 52 }, (_, i) => ({
+        date: isoDay(i * 7),
+        score: Math.round(rand(i + 10) * 1000) / 10,
+      })),
+    },
+    skills: Object.fromEntries(SKILLS.map((skill, s) => [skill, {
+      currentLevel: Math.round(rand(s + 100) * 100) / 10,
+      previousLevel: Math.round(rand(s + 200) * 100) / 10,
+      growthRate: Math.round(rand(s + 300) * 1000) / 1000,
+      consistency: Math.round(rand(s + 400) * 100) / 100,
+      momentum: Math.round(rand(s + 500) * 100) / 100,
+      trend: TRENDS[(seed + s) % TRENDS.length],
+      nextMilestone: { level: 8, estimatedWeeks: 6, requiredGrowthRate: 0.12 },
+      strengths: ['Clear signposting', 'Confident delivery'],
+      focusAreas: ['Weighing', 'Time management'],
+    }])),
+    trajectory: {
+      projected3Months: Math.round(rand(600) * 1000) / 10,
+      projected6Months: Math.round(rand(601) * 1000) / 10,
+      confidenceInterval: [Math.round(rand(602) * 500) / 10, Math.round(rand(603) * 1000) / 10],
+    },
+    milestones: {
+      achieved: Array.from({ length: 6 }, (_, i) => ({
+        id: `milestone-${i}`,
+        title: 'Consistent rebuttals',
+        description: 'Delivered structured rebuttals in three consecutive sessions',
+        achievedDate: new Date(Date.UTC(2024, i, 1)),
+        achieved: true,
+        progress: 100,
+        skills: [SKILLS[i % SKILLS.length]],
+      })),
+      upcoming: Array.from({ length: 3 }, (_, i) => ({
+        id: `upcoming-${i}`,
+        title: 'Lead a team case',
+        description: 'Plan and deliver the first speech for the team',
+        achieved: false,
+        progress: Math.round(rand(700 + i) * 100),
+        skills: [SKILLS[(i + 2) % SKILLS.length]],
+      })),
+    },
+    patterns: [{
+      type: 'consistent',
+      description: 'Scores vary little week to week',
+      recommendation: 'Introduce harder motions to keep momentum',
+    }],
+    comparisons: {
+      toPeers: { percentile: 64, ranking: 9, totalPeers: 24, aboveAverage: true },
+      toPrevious: { improvement: 4.2, consistencyChange: 0.3, momentumChange: -0.1 },
+      toGoals: { onTrack: true, progressPercentage: 72, estimatedCompletion: null },
+    },
+    velocity: Array.from({ length: 26 }, (_, i) => ({
+      week: isoDay(i * 7),
+      velocity: Math.round(rand(800 + i) * 100) / 100,
+      benchmark: 0.5,
+    })),
+  };
+}
+
+function median(values: number[]): number {
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.floor(sorted.length / 2)];
+}
+
+async function time(iterations: number, fn: () => Promise<unknown> | unknown): Promise<number> {
+  const samples: number[] = [];
+  for (let i = 0; i < iterations; i++) {
+    const start = performance.now();
+    await fn();
+    samples.push(performance.now() - start);
+  }
+  return median(samples);
+}
+
+async function benchmark(label: string, payload: unknown, iterations: number) {
+  const json = JSON.stringify(payload);
+  const expected = JSON.stringify(JSON.parse(json));
+
+  const jsonEncode = await time(iterations, () => JSON.stringify(payload));
+  const jsonDecode = await time(iterations, () => JSON.parse(json));
+
+  console.log(`\n📦 ${label}`);
+  console.log('   codec            bytes      ratio   encode ms   decode ms');
+  console.log(`   ${'plain json'.padEnd(15)} ${String(json.length).padStart(8)}   ${'1.0x'.padStart(6)}   ${jsonEncode.toFixed(3).padStart(9)}   ${jsonDecode.toFixed(3).padStart(9)}`);
+
+  const variants: [string, Compression][] = [
+    ['json', Compression.None],
+    ['json', Compression.Gzip],
+    ['json', Compression.Brotli],
+    ['packed', Compression.None],
+    ['packed', Compression.Gzip],
+    ['packed', Compression.Brotli],
+  ];
+
+  for (const [codecName, compression] of variants) {
+    const codec = getCodec(codecName);
+    const { buffer } = await encodeCacheValue(payload, codec, compression);
+
+    const decoded = await decodeCacheValue(buffer);
+    if (JSON.stringify(decoded) !== expected) {
+      throw new Error(`${codecName}/${Compression[compression]} did not round-trip`);
+    }
+
+    const encodeMs = await time(iterations, () => encodeCacheValue(payload, codec, compression));
+    const decodeMs = await time(iterations, () => decodeCacheValue(buffer));
+    const name = `${codecName}+${Compression[compression].toLowerCase()}`;
+    const ratio = `${(json.length / buffer.length).toFixed(1)}x`;
+
+    console.log(`   ${name.padEnd(15)} ${String(buffer.length).padStart(8)}   ${ratio.padStart(6)}   ${encodeMs.toFixed(3).padStart(9)}   ${decodeMs.toFixed(3).padStart(9)}`);
+  }
+}
+
+async function main() {
+  const students = parseInt(process.argv[2] || '25');
+  const iterations = parseInt(process.argv[3] || '50');
+
+  console.log(`🧪 Cache codec benchmark (${iterations} iterations, median times)`);
+
+  await benchmark('Single StudentGrowthData', studentGrowth(1), iterations);
+  await benchmark(
+    `Class of ${students} StudentGrowthData`,
+    Array.from({ length: students }, (_, i) => ({ studentId: `student-${i}`, growth: studentGrowth(i) })),
+    iterations
+  );
+  await benchmark('Small dashboard entry', { total_students: '42', total_courses: '6' }, iterations);
+}
+
+main().catch(error => {
+  console.error('❌ Benchmark failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,92 @@
+#!/usr/bin/env tsx
+
+/**
+ * Compares the single-pass .docx reader with the two mammoth calls it
+ * replaces, on documents from the feedback corpus.
+ *
+ *   npx tsx scripts/benchmark-docx-reader.ts [dataPath] [maxFiles]
+ *
+ * For every file both readers must produce the same text and HTML; any
+ * difference is listed and the script exits non-zero. Reports CPU time per
+ * document for each reader.
+ */
+
+import fs from 'fs';
+import path from 'path';
+import mammoth from 'mammoth';
+import { isSinglePassAvailable, readDocx } from '../src/lib/docx-reader';
+
+function listDocx(dirPath: string, files: string[] = []): string[] {
+  for (const entry of fs.readdirSync(dirPath, { withFileTypes: true })) {
+    const entryPath = path.join(dirPath, entry.name);
+    if (entry.isDirectory()) {
+      listDocx(entryPath, files);
+    } else if (entry.name.toLowerCase().endsWith('.docx')) {
+      files.push(entryPath);
+    }
+  }
+  return files;
+}
+
+async function cpuTime(fn: () => Promise<unknown>): Promise<number> {
+  const start = process.cpuUsage();
+  await fn();
+  const used = process.cpuUsage(start);
+  return (used.user + used.system) / 1000;
+}
+
+async function main() {
+  const dataPath = process.argv[2] || './data/Overall/Secondary';
+  const maxFiles = parseInt(process.argv[3] || '200');
+
+  if (!isSinglePassAvailable()) {
+    console.error('❌ mammoth internals could not be loaded; readDocx is using the two-call fallback');
+    process.exit(1);
+  }
+
+  const files = listDocx(dataPath).slice(0, maxFiles);
+  console.log(`🧪 DOCX reader benchmark on ${files.length} files from ${dataPath}`);
+
+  let twoCallMs = 0;
+  let singlePassMs = 0;
+  const mismatches: string[] = [];
+
+  for (const filePath of files) {
+    let expected: { text: string; html: string } | null = null;
+    twoCallMs += await cpuTime(async () => {
+      const text = (await mammoth.extractRawText({ path: filePath })).value;
+      const html = (await mammoth.convertToHtml({ path: filePath })).value;
+      expected = { text, html };
+    });
+
+    let actual: { text: string; html: string | null } | null = null;
+    singlePassMs += await cpuTime(async () => {
+      actual = await readDocx(filePath, { html: true });
+    });
+
+    if (!expected || !actual) continue;
+    const { text, html } = expected;
+    const result = actual as { text: string; html: string | null };
+    if (result.text !== text) mismatches.push(`${filePath}: text differs`);
+    if (result.html !== html) mismatches.push(`${filePath}: html differs`);
+  }
+
+  const perFile = (ms: number) => (ms / Math.max(files.length, 1)).toFixed(2);
+  console.log('   reader         total cpu ms   per file ms');
+  console.log(`   ${'two calls'.padEnd(14)} ${twoCallMs.toFixed(0).padStart(12)}   ${perFile(twoCallMs).padStart(11)}`);
+  console.log(`   ${'single pass'.padEnd(14)} ${singlePassMs.toFixed(0).padStart(12)}   ${perFile(singlePassMs).padStart(11)}`);
+  console.log(`   speedup ${(twoCallMs / Math.max(singlePassMs, 1)).toFixed(2)}x`);
+
+  if (mismatches.length > 0) {
+    console.error(`\n❌ ${mismatches.length} output differences:`);
+    mismatches.slice(0, 20).forEach(line => console.error(`   ${line}`));
+    process.exit(1);
+  }
+
+  console.log('\n✅ Single-pass output identical on every file');
+}
+
+main().catch(error => {
+  console.error('❌ Benchmark failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,431 @@
+#!/usr/bin/env tsx
+
+/**
+ * Benchmark and golden-output check for the feedback parsing pipeline, run
+ * on a frozen corpus sampled from data/Overall.
+ *
+ *   npx tsx scripts/benchmark-feedback-parser.ts [options]
+ *
+ *   --sample [perBucket]  re-sample the corpus manifest (default 8 files per
+ *                         primary/secondary x consolidated/individual bucket)
+ *   --update-golden       overwrite the golden snapshot with this run's records
+ *   --golden-ref REF      with --update-golden, take the snapshot from the
+ *                         parser as of git REF instead (e.g. the commit before
+ *                         a parser change), then check this run against it
+ *   --save-baseline       store this run's numbers as the comparison baseline
+ *   --runs N              timed passes over the corpus (default 3, best kept)
+ *
+ * Every pass parses each corpus file with the parse cache off and on the
+ * main thread, so the numbers are the parser's own cost. Reports files/sec,
+ * ms per document, peak RSS and time per phase: read, HTML conversion,
+ * section split, rubric extraction and ID hashing. The extracted
+ * StudentFeedback records are compared with the golden snapshot (ignoring
+ * extractedAt and the timestamp in uniqueId); any difference is listed and
+ * the script exits non-zero, as it does when there is no snapshot yet.
+ * Parser logging is silenced while timing.
+ */
+
+import fs from 'fs';
+import path from 'path';
+import { createHash } from 'crypto';
+import { execFileSync } from 'child_process';
+import { readDocx } from '../src/lib/docx-reader';
+import { FeedbackParser, type StudentFeedback } from '../src/lib/feedback-parser';
+
+const FIXTURE_DIR = path.join(__dirname, 'fixtures', 'feedback-benchmark');
+const CORPUS_PATH = path.join(FIXTURE_DIR, 'corpus.json');
+const GOLDEN_PATH = path.join(FIXTURE_DIR, 'golden.json');
+const BASELINE_PATH = path.join(FIXTURE_DIR, 'baseline.json');
+const DATA_ROOT = 'data/Overall';
+const REF_CHECKOUT_DIR = path.join('.cache', 'feedback-benchmark');
+
+type FeedbackType = 'primary' | 'secondary';
+type FileKind = 'consolidated' | 'individual';
+
+interface CorpusFile {
+  path: string;
+  feedbackType: FeedbackType;
+  kind: FileKind;
+  sha256: string;
+}
+
+interface Corpus {
+  root: string;
+  perBucket: number;
+  files: CorpusFile[];
+}
+
+const PHASES = ['read', 'html', 'split', 'rubric', 'hash'] as const;
+type Phase = typeof PHASES[number];
+
+const PHASE_LABELS: Record<Phase, string> = {
+  read: 'read',
+  html: 'HTML conversion',
+  split: 'section split',
+  rubric: 'rubric extraction',
+  hash: 'ID hashing'
+};
+
+interface BenchmarkResult {
+  files: number;
+  records: number;
+  totalMs: number;
+  filesPerSec: number;
+  msPerDoc: number;
+  peakRssMb: number;
+  phasesMs: Record<Phase, number>;
+  recordedAt: string;
+}
+
+function sha256(filePath: string): string {
+  return createHash('sha256').update(fs.readFileSync(filePath)).digest('hex');
+}
+
+function listDocuments(dirPath: string, files: string[] = []): string[] {
+  for (const entry of fs.readdirSync(dirPath, { withFileTypes: true })) {
+    const entryPath = path.join(dirPath, entry.name);
+    if (entry.isDirectory()) {
+      listDocuments(entryPath, files);
+    } else if (['.docx', '.txt'].includes(path.extname(entry.name).toLowerCase())) {
+      files.push(entryPath);
+    }
+  }
+  return files;
+}
+
+// The parser's helpers are private; the benchmark reaches them through the
+// prototype so the corpus is classified and timed exactly as it is parsed
+function parserInternals(parser: FeedbackParser): any {
+  return parser as any;
+}
+
+function sampleCorpus(perBucket: number): Corpus {
+  const parser = parserInternals(new FeedbackParser(DATA_ROOT));
+  const buckets = new Map<string, CorpusFile[]>();
+
+  for (const feedbackType of ['primary', 'secondary'] as FeedbackType[]) {
+    const typeRoot = path.join(DATA_ROOT, feedbackType === 'primary' ? 'Primary' : 'Secondary');
+    if (!fs.existsSync(typeRoot)) continue;
+
+    const files = listDocuments(typeRoot).sort();
+    for (const filePath of files) {
+      const fileName = path.basename(filePath, path.extname(filePath));
+      const kind: FileKind = parser.isIndividualStudentFile(fileName) ? 'individual' : 'consolidated';
+      const key = `${feedbackType}/${kind}`;
+      if (!buckets.has(key)) buckets.set(key, []);
+      buckets.get(key)!.push({ path: filePath, feedbackType, kind, sha256: '' });
+    }
+  }
+
+  // Evenly spaced picks, so every bucket spans its instructors and terms
+  const files: CorpusFile[] = [];
+  for (const key of [...buckets.keys()].sort()) {
+    const bucket = buckets.get(key)!;
+    const count = Math.min(perBucket, bucket.length);
+    for (let i = 0; i < count; i++) {
+      const file = bucket[Math.floor((i * bucket.length) / count)];
+      files.push({ ...file, sha256: sha256(file.path) });
+    }
+  }
+
+  return { root: DATA_ROOT, perBucket, files };
+}
+
+function loadCorpus(): Corpus {
+  if (!fs.existsSync(CORPUS_PATH)) {
+    throw new Error(`No corpus manifest at ${CORPUS_PATH}; run with --sample first`);
+  }
+  const corpus: Corpus = JSON.parse(fs.readFileSync(CORPUS_PATH, 'utf8'));
+
+  const changed = corpus.files.filter(file => !fs.existsSync(file.path) || sha256(file.path) !== file.sha256);
+  if (changed.length > 0) {
+    changed.slice(0, 20).forEach(file => console.error(`   ${file.path}`));
+    throw new Error(`${changed.length} corpus files are missing or changed; re-sample with --sample and --update-golden`);
+  }
+  return corpus;
+}
+
+// Records as they are compared: extractedAt and the trailing timestamp in
+// uniqueId differ on every run, the HTML is kept as a hash
+function normalizeRecord(feedback: StudentFeedback): Record<string, unknown> {
+  const { extractedAt: _extractedAt, htmlContent, uniqueId, ...rest } = feedback;
+  return {
+    ...rest,
+    uniqueId: uniqueId.replace(/_[a-z0-9]+$/, ''),
+    htmlSha256: htmlContent ? createHash('sha256').update(htmlContent).digest('hex') : null
+  };
+}
+
+function diffGolden(
+  golden: Record<string, Record<string, unknown>[]>,
+  actual: Record<string, Record<string, unknown>[]>
+): string[] {
+  const differences: string[] = [];
+  for (const filePath of new Set([...Object.keys(golden), ...Object.keys(actual)])) {
+    const expected = golden[filePath] ?? [];
+    const records = actual[filePath] ?? [];
+    if (expected.length !== records.length) {
+      differences.push(`${filePath}: ${expected.length} records expected, ${records.length} extracted`);
+      continue;
+    }
+    records.forEach((record, index) => {
+      const fields = new Set([...Object.keys(expected[index]), ...Object.keys(record)]);
+      for (const field of fields) {
+        if (JSON.stringify(expected[index][field]) !== JSON.stringify(record[field])) {
+          differences.push(`${filePath} #${index} (${record.studentName}): ${field} differs`);
+        }
+      }
+    });
+  }
+  return differences;
+}
+
+// FeedbackParser as it was at `ref`, loaded from a git archive of src/lib
+// unpacked inside the repo so it still resolves node_modules
+function parserAtRef(ref: string): typeof FeedbackParser {
+  const dir = path.resolve(REF_CHECKOUT_DIR, ref.replace(/[^\w.-]/g, '_'));
+  fs.rmSync(dir, { recursive: true, force: true });
+  fs.mkdirSync(dir, { recursive: true });
+
+  const archive = execFileSync('git', ['archive', ref, 'src/lib'], { maxBuffer: 512 * 1024 * 1024 });
+  execFileSync('tar', ['-x', '-C', dir], { input: archive });
+  return require(path.join(dir, 'src', 'lib', 'feedback-parser')).FeedbackParser;
+}
+
+async function extractRecords(
+  corpus: Corpus,
+  parser: Pick<FeedbackParser, 'parseDocumentFile'>
+): Promise<Record<string, Record<string, unknown>[]>> {
+  const records: Record<string, Record<string, unknown>[]> = {};
+  for (const file of corpus.files) {
+    const fileResult = await parser.parseDocumentFile(file.path, file.feedbackType);
+    records[file.path] = fileResult.feedbacks.map(normalizeRecord);
+  }
+  return records;
+}
+
+function instrument(parser: FeedbackParser, phasesMs: Record<Phase, number>): void {
+  const target = parserInternals(parser);
+  const timed = (method: string, phase: Phase) => {
+    const original = target[method].bind(parser);
+    target[method] = (...args: unknown[]) => {
+      const start = process.hrtime.bigint();
+      const value = original(...args);
+      const record = () => {
+        phasesMs[phase] += Number(process.hrtime.bigint() - start) / 1e6;
+      };
+      if (value instanceof Promise) {
+        return value.finally(record);
+      }
+      record();
+      return value;
+    };
+  };
+
+  // Document reading is read + HTML and is booked as HTML; the read share is
+  // measured separately and moved over afterwards. Rubric extraction and
+  // hashing run inside the section split and are subtracted from it.
+  timed('readFeedbackDocument', 'html');
+  timed('extractStudentFeedbacks', 'split');
+  timed('extractRubricScores', 'rubric');
+  timed('buildUniqueId', 'hash');
+}
+
+async function timeTextReads(corpus: Corpus): Promise<number> {
+  let ms = 0;
+  for (const file of corpus.files) {
+    if (path.extname(file.path).toLowerCase() !== '.docx') {
+      const start = process.hrtime.bigint();
+      fs.readFileSync(file.path, 'utf8');
+      ms += Number(process.hrtime.bigint() - start) / 1e6;
+      continue;
+    }
+    const start = process.hrtime.bigint();
+    await readDocx(file.path, { html: false });
+    ms += Number(process.hrtime.bigint() - start) / 1e6;
+  }
+  return ms;
+}
+
+async function runPass(corpus: Corpus): Promise<{
+  result: Omit<BenchmarkResult, 'peakRssMb' | 'recordedAt'>;
+  records: Record<string, Record<string, unknown>[]>;
+  errors: string[];
+}> {
+  const parser = new FeedbackParser(corpus.root);
+  const phasesMs: Record<Phase, number> = { read: 0, html: 0, split: 0, rubric: 0, hash: 0 };
+  instrument(parser, phasesMs);
+
+  const records: Record<string, Record<string, unknown>[]> = {};
+  const errors: string[] = [];
+  let recordCount = 0;
+
+  const start = process.hrtime.bigint();
+  for (const file of corpus.files) {
+    const fileResult = await parser.parseDocumentFile(file.path, file.feedbackType);
+    records[file.path] = fileResult.feedbacks.map(normalizeRecord);
+    errors.push(...fileResult.errors);
+    recordCount += fileResult.feedbacks.length;
+  }
+  const totalMs = Number(process.hrtime.bigint() - start) / 1e6;
+
+  const readMs = await timeTextReads(corpus);
+  phasesMs.read = Math.min(readMs, phasesMs.html);
+  phasesMs.html -= phasesMs.read;
+  phasesMs.split = Math.max(0, phasesMs.split - phasesMs.rubric - phasesMs.hash);
+
+  return {
+    result: {
+      files: corpus.files.length,
+      records: recordCount,
+      totalMs,
+      filesPerSec: corpus.files.length / (totalMs / 1000),
+      msPerDoc: totalMs / Math.max(corpus.files.length, 1),
+      phasesMs
+    },
+    records,
+    errors
+  };
+}
+
+function formatDelta(current: number, baseline: number | undefined, lowerIsBetter = true): string {
+  if (baseline === undefined || baseline === 0) return '';
+  const change = ((current - baseline) / baseline) * 100;
+  const better = lowerIsBetter ? change < 0 : change > 0;
+  const sign = change >= 0 ? '+' : '';
+  return `${sign}${change.toFixed(1)}%${Math.abs(change) >= 5 ? (better ? ' ✅' : ' ⚠️') : ''}`;
+}
+
+function report(result: BenchmarkResult, baseline: BenchmarkResult | null): void {
+  const row = (label: string, value: string, base: string, delta: string) =>
+    console.log(`   ${label.padEnd(20)} ${value.padStart(12)} ${base.padStart(12)}   ${delta}`);
+
+  console.log(`\n📊 ${result.files} files, ${result.records} records`);
+  row('metric', 'current', 'baseline', 'change');
+  row('files/sec', result.filesPerSec.toFixed(1), baseline ? baseline.filesPerSec.toFixed(1) : '-',
+    formatDelta(result.filesPerSec, baseline?.filesPerSec, false));
+  row('ms per document', result.msPerDoc.toFixed(2), baseline ? baseline.msPerDoc.toFixed(2) : '-',
+    formatDelta(result.msPerDoc, baseline?.msPerDoc));
+  row('peak RSS MB', result.peakRssMb.toFixed(1), baseline ? baseline.peakRssMb.toFixed(1) : '-',
+    formatDelta(result.peakRssMb, baseline?.peakRssMb));
+
+  for (const phase of PHASES) {
+    row(`${PHASE_LABELS[phase]} ms`, result.phasesMs[phase].toFixed(1),
+      baseline ? baseline.phasesMs[phase].toFixed(1) : '-',
+      formatDelta(result.phasesMs[phase], baseline?.phasesMs[phase]));
+  }
+
+  if (baseline) {
+    console.log(`   (baseline recorded ${baseline.recordedAt})`);
+  }
+}
+
+async function main() {
+  const args = process.argv.slice(2);
+  const flag = (name: string) => args.includes(name);
+  const option = (name: string, fallback: number) => {
+    const index = args.indexOf(name);
+    const value = index >= 0 ? parseInt(args[index + 1]) : NaN;
+    return Number.isNaN(value) ? fallback : value;
+  };
+  const text = (name: string) => {
+    const index = args.indexOf(name);
+    return index >= 0 && args[index + 1] && !args[index + 1].startsWith('--') ? args[index + 1] : null;
+  };
+  const goldenRef = text('--golden-ref');
+  if (args.includes('--golden-ref') && !goldenRef) {
+    throw new Error('--golden-ref needs a git ref');
+  }
+
+  process.env.FEEDBACK_PARSE_CACHE = 'off';
+  fs.mkdirSync(FIXTURE_DIR, { recursive: true });
+
+  if (flag('--sample')) {
+    const corpus = sampleCorpus(option('--sample', 8));
+    fs.writeFileSync(CORPUS_PATH, JSON.stringify(corpus, null, 2) + '\n');
+    console.log(`📁 Sampled ${corpus.files.length} files into ${CORPUS_PATH}`);
+  }
+
+  const corpus = loadCorpus();
+  if (!flag('--update-golden') && !fs.existsSync(GOLDEN_PATH)) {
+    // Writing one from this run would make the check pass by definition
+    throw new Error(
+      `No golden snapshot at ${GOLDEN_PATH}. Generate it from the parser before the ` +
+      'change under test with --update-golden --golden-ref <commit>'
+    );
+  }
+
+  const runs = Math.max(1, option('--runs', 3));
+  console.log(`🧪 Feedback parser benchmark on ${corpus.files.length} files, best of ${runs} runs`);
+
+  const log = console.log;
+  const warn = console.warn;
+  let best: Awaited<ReturnType<typeof runPass>> | null = null;
+  try {
+    console.log = () => {};
+    console.warn = () => {};
+    for (let run = 0; run < runs; run++) {
+      const pass = await runPass(corpus);
+      if (!best || pass.result.totalMs < best.result.totalMs) best = pass;
+    }
+  } finally {
+    console.log = log;
+    console.warn = warn;
+  }
+
+  const result: BenchmarkResult = {
+    ...best!.result,
+    // maxRSS is reported in kilobytes
+    peakRssMb: process.resourceUsage().maxRSS / 1024,
+    recordedAt: new Date().toISOString()
+  };
+
+  const baseline: BenchmarkResult | null = fs.existsSync(BASELINE_PATH)
+    ? JSON.parse(fs.readFileSync(BASELINE_PATH, 'utf8'))
+    : null;
+  report(result, baseline);
+
+  if (best!.errors.length > 0) {
+    console.warn(`\n⚠️ ${best!.errors.length} parse errors:`);
+    best!.errors.slice(0, 10).forEach(line => console.warn(`   ${line}`));
+  }
+
+  if (flag('--save-baseline')) {
+    fs.writeFileSync(BASELINE_PATH, JSON.stringify(result, null, 2) + '\n');
+    console.log(`\n💾 Baseline saved to ${BASELINE_PATH}`);
+  }
+
+  if (flag('--update-golden')) {
+    let records = best!.records;
+    if (goldenRef) {
+      const ReferenceParser = parserAtRef(goldenRef);
+      try {
+        console.log = () => {};
+        console.warn = () => {};
+        records = await extractRecords(corpus, new ReferenceParser(corpus.root));
+      } finally {
+        console.log = log;
+        console.warn = warn;
+      }
+    }
+
+    fs.writeFileSync(GOLDEN_PATH, JSON.stringify(records, null, 2) + '\n');
+    console.log(`\n💾 Golden snapshot written to ${GOLDEN_PATH}${goldenRef ? ` from the parser at ${goldenRef}` : ''}`);
+    if (!goldenRef) return;
+  }
+
+  const golden = JSON.parse(fs.readFileSync(GOLDEN_PATH, 'utf8'));
+  const differences = diffGolden(golden, best!.records);
+  if (differences.length > 0) {
+    console.error(`\n❌ ${differences.length} differences from the golden snapshot:`);
+    differences.slice(0, 30).forEach(line => console.error(`   ${line}`));
+    process.exit(1);
+  }
+
+  console.log('\n✅ Extracted records match the golden snapshot');
+}
+
+main().catch(error => {
+  console.error('❌ Benchmark failed:', error);
+  process.exit(1);
+});
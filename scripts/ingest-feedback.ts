@@ -0,0 +1,44 @@
+#!/usr/bin/env tsx
+
+/**
+ * Syncs parsed_student_feedback with the documents in data/Overall.
+ *
+ *   npx tsx scripts/ingest-feedback.ts [--full]
+ *
+ * Only documents whose content changed since the last ingest are parsed,
+ * and the resulting changes are applied in one transaction. --full re-parses
+ * every document (e.g. after a parser change) but still only writes the rows
+ * that differ.
+ */
+
+import { FeedbackStoragePostgres } from '../src/lib/feedback-storage-postgres';
+
+async function main() {
+  const full = process.argv.includes('--full');
+  process.env.FEEDBACK_NAME_INDEX_WATCH = 'off';
+
+  console.log(`📥 Ingesting feedback documents (${full ? 'full' : 'incremental'})`);
+
+  const storage = new FeedbackStoragePostgres();
+  const result = await storage.parseAndStoreFeedback({ full });
+
+  if (!result.success) {
+    console.error('❌ Ingest failed:', result.errors.join('\n'));
+    process.exit(1);
+  }
+
+  console.log(`✅ ${result.filesChanged}/${result.filesTotal} files changed, ${result.filesRemoved} removed in ${result.durationMs}ms`);
+  console.log(`   ${result.inserted} inserted, ${result.updated} updated, ${result.deleted} deleted; ${result.totalStudents} students`);
+  if (result.errors.length > 0) {
+    console.log(`⚠️  ${result.errors.length} documents could not be parsed and kept their stored rows:`);
+    for (const error of result.errors) {
+      console.log(`   ${error}`);
+    }
+  }
+  process.exit(0);
+}
+
+main().catch(error => {
+  console.error('❌ Ingest failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,540 @@
+#!/usr/bin/env tsx
+
+/**
+ * Local stand-in for the Gemini and OpenAI-compatible (OpenRouter) APIs, so
+ * the AI pipeline can be run and benchmarked without network access, keys
+ * or quota.
+ *
+ *   npx tsx scripts/llm-standin-server.ts [options]
+ *
+ *   --port N               listen port (default 8787, 0 picks a free one)
+ *   --latency SPEC         time to first token: fixed:MS, uniform:MIN-MAX or
+ *                          lognormal:MEDIAN,SIGMA (default lognormal:400,0.3)
+ *   --tokens-per-sec N     output rate once the response starts (default 200)
+ *   --output-tokens N      length of templated text answers (default 400)
+ *   --rate-429 P           share of requests answered 429 RESOURCE_EXHAUSTED
+ *   --rate-500 P           share of requests answered 500 INTERNAL
+ *   --rpm-per-key N        answer 429 once a key sends more than N requests
+ *                          a minute (default 0, no limit)
+ *   --seed N               seed for latency and error draws (default 1)
+ *   --responses FILE       JSON list of { "match": regex, "response": text
+ *                          or object } rules checked against the prompt first
+ *
+ * Point the app at it with GEMINI_API_BASE_URL=http://localhost:8787 and
+ * OPENROUTER_API_URL=http://localhost:8787/v1/chat/completions. Handles
+ *
+ *   POST /v1beta/models/{model}:generateContent
+ *   POST /v1beta/models/{model}:streamGenerateContent?alt=sse
+ *   POST /v1/chat/completions (also /chat/completions, /api/v1/...)
+ *   GET  /__stats   requests by route, status and key, injected errors,
+ *                   peak concurrency and token counts
+ *   POST /__reset   clear the stats and per-key windows
+ *
+ * Answers are deterministic for a prompt: a response schema is filled in
+ * from its property names, JSON requests get a StudentAnalysisResult (or
+ * one per student for batch prompts) and text requests get a markdown
+ * analysis with the sections the DeepSeek parser reads.
+ */
+
+import fs from 'fs';
+import http from 'http';
+import { createHash } from 'crypto';
+
+export interface StandInOptions {
+  port?: number;
+  latency?: string;
+  tokensPerSec?: number;
+  outputTokens?: number;
+  rate429?: number;
+  rate500?: number;
+  rpmPerKey?: number;
+  seed?: number;
+  responsesFile?: string;
+}
+
+export interface StandInStats {
+  requests: number;
+  byRoute: Record<string, number>;
+  byStatus: Record<string, number>;
+  byKey: Record<string, number>;
+  injected: { rateLimited: number; quotaExceeded: number; serverErrors: number };
+  inFlight: number;
+  peakInFlight: number;
+  promptTokens: number;
+  outputTokens: number;
+}
+
+export interface StandInServer {
+  url: string;
+  port: number;
+  stats(): StandInStats;
+  reset(): void;
+  close(): Promise<void>;
+}
+
+interface ResponseRule {
+  match: RegExp;
+  response: string;
+}
+
+type Dialect = 'gemini' | 'openai';
+
+const MINUTE_MS = 60_000;
+const CHARS_PER_TOKEN = 4;
+// Tokens per streamed chunk
+const STREAM_CHUNK_TOKENS = 16;
+
+function mulberry32(seed: number): () => number {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function latencySampler(spec: string, random: () => number): () => number {
+  const [kind, args = ''] = spec.split(':');
+  const values = args.split(/[-,]/).map(Number);
+
+  switch (kind) {
+    case 'fixed':
+      return () => values[0] || 0;
+    case 'uniform': {
+      const [min, max] = values;
+      return () => min + random() * (max - min);
+    }
+    case 'lognormal': {
+      const [median, sigma] = values;
+      return () => {
+        // Box-Muller
+        const normal = Math.sqrt(-2 * Math.log(1 - random())) * Math.cos(2 * Math.PI * random());
+        return median * Math.exp(sigma * normal);
+      };
+    }
+    default:
+      throw new Error(`Unknown latency distribution "${spec}"; use fixed:MS, uniform:MIN-MAX or lognormal:MEDIAN,SIGMA`);
+  }
+}
+
+function loadRules(filePath?: string): ResponseRule[] {
+  if (!filePath) return [];
+  const rules: Array<{ match: string; response: unknown }> = JSON.parse(fs.readFileSync(filePath, 'utf8'));
+  return rules.map(rule => ({
+    match: new RegExp(rule.match, 'i'),
+    response: typeof rule.response === 'string' ? rule.response : JSON.stringify(rule.response)
+  }));
+}
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, Math.max(0, ms)));
+
+function countTokens(text: string): number {
+  return Math.ceil(text.length / CHARS_PER_TOKEN);
+}
+
+// Small stable number for a text, so answers vary by student but not by run
+function digestNumber(text: string): number {
+  return parseInt(createHash('sha256').update(text).digest('hex').slice(0, 8), 16);
+}
+
+function studentAnalysis(studentName: string) {
+  const n = digestNumber(studentName);
+  const score = 55 + (n % 40);
+  const trend = (['improving', 'stable', 'declining'] as const)[n % 3];
+  const needsAttention = score < 65;
+
+  return {
+    studentMetrics: {
+      overallScore: score,
+      growthRate: (n % 30) - 10,
+      consistencyScore: 50 + (n % 45),
+      engagementLevel: 60 + (n % 35),
+      trend
+    },
+    skillAssessment: ['Argument Structure', 'Delivery', 'Rebuttal', 'Use of Examples'].map((skillName, index) => ({
+      skillName,
+      currentLevel: 4 + ((n >> index) % 6),
+      progress: ((n >> index) % 20) - 5,
+      consistency: (['high', 'medium', 'low'] as const)[(n >> index) % 3],
+      evidence: [`${studentName} showed ${skillName.toLowerCase()} in recent feedback`]
+    })),
+    attentionNeeded: {
+      requiresAttention: needsAttention,
+      severity: needsAttention ? 'medium' : 'none',
+      primaryConcern: needsAttention ? 'Rebuttals lack direct engagement' : '',
+      specificIssues: needsAttention ? ['Rebuttals restate own case'] : [],
+      suggestedInterventions: needsAttention ? ['Paired rebuttal drills'] : [],
+      reasoning: `Derived from ${studentName}'s recent sessions`
+    },
+    achievements: {
+      recentBreakthroughs: ['Clearer signposting'],
+      masteredSkills: score > 80 ? ['Speech timing'] : [],
+      notableImprovements: ['More specific examples'],
+      readyForAdvancement: score > 85,
+      recognitionSuggestions: ['Mention improved structure in class'],
+      reasoning: `Derived from ${studentName}'s recent sessions`
+    },
+    recommendations: {
+      immediateActions: ['Prepare two rebuttal responses per motion'],
+      skillFocusAreas: ['Rebuttal', 'Examples'],
+      practiceActivities: ['Timed one-minute rebuttals'],
+      parentCommunication: `${studentName} is making steady progress.`
+    }
+  };
+}
+
+// Values for schema strings the app checks or switches on
+const STRING_HINTS: Record<string, string> = {
+  priority: 'high',
+  severity: 'medium',
+  urgency: 'medium',
+  consistency: 'medium',
+  trend: 'improving',
+  currentLevel: 'developing',
+  progress: 'improving',
+  type: 'skill',
+  timeframe: '2-4 weeks'
+};
+
+function fromSchema(schema: any, name: string, context: { studentName: string }): unknown {
+  if (!schema || typeof schema !== 'object') return null;
+  if (Array.isArray(schema.enum) && schema.enum.length > 0) return schema.enum[0];
+
+  const type = String(Array.isArray(schema.type) ? schema.type[0] : schema.type || 'object').toLowerCase();
+  switch (type) {
+    case 'object': {
+      const value: Record<string, unknown> = {};
+      for (const [key, property] of Object.entries(schema.properties || {})) {
+        value[key] = fromSchema(property, key, context);
+      }
+      return value;
+    }
+    case 'array':
+      return [0, 1].map(index => {
+        const item = fromSchema(schema.items, name, context) as any;
+        if (typeof item === 'string') return `${item} ${index + 1}`;
+        // Keep ids (e.g. recommendation ids) unique within the list
+        if (typeof item?.id === 'string') item.id = `${item.id}-${index + 1}`;
+        return item;
+      });
+    case 'integer':
+      return 3;
+    case 'number':
+      return 3.5;
+    case 'boolean':
+      return false;
+    default:
+      if (name === 'studentName') return context.studentName;
+      if (name === 'id') return `rec-${digestNumber(context.studentName) % 10000}`;
+      return STRING_HINTS[name] ?? `${name} for ${context.studentName}`;
+  }
+}
+
+function textAnalysis(studentName: string, outputTokens: number): string {
+  const sections = [
+    `# Analysis for ${studentName}\n`,
+    '### SKILL_CATEGORIES_ANALYSIS\n**Argument Structure & Depth**\nCurrent Level: developing\nProgress: improving\nEvidence: - clearer claims - better signposting\n',
+    '### PATTERN_ANALYSIS\nRepeated Issues: rebuttals restate own case\nRecent Concerns: speech time under target\n',
+    '### OVERALL_PROGRESSION\nTrend: improving\nConsistency: medium\nBreakthrough Moments: - first full-length speech\n',
+    '### RECOMMENDATIONS\nPriority: high\nSkill Area: Rebuttal & Directness\nTarget Issue: indirect rebuttals\nRecommendation: Practise naming the opposing claim before answering it.\nRationale: Seen in most recent sessions.\n'
+  ];
+  let text = sections.join('\n');
+  const filler = `\n${studentName} engaged with the motion, organised points into clear sections and responded to feedback from earlier sessions.`;
+  while (countTokens(text) < outputTokens) {
+    text += filler;
+  }
+  return text;
+}
+
+function promptText(dialect: Dialect, body: any): string {
+  if (dialect === 'openai') {
+    return (body.messages || []).map((message: any) =>
+      typeof message.content === 'string' ? message.content : JSON.stringify(message.content)
+    ).join('\n');
+  }
+  const parts = [...(body.systemInstruction?.parts || []), ...(body.contents || []).flatMap((content: any) => content.parts || [])];
+  return parts.map((part: any) => part.text || '').join('\n');
+}
+
+function studentNames(prompt: string): string[] {
+  return Array.from(new Set(Array.from(prompt.matchAll(/"studentName":\s*"([^"]+)"/g), match => match[1])));
+}
+
+function firstStudentName(prompt: string): string {
+  return studentNames(prompt)[0]
+    || prompt.match(/(?:Analysis for|performance of|feedback for)\s+([A-Z][\w'.-]*(?: [A-Z][\w'.-]*)*)/)?.[1]
+    || 'Student';
+}
+
+export async function startStandInServer(options: StandInOptions = {}): Promise<StandInServer> {
+  const random = mulberry32(options.seed ?? 1);
+  const latency = latencySampler(options.latency ?? 'lognormal:400,0.3', random);
+  const tokensPerSec = options.tokensPerSec ?? 200;
+  const outputTokens = options.outputTokens ?? 400;
+  const rate429 = options.rate429 ?? 0;
+  const rate500 = options.rate500 ?? 0;
+  const rpmPerKey = options.rpmPerKey ?? 0;
+  const rules = loadRules(options.responsesFile);
+
+  let stats: StandInStats;
+  let keyWindows: Map<string, number[]>;
+  const reset = () => {
+    stats = {
+      requests: 0, byRoute: {}, byStatus: {}, byKey: {},
+      injected: { rateLimited: 0, quotaExceeded: 0, serverErrors: 0 },
+      inFlight: 0, peakInFlight: 0, promptTokens: 0, outputTokens: 0
+    };
+    keyWindows = new Map();
+  };
+  reset();
+
+  const answer = (dialect: Dialect, body: any, prompt: string): string => {
+    const rule = rules.find(candidate => candidate.match.test(prompt));
+    if (rule) return rule.response;
+
+    const config = dialect === 'gemini' ? body.generationConfig || {} : {};
+    const schema = config.responseSchema || config.responseJsonSchema;
+    if (schema) {
+      return JSON.stringify(fromSchema(schema, '', { studentName: firstStudentName(prompt) }));
+    }
+
+    const wantsJson = config.responseMimeType === 'application/json' || body.response_format?.type === 'json_object';
+    if (wantsJson) {
+      if (/Analyze these \d+ students/i.test(prompt)) {
+        return JSON.stringify({
+          analyses: studentNames(prompt).map(studentName => ({ studentName, analysis: studentAnalysis(studentName) }))
+        });
+      }
+      return JSON.stringify(studentAnalysis(firstStudentName(prompt)));
+    }
+    return textAnalysis(firstStudentName(prompt), outputTokens);
+  };
+
+  const sendError = (res: http.ServerResponse, dialect: Dialect, status: number) => {
+    const message = status === 429 ? 'Resource has been exhausted (e.g. check quota).' : 'Internal error encountered.';
+    const body = dialect === 'gemini'
+      ? { error: { code: status, message, status: status === 429 ? 'RESOURCE_EXHAUSTED' : 'INTERNAL' } }
+      : { error: { code: status, message, type: status === 429 ? 'rate_limit_exceeded' : 'server_error' } };
+    res.writeHead(status, { 'Content-Type': 'application/json' });
+    res.end(JSON.stringify(body));
+  };
+
+  // Injected error status for this request, or 0
+  const injectedError = (apiKey: string): number => {
+    if (rpmPerKey > 0) {
+      const now = Date.now();
+      const window = (keyWindows.get(apiKey) || []).filter(time => now - time < MINUTE_MS);
+      keyWindows.set(apiKey, window);
+      if (window.length >= rpmPerKey) {
+        stats.injected.quotaExceeded++;
+        return 429;
+      }
+      window.push(now);
+    }
+    const draw = random();
+    if (draw < rate429) {
+      stats.injected.rateLimited++;
+      return 429;
+    }
+    if (draw < rate429 + rate500) {
+      stats.injected.serverErrors++;
+      return 500;
+    }
+    return 0;
+  };
+
+  const handleModelCall = async (
+    req: http.IncomingMessage,
+    res: http.ServerResponse,
+    dialect: Dialect,
+    route: string,
+    body: any,
+    streaming: boolean
+  ) => {
+    const apiKey = String(req.headers['x-goog-api-key']
+      || new URL(req.url || '/', 'http://localhost').searchParams.get('key')
+      || (req.headers.authorization || '').replace(/^Bearer\s+/i, '')
+      || 'anonymous');
+    // Stats show a key fingerprint, never the key
+    const keyLabel = createHash('sha256').update(apiKey).digest('hex').slice(0, 8);
+    stats.requests++;
+    stats.byRoute[route] = (stats.byRoute[route] || 0) + 1;
+    stats.byKey[keyLabel] = (stats.byKey[keyLabel] || 0) + 1;
+
+    const status = injectedError(apiKey);
+    if (status === 429) {
+      stats.byStatus[status] = (stats.byStatus[status] || 0) + 1;
+      return sendError(res, dialect, status);
+    }
+
+    await sleep(latency());
+    if (status === 500) {
+      stats.byStatus[status] = (stats.byStatus[status] || 0) + 1;
+      return sendError(res, dialect, status);
+    }
+
+    const prompt = promptText(dialect, body);
+    const text = answer(dialect, body, prompt);
+    const promptTokens = countTokens(prompt);
+    const textTokens = countTokens(text);
+    stats.promptTokens += promptTokens;
+    stats.outputTokens += textTokens;
+    stats.byStatus[200] = (stats.byStatus[200] || 0) + 1;
+
+    const model = String(body.model || route.split(':')[0]);
+    const usage = dialect === 'gemini'
+      ? { promptTokenCount: promptTokens, candidatesTokenCount: textTokens, totalTokenCount: promptTokens + textTokens }
+      : { prompt_tokens: promptTokens, completion_tokens: textTokens, total_tokens: promptTokens + textTokens };
+    const payload = (delta: string, done: boolean) => dialect === 'gemini'
+      ? {
+          candidates: [{
+            content: { role: 'model', parts: [{ text: delta }] },
+            ...(done && { finishReason: 'STOP' }),
+            index: 0
+          }],
+          ...(done && { usageMetadata: usage }),
+          modelVersion: model
+        }
+      : {
+          id: `chatcmpl-${digestNumber(prompt)}`,
+          object: streaming ? 'chat.completion.chunk' : 'chat.completion',
+          created: Math.floor(Date.now() / 1000),
+          model,
+          choices: [streaming
+            ? { index: 0, delta: { content: delta }, finish_reason: done ? 'stop' : null }
+            : { index: 0, message: { role: 'assistant', content: delta }, finish_reason: 'stop' }],
+          ...(done && { usage })
+        };
+
+    if (!streaming) {
+      await sleep((textTokens / tokensPerSec) * 1000);
+      res.writeHead(200, { 'Content-Type': 'application/json' });
+      res.end(JSON.stringify(payload(text, true)));
+      return;
+    }
+
+    res.writeHead(200, { 'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache' });
+    let closed = false;
+    res.on('close', () => {
+      closed = true;
+    });
+    const chunkChars = STREAM_CHUNK_TOKENS * CHARS_PER_TOKEN;
+    for (let offset = 0; offset < text.length && !closed; offset += chunkChars) {
+      await sleep((STREAM_CHUNK_TOKENS / tokensPerSec) * 1000);
+      const done = offset + chunkChars >= text.length;
+      res.write(`data: ${JSON.stringify(payload(text.slice(offset, offset + chunkChars), done))}\n\n`);
+    }
+    if (dialect === 'openai') {
+      res.write('data: [DONE]\n\n');
+    }
+    res.end();
+  };
+
+  const server = http.createServer((req, res) => {
+    const url = new URL(req.url || '/', 'http://localhost');
+
+    if (req.method === 'GET' && url.pathname === '/__stats') {
+      res.writeHead(200, { 'Content-Type': 'application/json' });
+      res.end(JSON.stringify(stats));
+      return;
+    }
+    if (req.method === 'POST' && url.pathname === '/__reset') {
+      reset();
+      res.writeHead(204);
+      res.end();
+      return;
+    }
+
+    const gemini = url.pathname.match(/^\/v1(?:alpha|beta)?\d*\/models\/([^/:]+):(generateContent|streamGenerateContent)$/);
+    const openai = /^(?:\/api)?(?:\/v1)?\/chat\/completions$/.test(url.pathname);
+    if (req.method !== 'POST' || (!gemini && !openai)) {
+      res.writeHead(404, { 'Content-Type': 'application/json' });
+      res.end(JSON.stringify({ error: { code: 404, message: `No stand-in for ${req.method} ${url.pathname}` } }));
+      return;
+    }
+
+    const chunks: Buffer[] = [];
+    req.on('data', chunk => chunks.push(chunk));
+    req.on('end', () => {
+      let body: any;
+      try {
+        body = JSON.parse(Buffer.concat(chunks).toString('utf8') || '{}');
+      } catch {
+        res.writeHead(400, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify({ error: { code: 400, message: 'Request body is not JSON' } }));
+        return;
+      }
+
+      const dialect: Dialect = gemini ? 'gemini' : 'openai';
+      const route = gemini ? `${gemini[1]}:${gemini[2]}` : 'chat/completions';
+      const streaming = gemini ? gemini[2] === 'streamGenerateContent' : body.stream === true;
+
+      stats.inFlight++;
+      stats.peakInFlight = Math.max(stats.peakInFlight, stats.inFlight);
+      handleModelCall(req, res, dialect, route, body, streaming)
+        .catch(error => {
+          if (!res.headersSent) {
+            res.writeHead(500, { 'Content-Type': 'application/json' });
+            res.end(JSON.stringify({ error: { code: 500, message: String(error) } }));
+          } else {
+            res.end();
+          }
+        })
+        .finally(() => {
+          stats.inFlight--;
+        });
+    });
+  });
+
+  await new Promise<void>((resolve, reject) => {
+    server.once('error', reject);
+    server.listen(options.port ?? 8787, '127.0.0.1', () => resolve());
+  });
+  const port = (server.address() as { port: number }).port;
+
+  return {
+    url: `http://127.0.0.1:${port}`,
+    port,
+    stats: () => JSON.parse(JSON.stringify(stats)),
+    reset,
+    close: () => new Promise<void>(resolve => {
+      server.closeAllConnections?.();
+      server.close(() => resolve());
+    })
+  };
+}
+
+if (require.main === module) {
+  const args = process.argv.slice(2);
+  const option = (name: string) => {
+    const index = args.indexOf(name);
+    return index >= 0 ? args[index + 1] : undefined;
+  };
+  const number = (name: string) => {
+    const value = option(name);
+    return value === undefined ? undefined : Number(value);
+  };
+
+  startStandInServer({
+    port: number('--port'),
+    latency: option('--latency'),
+    tokensPerSec: number('--tokens-per-sec'),
+    outputTokens: number('--output-tokens'),
+    rate429: number('--rate-429'),
+    rate500: number('--rate-500'),
+    rpmPerKey: number('--rpm-per-key'),
+    seed: number('--seed'),
+    responsesFile: option('--responses')
+  })
+    .then(server => {
+      console.log(`🤖 LLM stand-in listening on ${server.url}`);
+      console.log(`   GEMINI_API_BASE_URL=${server.url}`);
+      console.log(`   OPENROUTER_API_URL=${server.url}/v1/chat/completions`);
+    })
+    .catch(error => {
+      console.error('❌ Could not start the LLM stand-in:', error);
+      process.exit(1);
+    });
+}
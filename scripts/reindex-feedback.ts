@@ -0,0 +1,40 @@
+#!/usr/bin/env tsx
+
+/**
+ * Rebuilds the student name index (and, for changed files, the parse cache)
+ * used by FeedbackParser.getStudentFeedback.
+ *
+ *   npx tsx scripts/reindex-feedback.ts [dataPath]
+ *
+ * The running app keeps the index current with a file watcher; run this
+ * after bulk changes made while the app was down, or to start from scratch.
+ */
+
+import { FeedbackParser } from '../src/lib/feedback-parser';
+
+async function main() {
+  const dataPath = process.argv[2] || './data/Overall';
+  process.env.FEEDBACK_NAME_INDEX_WATCH = 'off';
+
+  console.log(`🔎 Reindexing feedback documents in ${dataPath}`);
+
+  const parser = new FeedbackParser(dataPath);
+  const stats = await parser.reindex();
+
+  if (!stats) {
+    console.log('⚠️  Name index is disabled (FEEDBACK_NAME_INDEX=off)');
+    return;
+  }
+
+  console.log(`✅ Indexed ${stats.files} files, ${stats.names} distinct students in ${stats.lastBuildMs}ms`);
+
+  const cacheStats = parser.getParseCacheStats();
+  if (cacheStats) {
+    console.log(`   Parse cache: ${cacheStats.misses} parsed, ${cacheStats.memoryHits + cacheStats.diskHits + cacheStats.revalidated} reused`);
+  }
+}
+
+main().catch(error => {
+  console.error('❌ Reindex failed:', error);
+  process.exit(1);
+});
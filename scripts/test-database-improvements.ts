@@ -2,7 +2,7 @@
 
 import { db } from '../src/lib/database/connection';
 import { qb } from '../src/lib/database/query-builder';
-import { cache } from '../src/lib/database/cache';
+import { cacheEngine } from '../src/lib/cache/cache-engine';
 
 async function testDatabaseImprovements() {
   console.log('🧪 Testing Database Improvements\n');
@@ -38,8 +38,7 @@ async function testDatabaseImprovements() {
     console.log('\n4️⃣ Testing Redis Cache Integration...');
     
     // Connect to cache
-    await cache.connect();
-    const cacheConnected = cache.isConnected();
+    const cacheConnected = await cacheEngine.ping();
     console.log(`✅ Cache connected: ${cacheConnected}`);
     
     if (cacheConnected) {
@@ -47,17 +46,17 @@ async function testDatabaseImprovements() {
       const testKey = 'test:database:improvements';
       const testData = { timestamp: new Date(), test: true };
       
-      await cache.set(testKey, testData, { ttl: 60 });
-      const cached = await cache.get(testKey);
+      await cacheEngine.set(testKey, testData, { ttl: 60 });
+      const cached = await cacheEngine.get(testKey);
       console.log('✅ Cache set/get working:', cached);
       
       // Test cache invalidation
-      await cache.delete(testKey);
-      const deleted = await cache.get(testKey);
+      await cacheEngine.delete(testKey);
+      const deleted = await cacheEngine.get(testKey);
       console.log('✅ Cache deletion working:', deleted === null);
       
       // Get cache stats
-      const stats = await cache.getStats();
+      const stats = cacheEngine.getStats();
       console.log('✅ Cache stats:', stats);
     }
     
@@ -125,7 +124,7 @@ async function testDatabaseImprovements() {
     console.error('\n❌ Test failed:', error);
   } finally {
     // Cleanup
-    await cache.disconnect();
+    await cacheEngine.close();
     await db.close();
     process.exit(0);
   }
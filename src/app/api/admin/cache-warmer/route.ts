@@ -0,0 +1,50 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getServerSession } from 'next-auth';
+import { authOptions } from '@/lib/auth';
+import { scheduleCacheWarmer } from '@/lib/services/schedule-warmer';
+
+export async function GET(request: NextRequest) {
+  try {
+    const session = await getServerSession(authOptions);
+    if (!session || session.user.role !== 'admin') {
+      return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    return NextResponse.json({
+      success: true,
+      report: scheduleCacheWarmer.getLastReport(),
+      timestamp: new Date().toISOString()
+    });
+
+  } catch (error) {
+    console.error('Cache warmer report error:', error);
+    return NextResponse.json({ 
+      error: 'Failed to fetch cache warmer report',
+      details: error instanceof Error ? error.message : 'Unknown error'
+    }, { status: 500 });
+  }
+}
+
+// Warm all of today's remaining classes now, e.g. after a deploy
+export async function POST(request: NextRequest) {
+  try {
+    const session = await getServerSession(authOptions);
+    if (!session || session.user.role !== 'admin') {
+      return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    const report = await scheduleCacheWarmer.runOnce({ force: true });
+
+    return NextResponse.json({
+      success: true,
+      report
+    });
+
+  } catch (error) {
+    console.error('Cache warm error:', error);
+    return NextResponse.json({ 
+      error: 'Failed to warm cache',
+      details: error instanceof Error ? error.message : 'Unknown error'
+    }, { status: 500 });
+  }
+}
@@ -5,6 +5,8 @@ import { db, findOne, insertOne, findMany } from '@/lib/postgres'
 import { aiAnalysisService } from '@/lib/ai-analysis-service'
 import { debateRecommendationEngine } from '@/lib/debate-recommendation-engine'
 import { deepSeekRecommendationEngine } from '@/lib/deepseek-recommendation-engine'
+import { sseResponse } from '@/lib/server-sent-events'
+import { studentNameResolver } from '@/lib/services/student-name-resolver'
 import { z } from 'zod'
 
 // Request validation schemas
@@ -36,6 +38,141 @@ const trackProgressSchema = z.object({
   }))
 })
 
+// Best unambiguous fuzzy match for a name with no exact match
+async function findSimilarStudent(studentName: string) {
+  const candidate = await studentNameResolver.resolveBest(studentName)
+  return candidate?.id ? findOne('students', { id: candidate.id }) : null
+}
+
+async function findStudentByName(studentName: string) {
+  return (await findOne('students', { name: studentName })) || findSimilarStudent(studentName)
+}
+
+async function suggestStudentNames(studentName: string): Promise<string[]> {
+  const candidates = await studentNameResolver.resolve(studentName, { limit: 5 })
+  return candidates.map(candidate => candidate.name)
+}
+
+interface QueryExecutor {
+  query(text: string, params?: any[]): Promise<{ rows: any[] }>
+}
+
+// Persist one recommendation from a scientific analysis
+async function insertScientificRecommendation(
+  executor: QueryExecutor,
+  studentId: string,
+  studentName: string,
+  rec: any,
+  userId: string
+) {
+  const inserted = await executor.query(
+    `INSERT INTO recommendations (student_id, student_name, growth_area, priority, category, recommendation, specific_actions, timeframe, measurable_goals, resources, instructor_notes, confidence, status, created_by)
+     VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14) RETURNING *`,
+    [
+      studentId,
+      studentName,
+      rec.skill,
+      rec.priority,
+      rec.category,
+      rec.recommendation,
+      rec.actionItems.practiceExercises,
+      rec.timeframe,
+      rec.measurableGoals.shortTerm,
+      [], // resources - can be added later
+      rec.patternContext.potentialUnderlyingFactors?.[0] || 'Pattern-based analysis',
+      rec.patternContext.issueFrequency * 10, // convert to percentage
+      'active',
+      userId
+    ]
+  )
+  return inserted.rows[0]
+}
+
+/**
+ * Scientific analysis as Server-Sent Events: the descriptive analysis text
+ * while it is generated, each recommendation as soon as the model has
+ * written it, the validated analysis, then each recommendation as it is
+ * saved. Events: stage, analysis-text, recommendation, reset, analysis,
+ * saved, done, error.
+ */
+function streamScientificAnalysis(params: {
+  student: any
+  studentName: string
+  programType: string
+  feedbackSessions: any[]
+  meaningfulSessionCount: number
+  userId: string
+}) {
+  const { student, studentName, programType, feedbackSessions, meaningfulSessionCount, userId } = params
+
+  return sseResponse(async (send) => {
+    let result
+    try {
+      result = await debateRecommendationEngine.analyzeChronologicalFeedback(
+        studentName,
+        feedbackSessions,
+        { onProgress: event => send(event.type, event) }
+      )
+    } catch (analysisError) {
+      console.error('❌ Scientific analysis failed:', analysisError)
+      const errorMessage = analysisError instanceof Error ? analysisError.message : 'Unknown error'
+      send('error', {
+        error: 'Failed to generate scientific analysis',
+        details: errorMessage,
+        errorType: analysisError instanceof Error ? analysisError.name : 'Unknown',
+        debug: {
+          feedbackSessionCount: feedbackSessions.length,
+          meaningfulSessionCount
+        }
+      })
+      return
+    }
+
+    const scientificAnalysis = result.analysis
+    const actualPrompt = result.prompt
+
+    send('analysis', {
+      studentName,
+      scientificAnalysis,
+      feedbackSessionsAnalyzed: feedbackSessions.length,
+      analysisType: 'scientific_debate_analysis',
+      debug: {
+        prompt: actualPrompt,
+        promptLength: actualPrompt.length,
+        feedbackSessionCount: feedbackSessions.length,
+        meaningfulSessionCount,
+        sampleFeedback: feedbackSessions.slice(0, 2)
+      }
+    })
+
+    // Saved one row at a time, so each reaches the client as soon as it is
+    // written rather than after a transaction over all of them
+    const savedRecommendations = []
+    if (!student.id.startsWith('temp_')) {
+      await insertOne('student_analysis_history', {
+        student_id: student.id,
+        analysis_type: 'scientific_debate_analysis',
+        analysis_data: scientificAnalysis,
+        program_type: programType,
+        feedback_session_count: feedbackSessions.length,
+        created_by: userId
+      })
+
+      for (const rec of scientificAnalysis.recommendations) {
+        const saved = await insertScientificRecommendation(db, student.id, studentName, rec, userId)
+        savedRecommendations.push(saved)
+        send('saved', { recommendation: saved })
+      }
+
+      console.log(`💾 Saved ${savedRecommendations.length} recommendations to database`)
+    } else {
+      console.log('⚠️ Using temporary student - skipping database save')
+    }
+
+    send('done', { success: true, recommendations: savedRecommendations })
+  })
+}
+
 export async function POST(request: NextRequest) {
   try {
     const session = await getServerSession(authOptions)
@@ -46,6 +183,8 @@ export async function POST(request: NextRequest) {
     const body = await request.json()
     const { searchParams } = new URL(request.url)
     const action = searchParams.get('action')
+    // ?stream=1 answers with Server-Sent Events instead of one JSON body
+    const stream = searchParams.get('stream') === '1'
 
     switch (action) {
       case 'generate': {
@@ -195,45 +334,19 @@ export async function POST(request: NextRequest) {
 
         if (!student) {
           console.log('⚠️ Student not found in students table, checking for similar names...')
-          
-          try {
-            // Try to find by partial name match
-            const allStudents = await findMany('students', {}, 'name ASC')
-            console.log(`📋 Found ${allStudents.length} students in database`)
-            
-            // Filter out students with null names and log any problematic records
-            const validStudents = allStudents.filter(s => {
-              if (!s.name) {
-                console.log('⚠️ Found student with null name:', s.id)
-                return false
-              }
-              return true
-            })
-            
-            console.log(`✅ ${validStudents.length} students have valid names`)
-            
-            const similarStudent = validStudents.find(s => 
-              s.name.toLowerCase().includes(studentName.toLowerCase()) ||
-              studentName.toLowerCase().includes(s.name.toLowerCase())
-            )
 
-            if (similarStudent) {
-              console.log('✅ Found similar student:', similarStudent.name)
-              student = similarStudent
-            } else {
-              // Create temporary student for analysis purposes
-              console.log('📝 Creating temporary student record for analysis')
-              student = {
-                id: `temp_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`,
-                name: studentName,
-                created_at: new Date().toISOString(),
-                updated_at: new Date().toISOString()
-              }
+          try {
+            student = await findSimilarStudent(studentName)
+            if (student) {
+              console.log('✅ Found similar student:', student.name)
             }
           } catch (studentLookupError) {
             console.error('❌ Error during student lookup:', studentLookupError)
-            // Create temporary student as fallback
-            console.log('📝 Creating temporary student record due to lookup error')
+          }
+
+          if (!student) {
+            // Create temporary student for analysis purposes
+            console.log('📝 Creating temporary student record for analysis')
             student = {
               id: `temp_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`,
               name: studentName,
@@ -330,6 +443,17 @@ export async function POST(request: NextRequest) {
 
         console.log('🤖 Starting scientific analysis with Gemini Flash 2.5...')
 
+        if (stream) {
+          return streamScientificAnalysis({
+            student,
+            studentName,
+            programType,
+            feedbackSessions,
+            meaningfulSessionCount: meaningfulSessions.length,
+            userId: session.user.id
+          })
+        }
+
         try {
           // Use the Gemini debate recommendation engine with JSON-Prompt approach
           const result = await debateRecommendationEngine.analyzeChronologicalFeedback(
@@ -361,27 +485,7 @@ export async function POST(request: NextRequest) {
             savedRecommendations = await db.transaction(async (client) => {
               const result = []
               for (const rec of scientificAnalysis.recommendations) {
-                const inserted = await client.query(
-                  `INSERT INTO recommendations (student_id, student_name, growth_area, priority, category, recommendation, specific_actions, timeframe, measurable_goals, resources, instructor_notes, confidence, status, created_by)
-                   VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14) RETURNING *`,
-                  [
-                    student.id,
-                    studentName,
-                    rec.skill,
-                    rec.priority,
-                    rec.category,
-                    rec.recommendation,
-                    rec.actionItems.practiceExercises,
-                    rec.timeframe,
-                    rec.measurableGoals.shortTerm,
-                    [], // resources - can be added later
-                    rec.patternContext.potentialUnderlyingFactors?.[0] || 'Pattern-based analysis',
-                    rec.patternContext.issueFrequency * 10, // convert to percentage
-                    'active',
-                    session.user.id
-                  ]
-                )
-                result.push(inserted.rows[0])
+                result.push(await insertScientificRecommendation(client, student.id, studentName, rec, session.user.id))
               }
               return result
             })
@@ -460,13 +564,16 @@ export async function POST(request: NextRequest) {
           return NextResponse.json({ error: 'Student name or studentId is required' }, { status: 400 })
         }
 
-        const student = await findOne('students', { name: studentName })
+        const student = await findStudentByName(studentName)
 
         if (!student) {
-          return NextResponse.json({ error: 'Student not found' }, { status: 404 })
+          return NextResponse.json({
+            error: 'Student not found',
+            suggestions: await suggestStudentNames(studentName)
+          }, { status: 404 })
         }
 
-        const feedbackData = await findMany('parsed_student_feedback', { student_name: studentName }, 'created_at DESC', 10)
+        const feedbackData = await findMany('parsed_student_feedback', { student_name: student.name }, 'created_at DESC', 10)
 
         if (!feedbackData || feedbackData.length === 0) {
           return NextResponse.json({ 
@@ -486,6 +593,38 @@ export async function POST(request: NextRequest) {
           teacherComments: feedback.teacher_comments || undefined
         }))
 
+        if (stream) {
+          // The service returns whole results, so this streams per step:
+          // the analysis first, then each recommendation
+          return sseResponse(async (send) => {
+            send('stage', { stage: 'analysis' })
+            const analysis = await aiAnalysisService.analyzeStudentPerformance(
+              studentName,
+              level as 'primary' | 'secondary',
+              feedbackSessions
+            )
+            send('analysis', { studentName, analysis })
+
+            send('stage', { stage: 'recommendations' })
+            const recommendations = await aiAnalysisService.generateRecommendations(
+              student.id,
+              studentName,
+              analysis,
+              programType as 'PSD' | 'Academic Writing' | 'RAPS' | 'Critical Thinking'
+            )
+            recommendations.forEach((recommendation, index) => {
+              send('recommendation', { index, recommendation })
+            })
+
+            send('done', {
+              success: true,
+              studentName,
+              recommendations,
+              feedbackSessionsAnalyzed: feedbackSessions.length
+            })
+          })
+        }
+
         const analysis = await aiAnalysisService.analyzeStudentPerformance(
           studentName,
           level as 'primary' | 'secondary',
@@ -538,9 +677,12 @@ export async function GET(request: NextRequest) {
 
     let targetStudentId = studentId
     if (!targetStudentId && studentName) {
-      const student = await findOne('students', { name: studentName })
+      const student = await findStudentByName(studentName)
       if (!student) {
-        return NextResponse.json({ error: 'Student not found' }, { status: 404 })
+        return NextResponse.json({
+          error: 'Student not found',
+          suggestions: await suggestStudentNames(studentName)
+        }, { status: 404 })
       }
       targetStudentId = student.id
     }
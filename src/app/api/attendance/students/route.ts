@@ -1,5 +1,5 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { db } from '@/lib/postgres';
+import { getAttendanceRoster } from '@/lib/services/class-data';
 import { getServerSession } from 'next-auth';
 import { authOptions } from '@/lib/auth';
 
@@ -17,31 +17,7 @@ export async function GET(request: NextRequest) {
       return NextResponse.json({ error: 'Course ID required' }, { status: 400 });
     }
 
-    // Get students enrolled in the course - ensuring unique students by name
-    // This handles cases where same student might have multiple records
-    const studentsQuery = `
-      SELECT DISTINCT ON (u.name)
-        s.id,
-        u.name,
-        e.id as enrollment_id,
-        e.status as enrollment_status
-      FROM students s
-      JOIN users u ON s.id = u.id
-      JOIN enrollments e ON s.id = e.student_id
-      WHERE e.course_id = $1 
-        AND e.status = 'active'
-        AND u.role = 'student'
-      ORDER BY u.name, s.created_at DESC, s.id DESC
-    `;
-
-    const result = await db.query(studentsQuery, [courseId]);
-
-    const students = result.rows.map(row => ({
-      id: row.id,
-      name: row.name,
-      enrollment_id: row.enrollment_id,
-      enrollment_status: row.enrollment_status
-    }));
+    const students = await getAttendanceRoster(courseId);
 
     return NextResponse.json({ 
       success: true, 
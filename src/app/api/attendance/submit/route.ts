@@ -2,6 +2,7 @@ import { NextRequest, NextResponse } from 'next/server';
 import { db } from '@/lib/postgres';
 import { getServerSession } from 'next-auth';
 import { authOptions } from '@/lib/auth';
+import { CacheTag, invalidateTags } from '@/lib/cache/cache-manager';
 
 interface AttendanceSubmission {
   course_id: string;
@@ -92,6 +93,14 @@ export async function POST(request: NextRequest) {
 
       await db.query('COMMIT');
 
+      // Tag invalidation only touches the entries for this course and its
+      // students, so it stays cheap however large the cache grows
+      await invalidateTags([
+        CacheTag.course(course_id),
+        CacheTag.instructor(session.user.id),
+        ...students.map(student => CacheTag.student(student.student_id))
+      ]);
+
       return NextResponse.json({ 
         success: true, 
         message: 'Attendance submitted successfully',
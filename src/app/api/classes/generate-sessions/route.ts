@@ -2,6 +2,7 @@ import { NextRequest, NextResponse } from 'next/server';
 import { getServerSession } from 'next-auth';
 import { authOptions } from '@/lib/auth';
 import { executeQuery } from '@/lib/postgres';
+import { invalidateClassData } from '@/lib/services/class-data';
 
 export async function POST(request: NextRequest) {
   try {
@@ -130,6 +131,10 @@ export async function POST(request: NextRequest) {
       }
     }
 
+    if (sessionsCreated > 0) {
+      await invalidateClassData(coursesResult.rows.map((course: any) => course.id));
+    }
+
     return NextResponse.json({
       success: true,
       sessionsCreated,
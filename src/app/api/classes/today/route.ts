@@ -2,6 +2,7 @@ import { NextRequest, NextResponse } from 'next/server';
 import { getServerSession } from 'next-auth';
 import { authOptions } from '@/lib/auth';
 import { executeQuery } from '@/lib/postgres';
+import { withETag } from '@/lib/cache/conditional-get';
 
 interface TodayClass {
   id: string;
@@ -19,7 +20,7 @@ interface TodayClass {
   instructorId?: string;
 }
 
-export async function GET(request: NextRequest) {
+async function getTodayClasses(request: NextRequest) {
   try {
     const session = await getServerSession(authOptions);
     
@@ -281,4 +282,6 @@ export async function GET(request: NextRequest) {
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+}
+
+export const GET = withETag('/api/classes/today', getTodayClasses);
@@ -2,8 +2,9 @@ import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { dal } from '@/lib/dal'
+import { etagFor, withETag } from '@/lib/cache/conditional-get'
 
-export async function GET(request: NextRequest) {
+async function getDashboardMetrics(request: NextRequest) {
   try {
     const session = await getServerSession(authOptions)
     
@@ -169,16 +170,22 @@ export async function GET(request: NextRequest) {
         )
     }
 
+    const filters = {
+      timeframe,
+      programType,
+      courseId,
+      studentId
+    }
+
     return NextResponse.json({
       type: metricType,
       data: metrics,
       generated_at: new Date().toISOString(),
-      filters: {
-        timeframe,
-        programType,
-        courseId,
-        studentId
-      }
+      filters
+    }, {
+      // generated_at changes on every call; version by the data alone so
+      // an unchanged poll can be answered with 304
+      headers: { ETag: etagFor(JSON.stringify({ type: metricType, data: metrics, filters })) }
     })
 
   } catch (error) {
@@ -411,4 +418,6 @@ async function getRecentActivity(): Promise<ActivityItem[]> {
       timestamp: new Date(Date.now() - 6 * 60 * 60 * 1000) // 6 hours ago
     }
   ]
-}
\ No newline at end of file
+}
+
+export const GET = withETag('/api/dashboard/metrics', getDashboardMetrics)
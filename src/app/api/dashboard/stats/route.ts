@@ -3,9 +3,10 @@ import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { db } from '@/lib/postgres'
 import FeedbackStorage from '@/lib/feedback-storage'
-import { cachedQuery, CachePrefix, CacheTTL } from '@/lib/cache/cache-manager'
+import { cachedQuery, CachePrefix, CacheTag, CacheTTL } from '@/lib/cache/cache-manager'
+import { withAutoCache } from '@/lib/cache/cache-middleware'
 
-export async function GET(request: NextRequest) {
+async function getDashboardStats(request: NextRequest) {
   try {
     const session = await getServerSession(authOptions)
     
@@ -53,7 +54,8 @@ export async function GET(request: NextRequest) {
           `, [instructorId]);
           return result.rows[0];
         },
-        CacheTTL.MEDIUM
+        CacheTTL.MEDIUM,
+        [CacheTag.instructor(instructorId)]
       );
       const totalStudents = parseInt(studentData.total_students, 10);
 
@@ -69,7 +71,8 @@ export async function GET(request: NextRequest) {
           `, [instructorId]);
           return result.rows;
         },
-        CacheTTL.MEDIUM
+        CacheTTL.MEDIUM,
+        [CacheTag.instructor(instructorId)]
       );
       const totalCourses = courses?.length || 0
 
@@ -148,3 +151,7 @@ export async function GET(request: NextRequest) {
     }, { status: 500 })
   }
 }
+
+// Stale-while-revalidate with single-flight refresh, so an expiring
+// dashboard key is recomputed by one request rather than every open tab
+export const GET = withAutoCache(getDashboardStats)
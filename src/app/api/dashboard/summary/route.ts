@@ -2,8 +2,9 @@ import { NextRequest, NextResponse } from 'next/server';
 import { getServerSession } from 'next-auth';
 import { authOptions } from '@/lib/auth';
 import { dal } from '@/lib/dal';
+import { withAutoCache } from '@/lib/cache/cache-middleware';
 
-export async function GET(request: NextRequest) {
+async function getDashboardSummary(request: NextRequest) {
   try {
     const session = await getServerSession(authOptions);
     
@@ -152,4 +153,8 @@ export async function GET(request: NextRequest) {
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+}
+
+// Stale-while-revalidate with single-flight refresh, so an expiring
+// dashboard key is recomputed by one request rather than every open tab
+export const GET = withAutoCache(getDashboardSummary);
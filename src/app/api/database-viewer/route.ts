@@ -2,6 +2,27 @@ import { NextRequest, NextResponse } from 'next/server';
 import { getServerSession } from 'next-auth';
 import { authOptions } from '@/lib/auth';
 import { executeQuery } from '@/lib/postgres';
+import {
+  KeysetSort,
+  buildKeysetClause,
+  buildKeysetOrder,
+  buildKeysetSelect,
+  normalizePageSize,
+  toPage
+} from '@/lib/dal/base/BaseRepository';
+
+// Same ordering the viewer has always used, made total (id last) and NULL-free
+// so it can be paged with a keyset cursor instead of OFFSET
+const VIEWER_SORT: KeysetSort = {
+  keys: [
+    "COALESCE(instructor, '')",
+    'student_name',
+    'unit_number::decimal',
+    "COALESCE(parsed_at, 'epoch'::timestamptz)",
+    'id'
+  ],
+  direction: 'ASC'
+};
 
 export async function GET(request: NextRequest) {
   try {
@@ -17,8 +38,8 @@ export async function GET(request: NextRequest) {
     const dateFrom = searchParams.get('dateFrom');
     const dateTo = searchParams.get('dateTo');
     const feedbackType = searchParams.get('feedbackType');
-    const limit = parseInt(searchParams.get('limit') || '100');
-    const offset = parseInt(searchParams.get('offset') || '0');
+    const cursor = searchParams.get('cursor');
+    const limit = normalizePageSize(searchParams.get('limit') || '100');
 
     // Build dynamic query
     let query = `
@@ -39,7 +60,8 @@ export async function GET(request: NextRequest) {
         file_path,
         parsed_at,
         unique_id,
-        rubric_scores
+        rubric_scores,
+        ${buildKeysetSelect(VIEWER_SORT)}
       FROM parsed_student_feedback 
       WHERE 1=1
     `;
@@ -77,15 +99,23 @@ export async function GET(request: NextRequest) {
       paramIndex++;
     }
 
-    // Add ordering and pagination
-    query += ` ORDER BY instructor, student_name, unit_number::decimal, parsed_at`;
-    query += ` LIMIT $${paramIndex} OFFSET $${paramIndex + 1}`;
-    params.push(limit, offset);
+    // Keyset pagination: seek past the last row of the previous page
+    const keyset = buildKeysetClause(VIEWER_SORT, cursor, paramIndex);
+    if (!keyset) {
+      return NextResponse.json({ error: 'Invalid cursor' }, { status: 400 });
+    }
+    if (keyset.text) {
+      query += ` AND ${keyset.text}`;
+      params.push(...keyset.values);
+    }
+
+    query += ` ${buildKeysetOrder(VIEWER_SORT)} LIMIT ${limit + 1}`;
 
     console.log('Database viewer query:', query);
     console.log('Parameters:', params);
 
     const result = await executeQuery(query, params);
+    const page = toPage<any>(result.rows, limit, VIEWER_SORT);
 
     // Also get summary statistics
     let summaryQuery = `
@@ -153,13 +183,13 @@ export async function GET(request: NextRequest) {
 
     return NextResponse.json({
       success: true,
-      data: result.rows,
+      data: page.items,
       summary: summaryResult.rows,
       pagination: {
         total: totalRecords,
         limit,
-        offset,
-        hasMore: offset + limit < totalRecords
+        nextCursor: page.nextCursor,
+        hasMore: page.hasMore
       },
       filters: {
         instructor,
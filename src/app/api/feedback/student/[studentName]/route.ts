@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server';
 import FeedbackStorage from '@/lib/feedback-storage';
+import { studentNameResolver } from '@/lib/services/student-name-resolver';
 
 export async function GET(
   request: NextRequest,
@@ -33,14 +34,8 @@ export async function GET(
     
     if (feedbacks.length === 0) {
       // Get similar names for suggestions
-      const allStudents = await storage.getStudentsWithFeedback();
-      const suggestions = allStudents
-        .filter(student => 
-          student.student_name.toLowerCase().includes(studentName.toLowerCase()) ||
-          studentName.toLowerCase().includes(student.student_name.toLowerCase())
-        )
-        .slice(0, 5)
-        .map(s => s.student_name);
+      const candidates = await studentNameResolver.resolve(studentName, { source: 'feedback', limit: 5 });
+      const suggestions = candidates.map(candidate => candidate.name);
       
       return NextResponse.json(
         { 
@@ -91,6 +91,10 @@ export async function POST(request: NextRequest) {
     for (const filePath of savedFiles) {
       try {
         const fileResult = await parser.parseDocumentFile(filePath, feedbackType);
+        if (!fileResult.success) {
+          console.error(`Failed to parse ${path.basename(filePath)}:`, fileResult.errors);
+          errors.push(...fileResult.errors);
+        }
         parseResults.push(...fileResult.feedbacks);
         console.log(`Parsed ${fileResult.feedbacks.length} feedback entries from ${path.basename(filePath)}`);
       } catch (error) {
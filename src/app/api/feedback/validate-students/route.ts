@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server';
 import FeedbackStorage from '@/lib/feedback-storage';
 import FeedbackParser from '@/lib/feedback-parser';
+import { studentNameResolver } from '@/lib/services/student-name-resolver';
 import path from 'path';
 
 export async function GET(request: NextRequest) {
@@ -15,15 +16,16 @@ export async function GET(request: NextRequest) {
     
     // Get all students from database
     const allStudents = await storage.getStudentsWithFeedback();
-    const foundStudentNames = allStudents.map(s => s.student_name);
     
-    // Check which expected students are missing
-    const missingStudents = expectedStudents.filter(student => 
-      !foundStudentNames.some(found => 
-        found.toLowerCase() === student.toLowerCase() ||
-        found.toLowerCase().includes(student.toLowerCase())
-      )
-    );
+    // Check which expected students are missing: no stored name equal to
+    // or containing the expected one (misspellings still count as missing)
+    const missingStudents: string[] = [];
+    for (const student of expectedStudents) {
+      const [best] = await studentNameResolver.resolve(student, { source: 'feedback', limit: 1 });
+      if (!best || best.match === 'fuzzy') {
+        missingStudents.push(student);
+      }
+    }
     
     // Check for potential name collisions (same name in both primary and secondary)
     const nameCollisions: any[] = [];
@@ -1,7 +1,8 @@
 import { NextRequest, NextResponse } from 'next/server';
 import FeedbackStorage from '@/lib/feedback-storage';
+import { withETag } from '@/lib/cache/conditional-get';
 
-export async function GET(request: NextRequest) {
+async function getGrowthAnalytics(request: NextRequest) {
   try {
     console.log(`Analytics request from ${permissions.instructorName} (canAccessAllData: ${permissions.canAccessAllData})`);
     
@@ -47,3 +48,5 @@ export async function GET(request: NextRequest) {
     }, { status: 200 });
   }
 }
+
+export const GET = withETag('/api/growth/analytics', getGrowthAnalytics);
@@ -1,7 +1,8 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { executeQuery } from '@/lib/postgres';
+import { withETag } from '@/lib/cache/conditional-get';
 
-export async function GET(
+async function getStudentGrowthOverview(
   request: NextRequest,
   { params }: { params: Promise<{ studentId: string }> }
 ) {
@@ -93,4 +94,6 @@ export async function GET(
     console.error('Error fetching student growth data:', error);
     return NextResponse.json({ error: 'Internal server error' }, { status: 500 });
   }
-}
\ No newline at end of file
+}
+
+export const GET = withETag('/api/growth/student/[studentId]', getStudentGrowthOverview);
@@ -1,5 +1,11 @@
 import { NextResponse } from 'next/server';
 import { db } from '@/lib/database/connection';
+import { getCacheStats } from '@/lib/cache/cache-manager';
+import { getInvalidationStats } from '@/lib/cache/invalidation-metrics';
+import { getConditionalStats } from '@/lib/cache/conditional-get';
+import { getAIResultCache } from '@/lib/ai-result-cache';
+import { aiSingleFlight } from '@/lib/ai-single-flight';
+import { getGeminiScheduler } from '@/lib/gemini-scheduler';
 
 export async function GET() {
   const health = {
@@ -10,6 +16,14 @@ export async function GET() {
       tables: 0,
       error: null as string | null
     },
+    cache: {
+      ...getCacheStats(),
+      invalidation: getInvalidationStats(),
+      conditional: getConditionalStats(),
+      aiResults: getAIResultCache()?.getStats() ?? null,
+      aiSingleFlight: aiSingleFlight.getStats()
+    },
+    gemini: getGeminiScheduler().getStats(),
     environment: process.env.NODE_ENV,
     version: process.env.npm_package_version || '0.1.0'
   };
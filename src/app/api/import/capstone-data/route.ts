@@ -4,6 +4,7 @@ import { authOptions } from '@/lib/auth'
 import * as XLSX from 'xlsx'
 import bcrypt from 'bcryptjs'
 import { pool } from '@/lib/postgres'
+import { invalidateClassData } from '@/lib/services/class-data'
 
 interface CourseData {
   code: string
@@ -75,6 +76,8 @@ export async function POST(request: NextRequest) {
       enrollmentsCreated: 0,
       errors: [] as string[]
     }
+    // Courses whose enrollments may have changed, for cache invalidation
+    const touchedCourseIds = new Set<string>()
 
     // Create a default password for new student accounts
     const defaultPassword = await bcrypt.hash('changeme123', 12)
@@ -259,6 +262,7 @@ export async function POST(request: NextRequest) {
                 ]
               )
               results.enrollmentsCreated++
+              touchedCourseIds.add(courseId)
             }
 
           } catch (error) {
@@ -272,6 +276,7 @@ export async function POST(request: NextRequest) {
     }
 
     await client.query('COMMIT')
+    await invalidateClassData(Array.from(touchedCourseIds))
 
     return NextResponse.json({
       success: true,
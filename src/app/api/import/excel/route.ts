@@ -3,6 +3,7 @@ import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { parseExcelFile, validateCourseData, normalizeTime } from '@/lib/excel-parser'
 import { db, findOne, insertOne } from '@/lib/postgres'
+import { invalidateClassData } from '@/lib/services/class-data'
 import bcrypt from 'bcryptjs'
 
 export async function POST(request: NextRequest) {
@@ -157,6 +158,8 @@ export async function POST(request: NextRequest) {
         }
       }
 
+      await invalidateClassData(Array.from(courseIds.values()))
+
       return NextResponse.json({
         success: true,
         import: true,
@@ -2,11 +2,24 @@ import { NextRequest, NextResponse } from 'next/server';
 import { getServerSession } from 'next-auth';
 import { authOptions } from '@/lib/auth';
 import { storageService } from '@/lib/storage-service';
-import { transcriptionService } from '@/lib/transcription-service';
-import { aiFeedbackGenerator } from '@/lib/ai-feedback-generator';
-import { transcriptStorage } from '@/lib/transcript-storage';
+import {
+  MAX_RECORDING_BYTES,
+  createRecordingRecord,
+  finishRecordingUpload,
+  isAllowedAudioType,
+  readUploadFields
+} from '@/lib/recording-upload-pipeline';
 import { executeQuery } from '@/lib/postgres';
-import { v4 as uuidv4 } from 'uuid';
+import {
+  KeysetSort,
+  buildKeysetClause,
+  buildKeysetOrder,
+  buildKeysetSelect,
+  normalizePageSize,
+  toPage
+} from '@/lib/dal/base/BaseRepository';
+
+const RECORDING_SORT: KeysetSort = { keys: ['sr.created_at', 'sr.id'], direction: 'DESC' };
 
 export async function POST(request: NextRequest) {
   try {
@@ -15,30 +28,13 @@ export async function POST(request: NextRequest) {
       return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
     }
 
+    // Single-request upload: the whole recording is buffered in memory.
+    // Recorders use the resumable protocol under ./sessions instead.
     const formData = await request.formData();
     const audioFile = formData.get('audio') as File;
-    const studentId = formData.get('studentId') as string;
-    const studentName = formData.get('studentName') as string;
-    const sessionId = formData.get('sessionId') as string | null;
-    const speechTopic = formData.get('speechTopic') as string;
-    const motion = formData.get('motion') as string;
-    const speechType = formData.get('speechType') as string || 'debate';
-    const programType = formData.get('programType') as string || 'PSD';
-    const transcriptionProvider = formData.get('transcriptionProvider') as string || 'openai';
-    const fullTranscript = formData.get('fullTranscript') as string || '';
-    const speakerSegmentsStr = formData.get('speakerSegments') as string || '[]';
-    const duration = parseInt(formData.get('duration') as string || '0');
-    const autoGenerateFeedback = formData.get('autoGenerateFeedback') === 'true';
-    const feedbackType = formData.get('feedbackType') as string || 'secondary';
-    
-    let speakerSegments = [];
-    try {
-      speakerSegments = JSON.parse(speakerSegmentsStr);
-    } catch (e) {
-      console.error('Failed to parse speaker segments:', e);
-    }
+    const fields = readUploadFields(name => formData.get(name) as string | null);
 
-    if (!audioFile || !studentId) {
+    if (!audioFile || !fields.studentId) {
       return NextResponse.json(
         { error: 'Audio file and student ID are required' }, 
         { status: 400 }
@@ -46,16 +42,14 @@ export async function POST(request: NextRequest) {
     }
 
     // Validate file type and size
-    const allowedTypes = ['audio/wav', 'audio/mp3', 'audio/mp4', 'audio/webm', 'audio/ogg'];
-    if (!allowedTypes.includes(audioFile.type)) {
+    if (!isAllowedAudioType(audioFile.type)) {
       return NextResponse.json(
         { error: 'Invalid file type. Please upload audio files only.' },
         { status: 400 }
       );
     }
 
-    const maxSizeBytes = 100 * 1024 * 1024; // 100MB
-    if (audioFile.size > maxSizeBytes) {
+    if (audioFile.size > MAX_RECORDING_BYTES) {
       return NextResponse.json(
         { error: 'File too large. Maximum size is 100MB.' },
         { status: 400 }
@@ -67,39 +61,13 @@ export async function POST(request: NextRequest) {
     const buffer = Buffer.from(arrayBuffer);
 
     // Create recording record in database
-    const recordingResult = await executeQuery(
-      `INSERT INTO speech_recordings (
-        id, student_id, session_id, instructor_id, audio_file_path,
-        original_filename, file_size_bytes, mime_type, speech_topic,
-        motion, speech_type, program_type, status, transcription_provider,
-        recording_metadata
-      ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
-      RETURNING *`,
-      [
-        uuidv4(),
-        studentId,
-        sessionId,
-        session.user.id,
-        '', // Will be updated after upload
-        audioFile.name,
-        audioFile.size,
-        audioFile.type,
-        speechTopic,
-        motion,
-        speechType,
-        programType,
-        'uploading',
-        transcriptionProvider,
-        JSON.stringify({
-          uploadedAt: new Date().toISOString(),
-          userAgent: request.headers.get('user-agent'),
-          contentLength: audioFile.size,
-        }),
-      ]
+    const recording = await createRecordingRecord(
+      session.user.id,
+      fields,
+      { filename: audioFile.name, sizeBytes: audioFile.size, mimeType: audioFile.type },
+      request.headers.get('user-agent')
     );
 
-    const recording = recordingResult.rows[0];
-
     try {
       // Upload file to storage
       const uploadResult = await storageService.uploadAudioFile(
@@ -113,83 +81,7 @@ export async function POST(request: NextRequest) {
         throw new Error(uploadResult.error || 'Upload failed');
       }
 
-      // Update recording with file path and duration
-      await executeQuery(
-        'UPDATE speech_recordings SET audio_file_path = $1, status = $2, duration_seconds = $3 WHERE id = $4',
-        [uploadResult.file!.filePath, 'uploaded', duration, recording.id]
-      );
-      
-      // Save transcript if provided from live transcription
-      let transcriptSaved = false;
-      if (fullTranscript) {
-        const transcriptResult = await transcriptStorage.saveTranscript(
-          recording.id,
-          fullTranscript,
-          {
-            studentId,
-            studentName,
-            speechTopic,
-            motion,
-            speechType,
-            duration,
-            wordCount: fullTranscript.split(/\s+/).length,
-            speakerSegments,
-            provider: 'gpt-4o-mini-live',
-            confidence: 0.95
-          }
-        );
-        transcriptSaved = transcriptResult.success;
-      }
-
-      // Start transcription process
-      const transcriptionResult = await transcriptionService.transcribeRecording(
-        recording.id,
-        transcriptionProvider as any
-      );
-
-      let feedbackResult = null;
-
-      // Generate AI feedback if requested and transcription succeeded
-      if (autoGenerateFeedback && transcriptionResult.success) {
-        try {
-          feedbackResult = await aiFeedbackGenerator.generateFeedbackFromRecording(
-            recording.id,
-            {
-              feedbackType: feedbackType as 'primary' | 'secondary',
-              includeTranscript: true,
-            }
-          );
-        } catch (error) {
-          console.error('AI feedback generation failed:', error);
-          // Don't fail the entire request if feedback generation fails
-        }
-      }
-
-      return NextResponse.json({
-        success: true,
-        recording: {
-          id: recording.id,
-          status: recording.status,
-          originalFilename: recording.original_filename,
-          fileSizeBytes: recording.file_size_bytes,
-          speechTopic: recording.speech_topic,
-          motion: recording.motion,
-          fileUrl: uploadResult.url,
-        },
-        transcription: transcriptionResult.success ? {
-          id: transcriptionResult.transcriptionId,
-          text: transcriptionResult.text,
-          confidence: transcriptionResult.confidence,
-          wordCount: transcriptionResult.wordCount,
-          speakingRate: transcriptionResult.speakingRate,
-        } : null,
-        feedback: feedbackResult?.success ? {
-          id: feedbackResult.feedbackId,
-          type: feedbackType,
-          generated: true,
-        } : null,
-        message: 'Recording uploaded successfully',
-      });
+      return NextResponse.json(await finishRecordingUpload(recording, uploadResult, fields));
 
     } catch (error) {
       // Clean up failed recording
@@ -219,13 +111,14 @@ export async function GET(request: NextRequest) {
     const { searchParams } = new URL(request.url);
     const studentId = searchParams.get('studentId');
     const sessionId = searchParams.get('sessionId');
-    const limit = parseInt(searchParams.get('limit') || '10');
-    const offset = parseInt(searchParams.get('offset') || '0');
+    const cursor = searchParams.get('cursor');
+    const limit = normalizePageSize(searchParams.get('limit') || '10');
 
     let query = `
       SELECT sr.*, s.name as student_name, u.name as instructor_name,
              st.transcription_text, st.confidence_score,
-             agf.status as feedback_status, agf.feedback_type
+             agf.status as feedback_status, agf.feedback_type,
+             ${buildKeysetSelect(RECORDING_SORT)}
       FROM speech_recordings sr
       JOIN students s ON sr.student_id = s.id
       JOIN users u ON sr.instructor_id = u.id
@@ -249,12 +142,21 @@ export async function GET(request: NextRequest) {
       params.push(sessionId);
     }
 
-    query += ` ORDER BY sr.created_at DESC LIMIT $${paramCount + 1} OFFSET $${paramCount + 2}`;
-    params.push(limit, offset);
+    const keyset = buildKeysetClause(RECORDING_SORT, cursor, paramCount + 1);
+    if (!keyset) {
+      return NextResponse.json({ error: 'Invalid cursor' }, { status: 400 });
+    }
+    if (keyset.text) {
+      query += ` AND ${keyset.text}`;
+      params.push(...keyset.values);
+    }
+
+    query += ` ${buildKeysetOrder(RECORDING_SORT)} LIMIT ${limit + 1}`;
 
     const result = await executeQuery(query, params);
+    const page = toPage<any>(result.rows, limit, RECORDING_SORT);
 
-    const recordings = result.rows.map((row: any) => ({
+    const recordings = page.items.map((row: any) => ({
       id: row.id,
       studentName: row.student_name,
       instructorName: row.instructor_name,
@@ -278,8 +180,8 @@ export async function GET(request: NextRequest) {
       recordings,
       pagination: {
         limit,
-        offset,
-        total: recordings.length, // Would need separate count query for exact total
+        nextCursor: page.nextCursor,
+        hasMore: page.hasMore,
       },
     });
 
@@ -0,0 +1,59 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getServerSession } from 'next-auth';
+import { authOptions } from '@/lib/auth';
+import { finishRecordingUpload } from '@/lib/recording-upload-pipeline';
+import { recordingUploadSessions } from '@/lib/recording-upload-sessions';
+import { executeQuery } from '@/lib/postgres';
+
+interface RouteParams {
+  params: Promise<{ uploadId: string }>;
+}
+
+/**
+ * Finish a fully received upload: the audio is moved into storage, then
+ * transcribed (and feedback generated) as for a single-request upload.
+ * Optional body: { sha256 } of the whole file, checked against the bytes
+ * received.
+ */
+export async function POST(request: NextRequest, { params }: RouteParams) {
+  try {
+    const { uploadId } = await params;
+    const session = await getServerSession(authOptions);
+    if (!session?.user?.id) {
+      return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    const body = await request.json().catch(() => ({}));
+    const completion = await recordingUploadSessions.complete(
+      uploadId,
+      session.user.id,
+      typeof body?.sha256 === 'string' ? body.sha256 : undefined
+    );
+
+    if (!completion.success) {
+      return NextResponse.json(
+        { error: completion.error, progress: completion.progress },
+        { status: completion.status }
+      );
+    }
+
+    try {
+      return NextResponse.json(
+        await finishRecordingUpload(completion.recording, completion.upload!, completion.fields!)
+      );
+    } catch (error) {
+      // Clean up failed recording
+      await executeQuery('DELETE FROM speech_recordings WHERE id = $1', [completion.recording.id]);
+      throw error;
+    }
+  } catch (error) {
+    console.error('Recording upload error:', error);
+    return NextResponse.json(
+      {
+        error: 'Upload failed',
+        details: error instanceof Error ? error.message : 'Unknown error'
+      },
+      { status: 500 }
+    );
+  }
+}
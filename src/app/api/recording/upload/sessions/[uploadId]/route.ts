@@ -0,0 +1,85 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getServerSession } from 'next-auth';
+import { authOptions } from '@/lib/auth';
+import { recordingUploadSessions, UploadSessionResult } from '@/lib/recording-upload-sessions';
+
+interface RouteParams {
+  params: Promise<{ uploadId: string }>;
+}
+
+function respond(result: UploadSessionResult) {
+  if (!result.success) {
+    return NextResponse.json(
+      { error: result.error, progress: result.progress },
+      { status: result.status }
+    );
+  }
+  return NextResponse.json(result.progress ?? { success: true }, { status: result.status });
+}
+
+/**
+ * Progress of an upload; a client resumes from receivedBytes
+ */
+export async function GET(request: NextRequest, { params }: RouteParams) {
+  try {
+    const { uploadId } = await params;
+    const session = await getServerSession(authOptions);
+    if (!session?.user?.id) {
+      return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    return respond(await recordingUploadSessions.getProgress(uploadId, session.user.id));
+  } catch (error) {
+    console.error('Error reading upload progress:', error);
+    return NextResponse.json({ error: 'Failed to read upload progress' }, { status: 500 });
+  }
+}
+
+/**
+ * Append one chunk (raw bytes) at ?offset=N, which must equal receivedBytes.
+ * The body is streamed to disk as it arrives.
+ */
+export async function PUT(request: NextRequest, { params }: RouteParams) {
+  try {
+    const { uploadId } = await params;
+    const session = await getServerSession(authOptions);
+    if (!session?.user?.id) {
+      return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    const offset = Number(request.nextUrl.searchParams.get('offset'));
+    if (!Number.isInteger(offset) || offset < 0) {
+      return NextResponse.json({ error: 'offset must be a non-negative integer' }, { status: 400 });
+    }
+    const contentLength = request.headers.get('content-length');
+
+    return respond(await recordingUploadSessions.append(
+      uploadId,
+      session.user.id,
+      offset,
+      request.body,
+      contentLength !== null ? parseInt(contentLength, 10) : null
+    ));
+  } catch (error) {
+    console.error('Error appending upload chunk:', error);
+    return NextResponse.json({ error: 'Failed to store chunk' }, { status: 500 });
+  }
+}
+
+/**
+ * Abandon an upload that has not been completed
+ */
+export async function DELETE(request: NextRequest, { params }: RouteParams) {
+  try {
+    const { uploadId } = await params;
+    const session = await getServerSession(authOptions);
+    if (!session?.user?.id) {
+      return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    return respond(await recordingUploadSessions.abort(uploadId, session.user.id));
+  } catch (error) {
+    console.error('Error aborting upload:', error);
+    return NextResponse.json({ error: 'Failed to abort upload' }, { status: 500 });
+  }
+}
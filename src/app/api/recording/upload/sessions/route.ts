@@ -0,0 +1,56 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getServerSession } from 'next-auth';
+import { authOptions } from '@/lib/auth';
+import { readUploadFields } from '@/lib/recording-upload-pipeline';
+import { recordingUploadSessions } from '@/lib/recording-upload-sessions';
+
+/**
+ * Open a resumable recording upload.
+ *
+ * Body: { filename, mimeType, totalBytes, fields } where `fields` holds the
+ * same (string) fields as the single-request upload form. Answers with the
+ * session's progress, including uploadId and the chunk size to use; the
+ * audio is then sent with PUT ./[uploadId]?offset=N and the upload finished
+ * with POST ./[uploadId]/complete.
+ */
+export async function POST(request: NextRequest) {
+  try {
+    const session = await getServerSession(authOptions);
+    if (!session?.user?.id) {
+      return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    const body = await request.json().catch(() => null);
+    if (!body || typeof body.filename !== 'string' || typeof body.mimeType !== 'string') {
+      return NextResponse.json(
+        { error: 'filename, mimeType and totalBytes are required' },
+        { status: 400 }
+      );
+    }
+
+    const rawFields = body.fields && typeof body.fields === 'object' ? body.fields : {};
+    const fields = readUploadFields(name => rawFields[name] != null ? String(rawFields[name]) : null);
+
+    const result = await recordingUploadSessions.create(session.user.id, {
+      filename: body.filename,
+      mimeType: body.mimeType,
+      totalBytes: Number(body.totalBytes),
+      fields,
+      userAgent: request.headers.get('user-agent'),
+    });
+
+    if (!result.success) {
+      return NextResponse.json({ error: result.error }, { status: result.status });
+    }
+    return NextResponse.json(result.progress, { status: result.status });
+  } catch (error) {
+    console.error('Error opening upload session:', error);
+    return NextResponse.json(
+      {
+        error: 'Upload failed',
+        details: error instanceof Error ? error.message : 'Unknown error'
+      },
+      { status: 500 }
+    );
+  }
+}
@@ -1,57 +1,32 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { getServerSession } from 'next-auth';
 import { authOptions } from '@/lib/auth';
-import fs from 'fs/promises';
 import path from 'path';
+import { storageService } from '@/lib/storage-service';
+import { audioFileResponse } from '@/lib/audio-streaming';
 
-export async function GET(
-  request: NextRequest,
-  { params }: { params: { filename: string } }
-) {
+async function serveAudio(request: NextRequest, params: Promise<{ filename: string }>) {
   try {
     const session = await getServerSession(authOptions);
     if (!session?.user?.id) {
       return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
     }
 
-    const { filename } = params;
-    
+    const { filename } = await params;
+
     // Sanitize filename to prevent path traversal
     const sanitizedFilename = path.basename(filename);
-    const audioPath = path.join(process.cwd(), 'data', 'recordings', 'audio', sanitizedFilename);
-    
-    // Check if file exists
-    try {
-      await fs.access(audioPath);
-    } catch {
+    const audioPath = await storageService.resolveLocalAudioPath(sanitizedFilename);
+
+    // Streams only the requested byte range; see audio-streaming.ts
+    const response = audioPath
+      ? await audioFileResponse(request, audioPath, { filename: sanitizedFilename })
+      : null;
+
+    if (!response) {
       return NextResponse.json({ error: 'Audio file not found' }, { status: 404 });
     }
-    
-    // Read the file
-    const audioBuffer = await fs.readFile(audioPath);
-    
-    // Determine content type based on file extension
-    const ext = path.extname(sanitizedFilename).toLowerCase();
-    const contentTypes: Record<string, string> = {
-      '.mp3': 'audio/mpeg',
-      '.wav': 'audio/wav',
-      '.webm': 'audio/webm',
-      '.ogg': 'audio/ogg',
-      '.m4a': 'audio/mp4'
-    };
-    
-    const contentType = contentTypes[ext] || 'audio/mpeg';
-    
-    // Return the audio file with proper headers
-    return new NextResponse(audioBuffer, {
-      status: 200,
-      headers: {
-        'Content-Type': contentType,
-        'Content-Length': audioBuffer.length.toString(),
-        'Content-Disposition': `inline; filename="${sanitizedFilename}"`,
-        'Cache-Control': 'public, max-age=3600'
-      }
-    });
+    return response;
   } catch (error) {
     console.error('Error serving audio file:', error);
     return NextResponse.json(
@@ -59,4 +34,18 @@ export async function GET(
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+}
+
+export async function GET(
+  request: NextRequest,
+  { params }: { params: Promise<{ filename: string }> }
+) {
+  return serveAudio(request, params);
+}
+
+export async function HEAD(
+  request: NextRequest,
+  { params }: { params: Promise<{ filename: string }> }
+) {
+  return serveAudio(request, params);
+}
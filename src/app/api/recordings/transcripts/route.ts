@@ -52,11 +52,31 @@ export async function GET(request: NextRequest) {
 
     // Search transcripts
     if (search) {
-      const results = await transcriptStorage.searchTranscripts(search, {
-        studentId: searchParams.get('filterStudentId') || undefined,
-        speechType: searchParams.get('speechType') || undefined,
+      const startDate = searchParams.get('startDate');
+      const endDate = searchParams.get('endDate');
+      const cursor = searchParams.get('cursor');
+
+      if (cursor && !transcriptStorage.isValidSearchCursor(cursor)) {
+        return NextResponse.json({ error: 'Invalid cursor' }, { status: 400 });
+      }
+
+      const page = await transcriptStorage.searchTranscripts(
+        search,
+        {
+          studentId: searchParams.get('filterStudentId') || undefined,
+          speechType: searchParams.get('speechType') || undefined,
+          startDate: startDate ? new Date(startDate) : undefined,
+          endDate: endDate ? new Date(endDate) : undefined,
+        },
+        {
+          limit: parseInt(searchParams.get('limit') || '20'),
+          cursor,
+        }
+      );
+      return NextResponse.json({
+        results: page.items,
+        pagination: { nextCursor: page.nextCursor, hasMore: page.hasMore },
       });
-      return NextResponse.json({ results });
     }
 
     return NextResponse.json({ error: 'Please provide recordingId, studentId, or search parameter' }, { status: 400 });
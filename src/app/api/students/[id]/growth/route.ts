@@ -4,8 +4,9 @@ import { authOptions } from '@/lib/auth';
 import { debateGrowthEngine, TimeFrame } from '@/lib/analytics/debate-growth-engine';
 // Keep old engine as fallback
 import { GrowthAnalyticsEngine } from '@/lib/analytics/growth-engine';
+import { withETag } from '@/lib/cache/conditional-get';
 
-export async function GET(
+async function getStudentGrowth(
   req: NextRequest,
   context: { params: Promise<{ id: string }> }
 ) {
@@ -62,4 +63,6 @@ export async function GET(
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+}
+
+export const GET = withETag('/api/students/[id]/growth', getStudentGrowth);
@@ -2,6 +2,7 @@ import { NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { db } from '@/lib/postgres'
+import { invalidateClassData } from '@/lib/services/class-data'
 
 interface RouteParams {
   params: Promise<{ id: string }>
@@ -294,10 +295,11 @@ export async function PATCH(request: Request, { params }: RouteParams) {
 
     if (body.status !== undefined) {
       // Update student status via enrollments
-      await db.query(
-        `UPDATE enrollments SET status = $1 WHERE student_id = $2`,
+      const updated = await db.query(
+        `UPDATE enrollments SET status = $1 WHERE student_id = $2 RETURNING course_id`,
         [body.status === 'hidden' ? 'inactive' : 'active', id]
       )
+      await invalidateClassData(updated.rows.map(row => row.course_id))
       return NextResponse.json({ success: true })
     }
 
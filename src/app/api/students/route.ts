@@ -2,6 +2,17 @@ import { NextRequest, NextResponse } from 'next/server';
 import { getServerSession } from 'next-auth';
 import { authOptions } from '@/lib/auth';
 import { db } from '@/lib/database/connection';
+import {
+  KeysetSort,
+  buildKeysetClause,
+  buildKeysetOrder,
+  buildKeysetSelect,
+  keysetColumns,
+  normalizePageSize,
+  toPage
+} from '@/lib/dal/base/BaseRepository';
+
+const STUDENT_SORT: KeysetSort = { keys: ['u.name', 's.id'], direction: 'ASC' };
 
 export async function GET(request: NextRequest) {
   try {
@@ -15,9 +26,27 @@ export async function GET(request: NextRequest) {
     
     console.log(`Fetching students for instructor: ${instructorName}`);
 
-    // Get all students with their enrollments, feedback count, and average star ratings
+    const { searchParams } = new URL(request.url);
+    const cursor = searchParams.get('cursor');
+    const pageSize = normalizePageSize(searchParams.get('limit'));
+
+    const keyset = buildKeysetClause(STUDENT_SORT, cursor, 1);
+    if (!keyset) {
+      return NextResponse.json({ error: 'Invalid cursor' }, { status: 400 });
+    }
+
+    // Pick the page of students first (an index range scan on users(name, id)),
+    // then aggregate enrollments, feedback and ratings for just those students
     const query = `
-      WITH student_ratings AS (
+      WITH page_students AS (
+        SELECT s.id, ${buildKeysetSelect(STUDENT_SORT)}
+        FROM students s
+        INNER JOIN users u ON s.id = u.id
+        ${keyset.text ? `WHERE ${keyset.text}` : ''}
+        ${buildKeysetOrder(STUDENT_SORT)}
+        LIMIT ${pageSize + 1}
+      ),
+      student_ratings AS (
         SELECT 
           s.id,
           AVG(
@@ -28,7 +57,7 @@ export async function GET(request: NextRequest) {
           ) as avg_star_rating,
           COUNT(DISTINCT cs.id) as attended_sessions,
           MAX(cs.session_date) as last_activity_date
-        FROM students s
+        FROM page_students s
         LEFT JOIN attendances a ON s.id = a.student_id
         LEFT JOIN class_sessions cs ON a.session_id = cs.id
         WHERE a.status = 'present'
@@ -38,7 +67,7 @@ export async function GET(request: NextRequest) {
         SELECT 
           s.id,
           COUNT(*) as makeup_count
-        FROM students s
+        FROM page_students s
         LEFT JOIN attendances a ON s.id = a.student_id
         LEFT JOIN class_sessions cs ON a.session_id = cs.id
         WHERE a.status = 'absent' 
@@ -67,33 +96,68 @@ export async function GET(request: NextRequest) {
               ELSE 'secondary'
             END
           ELSE 'secondary'
-        END as level
-      FROM students s
+        END as level,
+        ${keysetColumns(STUDENT_SORT, 'ps')}
+      FROM page_students ps
+      INNER JOIN students s ON s.id = ps.id
       INNER JOIN users u ON s.id = u.id
       LEFT JOIN enrollments e ON s.id = e.student_id
       LEFT JOIN courses c ON e.course_id = c.id
       LEFT JOIN parsed_student_feedback pf ON s.id = pf.student_id
       LEFT JOIN student_ratings sr ON s.id = sr.id
       LEFT JOIN student_makeups sm ON s.id = sm.id
-      GROUP BY s.id, s.student_number, u.name, s.grade_level, s.school, 
+      GROUP BY ${keysetColumns(STUDENT_SORT, 'ps')}, s.id, s.student_number, u.name, s.grade_level, s.school, 
                sr.avg_star_rating, sr.attended_sessions, sr.last_activity_date, sm.makeup_count
-      ORDER BY u.name
+      ${buildKeysetOrder(STUDENT_SORT)}
     `;
 
-    const result = await db.query(query);
-    
-    // Log query results for debugging
-    console.log(`Students API: Found ${result.rows.length} students`);
-    if (result.rows.length > 0) {
-      console.log('First student raw data:', {
-        id: result.rows[0].id,
-        student_id_external: result.rows[0].student_id_external,
-        name: result.rows[0].name
-      });
+    const result = await db.query(query, keyset.values);
+    const page = toPage<any>(result.rows, pageSize, STUDENT_SORT);
+
+    // Header stats cover every student, not just the loaded pages, so they
+    // are computed here once, with the first page. They use the same rules
+    // as starAverage and feedbackSessions below.
+    let total: number | undefined;
+    let stats: { totalStudents: number; topPerformers: number; needSupport: number } | undefined;
+    if (!cursor) {
+      const statsResult = await db.query(`
+        WITH ratings AS (
+          SELECT
+            a.student_id,
+            AVG(
+              (COALESCE(a.attitude_efforts, 0) +
+               COALESCE(a.asking_questions, 0) +
+               COALESCE(a.application_skills, 0) +
+               COALESCE(a.application_feedback, 0))::DECIMAL / 4.0
+            ) as avg_star_rating
+          FROM attendances a
+          WHERE a.status = 'present'
+          GROUP BY a.student_id
+        )
+        SELECT
+          COUNT(*) as total,
+          COUNT(*) FILTER (WHERE COALESCE(r.avg_star_rating, 3.0) >= 3.5) as top_performers,
+          COUNT(*) FILTER (
+            WHERE COALESCE(r.avg_star_rating, 3.0) < 2.5
+            OR NOT EXISTS (SELECT 1 FROM parsed_student_feedback pf WHERE pf.student_id = s.id)
+          ) as need_support
+        FROM students s
+        INNER JOIN users u ON s.id = u.id
+        LEFT JOIN ratings r ON r.student_id = s.id
+      `);
+      const row = statsResult.rows[0] || {};
+      total = parseInt(row.total || '0');
+      stats = {
+        totalStudents: total,
+        topPerformers: parseInt(row.top_performers || '0'),
+        needSupport: parseInt(row.need_support || '0')
+      };
     }
     
+    console.log(`Students API: Returning ${page.items.length} students (hasMore: ${page.hasMore})`);
+    
     // Transform the data to match the expected structure
-    const students = result.rows.map(row => ({
+    const students = page.items.map(row => ({
       id: row.student_id_external || row.id,
       name: row.name || 'Unknown Student',
       level: row.level,
@@ -109,7 +173,16 @@ export async function GET(request: NextRequest) {
       isDeparted: false
     }));
 
-    return NextResponse.json(students);
+    return NextResponse.json({
+      students,
+      stats,
+      pagination: {
+        limit: pageSize,
+        nextCursor: page.nextCursor,
+        hasMore: page.hasMore,
+        total
+      }
+    });
 
   } catch (error) {
     console.error('Error fetching students:', error);
@@ -18,6 +18,7 @@ import {
 } from 'lucide-react';
 import StudentAnalysisAnimation from '@/components/animations/StudentAnalysisAnimation';
 import StudentRecommendations from '@/components/ai/StudentRecommendations';
+import { fetchWithETag } from '@/lib/react-query';
 
 interface GrowthAnalytics {
   unitPerformance: Array<{
@@ -147,7 +148,7 @@ export default function GrowthTrackingPage() {
 
   const fetchAnalytics = async () => {
     try {
-      const response = await fetch('/api/growth/analytics');
+      const response = await fetchWithETag('/api/growth/analytics');
       const data = await response.json();
       setAnalytics(data);
     } catch (error) {
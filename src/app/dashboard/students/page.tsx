@@ -183,47 +183,66 @@ export default function StudentsPage() {
   const [selectedCourse, setSelectedCourse] = useState('all');
   const [currentPage, setCurrentPage] = useState(1);
   const [activeTab, setActiveTab] = useState('grid');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [hasMoreStudents, setHasMoreStudents] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [serverStats, setServerStats] = useState<StatsData | null>(null);
   
   const ITEMS_PER_PAGE = 20;
+  const FETCH_PAGE_SIZE = 100;
   
-  // Fetch students data
+  // Fetch one keyset page of students from the API and append it
+  const fetchStudentsPage = useCallback(async (cursor: string | null) => {
+    const params = new URLSearchParams({ limit: FETCH_PAGE_SIZE.toString() });
+    if (cursor) params.append('cursor', cursor);
+
+    const response = await fetch(`/api/students?${params}`);
+    console.log('Response status:', response.status);
+
+    if (!response.ok) {
+      console.error('API error:', response.status, response.statusText);
+      const errorText = await response.text();
+      console.error('Error details:', errorText);
+      setHasMoreStudents(false);
+      return;
+    }
+
+    const data = await response.json();
+    console.log('Students page received:', data.students.length, 'students');
+    setStudents(prev => (cursor ? [...prev, ...data.students] : data.students));
+    setNextCursor(data.pagination.nextCursor);
+    setHasMoreStudents(data.pagination.hasMore);
+    // Sent with the first page only; covers all students, loaded or not
+    if (data.stats) {
+      setServerStats(data.stats);
+    }
+  }, []);
+  
+  // Fetch the first page of students
   useEffect(() => {
-    const fetchStudents = async () => {
-      try {
-        const response = await fetch('/api/students');
-        console.log('Response status:', response.status);
-        
-        if (response.ok) {
-          const data = await response.json();
-          console.log('Students data received:', data.length, 'students');
-          console.log('First student:', data[0]);
-          setStudents(data);
-        } else {
-          console.error('API error:', response.status, response.statusText);
-          const errorText = await response.text();
-          console.error('Error details:', errorText);
-          setStudents([]);
-        }
-      } catch (error) {
+    fetchStudentsPage(null)
+      .catch(error => {
         console.error('Error fetching students:', error);
         setStudents([]);
-      } finally {
-        setLoading(false);
-      }
-    };
-    
-    fetchStudents();
-  }, []);
+      })
+      .finally(() => setLoading(false));
+  }, [fetchStudentsPage]);
   
-  // Calculate stats
+  // Calculate stats; the server's cover every student, the fallback only
+  // the pages loaded so far
   const stats: StatsData = useMemo(() => {
+    if (serverStats) return serverStats;
     const activeStudents = students.filter(s => !s.isHidden && !s.isDeparted);
     return {
       totalStudents: activeStudents.length,
       topPerformers: activeStudents.filter(s => s.starAverage >= 3.5).length,
       needSupport: activeStudents.filter(s => s.starAverage < 2.5 || s.feedbackSessions === 0).length
     };
-  }, [students]);
+  }, [students, serverStats]);
+
+  // Search and filters run in the browser, over the students loaded so far
+  const filtersActive = searchTerm !== '' || filterType !== 'all' || selectedCourse !== 'all';
+  const filtersPartial = filtersActive && hasMoreStudents;
   
   // Filter and sort students
   const filteredStudents = useMemo(() => {
@@ -304,11 +323,32 @@ export default function StudentsPage() {
     return Array.from(courses).sort();
   }, [students]);
   
-  const handleLoadMore = useCallback(() => {
+  // Fetch the next page from the server; resolves to whether one was added
+  const fetchMoreStudents = useCallback(async () => {
+    if (!hasMoreStudents || loadingMore) return false;
+    setLoadingMore(true);
+    try {
+      await fetchStudentsPage(nextCursor);
+      return true;
+    } catch (error) {
+      console.error('Error fetching more students:', error);
+      return false;
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [hasMoreStudents, loadingMore, nextCursor, fetchStudentsPage]);
+
+  const handleLoadMore = useCallback(async () => {
     if (currentPage < totalPages) {
       setCurrentPage(prev => prev + 1);
+      return;
     }
-  }, [currentPage, totalPages]);
+
+    // Local pages are exhausted; fetch the next page from the server on demand
+    if (await fetchMoreStudents()) {
+      setCurrentPage(prev => prev + 1);
+    }
+  }, [currentPage, totalPages, fetchMoreStudents]);
   
   return (
     <div className="min-h-screen bg-gray-50">
@@ -394,6 +434,12 @@ export default function StudentsPage() {
               </SelectContent>
             </Select>
           </div>
+          {filtersPartial && (
+            <p className="text-sm text-gray-500 mt-2">
+              Showing matches among the {students.length} students loaded so far
+              {serverStats ? ` of ${serverStats.totalStudents}` : ''}. Load more to search the rest.
+            </p>
+          )}
         </div>
       </div>
       
@@ -418,6 +464,11 @@ export default function StudentsPage() {
             ) : filteredStudents.length === 0 ? (
               <Card className="p-12 text-center">
                 <p className="text-gray-500">No students found matching your criteria</p>
+                {hasMoreStudents && (
+                  <Button variant="outline" className="mt-4" onClick={fetchMoreStudents} disabled={loadingMore}>
+                    {loadingMore ? 'Loading...' : 'Load More Students'}
+                  </Button>
+                )}
               </Card>
             ) : (
               <>
@@ -427,10 +478,14 @@ export default function StudentsPage() {
                   ))}
                 </div>
                 
-                {currentPage < totalPages && (
+                {(currentPage < totalPages || hasMoreStudents) && (
                   <div className="mt-8 text-center">
-                    <Button variant="outline" onClick={handleLoadMore}>
-                      Load More ({filteredStudents.length - paginatedStudents.length} remaining)
+                    <Button variant="outline" onClick={handleLoadMore} disabled={loadingMore}>
+                      {loadingMore
+                        ? 'Loading...'
+                        : currentPage < totalPages
+                          ? `Load More (${filteredStudents.length - paginatedStudents.length} remaining)`
+                          : 'Load More'}
                     </Button>
                   </div>
                 )}
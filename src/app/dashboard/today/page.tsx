@@ -24,6 +24,7 @@ import {
 import Link from 'next/link'
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from '@/components/ui/dialog'
 import { DynamicFeedbackRecordingWorkflow } from '@/components/dynamic'
+import { fetchWithETag } from '@/lib/react-query'
 
 interface Session {
   id: string
@@ -60,7 +61,7 @@ export default function TodaySchedulePage() {
       
       // Use the standardized API endpoint
       const dateStr = selectedDate.toISOString().split('T')[0]
-      const response = await fetch(`/api/classes/today?date=${dateStr}`)
+      const response = await fetchWithETag(`/api/classes/today?date=${dateStr}`)
       const data = await response.json()
       
       if (response.ok) {
@@ -15,6 +15,7 @@ import {
   Loader2,
   CheckCircle
 } from 'lucide-react'
+import { isEventStream, readServerSentEvents } from '@/lib/server-sent-events'
 
 interface AIRecommendation {
   id: string
@@ -46,6 +47,7 @@ export default function AIRecommendations({
   const [loading, setLoading] = useState(false)
   const [generating, setGenerating] = useState(false)
   const [error, setError] = useState<string | null>(null)
+  const [stage, setStage] = useState<string | null>(null)
 
   useEffect(() => {
     if (studentName) {
@@ -78,7 +80,8 @@ export default function AIRecommendations({
       setGenerating(true)
       setError(null)
 
-      const response = await fetch('/api/ai/recommendations', {
+      // Streamed, so each recommendation shows up as soon as it exists
+      const response = await fetch('/api/ai/recommendations?stream=1', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -89,6 +92,28 @@ export default function AIRecommendations({
         })
       })
 
+      if (response.ok && isEventStream(response)) {
+        let streamed: AIRecommendation[] = []
+        await readServerSentEvents(response, (event, data) => {
+          switch (event) {
+            case 'stage':
+              setStage(data.stage === 'analysis' ? 'Analyzing feedback...' : 'Writing recommendations...')
+              break
+            case 'recommendation':
+              streamed = [...streamed, data.recommendation]
+              setRecommendations(streamed)
+              break
+            case 'done':
+              setRecommendations(data.recommendations || streamed)
+              break
+            case 'error':
+              setError(data.error || 'Failed to generate recommendations')
+              break
+          }
+        })
+        return
+      }
+
       const data = await response.json()
 
       if (response.ok) {
@@ -100,6 +125,7 @@ export default function AIRecommendations({
       setError('Network error generating recommendations')
     } finally {
       setGenerating(false)
+      setStage(null)
     }
   }
 
@@ -145,7 +171,7 @@ export default function AIRecommendations({
               {generating ? (
                 <>
                   <Loader2 className="mr-2 h-4 w-4 animate-spin" />
-                  Analyzing...
+                  {stage || 'Analyzing...'}
                 </>
               ) : (
                 <>
@@ -192,9 +218,9 @@ export default function AIRecommendations({
           </h3>
           
           <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
-            {recommendations.map((rec) => (
+            {recommendations.map((rec, index) => (
               <Card 
-                key={rec.id}
+                key={rec.id || index}
                 className="hover:shadow-md transition-shadow border-l-4 border-l-purple-400"
               >
                 <CardHeader className="pb-3">
@@ -16,6 +16,7 @@ import {
   Users,
   Award,
   ArrowRight,
+  Loader2,
   X
 } from 'lucide-react'
 
@@ -37,6 +38,9 @@ interface StudentRecommendationsProps {
   strengths: string[]
   focusAreas: string[]
   scientificAnalysis?: any
+  // Analysis text received so far while the analysis is still streaming
+  streamingText?: string
+  isStreaming?: boolean
   isVisible: boolean
   onClose: () => void
 }
@@ -47,6 +51,8 @@ const StudentRecommendations: React.FC<StudentRecommendationsProps> = ({
   strengths,
   focusAreas,
   scientificAnalysis,
+  streamingText = '',
+  isStreaming = false,
   isVisible,
   onClose
 }) => {
@@ -80,7 +86,7 @@ const StudentRecommendations: React.FC<StudentRecommendationsProps> = ({
       return {
         id: rec.id || `sci_rec_${index}`,
         title: rec.skill || 'Skill Development',
-        priority: rec.priority as 'high' | 'medium' | 'low',
+        priority: (rec.priority || 'medium') as 'high' | 'medium' | 'low',
         category: rec.category === 'immediate_action' ? 'practice' :
                   rec.category === 'skill_development' ? 'skill-building' : 'technique',
         description: description || rec.recommendation || '',
@@ -167,6 +173,29 @@ const StudentRecommendations: React.FC<StudentRecommendationsProps> = ({
         </div>
 
         <div className="p-6 space-y-6">
+          {/* Live analysis while the model is still writing */}
+          {isStreaming && (
+            <Card className="border-blue-200 bg-blue-50">
+              <CardHeader className="pb-3">
+                <CardTitle className="text-lg text-blue-700 flex items-center gap-2">
+                  <Loader2 className="w-5 h-5 animate-spin" />
+                  Analyzing {studentName}'s feedback...
+                </CardTitle>
+                <CardDescription>
+                  Recommendations appear below as they are written.
+                </CardDescription>
+              </CardHeader>
+              {streamingText && (
+                <CardContent>
+                  {/* Only the tail, so long analyses stay cheap to render */}
+                  <p className="max-h-48 overflow-y-auto text-xs text-gray-700 whitespace-pre-wrap leading-relaxed">
+                    {streamingText.length > 4000 ? '…' + streamingText.slice(-4000) : streamingText}
+                  </p>
+                </CardContent>
+              )}
+            </Card>
+          )}
+
           {/* Student Overview */}
           <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
             {/* Strengths */}
@@ -336,7 +365,7 @@ const StudentRecommendations: React.FC<StudentRecommendationsProps> = ({
                     </CardContent>
                   </Card>
                 </motion.div>
-              )) : (
+              )) : isStreaming ? null : (
                 <div className="text-center py-8">
                   <div className="text-gray-400 mb-4">
                     <AlertCircle className="w-12 h-12 mx-auto mb-2" />
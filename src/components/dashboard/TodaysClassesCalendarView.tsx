@@ -23,6 +23,7 @@ import {
 import { Input } from "@/components/ui/input"
 import StudentAnalysisAnimation from '@/components/animations/StudentAnalysisAnimation'
 import StudentRecommendations from '@/components/ai/StudentRecommendations'
+import { isEventStream, readServerSentEvents } from '@/lib/server-sent-events'
 import Link from 'next/link'
 
 interface TodaysClass {
@@ -67,6 +68,8 @@ export default function TodaysClassesCalendarView({ className }: TodaysClassesCa
   const [scientificAnalysis, setScientificAnalysis] = useState<any>(null)
   const [showPromptDebug, setShowPromptDebug] = useState(false)
   const [promptDebugData, setPromptDebugData] = useState<any>(null)
+  const [streamingText, setStreamingText] = useState('')
+  const [analysisStreaming, setAnalysisStreaming] = useState(false)
 
   useEffect(() => {
     fetchTodaysClasses()
@@ -311,10 +314,14 @@ export default function TodaysClassesCalendarView({ className }: TodaysClassesCa
     setAnimatingStudent(student)
     setShowAnimation(true)
     setAnalysisComplete(false)
+    setScientificAnalysis(null)
+    setStreamingText('')
+    setAnalysisStreaming(true)
     
     try {
-      // Call the new scientific analysis API
-      const response = await fetch('/api/ai/recommendations?action=scientific-analysis', {
+      // Call the new scientific analysis API, streamed so the recommendations
+      // panel opens with the first text the model writes
+      const response = await fetch('/api/ai/recommendations?action=scientific-analysis&stream=1', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -347,15 +354,70 @@ export default function TodaysClassesCalendarView({ className }: TodaysClassesCa
         throw new Error(`Failed to generate scientific analysis: ${errorData.error || 'Unknown error'} ${errorData.details ? `(${errorData.details})` : ''}`)
       }
 
-      const data = await response.json()
-      console.log('Scientific analysis completed for:', student.name, data)
-      console.log('Setting scientific analysis data:', data.scientificAnalysis)
-      console.log('Setting analysisComplete to true')
-      
-      // Store the scientific analysis results and debug data
-      setScientificAnalysis(data.scientificAnalysis)
-      setPromptDebugData(data.debug)
-      setAnalysisComplete(true)
+      if (!isEventStream(response)) {
+        const data = await response.json()
+        console.log('Scientific analysis completed for:', student.name, data)
+        
+        // Store the scientific analysis results and debug data
+        setScientificAnalysis(data.scientificAnalysis)
+        setPromptDebugData(data.debug)
+        setAnalysisStreaming(false)
+        setAnalysisComplete(true)
+        return
+      }
+
+      let streamError: any = null
+      let panelOpen = false
+      let previewRecommendations: any[] = []
+      const openPanel = () => {
+        if (panelOpen) return
+        panelOpen = true
+        setShowAnimation(false)
+        setShowRecommendations(true)
+      }
+
+      await readServerSentEvents(response, (event, data) => {
+        switch (event) {
+          case 'analysis-text':
+            setStreamingText(text => text + data.delta)
+            openPanel()
+            break
+          case 'recommendation':
+            previewRecommendations = [...previewRecommendations, data.recommendation]
+            setScientificAnalysis({ recommendations: previewRecommendations })
+            openPanel()
+            break
+          case 'reset':
+            if (data.stage === 'descriptive') {
+              setStreamingText('')
+            } else {
+              previewRecommendations = []
+              setScientificAnalysis(null)
+            }
+            break
+          case 'analysis':
+            console.log('Scientific analysis completed for:', student.name, data)
+            setScientificAnalysis(data.scientificAnalysis)
+            setPromptDebugData(data.debug)
+            setAnalysisStreaming(false)
+            setAnalysisComplete(true)
+            openPanel()
+            break
+          case 'error':
+            streamError = data
+            break
+        }
+      })
+
+      if (streamError) {
+        setPromptDebugData(streamError.debug ? { ...streamError.debug, error: streamError.error, details: streamError.details } : {
+          error: streamError.error || 'Unknown error',
+          details: streamError.details || 'No additional details',
+          apiResponse: streamError,
+          timestamp: new Date().toISOString()
+        })
+        throw new Error(`Failed to generate scientific analysis: ${streamError.error || 'Unknown error'} ${streamError.details ? `(${streamError.details})` : ''}`)
+      }
     } catch (error) {
       console.error('Error generating scientific analysis:', error)
       
@@ -370,7 +432,9 @@ export default function TodaysClassesCalendarView({ className }: TodaysClassesCa
       
       // Reset animation state on error but keep student for debug access
       setShowAnimation(false)
+      setShowRecommendations(false)
       setAnalysisComplete(false)
+      setAnalysisStreaming(false)
       // Don't reset animatingStudent or promptDebugData so debug info is still accessible
     }
   }
@@ -573,11 +637,14 @@ export default function TodaysClassesCalendarView({ className }: TodaysClassesCa
             strengths={animatingStudent.strengths}
             focusAreas={animatingStudent.focusAreas}
             scientificAnalysis={scientificAnalysis}
+            streamingText={streamingText}
+            isStreaming={analysisStreaming}
             isVisible={showRecommendations}
             onClose={() => {
               setShowRecommendations(false)
               setAnimatingStudent(null)
               setScientificAnalysis(null)
+              setStreamingText('')
             }}
           />
         )}
@@ -785,11 +852,14 @@ export default function TodaysClassesCalendarView({ className }: TodaysClassesCa
           strengths={animatingStudent.strengths}
           focusAreas={animatingStudent.focusAreas}
           scientificAnalysis={scientificAnalysis}
+          streamingText={streamingText}
+          isStreaming={analysisStreaming}
           isVisible={showRecommendations}
           onClose={() => {
             setShowRecommendations(false)
             setAnimatingStudent(null)
             setScientificAnalysis(null)
+            setStreamingText('')
           }}
         />
       )}
@@ -135,12 +135,14 @@ export default function DatabaseViewer({ onMigrationNeeded }: DatabaseViewerProp
   const [currentPage, setCurrentPage] = useState(1);
   const [totalRecords, setTotalRecords] = useState(0);
   const [hasMore, setHasMore] = useState(false);
+  // cursors[n] is the cursor that fetches page n + 1 (null for the first page)
+  const [cursors, setCursors] = useState<(string | null)[]>([null]);
   const pageSize = 50;
 
   // Content popup
   const [selectedRecord, setSelectedRecord] = useState<DatabaseRecord | null>(null);
 
-  const fetchData = async (page = 1) => {
+  const fetchData = async (page = 1, pageCursors: (string | null)[] = cursors) => {
     setLoading(true);
     setError(null);
     
@@ -150,7 +152,8 @@ export default function DatabaseViewer({ onMigrationNeeded }: DatabaseViewerProp
       if (studentFilter) params.append('student', studentFilter);
       if (feedbackTypeFilter && feedbackTypeFilter !== 'all') params.append('feedbackType', feedbackTypeFilter);
       params.append('limit', pageSize.toString());
-      params.append('offset', ((page - 1) * pageSize).toString());
+      const cursor = pageCursors[page - 1];
+      if (cursor) params.append('cursor', cursor);
 
       const response = await fetch(`/api/database-viewer?${params}`);
       const result = await response.json();
@@ -160,6 +163,7 @@ export default function DatabaseViewer({ onMigrationNeeded }: DatabaseViewerProp
         setSummary(result.summary);
         setTotalRecords(result.pagination.total);
         setHasMore(result.pagination.hasMore);
+        setCursors([...pageCursors.slice(0, page), result.pagination.nextCursor]);
         setCurrentPage(page);
       } else {
         setError(result.error || 'Failed to fetch data');
@@ -183,7 +187,7 @@ export default function DatabaseViewer({ onMigrationNeeded }: DatabaseViewerProp
       if (response.ok && result.success) {
         console.log('Migration completed:', result.summary);
         // Refresh data after migration
-        await fetchData(1);
+        await fetchData(1, [null]);
         if (onMigrationNeeded) onMigrationNeeded();
       } else {
         setError(result.error || 'Migration failed');
@@ -198,7 +202,7 @@ export default function DatabaseViewer({ onMigrationNeeded }: DatabaseViewerProp
 
   const applyFilters = () => {
     setCurrentPage(1);
-    fetchData(1);
+    fetchData(1, [null]);
   };
 
   const clearFilters = () => {
@@ -206,7 +210,7 @@ export default function DatabaseViewer({ onMigrationNeeded }: DatabaseViewerProp
     setStudentFilter('');
     setFeedbackTypeFilter('all');
     setCurrentPage(1);
-    fetchData(1);
+    fetchData(1, [null]);
   };
 
   const nextPage = () => {
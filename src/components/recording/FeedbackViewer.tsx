@@ -1,6 +1,6 @@
 'use client';
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
 import { Badge } from '@/components/ui/badge';
@@ -77,6 +77,7 @@ export function FeedbackViewer({ recordingId }: FeedbackViewerProps) {
   const [isEditing, setIsEditing] = useState(false);
   const [editedFeedback, setEditedFeedback] = useState<any>({});
   const [isPlaying, setIsPlaying] = useState(false);
+  const audioRef = useRef<HTMLAudioElement | null>(null);
 
   useEffect(() => {
     loadRecordingDetails();
@@ -113,13 +114,20 @@ export function FeedbackViewer({ recordingId }: FeedbackViewerProps) {
 
   const playAudio = () => {
     if (recording?.fileUrl) {
-      const audio = new Audio(recording.fileUrl);
-      audio.play();
+      // Reuse the element so a replay is served from the browser cache; the
+      // audio endpoint streams byte ranges, so playback starts before the
+      // whole file has arrived
+      if (!audioRef.current || audioRef.current.dataset.src !== recording.fileUrl) {
+        audioRef.current?.pause();
+        const audio = new Audio(recording.fileUrl);
+        audio.dataset.src = recording.fileUrl;
+        audio.onended = () => {
+          setIsPlaying(false);
+        };
+        audioRef.current = audio;
+      }
+      audioRef.current.play();
       setIsPlaying(true);
-      
-      audio.onended = () => {
-        setIsPlaying(false);
-      };
     }
   };
 
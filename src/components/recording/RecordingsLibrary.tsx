@@ -66,17 +66,26 @@ export function RecordingsLibrary() {
   const [showTranscriptDialog, setShowTranscriptDialog] = useState(false);
   const [audioUrl, setAudioUrl] = useState<string | null>(null);
   const [isPlaying, setIsPlaying] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [hasMore, setHasMore] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const audioRef = React.useRef<HTMLAudioElement>(null);
 
   useEffect(() => {
     fetchRecordings();
   }, []);
 
-  const fetchRecordings = async () => {
+  const fetchRecordings = async (cursor: string | null = null) => {
     try {
-      const response = await fetch('/api/recording/upload?limit=50');
+      const params = new URLSearchParams({ limit: '50' });
+      if (cursor) params.append('cursor', cursor);
+
+      const response = await fetch(`/api/recording/upload?${params}`);
       const data = await response.json();
-      setRecordings(data.recordings || []);
+      const page: Recording[] = data.recordings || [];
+      setRecordings(prev => (cursor ? [...prev, ...page] : page));
+      setNextCursor(data.pagination?.nextCursor ?? null);
+      setHasMore(!!data.pagination?.hasMore);
     } catch (error) {
       console.error('Failed to fetch recordings:', error);
     } finally {
@@ -84,22 +93,29 @@ export function RecordingsLibrary() {
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!hasMore || loadingMore) return;
+    setLoadingMore(true);
+    await fetchRecordings(nextCursor);
+    setLoadingMore(false);
+  };
+
   const handlePlayRecording = async (recording: Recording) => {
     if (selectedRecording?.id === recording.id && isPlaying) {
       // Pause if clicking the same recording
       audioRef.current?.pause();
       setIsPlaying(false);
+    } else if (selectedRecording?.id === recording.id && audioRef.current) {
+      // Resume where playback was paused
+      audioRef.current.play();
+      setIsPlaying(true);
     } else {
-      // Play new recording
+      // Play new recording; autoPlay starts it as soon as the first byte
+      // range has arrived
       setSelectedRecording(recording);
       const url = `/api/recordings/audio/${recording.id}.webm`;
       setAudioUrl(url);
       setIsPlaying(true);
-      
-      // Wait for state update then play
-      setTimeout(() => {
-        audioRef.current?.play();
-      }, 100);
     }
   };
 
@@ -203,7 +219,7 @@ export function RecordingsLibrary() {
                 />
               </div>
               <Badge variant="outline">
-                {recordings.length} recordings
+                {recordings.length}{hasMore ? '+' : ''} recordings
               </Badge>
             </div>
           </div>
@@ -254,6 +270,14 @@ export function RecordingsLibrary() {
               />
             </TabsContent>
           </Tabs>
+
+          {hasMore && (
+            <div className="mt-4 text-center">
+              <Button variant="outline" onClick={handleLoadMore} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load More Recordings'}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
 
@@ -262,6 +286,8 @@ export function RecordingsLibrary() {
         <audio 
           ref={audioRef} 
           src={audioUrl} 
+          preload="metadata"
+          autoPlay
           onEnded={() => setIsPlaying(false)}
           className="hidden"
         />
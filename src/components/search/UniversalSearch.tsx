@@ -265,6 +265,8 @@ export default function UniversalSearch({ className, onClose }: UniversalSearchP
   const inputRef = useRef<HTMLInputElement>(null)
   const resultsRef = useRef<HTMLDivElement>(null)
   const searchButtonRef = useRef<HTMLButtonElement>(null)
+  // In-flight student search; aborted as soon as a newer query is issued
+  const searchAbortRef = useRef<AbortController | null>(null)
 
   // Initialize Fuse.js
   const fuse = new Fuse(allSearchData, {
@@ -289,16 +291,25 @@ export default function UniversalSearch({ className, onClose }: UniversalSearchP
 
   // Search handler with debounce
   const performSearch = useCallback(async (searchQuery: string) => {
+    searchAbortRef.current?.abort()
+
     if (!searchQuery.trim()) {
+      searchAbortRef.current = null
       setResults([])
+      setIsLoading(false)
       return
     }
 
+    const controller = new AbortController()
+    searchAbortRef.current = controller
     setIsLoading(true)
     
     try {
       // Fetch real student data
-      const studentResponse = await fetch(`/api/search/students?q=${encodeURIComponent(searchQuery)}`)
+      const studentResponse = await fetch(
+        `/api/search/students?q=${encodeURIComponent(searchQuery)}`,
+        { signal: controller.signal }
+      )
       
       let students = []
       if (studentResponse.ok) {
@@ -306,6 +317,9 @@ export default function UniversalSearch({ className, onClose }: UniversalSearchP
       } else {
         console.error('Student search API error:', studentResponse.status)
       }
+
+      // A newer keystroke has superseded this search
+      if (controller.signal.aborted) return
       
       // Use Fuse for other data (features, courses, etc.)
       const fuseResults = fuse.search(searchQuery)
@@ -324,6 +338,7 @@ export default function UniversalSearch({ className, onClose }: UniversalSearchP
       setIsLoading(false)
       setSelectedIndex(0)
     } catch (error) {
+      if (controller.signal.aborted) return
       console.error('Search error:', error)
       // Fallback to fuse search
       const fuseResults = fuse.search(searchQuery)
@@ -338,13 +353,16 @@ export default function UniversalSearch({ className, onClose }: UniversalSearchP
     }
   }, [])
 
-  // Debounced search
+  // Debounced search; a pending request is cancelled when the query changes
   useEffect(() => {
     const timer = setTimeout(() => {
       performSearch(query)
     }, 200)
 
-    return () => clearTimeout(timer)
+    return () => {
+      clearTimeout(timer)
+      searchAbortRef.current?.abort()
+    }
   }, [query, performSearch])
 
   // Keyboard shortcuts
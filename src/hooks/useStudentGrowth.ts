@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import { StudentGrowthData, TimeFrame } from '@/lib/analytics/growth-engine';
+import { fetchWithETag } from '@/lib/react-query';
 
 interface UseStudentGrowthReturn {
   data: StudentGrowthData | null;
@@ -250,7 +251,7 @@ export function useStudentGrowth(
       setLoading(true);
       setError(null);
       
-      const response = await fetch(
+      const response = await fetchWithETag(
         `/api/students/${studentId}/growth?timeframe=${timeframe}`
       );
       
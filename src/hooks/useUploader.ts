@@ -1,10 +1,95 @@
 /**
  * Custom hook for handling file uploads
  * Separates upload logic from UI components
+ *
+ * Recordings are sent through the resumable protocol under
+ * `${uploadUrl}/sessions`: the audio goes up in chunks, and after a network
+ * error the upload resumes from the last byte the server acknowledged
+ * instead of starting over.
  */
 
 import { useState } from 'react';
 
+const MAX_CHUNK_RETRIES = 6;
+const RETRY_BASE_MS = 1000;
+const RETRY_MAX_MS = 15000;
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+async function errorMessage(response: Response): Promise<string> {
+  const errorData = await response.json().catch(() => null);
+  return errorData?.error || `Upload failed with status ${response.status}`;
+}
+
+async function uploadResumable(
+  uploadUrl: string,
+  audio: Blob,
+  filename: string,
+  fields: Record<string, string>,
+  onStatus: (status: string) => void
+): Promise<any> {
+  const opened = await fetch(`${uploadUrl}/sessions`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ filename, mimeType: audio.type, totalBytes: audio.size, fields })
+  });
+  if (!opened.ok) {
+    throw new Error(await errorMessage(opened));
+  }
+  const { uploadId, chunkBytes } = await opened.json();
+  const sessionUrl = `${uploadUrl}/sessions/${uploadId}`;
+
+  let offset = 0;
+  let failures = 0;
+  while (offset < audio.size) {
+    onStatus(`Uploading recording... ${Math.floor((offset / audio.size) * 100)}%`);
+    try {
+      const response = await fetch(`${sessionUrl}?offset=${offset}`, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/octet-stream' },
+        body: audio.slice(offset, offset + chunkBytes)
+      });
+      const data = await response.json().catch(() => null);
+
+      // On 409 (offset mismatch) the server's count of received bytes wins
+      const received = response.ok ? data?.receivedBytes : data?.progress?.receivedBytes;
+      if ((response.ok || response.status === 409) && typeof received === 'number' && received !== offset) {
+        offset = received;
+        failures = 0;
+        continue;
+      }
+      if (!response.ok && response.status < 500 && response.status !== 408) {
+        throw Object.assign(new Error(data?.error || `Upload failed with status ${response.status}`), { fatal: true });
+      }
+    } catch (error) {
+      if ((error as { fatal?: boolean }).fatal) throw error;
+    }
+
+    // Network error or server error: wait, then resume from what arrived
+    failures++;
+    if (failures > MAX_CHUNK_RETRIES) {
+      throw new Error('Upload interrupted. Check your connection and try again.');
+    }
+    onStatus('Connection lost, resuming upload...');
+    await sleep(Math.min(RETRY_MAX_MS, RETRY_BASE_MS * 2 ** (failures - 1)));
+    try {
+      const progress = await fetch(sessionUrl);
+      if (progress.ok) {
+        offset = (await progress.json()).receivedBytes;
+      }
+    } catch {
+      // Still offline; the next attempt reports the offset mismatch if any
+    }
+  }
+
+  onStatus('Processing recording...');
+  const completed = await fetch(`${sessionUrl}/complete`, { method: 'POST' });
+  if (!completed.ok) {
+    throw new Error(await errorMessage(completed));
+  }
+  return completed.json();
+}
+
 export interface UploadState {
   isProcessing: boolean;
   processingStatus: string;
@@ -35,17 +120,30 @@ export function useUploader(uploadUrl: string = '/api/recording/upload'): UseUpl
     });
 
     try {
-      const response = await fetch(uploadUrl, {
-        method: 'POST',
-        body: formData
-      });
+      const audio = formData.get('audio');
+      let result;
 
-      if (!response.ok) {
-        const errorData = await response.json().catch(() => null);
-        throw new Error(errorData?.error || `Upload failed with status ${response.status}`);
-      }
+      if (audio instanceof Blob && audio.size > 0) {
+        const fields: Record<string, string> = {};
+        formData.forEach((value, key) => {
+          if (key !== 'audio' && typeof value === 'string') fields[key] = value;
+        });
+        const filename = audio instanceof File ? audio.name : 'recording.webm';
+        result = await uploadResumable(uploadUrl, audio, filename, fields, processingStatus =>
+          setState(prev => ({ ...prev, processingStatus }))
+        );
+      } else {
+        const response = await fetch(uploadUrl, {
+          method: 'POST',
+          body: formData
+        });
+
+        if (!response.ok) {
+          throw new Error(await errorMessage(response));
+        }
 
-      const result = await response.json();
+        result = await response.json();
+      }
       
       setState({
         isProcessing: false,
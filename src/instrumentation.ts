@@ -0,0 +1,17 @@
+export async function register() {
+  // Background jobs run in the Node.js server only, never in the edge runtime
+  // or while `next build` collects page data
+  if (process.env.NEXT_RUNTIME !== 'nodejs' || process.env.NEXT_PHASE === 'phase-production-build') {
+    return;
+  }
+
+  if (process.env.CACHE_WARMER !== 'off') {
+    const { scheduleCacheWarmer } = await import('@/lib/services/schedule-warmer');
+    scheduleCacheWarmer.start();
+  }
+
+  if (process.env.CACHE_TAG_CLEANUP !== 'off') {
+    const { cacheEngine } = await import('@/lib/cache/cache-engine');
+    cacheEngine.startTagCleanup();
+  }
+}
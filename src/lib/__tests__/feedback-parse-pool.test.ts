@@ -0,0 +1,100 @@
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { FeedbackParsePool, workerOptions } from '../feedback-parse-pool';
+import { FeedbackParser } from '../feedback-parser';
+
+// Runs the real worker entry (feedback-parse-worker.ts) against documents
+// from data/Overall, so a worker that cannot load shows up as a failure
+// here rather than as a silent in-process fallback.
+
+const DATA_PATH = path.join(process.cwd(), 'data', 'Overall');
+
+jest.setTimeout(60000);
+
+describe('FeedbackParsePool', () => {
+  let cacheDir: string;
+  let warnSpy: jest.SpyInstance;
+
+  beforeEach(() => {
+    // Workers read the environment when they start
+    cacheDir = fs.mkdtempSync(path.join(os.tmpdir(), 'feedback-parse-pool-'));
+    process.env.FEEDBACK_PARSE_CACHE_DIR = cacheDir;
+    warnSpy = jest.spyOn(console, 'warn').mockImplementation(() => undefined);
+  });
+
+  afterEach(() => {
+    warnSpy.mockRestore();
+    delete process.env.FEEDBACK_PARSE_CACHE_DIR;
+    fs.rmSync(cacheDir, { recursive: true, force: true });
+  });
+
+  describe('workerOptions', () => {
+    it('should register tsx when running from source', () => {
+      const options = workerOptions('file:///app/src/lib/feedback-parse-pool.ts');
+
+      expect(options.execArgv).toEqual(expect.arrayContaining(['--import', 'tsx']));
+    });
+
+    it('should leave bundled workers alone', () => {
+      expect(workerOptions('file:///app/.next/server/chunks/123.js')).toEqual({});
+    });
+  });
+
+  describe('parse', () => {
+    it('should parse documents on worker threads', async () => {
+      const parser = new FeedbackParser(DATA_PATH);
+      const files = (await parser.listDocumentFiles()).slice(0, 2);
+      expect(files.length).toBeGreaterThan(0);
+
+      // No fallback: if the worker cannot start, every file fails
+      const pool = new FeedbackParsePool({ size: 2, dataPath: DATA_PATH });
+      const results = [];
+      try {
+        for await (const result of pool.parse(files)) {
+          results.push(result);
+        }
+      } finally {
+        await pool.close();
+      }
+
+      expect(warnSpy).not.toHaveBeenCalledWith(
+        'Feedback parse workers unavailable, parsing in-process:',
+        expect.anything()
+      );
+      expect(results.map(result => result.filePath)).toEqual(files.map(file => file.filePath));
+
+      for (const result of results) {
+        const inProcess = await parser.parseDocumentFile(result.filePath, result.feedbackType);
+        expect(result.errors).toEqual(inProcess.errors);
+        expect(result.feedbacks.map(feedback => feedback.uniqueId))
+          .toEqual(inProcess.feedbacks.map(feedback => feedback.uniqueId));
+      }
+
+      // Each worker parsed through its own cache and reported it
+      expect(pool.getCacheStats()?.misses).toBe(files.length);
+    });
+
+    it('should fail a file that does not exist without losing the worker', async () => {
+      const parser = new FeedbackParser(DATA_PATH);
+      const [file] = await parser.listDocumentFiles();
+      const missing = { filePath: path.join(cacheDir, 'missing.docx'), feedbackType: 'primary' as const };
+
+      const pool = new FeedbackParsePool({ size: 1, dataPath: DATA_PATH });
+      const results = [];
+      try {
+        for await (const result of pool.parse([missing, file])) {
+          results.push(result);
+        }
+      } finally {
+        await pool.close();
+      }
+
+      expect(results[0].errors.length).toBeGreaterThan(0);
+      expect(results[0].errors.join('\n')).not.toContain('No in-process parser configured');
+      const inProcess = await parser.parseDocumentFile(file.filePath, file.feedbackType);
+      expect(results[1].errors).toEqual(inProcess.errors);
+      expect(results[1].feedbacks).toHaveLength(inProcess.feedbacks.length);
+    });
+  });
+});
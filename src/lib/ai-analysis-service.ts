@@ -1,5 +1,7 @@
 import { GoogleGenerativeAI } from '@google/generative-ai'
 import { PromptManager } from './prompt-manager'
+import { cachedAIResult } from './ai-result-cache'
+import { estimateTokens, geminiBaseUrl, getGeminiScheduler, type GeminiScheduler } from './gemini-scheduler'
 
 // Unified AI Analysis Service for Student Growth
 // Combines recommendation generation, feedback analysis, and skill extraction
@@ -130,107 +132,77 @@ export interface CourseObjectiveAnalysis {
 }
 
 export class AIAnalysisService {
-  private apiKeys: string[]
-  private currentKeyIndex: number = 0
+  private scheduler: GeminiScheduler
   private model: string = 'gemini-2.0-flash-exp'
   private promptManager: PromptManager
 
   constructor() {
-    // Load API keys with fallback support
-    this.apiKeys = this.loadApiKeys()
+    // API keys are shared with the other Gemini callers through the scheduler
+    this.scheduler = getGeminiScheduler()
     
-    if (this.apiKeys.length === 0) {
+    if (this.scheduler.keyCount === 0) {
       throw new Error('No Gemini API keys found. Please set GEMINI_API_KEY_* or GOOGLE_AI_API_KEY environment variables.')
     }
 
     // Initialize prompt manager
     this.promptManager = new PromptManager()
 
-    console.log(`AIAnalysisService initialized with ${this.apiKeys.length} API keys`)
+    console.log(`AIAnalysisService initialized with ${this.scheduler.keyCount} API keys`)
   }
 
   /**
-   * Load API keys from environment with multiple fallback options
-   */
-  private loadApiKeys(): string[] {
-    const keys: string[] = []
-
-    // Try numbered keys first (GEMINI_API_KEY_1, etc.)
-    for (let i = 1; i <= 4; i++) {
-      const key = process.env[`GEMINI_API_KEY_${i}`]
-      if (key) keys.push(key)
-    }
-
-    // Fallback to single keys
-    const singleKey = process.env.GEMINI_API_KEY || process.env.GOOGLE_AI_API_KEY
-    if (singleKey && !keys.includes(singleKey)) {
-      keys.push(singleKey)
-    }
-
-    return keys
-  }
-
-  /**
-   * Get the next API key in rotation
-   */
-  private getNextApiKey(): string {
-    const key = this.apiKeys[this.currentKeyIndex]
-    this.currentKeyIndex = (this.currentKeyIndex + 1) % this.apiKeys.length
-    return key
-  }
-
-  /**
-   * Create GoogleGenerativeAI instance with current API key
-   */
-  private createClient(): GoogleGenerativeAI {
-    return new GoogleGenerativeAI(this.getNextApiKey())
-  }
-
-  /**
-   * Generate content with structured output
+   * Generate content with structured output. Results are cached by `kind`,
+   * the inputs the prompt was built from and the prompt template version;
+   * without explicit inputs the prompt text itself is the key.
    */
   private async generateStructuredContent<T>(
     prompt: string,
-    retries: number = 3
+    cacheKey: { kind: string; inputs?: unknown; promptVersion?: string } = { kind: 'structured-content' }
   ): Promise<T> {
-    let lastError: Error | null = null
-
-    for (let attempt = 0; attempt < retries; attempt++) {
-      try {
-        const client = this.createClient()
-        const model = client.getGenerativeModel({ 
-          model: this.model,
-          generationConfig: {
-            responseMimeType: 'application/json',
-          },
-        })
-
-        const result = await model.generateContent(prompt)
-        const response = await result.response
-        const text = response.text()
-
-        // Parse and validate JSON response
-        const parsed = JSON.parse(text)
-        return parsed as T
-      } catch (error) {
-        lastError = error as Error
-        console.error(`Attempt ${attempt + 1} failed:`, error)
-        
-        // If it's a parsing error, try to extract JSON from the response
-        if (error instanceof SyntaxError && typeof (error as any).text === 'string') {
-          const jsonMatch = (error as any).text.match(/\{[\s\S]*\}/)
-          if (jsonMatch) {
-            try {
-              return JSON.parse(jsonMatch[0]) as T
-            } catch {
-              // Continue to next attempt
-            }
-          }
+    return cachedAIResult(
+      {
+        kind: cacheKey.kind,
+        inputs: cacheKey.inputs ?? { prompt },
+        promptVersion: cacheKey.promptVersion ?? 'inline',
+        model: this.model,
+        params: { responseMimeType: 'application/json' }
+      },
+      () => this.requestStructuredContent<T>(prompt),
+      { promptLength: prompt.length }
+    )
+  }
+
+  // Rate limits, 5xx and network errors are retried by the scheduler, with
+  // backoff and on another key; a second retry loop here would multiply the
+  // attempts per call
+  private async requestStructuredContent<T>(prompt: string): Promise<T> {
+    const text = await this.scheduler.run(async apiKey => {
+      const model = new GoogleGenerativeAI(apiKey).getGenerativeModel({ 
+        model: this.model,
+        generationConfig: {
+          responseMimeType: 'application/json',
+        },
+      }, { baseUrl: geminiBaseUrl() })
+
+      const result = await model.generateContent(prompt)
+      const response = await result.response
+      return response.text()
+    }, { estimatedTokens: estimateTokens(prompt, 4096), label: 'structured content' })
+
+    try {
+      return JSON.parse(text) as T
+    } catch (error) {
+      // The model occasionally wraps the JSON in prose or a code fence
+      const jsonMatch = text.match(/\{[\s\S]*\}/)
+      if (jsonMatch) {
+        try {
+          return JSON.parse(jsonMatch[0]) as T
+        } catch {
+          // Fall through to the error below
         }
       }
+      throw new Error(`Structured response was not valid JSON: ${(error as Error).message}`)
     }
-
-    throw new Error(`Failed after ${retries} attempts: ${lastError?.message || 'Unknown error'}`)
   }
 
   /**
@@ -242,14 +214,15 @@ export class AIAnalysisService {
     feedbackSessions: FeedbackSession[]
   ): Promise<StudentAnalysis> {
     // Get the student performance analysis prompt from PromptManager
-    const prompt = this.promptManager.getStudentAnalysisPrompt({
-      studentName,
-      level,
-      feedbackSessions
-    })
+    const input = { studentName, level, feedbackSessions }
+    const prompt = this.promptManager.getStudentAnalysisPrompt(input)
 
     try {
-      const analysis = await this.generateStructuredContent<StudentAnalysis>(prompt)
+      const analysis = await this.generateStructuredContent<StudentAnalysis>(prompt, {
+        kind: 'student-performance',
+        inputs: input,
+        promptVersion: this.promptManager.getPromptVersion('student-analysis')
+      })
       
       // Validate and ensure all required fields are present
       return this.validateStudentAnalysis(analysis)
@@ -267,14 +240,15 @@ export class AIAnalysisService {
     level: 'primary' | 'secondary',
     studentAnalyses: Array<{ studentName: string; metrics: StudentMetrics; skillAssessment: SkillAssessment[] }>
   ): Promise<ClassInsights> {
-    const prompt = this.promptManager.getClassInsightsPrompt({
-      className,
-      level,
-      studentAnalyses
-    })
+    const input = { className, level, studentAnalyses }
+    const prompt = this.promptManager.getClassInsightsPrompt(input)
 
     try {
-      return await this.generateStructuredContent<ClassInsights>(prompt)
+      return await this.generateStructuredContent<ClassInsights>(prompt, {
+        kind: 'class-insights',
+        inputs: input,
+        promptVersion: this.promptManager.getPromptVersion('class-insights')
+      })
     } catch (error) {
       console.error('Error generating class insights:', error)
       return this.getFallbackClassInsights(className, studentAnalyses)
@@ -288,12 +262,14 @@ export class AIAnalysisService {
     program: string,
     objectives: string[]
   ): Promise<CourseObjectiveAnalysis> {
-    const prompt = this.promptManager.getCourseObjectiveAnalysisPrompt({
-      program,
-      objectives
-    })
+    const input = { program, objectives }
+    const prompt = this.promptManager.getCourseObjectiveAnalysisPrompt(input)
 
-    return await this.generateStructuredContent<CourseObjectiveAnalysis>(prompt)
+    return await this.generateStructuredContent<CourseObjectiveAnalysis>(prompt, {
+      kind: 'course-objectives',
+      inputs: input,
+      promptVersion: this.promptManager.getPromptVersion('course-objectives')
+    })
   }
 
   /**
@@ -409,7 +385,7 @@ Return JSON: {
         status: 'improved' | 'stable' | 'needs_attention'
         evidence: string
         confidence: number
-      }>(prompt)
+      }>(prompt, { kind: 'recommendation-progress' })
 
       return result
     } catch (error) {
@@ -461,7 +437,7 @@ Return in JSON format:
   }
 }`
 
-    return await this.generateStructuredContent(prompt)
+    return await this.generateStructuredContent(prompt, { kind: 'skill-extraction' })
   }
 
   // Helper methods for recommendation generation
@@ -1,6 +1,7 @@
 import { GoogleGenerativeAI } from '@google/generative-ai';
 import { executeQuery } from './postgres';
 import { transcriptionService } from './transcription-service';
+import { geminiBaseUrl } from './gemini-scheduler';
 
 export interface PrimaryFeedbackData {
   studentName: string;
@@ -76,7 +77,7 @@ export class AIFeedbackGenerator {
         topK: 40,
         maxOutputTokens: 2048,
       },
-    });
+    }, { baseUrl: geminiBaseUrl() });
   }
 
   /**
@@ -0,0 +1,331 @@
+import { createHash } from 'crypto';
+import { aiSingleFlight } from './ai-single-flight';
+import { MemoryLRU } from './cache/memory-lru';
+import { db } from './postgres';
+
+// Content-addressed cache of AI model results, shared by GeminiAnalyzer,
+// GeminiBatchAnalyzer, AIAnalysisService and DebateRecommendationEngine.
+//
+// An entry is keyed by a hash of everything that decides the model's answer:
+// the normalized inputs, the prompt template version, the model id and the
+// generation parameters. New feedback, an edited prompt or a different model
+// therefore produce a new key instead of serving a stale result, and the
+// same inputs after a restart are answered from Postgres (ai_result_cache)
+// without a model call. The most recently used entries are also kept in
+// process memory.
+//
+// Misses go through aiSingleFlight, so concurrent requests for the same key,
+// in this worker or another, share one model call.
+//
+// Entries expire AI_RESULT_CACHE_MAX_AGE_DAYS after they were computed; the
+// table is pruned back to AI_RESULT_CACHE_MAX_BYTES, least recently used
+// first, every PRUNE_EVERY_WRITES writes.
+
+const MAX_AGE_MS = parseFloat(process.env.AI_RESULT_CACHE_MAX_AGE_DAYS || '30') * 24 * 60 * 60 * 1000;
+const MAX_BYTES = parseInt(process.env.AI_RESULT_CACHE_MAX_BYTES || String(256 * 1024 * 1024));
+const MEMORY_BYTES = parseInt(process.env.AI_RESULT_CACHE_MEMORY_BYTES || String(16 * 1024 * 1024));
+const PRUNE_EVERY_WRITES = 50;
+
+// Rough characters-per-token ratio for the cost estimate
+const CHARS_PER_TOKEN = 4;
+
+export interface AIResultKeyParts {
+  // What is being produced, e.g. 'student-analysis'
+  kind: string;
+  inputs: unknown;
+  promptVersion: string;
+  model: string;
+  params?: Record<string, unknown>;
+}
+
+export interface AIResultCacheOptions<T> {
+  // Length of the prompt sent to the model, for the tokens-saved estimate
+  promptLength?: number;
+  // Results failing this are returned but not cached (default: non-null)
+  shouldCache?: (value: T) => boolean;
+}
+
+interface CachedResult<T> {
+  value: T;
+  createdAt: number;
+  estimatedTokens: number;
+  callMs: number;
+}
+
+export interface AIResultCacheStats {
+  memoryHits: number;
+  storeHits: number;
+  misses: number;
+  writes: number;
+  expired: number;
+  evicted: number;
+  errors: number;
+  hitRate: number;
+  // Estimated model tokens and call time avoided by hits
+  tokensSaved: number;
+  callMsSaved: number;
+  memory: ReturnType<MemoryLRU['getStats']>;
+}
+
+/**
+ * JSON with object keys sorted, so equal inputs hash equally whatever order
+ * their properties were built in
+ */
+function canonicalJson(value: unknown): string {
+  if (value === null || typeof value !== 'object') {
+    return JSON.stringify(value) ?? 'null';
+  }
+  if (value instanceof Date) {
+    return JSON.stringify(value.toISOString());
+  }
+  if (Array.isArray(value)) {
+    return `[${value.map(canonicalJson).join(',')}]`;
+  }
+  const entries = Object.entries(value as Record<string, unknown>)
+    .filter(([, item]) => item !== undefined)
+    .sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0));
+  return `{${entries.map(([key, item]) => `${JSON.stringify(key)}:${canonicalJson(item)}`).join(',')}}`;
+}
+
+/**
+ * Cache key for a model call: sha256 over the kind, inputs, prompt version,
+ * model and parameters
+ */
+export function aiResultKey(parts: AIResultKeyParts): string {
+  const digest = createHash('sha256').update(canonicalJson({
+    kind: parts.kind,
+    inputs: parts.inputs,
+    promptVersion: parts.promptVersion,
+    model: parts.model,
+    params: parts.params ?? {}
+  })).digest('hex');
+  return `${parts.kind}:${digest}`;
+}
+
+export class AIResultCache {
+  private memory: MemoryLRU<CachedResult<unknown>>;
+  private stats = {
+    memoryHits: 0, storeHits: 0, misses: 0, writes: 0, expired: 0, evicted: 0, errors: 0,
+    tokensSaved: 0, callMsSaved: 0
+  };
+  private writesSincePrune = 0;
+
+  constructor(private maxAgeMs: number = MAX_AGE_MS, private maxBytes: number = MAX_BYTES, memoryBytes: number = MEMORY_BYTES) {
+    this.memory = new MemoryLRU<CachedResult<unknown>>({ maxBytes: memoryBytes });
+  }
+
+  /**
+   * The cached result for `parts`, or the result of `compute`, which is
+   * then stored. Failed computations (null, or rejected by shouldCache) are
+   * not cached, so the next request tries the model again. Concurrent
+   * misses for the same key wait for a single `compute`.
+   */
+  async getOrCompute<T>(
+    parts: AIResultKeyParts,
+    compute: () => Promise<T>,
+    options: AIResultCacheOptions<T> = {}
+  ): Promise<T> {
+    const key = aiResultKey(parts);
+    const cached = await this.lookup<T>(key);
+    if (cached !== null) {
+      return cached;
+    }
+
+    return aiSingleFlight.run(key, async () => {
+      this.stats.misses++;
+      const start = Date.now();
+      const value = await compute();
+      const callMs = Date.now() - start;
+
+      const shouldCache = options.shouldCache ?? ((result: T) => result !== null && result !== undefined);
+      if (shouldCache(value)) {
+        await this.store(key, parts, value, callMs, options.promptLength ?? 0);
+      }
+      return value;
+    }, { recheck: () => this.lookup<T>(key) });
+  }
+
+  /**
+   * The cached result for `parts` without computing anything on a miss
+   */
+  async get<T>(parts: AIResultKeyParts): Promise<T | null> {
+    const cached = await this.lookup<T>(aiResultKey(parts));
+    if (cached === null) {
+      this.stats.misses++;
+    }
+    return cached;
+  }
+
+  async set<T>(parts: AIResultKeyParts, value: T, options: { promptLength?: number; callMs?: number } = {}): Promise<void> {
+    await this.store(aiResultKey(parts), parts, value, options.callMs ?? 0, options.promptLength ?? 0);
+  }
+
+  async delete(parts: AIResultKeyParts): Promise<void> {
+    const key = aiResultKey(parts);
+    this.memory.delete(key);
+    try {
+      await db.query('DELETE FROM ai_result_cache WHERE cache_key = $1', [key]);
+    } catch (error) {
+      this.stats.errors++;
+      console.warn(`Could not delete AI result cache entry ${key}:`, error);
+    }
+  }
+
+  /**
+   * Drop expired entries, then the least recently used ones until the table
+   * fits in the byte budget. Returns the number of rows removed.
+   */
+  async prune(): Promise<number> {
+    this.writesSincePrune = 0;
+    try {
+      const expired = await db.query(
+        'DELETE FROM ai_result_cache WHERE created_at < NOW() - make_interval(secs => $1::float8)',
+        [this.maxAgeMs / 1000]
+      );
+      const evicted = await db.query(`
+        DELETE FROM ai_result_cache
+        WHERE cache_key IN (
+          SELECT cache_key FROM (
+            SELECT cache_key,
+                   SUM(bytes) OVER (ORDER BY COALESCE(last_hit_at, created_at) DESC, cache_key) AS running_bytes
+            FROM ai_result_cache
+          ) ranked
+          WHERE running_bytes > $1
+        )
+      `, [this.maxBytes]);
+      this.stats.expired += expired.rowCount || 0;
+      this.stats.evicted += evicted.rowCount || 0;
+      return (expired.rowCount || 0) + (evicted.rowCount || 0);
+    } catch (error) {
+      this.stats.errors++;
+      console.warn('Could not prune AI result cache:', error);
+      return 0;
+    }
+  }
+
+  getStats(): AIResultCacheStats {
+    const hits = this.stats.memoryHits + this.stats.storeHits;
+    const lookups = hits + this.stats.misses;
+    return {
+      ...this.stats,
+      hitRate: lookups > 0 ? hits / lookups : 0,
+      memory: this.memory.getStats()
+    };
+  }
+
+  private async lookup<T>(key: string): Promise<T | null> {
+    const remembered = this.memory.get(key) as CachedResult<T> | undefined;
+    if (remembered) {
+      this.stats.memoryHits++;
+      this.recordSaving(remembered);
+      return remembered.value;
+    }
+
+    let row: any;
+    try {
+      const result = await db.query(`
+        UPDATE ai_result_cache
+        SET hit_count = hit_count + 1, last_hit_at = NOW()
+        WHERE cache_key = $1
+        RETURNING result, created_at, estimated_tokens, call_ms, bytes
+      `, [key]);
+      row = result.rows[0];
+    } catch (error) {
+      this.stats.errors++;
+      console.warn(`Could not read AI result cache entry ${key}:`, error);
+      return null;
+    }
+    if (!row) {
+      return null;
+    }
+
+    const entry: CachedResult<T> = {
+      value: row.result as T,
+      createdAt: new Date(row.created_at).getTime(),
+      estimatedTokens: row.estimated_tokens || 0,
+      callMs: row.call_ms || 0
+    };
+    if (Date.now() - entry.createdAt >= this.maxAgeMs) {
+      this.stats.expired++;
+      return null;
+    }
+
+    this.stats.storeHits++;
+    this.recordSaving(entry);
+    this.remember(key, entry, row.bytes || 0);
+    return entry.value;
+  }
+
+  private async store<T>(key: string, parts: AIResultKeyParts, value: T, callMs: number, promptLength: number): Promise<void> {
+    const json = JSON.stringify(value);
+    const entry: CachedResult<T> = {
+      value,
+      createdAt: Date.now(),
+      estimatedTokens: Math.ceil((promptLength + json.length) / CHARS_PER_TOKEN),
+      callMs
+    };
+    this.remember(key, entry, json.length);
+
+    try {
+      await db.query(`
+        INSERT INTO ai_result_cache
+          (cache_key, kind, model, prompt_version, result, bytes, estimated_tokens, call_ms, created_at)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW())
+        ON CONFLICT (cache_key) DO UPDATE SET
+          result = EXCLUDED.result,
+          bytes = EXCLUDED.bytes,
+          estimated_tokens = EXCLUDED.estimated_tokens,
+          call_ms = EXCLUDED.call_ms,
+          created_at = EXCLUDED.created_at
+      `, [key, parts.kind, parts.model, parts.promptVersion, json, json.length, entry.estimatedTokens, callMs]);
+      this.stats.writes++;
+    } catch (error) {
+      this.stats.errors++;
+      console.warn(`Could not write AI result cache entry ${key}:`, error);
+      return;
+    }
+
+    if (++this.writesSincePrune >= PRUNE_EVERY_WRITES) {
+      await this.prune();
+    }
+  }
+
+  private remember(key: string, entry: CachedResult<unknown>, bytes: number): void {
+    const ttlMs = this.maxAgeMs - (Date.now() - entry.createdAt);
+    this.memory.set(key, entry, bytes * 2, ttlMs);
+  }
+
+  private recordSaving(entry: CachedResult<unknown>): void {
+    this.stats.tokensSaved += entry.estimatedTokens;
+    this.stats.callMsSaved += entry.callMs;
+  }
+}
+
+let sharedCache: AIResultCache | null = null;
+
+/**
+ * The process-wide AI result cache, or null when disabled with
+ * AI_RESULT_CACHE=off.
+ */
+export function getAIResultCache(): AIResultCache | null {
+  if (process.env.AI_RESULT_CACHE === 'off') {
+    return null;
+  }
+  if (!sharedCache) {
+    sharedCache = new AIResultCache();
+  }
+  return sharedCache;
+}
+
+/**
+ * getOrCompute on the shared cache, or just a single-flight `compute` when
+ * it is disabled
+ */
+export async function cachedAIResult<T>(
+  parts: AIResultKeyParts,
+  compute: () => Promise<T>,
+  options: AIResultCacheOptions<T> = {}
+): Promise<T> {
+  const cache = getAIResultCache();
+  return cache ? cache.getOrCompute(parts, compute, options) : aiSingleFlight.run(aiResultKey(parts), compute);
+}
@@ -0,0 +1,234 @@
+import { cacheEngine } from './cache/cache-engine';
+
+// Single-flight for AI model calls, keyed by the analysis input hash
+// (aiResultKey).
+//
+// Concurrent requests for the same analysis - two instructors opening the
+// same student, a double-clicked button, a batch overlapping a single
+// analysis - share one model call. Within a worker, later callers attach to
+// the in-flight promise. Across pm2 workers, the first caller takes a Redis
+// lock and publishes the result on RESULT_CHANNEL when done; callers in other
+// workers wait for that message instead of calling the model themselves.
+//
+// The leader renews its lock while the model runs. If it dies, the lock
+// lapses and a waiter takes over; if a broadcast is missed, waiters notice
+// the released lock and look the result up through `recheck`. Without Redis
+// only the in-process part applies.
+
+const LOCK_PREFIX = 'ai-flight:';
+const RESULT_CHANNEL = 'ai:single-flight';
+const LOCK_TTL_MS = parseInt(process.env.AI_SINGLE_FLIGHT_LOCK_MS || '60000');
+const WAIT_TIMEOUT_MS = parseInt(process.env.AI_SINGLE_FLIGHT_WAIT_MS || String(10 * 60 * 1000));
+const POLL_INTERVAL_MS = 1000;
+
+interface FlightResult {
+  key: string;
+  ok: boolean;
+  value?: unknown;
+  error?: string;
+}
+
+export interface SingleFlightOptions<T> {
+  // Where the leader's result can be found if its broadcast is missed,
+  // e.g. the AI result cache. Also checked by a new leader before computing.
+  recheck?: () => Promise<T | null>;
+}
+
+export interface SingleFlightStats {
+  // Computations run by this worker
+  led: number;
+  // Callers that attached to a computation in this worker
+  joinedLocal: number;
+  // Callers that waited for a computation in another worker
+  joinedRemote: number;
+  // Waits that gave up and computed locally
+  remoteFallbacks: number;
+  inFlight: number;
+  waiting: number;
+}
+
+export class SingleFlight {
+  private inFlight = new Map<string, Promise<unknown>>();
+  private waiters = new Map<string, Set<(result: FlightResult) => void>>();
+  private listening = false;
+  private stats = { led: 0, joinedLocal: 0, joinedRemote: 0, remoteFallbacks: 0 };
+
+  /**
+   * Result of `compute` for `key`, run at most once at a time across all
+   * callers and workers. Joined callers receive the leader's value, or an
+   * error carrying the leader's error message.
+   */
+  run<T>(key: string, compute: () => Promise<T>, options: SingleFlightOptions<T> = {}): Promise<T> {
+    const existing = this.inFlight.get(key) as Promise<T> | undefined;
+    if (existing) {
+      this.stats.joinedLocal++;
+      return existing;
+    }
+
+    const flight = this.execute(key, compute, options).finally(() => {
+      this.inFlight.delete(key);
+    });
+    this.inFlight.set(key, flight);
+    return flight;
+  }
+
+  getStats(): SingleFlightStats {
+    let waiting = 0;
+    this.waiters.forEach((handlers) => {
+      waiting += handlers.size;
+    });
+    return { ...this.stats, inFlight: this.inFlight.size, waiting };
+  }
+
+  private async execute<T>(key: string, compute: () => Promise<T>, options: SingleFlightOptions<T>): Promise<T> {
+    const lockName = `${LOCK_PREFIX}${key}`;
+    const deadline = Date.now() + WAIT_TIMEOUT_MS;
+    let joined = false;
+
+    while (Date.now() < deadline) {
+      const token = await cacheEngine.tryLock(lockName, LOCK_TTL_MS);
+      if (token) {
+        return this.lead(key, lockName, token, compute, options);
+      }
+
+      if (!joined) {
+        joined = true;
+        this.stats.joinedRemote++;
+      }
+      const result = await this.waitForRemote(key, lockName, deadline, options);
+      if (result) {
+        if (!result.ok) {
+          throw new Error(result.error || 'AI analysis failed in another worker');
+        }
+        return result.value as T;
+      }
+      // The lock was released without a result reaching us; try to lead
+    }
+
+    this.stats.remoteFallbacks++;
+    console.warn(`Gave up waiting for AI analysis ${key} in another worker, computing locally`);
+    return compute();
+  }
+
+  private async lead<T>(
+    key: string,
+    lockName: string,
+    token: string,
+    compute: () => Promise<T>,
+    options: SingleFlightOptions<T>
+  ): Promise<T> {
+    this.stats.led++;
+    const renewal = setInterval(() => {
+      cacheEngine.extendLock(lockName, token, LOCK_TTL_MS).catch(() => {});
+    }, LOCK_TTL_MS / 3);
+
+    try {
+      // Another worker may have finished between our caller's miss and the lock
+      const stored = options.recheck ? await options.recheck() : null;
+      const value = stored ?? await compute();
+      // Broadcast before unlocking, so waiters never see the lock gone
+      // without the result on its way
+      await this.broadcast({ key, ok: true, value });
+      return value;
+    } catch (error) {
+      await this.broadcast({ key, ok: false, error: error instanceof Error ? error.message : String(error) });
+      throw error;
+    } finally {
+      clearInterval(renewal);
+      await cacheEngine.unlock(lockName, token);
+    }
+  }
+
+  /**
+   * Wait for another worker's result for `key`. Resolves null once its lock
+   * is gone without a result (and `recheck` finds nothing) or at the deadline.
+   */
+  private waitForRemote<T>(
+    key: string,
+    lockName: string,
+    deadline: number,
+    options: SingleFlightOptions<T>
+  ): Promise<FlightResult | null> {
+    this.listen();
+
+    return new Promise((resolve) => {
+      let handlers = this.waiters.get(key);
+      if (!handlers) {
+        handlers = new Set();
+        this.waiters.set(key, handlers);
+      }
+
+      let settled = false;
+      let checking = false;
+      let timer: ReturnType<typeof setInterval> | undefined;
+      const finish = (result: FlightResult | null) => {
+        if (settled) return;
+        settled = true;
+        clearInterval(timer);
+        handlers!.delete(finish);
+        if (handlers!.size === 0) {
+          this.waiters.delete(key);
+        }
+        resolve(result);
+      };
+
+      // Covers a leader that finished before we subscribed, or a lost message
+      const check = async () => {
+        if (settled || checking) return;
+        checking = true;
+        try {
+          if (Date.now() >= deadline) {
+            finish(null);
+            return;
+          }
+          if (await cacheEngine.isLocked(lockName)) {
+            return;
+          }
+          const stored = options.recheck ? await options.recheck() : null;
+          finish(stored !== null && stored !== undefined ? { key, ok: true, value: stored } : null);
+        } catch (error) {
+          console.warn(`Could not check AI analysis ${key} in another worker:`, error);
+        } finally {
+          checking = false;
+        }
+      };
+
+      handlers.add(finish);
+      timer = setInterval(check, POLL_INTERVAL_MS);
+      check();
+    });
+  }
+
+  private listen(): void {
+    if (this.listening) return;
+    this.listening = true;
+
+    cacheEngine.subscribe(RESULT_CHANNEL, (raw) => {
+      let result: FlightResult;
+      try {
+        result = JSON.parse(raw);
+      } catch {
+        return;
+      }
+      const handlers = this.waiters.get(result.key);
+      if (handlers) {
+        Array.from(handlers).forEach((handler) => handler(result));
+      }
+    });
+  }
+
+  private async broadcast(result: FlightResult): Promise<void> {
+    let message: string;
+    try {
+      message = JSON.stringify(result);
+    } catch (error) {
+      // Unserializable results reach waiters through recheck instead
+      console.warn(`Could not broadcast AI analysis ${result.key}:`, error);
+      return;
+    }
+    await cacheEngine.publish(RESULT_CHANNEL, message);
+  }
+}
+
+// Export singleton instance
+export const aiSingleFlight = new SingleFlight();
@@ -0,0 +1,154 @@
+import fs from 'fs';
+import path from 'path';
+import { Readable } from 'stream';
+
+/**
+ * HTTP delivery of stored audio files with byte-range support.
+ *
+ * Browsers play <audio> sources through Range requests: a small first
+ * request to read the container header, then one request per seek. Each
+ * request streams only the requested slice from disk through
+ * fs.createReadStream, so a seek in a long recording does not re-download
+ * the file and the server never holds more than one read buffer per
+ * reader. Strong ETags and Last-Modified let the browser revalidate its
+ * cached slices with a 304, and If-Range keeps a stale cached slice from
+ * being combined with a newer file.
+ */
+
+const CONTENT_TYPES: Record<string, string> = {
+  '.mp3': 'audio/mpeg',
+  '.wav': 'audio/wav',
+  '.webm': 'audio/webm',
+  '.ogg': 'audio/ogg',
+  '.m4a': 'audio/mp4',
+  '.mp4': 'audio/mp4'
+};
+
+const READ_CHUNK_BYTES = 64 * 1024;
+
+export interface ByteRange {
+  start: number;
+  end: number; // inclusive
+}
+
+export function audioContentType(filename: string): string {
+  return CONTENT_TYPES[path.extname(filename).toLowerCase()] || 'audio/mpeg';
+}
+
+/**
+ * Parse a Range header against a file of `size` bytes. Returns null when
+ * the header is absent, malformed or asks for several ranges (answered
+ * with the whole file), and 'unsatisfiable' when no requested byte exists.
+ */
+export function parseRange(header: string | null, size: number): ByteRange | 'unsatisfiable' | null {
+  if (!header) return null;
+  const match = header.trim().match(/^bytes=(\d*)-(\d*)$/);
+  if (!match || (!match[1] && !match[2])) return null;
+
+  let start: number;
+  let end: number;
+  if (!match[1]) {
+    // Suffix range: the last N bytes
+    const suffix = parseInt(match[2], 10);
+    if (suffix === 0) return 'unsatisfiable';
+    start = Math.max(0, size - suffix);
+    end = size - 1;
+  } else {
+    start = parseInt(match[1], 10);
+    end = match[2] ? Math.min(parseInt(match[2], 10), size - 1) : size - 1;
+    if (match[2] && parseInt(match[2], 10) < start) return null;
+  }
+
+  if (start >= size || size === 0) return 'unsatisfiable';
+  return { start, end };
+}
+
+function entityTag(stats: fs.Stats): string {
+  return `"${stats.size.toString(16)}-${Math.floor(stats.mtimeMs).toString(16)}"`;
+}
+
+// HTTP dates have one-second resolution
+function modifiedSeconds(stats: fs.Stats): number {
+  return Math.floor(stats.mtimeMs / 1000);
+}
+
+function isNotModified(request: Request, etag: string, stats: fs.Stats): boolean {
+  const ifNoneMatch = request.headers.get('if-none-match');
+  if (ifNoneMatch) {
+    return ifNoneMatch.trim() === '*'
+      || ifNoneMatch.split(',').some(tag => tag.trim().replace(/^W\//, '') === etag);
+  }
+  const ifModifiedSince = Date.parse(request.headers.get('if-modified-since') || '');
+  return !isNaN(ifModifiedSince) && modifiedSeconds(stats) <= Math.floor(ifModifiedSince / 1000);
+}
+
+// A Range request with If-Range is only honoured while the file is unchanged
+function rangeStillValid(request: Request, etag: string, stats: fs.Stats): boolean {
+  const ifRange = request.headers.get('if-range');
+  if (!ifRange) return true;
+  if (ifRange.trim().startsWith('"')) return ifRange.trim() === etag;
+  const date = Date.parse(ifRange);
+  return !isNaN(date) && modifiedSeconds(stats) === Math.floor(date / 1000);
+}
+
+/**
+ * Response for `filePath` honouring Range, If-Range, If-None-Match and
+ * If-Modified-Since. HEAD requests get the headers only. Returns null when
+ * the file does not exist.
+ */
+export async function audioFileResponse(
+  request: Request,
+  filePath: string,
+  options: { filename?: string; cacheControl?: string } = {}
+): Promise<Response | null> {
+  let stats: fs.Stats;
+  try {
+    stats = await fs.promises.stat(filePath);
+  } catch {
+    return null;
+  }
+  if (!stats.isFile()) return null;
+
+  const filename = options.filename || path.basename(filePath);
+  const etag = entityTag(stats);
+  const headers: Record<string, string> = {
+    'Content-Type': audioContentType(filename),
+    'Accept-Ranges': 'bytes',
+    'ETag': etag,
+    'Last-Modified': stats.mtime.toUTCString(),
+    'Content-Disposition': `inline; filename="${filename}"`,
+    'Cache-Control': options.cacheControl || 'private, max-age=3600'
+  };
+
+  if (isNotModified(request, etag, stats)) {
+    return new Response(null, { status: 304, headers });
+  }
+
+  const range = rangeStillValid(request, etag, stats)
+    ? parseRange(request.headers.get('range'), stats.size)
+    : null;
+
+  if (range === 'unsatisfiable') {
+    return new Response(null, {
+      status: 416,
+      headers: { ...headers, 'Content-Range': `bytes */${stats.size}` }
+    });
+  }
+
+  const start = range ? range.start : 0;
+  const end = range ? range.end : stats.size - 1;
+  headers['Content-Length'] = String(stats.size === 0 ? 0 : end - start + 1);
+  if (range) {
+    headers['Content-Range'] = `bytes ${start}-${end}/${stats.size}`;
+  }
+
+  let body: ReadableStream<Uint8Array> | null = null;
+  if (request.method !== 'HEAD' && stats.size > 0) {
+    // toWeb pulls from the file only as fast as the client reads, and
+    // destroys the file stream when the client goes away mid-response
+    const fileStream = fs.createReadStream(filePath, { start, end, highWaterMark: READ_CHUNK_BYTES });
+    body = Readable.toWeb(fileStream) as unknown as ReadableStream<Uint8Array>;
+  }
+
+  return new Response(body, { status: range ? 206 : 200, headers });
+}
@@ -0,0 +1,365 @@
+import { CacheEngine } from '../cache-engine';
+import { decodeCacheValue, encodeCacheValue } from '../cache-codec';
+
+// Mock ioredis; every CacheEngine gets the same ready client
+let mockRedis: any;
+
+jest.mock('ioredis', () => ({
+  __esModule: true,
+  default: jest.fn(() => mockRedis),
+}));
+
+jest.mock('../../database/drizzle', () => ({ db: {} }));
+
+function createPipeline(replies: () => any[]) {
+  const pipeline: any = {
+    setex: jest.fn().mockReturnThis(),
+    set: jest.fn().mockReturnThis(),
+    sadd: jest.fn().mockReturnThis(),
+    expire: jest.fn().mockReturnThis(),
+    unlink: jest.fn().mockReturnThis(),
+    exists: jest.fn().mockReturnThis(),
+    smembers: jest.fn().mockReturnThis(),
+    del: jest.fn().mockReturnThis(),
+  };
+  pipeline.exec = jest.fn(async () => replies());
+  return pipeline;
+}
+
+describe('CacheEngine', () => {
+  let cache: CacheEngine;
+  let pipelines: any[];
+  let multis: any[];
+  let pipelineReplies: any[][];
+  let multiReplies: any[][];
+
+  const encode = async (value: unknown) => (await encodeCacheValue(value)).buffer;
+
+  beforeEach(() => {
+    pipelines = [];
+    multis = [];
+    pipelineReplies = [];
+    multiReplies = [];
+
+    mockRedis = {
+      status: 'ready',
+      on: jest.fn(),
+      connect: jest.fn().mockResolvedValue(undefined),
+      quit: jest.fn().mockResolvedValue('OK'),
+      getBuffer: jest.fn().mockResolvedValue(null),
+      mgetBuffer: jest.fn(),
+      unlink: jest.fn(async (...keys: string[]) => keys.length),
+      keys: jest.fn().mockResolvedValue([]),
+      scan: jest.fn().mockResolvedValue(['0', []]),
+      sscan: jest.fn().mockResolvedValue(['0', []]),
+      srem: jest.fn(async (_key: string, ...members: string[]) => members.length),
+      publish: jest.fn().mockResolvedValue(0),
+      ping: jest.fn().mockResolvedValue('PONG'),
+      set: jest.fn().mockResolvedValue('OK'),
+      pipeline: jest.fn(() => {
+        const pipeline = createPipeline(() => pipelineReplies.shift() || []);
+        pipelines.push(pipeline);
+        return pipeline;
+      }),
+      multi: jest.fn(() => {
+        const multi = createPipeline(() => multiReplies.shift() || []);
+        multis.push(multi);
+        return multi;
+      }),
+    };
+
+    cache = new CacheEngine();
+  });
+
+  afterEach(() => {
+    jest.clearAllMocks();
+  });
+
+  describe('get', () => {
+    it('should decode values from Redis and serve repeats from memory', async () => {
+      const testData = { id: 1, name: 'Test' };
+      mockRedis.getBuffer.mockResolvedValue(await encode(testData));
+
+      expect(await cache.get('test-key')).toEqual(testData);
+      expect(await cache.get('test-key')).toEqual(testData);
+
+      expect(mockRedis.getBuffer).toHaveBeenCalledTimes(1);
+      expect(cache.getStats().l1.hits).toBe(1);
+      expect(cache.getStats().l2.hits).toBe(1);
+    });
+
+    it('should return null for missing keys', async () => {
+      expect(await cache.get('missing-key')).toBeNull();
+    });
+
+    it('should return null on Redis errors', async () => {
+      mockRedis.getBuffer.mockRejectedValue(new Error('Redis error'));
+
+      expect(await cache.get('key')).toBeNull();
+      expect(cache.getStats().l2.errors).toBe(1);
+    });
+
+    it('should keep working from memory without Redis', async () => {
+      mockRedis.status = 'end';
+
+      await cache.set('key', { id: 1 });
+
+      expect(await cache.get('key')).toEqual({ id: 1 });
+      expect(mockRedis.getBuffer).not.toHaveBeenCalled();
+    });
+  });
+
+  describe('value isolation', () => {
+    it('should not let callers mutate the stored value', async () => {
+      const value = { id: 1, tags: ['a'] };
+      await cache.set('key', value);
+      value.tags.push('changed-after-set');
+
+      const first = await cache.get<{ id: number; tags: string[] }>('key');
+      first!.tags.push('changed-after-get');
+
+      expect(await cache.get('key')).toEqual({ id: 1, tags: ['a'] });
+    });
+
+    it('should return the same shape from memory and Redis', async () => {
+      const value = { id: 1, nested: { list: [1, 2, 3] } };
+      mockRedis.getBuffer.mockResolvedValue(await encode(value));
+
+      const fromRedis = await cache.get('key');
+      const fromMemory = await cache.get('key');
+
+      expect(fromMemory).toEqual(fromRedis);
+      expect(fromMemory).not.toBe(fromRedis);
+    });
+
+    it('should hand out what Redis would for values set locally', async () => {
+      const at = new Date('2024-03-01T09:00:00Z');
+      await cache.set('key', { at, skipped: undefined });
+
+      expect(await cache.get('key')).toEqual({ at: at.toISOString() });
+    });
+  });
+
+  describe('set', () => {
+    it('should store encoded values with TTL', async () => {
+      await cache.set('test-key', { id: 1 }, { ttl: 300 });
+
+      const [pipeline] = pipelines;
+      expect(pipeline.setex).toHaveBeenCalledWith('test-key', 300, expect.any(Buffer));
+      expect(await decodeCacheValue(pipeline.setex.mock.calls[0][2])).toEqual({ id: 1 });
+      expect(pipeline.exec).toHaveBeenCalled();
+    });
+
+    it('should tell other workers only once Redis has the new value', async () => {
+      await cache.set('test-key', { id: 1 });
+
+      expect(mockRedis.publish.mock.invocationCallOrder[0])
+        .toBeGreaterThan(pipelines[0].exec.mock.invocationCallOrder[0]);
+    });
+
+    it('should still tell other workers when the write fails', async () => {
+      mockRedis.pipeline.mockImplementationOnce(() => {
+        const pipeline = createPipeline(() => []);
+        pipeline.exec.mockRejectedValue(new Error('Redis error'));
+        pipelines.push(pipeline);
+        return pipeline;
+      });
+
+      await cache.set('test-key', { id: 1 });
+
+      expect(mockRedis.publish).toHaveBeenCalledWith('cache:invalidate', expect.stringContaining('test-key'));
+    });
+
+    it('should store without TTL when ttl is 0', async () => {
+      await cache.set('test-key', { id: 1 }, { ttl: 0 });
+
+      expect(pipelines[0].set).toHaveBeenCalledWith('test-key', expect.any(Buffer));
+      expect(pipelines[0].setex).not.toHaveBeenCalled();
+    });
+
+    it('should use default TTL when not specified', async () => {
+      await cache.set('test-key', 'value');
+
+      expect(pipelines[0].setex).toHaveBeenCalledWith('test-key', 300, expect.any(Buffer));
+    });
+
+    it('should register keys under their tags', async () => {
+      await cache.set('metrics:all', [], { ttl: 60, tags: ['instructor:7'] });
+
+      expect(pipelines[0].sadd).toHaveBeenCalledWith('tag:instructor:7', 'metrics:all');
+      expect(pipelines[0].expire).toHaveBeenCalledWith('tag:instructor:7', 86400);
+    });
+  });
+
+  describe('delete', () => {
+    it('should unlink the key and tell other workers', async () => {
+      const result = await cache.delete('test-key');
+
+      expect(mockRedis.unlink).toHaveBeenCalledWith('test-key');
+      expect(mockRedis.publish).toHaveBeenCalledWith(
+        'cache:invalidate',
+        expect.stringContaining('test-key')
+      );
+      expect(result).toBe(true);
+      expect(mockRedis.publish.mock.invocationCallOrder[0])
+        .toBeGreaterThan(mockRedis.unlink.mock.invocationCallOrder[0]);
+    });
+
+    it('should return false when key not found', async () => {
+      mockRedis.unlink.mockResolvedValue(0);
+
+      expect(await cache.delete('missing-key')).toBe(false);
+    });
+  });
+
+  describe('deletePattern', () => {
+    it('should delete keys matching pattern using SCAN', async () => {
+      mockRedis.scan
+        .mockResolvedValueOnce(['17', ['user:1:profile']])
+        .mockResolvedValueOnce(['0', ['user:1:settings']]);
+
+      const result = await cache.deletePattern('user:1:*');
+
+      expect(mockRedis.scan).toHaveBeenCalledWith('0', 'MATCH', 'user:1:*', 'COUNT', 500);
+      expect(mockRedis.scan).toHaveBeenCalledWith('17', 'MATCH', 'user:1:*', 'COUNT', 500);
+      expect(mockRedis.unlink).toHaveBeenCalledWith('user:1:profile');
+      expect(mockRedis.unlink).toHaveBeenCalledWith('user:1:settings');
+      expect(mockRedis.keys).not.toHaveBeenCalled();
+      expect(result).toBe(2);
+    });
+
+    it('should return 0 when no keys match', async () => {
+      expect(await cache.deletePattern('nonexistent:*')).toBe(0);
+      expect(mockRedis.unlink).not.toHaveBeenCalled();
+    });
+  });
+
+  describe('invalidateTags', () => {
+    it('should delete every key registered under the tag', async () => {
+      multiReplies.push([[null, ['student:123', 'attendance:student:123:stats']], [null, 1]]);
+      pipelineReplies.push([[null, 2]]);
+
+      const deleted = await cache.invalidateTags(['student:123']);
+
+      const [multi] = multis;
+      expect(multi.smembers).toHaveBeenCalledWith('tag:student:123');
+      expect(multi.del).toHaveBeenCalledWith('tag:student:123');
+      expect(pipelines[0].unlink).toHaveBeenCalledWith('student:123', 'attendance:student:123:stats');
+      expect(mockRedis.keys).not.toHaveBeenCalled();
+      expect(deleted).toBe(2);
+      expect(mockRedis.publish.mock.invocationCallOrder[0])
+        .toBeGreaterThan(pipelines[0].exec.mock.invocationCallOrder[0]);
+    });
+
+    it('should drop tagged entries from memory', async () => {
+      mockRedis.status = 'end';
+      await cache.set('course:456:details', { id: 456 }, { tags: ['course:456'] });
+
+      await cache.invalidateTags(['course:456']);
+
+      expect(await cache.get('course:456:details')).toBeNull();
+    });
+
+    it('should delete large tag sets in batches', async () => {
+      const members = Array.from({ length: 1200 }, (_, i) => `student:9:${i}`);
+      multiReplies.push([[null, members], [null, 1]]);
+      pipelineReplies.push([[null, 500], [null, 500], [null, 200]]);
+
+      const deleted = await cache.invalidateTags(['student:9']);
+
+      expect(pipelines[0].unlink).toHaveBeenCalledTimes(3);
+      expect(deleted).toBe(1200);
+    });
+
+    it('should skip invalidation when no tags are given', async () => {
+      expect(await cache.invalidateTags([])).toBe(0);
+      expect(mockRedis.multi).not.toHaveBeenCalled();
+    });
+  });
+
+  describe('cleanupOrphanedTags', () => {
+    it('should remove members whose entries have expired', async () => {
+      mockRedis.scan.mockResolvedValueOnce(['0', ['tag:student:1']]);
+      mockRedis.sscan.mockResolvedValueOnce(['0', ['student:1', 'feedback:student:1:10']]);
+      pipelineReplies.push([[null, 1], [null, 0]]);
+
+      const removed = await cache.cleanupOrphanedTags();
+
+      expect(mockRedis.srem).toHaveBeenCalledWith('tag:student:1', 'feedback:student:1:10');
+      expect(removed).toBe(1);
+    });
+
+    it('should sweep on a timer from one worker at a time', async () => {
+      jest.useFakeTimers();
+      try {
+        mockRedis.set.mockResolvedValueOnce('OK').mockResolvedValueOnce(null);
+        cache.startTagCleanup(1000);
+
+        await jest.advanceTimersByTimeAsync(2000);
+
+        expect(mockRedis.set).toHaveBeenCalledTimes(2);
+        expect(mockRedis.scan).toHaveBeenCalledTimes(1);
+      } finally {
+        cache.stopTagCleanup();
+        jest.useRealTimers();
+      }
+    });
+  });
+
+  describe('Batch Operations', () => {
+    it('should get multiple values', async () => {
+      mockRedis.mgetBuffer.mockResolvedValue([await encode({ id: 1 }), null, await encode({ id: 3 })]);
+
+      const result = await cache.mget(['key1', 'key2', 'key3']);
+
+      expect(mockRedis.mgetBuffer).toHaveBeenCalledWith('key1', 'key2', 'key3');
+      expect(result).toEqual([{ id: 1 }, null, { id: 3 }]);
+    });
+
+    it('should only ask Redis for keys missing from memory', async () => {
+      await cache.set('key1', { id: 1 });
+      mockRedis.mgetBuffer.mockResolvedValue([null]);
+
+      const result = await cache.mget(['key1', 'key2']);
+
+      expect(mockRedis.mgetBuffer).toHaveBeenCalledWith('key2');
+      expect(result).toEqual([{ id: 1 }, null]);
+    });
+
+    it('should set multiple values with TTL', async () => {
+      await cache.mset(
+        [
+          { key: 'key1', value: { id: 1 }, ttl: 60 },
+          { key: 'key2', value: { id: 2 } }
+        ],
+        { ttl: 120 }
+      );
+
+      const [pipeline] = pipelines;
+      expect(pipeline.setex).toHaveBeenCalledWith('key1', 60, expect.any(Buffer));
+      expect(pipeline.setex).toHaveBeenCalledWith('key2', 120, expect.any(Buffer));
+      expect(pipeline.exec).toHaveBeenCalledTimes(1);
+    });
+  });
+
+  describe('CachedRepository', () => {
+    it('should namespace its keys and tags', async () => {
+      const { CachedRepository } = require('../../database/cached-repository');
+      const database = {
+        query: {
+          courses: { findFirst: jest.fn().mockResolvedValue({ id: '456' }) }
+        }
+      };
+      const repo = new CachedRepository(database);
+      repo.cache = cache;
+
+      await repo.findCourseById('456');
+
+      expect(pipelines[0].setex).toHaveBeenCalledWith('growth_compass:course:456', 3600, expect.any(Buffer));
+      expect(pipelines[0].sadd).toHaveBeenCalledWith(
+        'tag:growth_compass:course:456',
+        'growth_compass:course:456'
+      );
+    });
+  });
+});
@@ -0,0 +1,407 @@
+import { promisify } from 'util';
+import zlib from 'zlib';
+
+// Serialization for values stored in Redis by the cache engine.
+//
+// Every encoded value starts with a four byte header:
+//
+//   [0] CODEC_MAGIC    distinguishes encoded values from legacy JSON strings
+//   [1] FORMAT_VERSION bumped whenever the header or a codec layout changes
+//   [2] codec id       how the body is serialized (json, packed)
+//   [3] compression    none, gzip or brotli
+//
+// Decoding looks at the header, so readers handle every codec and entries
+// written before this layer existed (plain JSON) keep working. The codec used
+// for writing is picked with CACHE_CODEC, which lets a new codec be rolled out
+// to readers before any writer starts producing it.
+
+const CODEC_MAGIC = 0xc7;
+const FORMAT_VERSION = 1;
+const HEADER_BYTES = 4;
+
+// Bodies smaller than this are stored uncompressed; below roughly a kilobyte
+// the compression header and CPU cost outweigh the bytes saved
+const COMPRESSION_THRESHOLD = parseInt(process.env.CACHE_COMPRESSION_THRESHOLD || '1024');
+
+const brotliCompress = promisify(zlib.brotliCompress);
+const brotliDecompress = promisify(zlib.brotliDecompress);
+const gzip = promisify(zlib.gzip);
+const gunzip = promisify(zlib.gunzip);
+
+export enum CodecId {
+  Json = 0,
+  Packed = 1,
+}
+
+export enum Compression {
+  None = 0,
+  Gzip = 1,
+  Brotli = 2,
+}
+
+export interface CacheCodec {
+  id: CodecId;
+  name: string;
+  encode(value: unknown): Buffer;
+  decode(body: Buffer): unknown;
+}
+
+export interface EncodedValue {
+  buffer: Buffer;
+  // Size of the serialized body before compression; a cheap stand-in for
+  // how much memory the decoded value occupies
+  rawBytes: number;
+}
+
+const jsonCodec: CacheCodec = {
+  id: CodecId.Json,
+  name: 'json',
+  encode: (value) => Buffer.from(JSON.stringify(value ?? null), 'utf8'),
+  decode: (body) => JSON.parse(body.toString('utf8')),
+};
+
+// ---------------------------------------------------------------------------
+// Packed codec
+//
+// A tagged binary layout with the same semantics as JSON (toJSON is honoured,
+// undefined and functions are dropped from objects and become null in
+// arrays). Object keys and short strings are interned: the first occurrence
+// is written in full, later ones as a varint index. Growth payloads repeat
+// the same few dozen keys and enum-like values thousands of times, which is
+// where most of the saving over JSON comes from.
+// ---------------------------------------------------------------------------
+
+const TAG_NULL = 0x00;
+const TAG_FALSE = 0x01;
+const TAG_TRUE = 0x02;
+const TAG_INT = 0x03;
+const TAG_FLOAT = 0x04;
+const TAG_STRING = 0x05;
+const TAG_STRING_REF = 0x06;
+const TAG_ARRAY = 0x07;
+const TAG_OBJECT = 0x08;
+
+const MAX_INTERNED_BYTES = 64;
+const MAX_VARINT_INT = 2 ** 52;
+
+class PackedWriter {
+  private buffer = Buffer.allocUnsafe(4096);
+  private offset = 0;
+  private strings = new Map<string, number>();
+
+  finish(): Buffer {
+    return this.buffer.subarray(0, this.offset);
+  }
+
+  private ensure(bytes: number): void {
+    if (this.offset + bytes <= this.buffer.length) return;
+    let size = this.buffer.length * 2;
+    while (size < this.offset + bytes) size *= 2;
+    const next = Buffer.allocUnsafe(size);
+    this.buffer.copy(next, 0, 0, this.offset);
+    this.buffer = next;
+  }
+
+  private byte(value: number): void {
+    this.ensure(1);
+    this.buffer[this.offset++] = value;
+  }
+
+  private varint(value: number): void {
+    this.ensure(8);
+    while (value >= 0x80) {
+      this.buffer[this.offset++] = (value % 0x80) | 0x80;
+      value = Math.floor(value / 0x80);
+    }
+    this.buffer[this.offset++] = value;
+  }
+
+  private string(value: string): void {
+    const ref = this.strings.get(value);
+    if (ref !== undefined) {
+      this.byte(TAG_STRING_REF);
+      this.varint(ref);
+      return;
+    }
+
+    const length = Buffer.byteLength(value, 'utf8');
+    this.byte(TAG_STRING);
+    this.varint(length);
+    this.ensure(length);
+    this.buffer.write(value, this.offset, length, 'utf8');
+    this.offset += length;
+
+    if (length <= MAX_INTERNED_BYTES) {
+      this.strings.set(value, this.strings.size);
+    }
+  }
+
+  value(input: unknown): void {
+    let value: any = input;
+    if (value !== null && typeof value === 'object' && typeof value.toJSON === 'function') {
+      value = value.toJSON();
+    }
+
+    switch (typeof value) {
+      case 'string':
+        this.string(value);
+        return;
+      case 'boolean':
+        this.byte(value ? TAG_TRUE : TAG_FALSE);
+        return;
+      case 'number':
+        if (!Number.isFinite(value)) {
+          this.byte(TAG_NULL);
+        } else if (Number.isInteger(value) && Math.abs(value) < MAX_VARINT_INT && !Object.is(value, -0)) {
+          this.byte(TAG_INT);
+          this.varint(value >= 0 ? value * 2 : -value * 2 - 1);
+        } else {
+          this.byte(TAG_FLOAT);
+          this.ensure(8);
+          this.buffer.writeDoubleLE(value, this.offset);
+          this.offset += 8;
+        }
+        return;
+      case 'bigint':
+        throw new TypeError('Do not know how to serialize a BigInt');
+      case 'object':
+        break;
+      default:
+        // undefined, functions and symbols, as JSON.stringify treats them
+        this.byte(TAG_NULL);
+        return;
+    }
+
+    if (value === null) {
+      this.byte(TAG_NULL);
+      return;
+    }
+
+    if (Array.isArray(value)) {
+      this.byte(TAG_ARRAY);
+      this.varint(value.length);
+      for (const item of value) {
+        this.value(item);
+      }
+      return;
+    }
+
+    const keys = Object.keys(value).filter(key => {
+      const item = value[key];
+      return item !== undefined && typeof item !== 'function' && typeof item !== 'symbol';
+    });
+
+    this.byte(TAG_OBJECT);
+    this.varint(keys.length);
+    for (const key of keys) {
+      this.string(key);
+      this.value(value[key]);
+    }
+  }
+}
+
+class PackedReader {
+  private offset = 0;
+  private strings: string[] = [];
+
+  constructor(private buffer: Buffer) {}
+
+  private varint(): number {
+    let result = 0;
+    let scale = 1;
+    let byte: number;
+    do {
+      byte = this.buffer[this.offset++];
+      if (byte === undefined) throw new Error('Truncated packed cache value');
+      result += (byte & 0x7f) * scale;
+      scale *= 0x80;
+    } while (byte & 0x80);
+    return result;
+  }
+
+  private string(tag: number): string {
+    if (tag === TAG_STRING_REF) {
+      const value = this.strings[this.varint()];
+      if (value === undefined) throw new Error('Invalid string reference in packed cache value');
+      return value;
+    }
+
+    const length = this.varint();
+    const value = this.buffer.toString('utf8', this.offset, this.offset + length);
+    this.offset += length;
+
+    if (length <= MAX_INTERNED_BYTES) {
+      this.strings.push(value);
+    }
+    return value;
+  }
+
+  value(): unknown {
+    const tag = this.buffer[this.offset++];
+
+    switch (tag) {
+      case TAG_NULL:
+        return null;
+      case TAG_FALSE:
+        return false;
+      case TAG_TRUE:
+        return true;
+      case TAG_INT: {
+        const zigzag = this.varint();
+        return zigzag % 2 === 0 ? zigzag / 2 : -(zigzag + 1) / 2;
+      }
+      case TAG_FLOAT: {
+        const value = this.buffer.readDoubleLE(this.offset);
+        this.offset += 8;
+        return value;
+      }
+      case TAG_STRING:
+      case TAG_STRING_REF:
+        return this.string(tag);
+      case TAG_ARRAY: {
+        const length = this.varint();
+        const items = new Array(length);
+        for (let i = 0; i < length; i++) {
+          items[i] = this.value();
+        }
+        return items;
+      }
+      case TAG_OBJECT: {
+        const count = this.varint();
+        const result: Record<string, unknown> = {};
+        for (let i = 0; i < count; i++) {
+          const keyTag = this.buffer[this.offset++];
+          if (keyTag !== TAG_STRING && keyTag !== TAG_STRING_REF) {
+            throw new Error('Invalid object key in packed cache value');
+          }
+          const key = this.string(keyTag);
+          const item = this.value();
+          if (key === '__proto__') {
+            Object.defineProperty(result, key, { value: item, enumerable: true, writable: true, configurable: true });
+          } else {
+            result[key] = item;
+          }
+        }
+        return result;
+      }
+      default:
+        throw new Error(`Unknown tag ${tag} in packed cache value`);
+    }
+  }
+}
+
+const packedCodec: CacheCodec = {
+  id: CodecId.Packed,
+  name: 'packed',
+  encode: (value) => {
+    const writer = new PackedWriter();
+    writer.value(value);
+    return writer.finish();
+  },
+  decode: (body) => new PackedReader(body).value(),
+};
+
+const codecs = new Map<CodecId, CacheCodec>([
+  [jsonCodec.id, jsonCodec],
+  [packedCodec.id, packedCodec],
+]);
+
+export function getCodec(name: string = process.env.CACHE_CODEC || 'packed'): CacheCodec {
+  for (const codec of codecs.values()) {
+    if (codec.name === name) return codec;
+  }
+  return packedCodec;
+}
+
+function compressionFromEnv(): Compression {
+  switch (process.env.CACHE_COMPRESSION) {
+    case 'none':
+      return Compression.None;
+    case 'gzip':
+      return Compression.Gzip;
+    default:
+      return Compression.Brotli;
+  }
+}
+
+export async function encodeCacheValue(
+  value: unknown,
+  codec: CacheCodec = getCodec(),
+  compression: Compression = compressionFromEnv()
+): Promise<EncodedValue> {
+  const body = codec.encode(value);
+  let payload = body;
+  let applied = Compression.None;
+
+  if (compression !== Compression.None && body.length >= COMPRESSION_THRESHOLD) {
+    const compressed = compression === Compression.Gzip
+      ? await gzip(body, { level: 6 })
+      : await brotliCompress(body, {
+          params: {
+            // Quality 4 keeps most of brotli's ratio at a fraction of the
+            // CPU cost of the default (11)
+            [zlib.constants.BROTLI_PARAM_QUALITY]: 4,
+            [zlib.constants.BROTLI_PARAM_SIZE_HINT]: body.length,
+          },
+        });
+
+    if (compressed.length < body.length) {
+      payload = compressed;
+      applied = compression;
+    }
+  }
+
+  const buffer = Buffer.allocUnsafe(HEADER_BYTES + payload.length);
+  buffer[0] = CODEC_MAGIC;
+  buffer[1] = FORMAT_VERSION;
+  buffer[2] = codec.id;
+  buffer[3] = applied;
+  payload.copy(buffer, HEADER_BYTES);
+
+  return { buffer, rawBytes: body.length };
+}
+
+export async function decodeCacheEntry<T>(buffer: Buffer): Promise<{ value: T; rawBytes: number }> {
+  // Entries written before the codec layer are bare JSON text
+  if (buffer.length === 0 || buffer[0] !== CODEC_MAGIC) {
+    return { value: JSON.parse(buffer.toString('utf8')) as T, rawBytes: buffer.length };
+  }
+
+  if (buffer[1] !== FORMAT_VERSION) {
+    throw new Error(`Unsupported cache format version ${buffer[1]}`);
+  }
+
+  const codec = codecs.get(buffer[2]);
+  if (!codec) {
+    throw new Error(`Unknown cache codec ${buffer[2]}`);
+  }
+
+  let body = buffer.subarray(HEADER_BYTES);
+  switch (buffer[3]) {
+    case Compression.None:
+      break;
+    case Compression.Gzip:
+      body = await gunzip(body);
+      break;
+    case Compression.Brotli:
+      body = await brotliDecompress(body);
+      break;
+    default:
+      throw new Error(`Unknown cache compression ${buffer[3]}`);
+  }
+
+  return { value: codec.decode(body) as T, rawBytes: body.length };
+}
+
+/**
+ * Copy of `value` in the shape decoding it would produce. Both codecs follow
+ * JSON semantics, so a JSON round trip gives the same result without paying
+ * for the binary encoding or compression.
+ */
+export function toCachedShape<T>(value: T): T {
+  return JSON.parse(JSON.stringify(value ?? null));
+}
+
+export async function decodeCacheValue<T>(buffer: Buffer): Promise<T> {
+  return (await decodeCacheEntry<T>(buffer)).value;
+}
@@ -0,0 +1,736 @@
+import Redis from 'ioredis';
+import { randomUUID } from 'crypto';
+import { MemoryLRU } from './memory-lru';
+import { decodeCacheEntry, encodeCacheValue, toCachedShape } from './cache-codec';
+import { recordInvalidation, timeCommand } from './invalidation-metrics';
+
+// Two-tier cache shared by cache-manager, redis-cache and CachedRepository.
+//
+// L1 is a byte-bounded LRU inside each worker; L2 is Redis. Reads try L1
+// first, then Redis, and fill L1 on the way back. Every write, delete and
+// invalidation is broadcast on a pub/sub channel so the other pm2 workers
+// drop their L1 copies. L1 entries live at most L1_MAX_TTL seconds, which
+// bounds staleness if a broadcast is ever missed.
+//
+// L1 holds decoded values, so a hit costs a structuredClone rather than a
+// decompress and parse. Values are stored in the shape Redis hands back
+// (JSON semantics: Dates become strings, undefined is dropped) and every hit
+// returns its own copy, so both tiers answer alike and mutating a returned
+// object (or the one passed to set) cannot change what the next reader sees.
+//
+// Broadcasts go out only after the Redis write or delete has completed;
+// sent earlier, another worker could drop its copy, re-read the old value
+// from Redis and keep it for up to L1_MAX_TTL.
+
+const TAG_PREFIX = 'tag:';
+const LOCK_PREFIX = 'lock:';
+const INVALIDATION_CHANNEL = 'cache:invalidate';
+const INVALIDATION_BATCH_SIZE = 500;
+const SCAN_COUNT = 500;
+const DEFAULT_TTL = 300; // 5 minutes
+const TAG_TTL_FLOOR = 86400; // 24 hours
+const TAG_CLEANUP_INTERVAL = 30 * 60 * 1000; // 30 minutes
+const TAG_CLEANUP_LOCK = 'cache:tag-cleanup';
+
+const L1_MAX_BYTES = parseInt(process.env.CACHE_L1_MAX_BYTES || String(32 * 1024 * 1024));
+const L1_MAX_TTL = parseInt(process.env.CACHE_L1_TTL || '30'); // seconds
+
+export interface CacheSetOptions {
+  ttl?: number; // seconds; 0 stores without expiry
+  tags?: string[];
+}
+
+export interface CacheEngineStats {
+  l1: {
+    hits: number;
+    misses: number;
+    hitRate: number;
+    entries: number;
+    bytes: number;
+    maxBytes: number;
+    evictions: number;
+  };
+  l2: {
+    connected: boolean;
+    hits: number;
+    misses: number;
+    errors: number;
+    hitRate: number;
+  };
+  hitRate: number;
+}
+
+interface InvalidationMessage {
+  origin: string;
+  keys?: string[];
+  tags?: string[];
+  pattern?: string;
+  flush?: boolean;
+}
+
+function hitRate(hits: number, misses: number): number {
+  const total = hits + misses;
+  return total > 0 ? hits / total : 0;
+}
+
+function globToRegExp(pattern: string): RegExp {
+  const escaped = pattern.replace(/[.+^${}()|[\]\\]/g, '\\$&');
+  return new RegExp(`^${escaped.replace(/\*/g, '.*').replace(/\?/g, '.')}$`);
+}
+
+export class CacheEngine {
+  private memory = new MemoryLRU<unknown>({ maxBytes: L1_MAX_BYTES });
+  private redis: Redis | null = null;
+  private subscriber: Redis | null = null;
+  private connecting: Promise<void> | null = null;
+  private tagCleanupTimer?: NodeJS.Timeout;
+  private readonly instanceId = randomUUID();
+
+  // Other modules' pub/sub channels, carried on the same subscriber
+  private channelHandlers = new Map<string, Set<(message: string) => void>>();
+
+  // Bumped on every local or remote invalidation; a Redis read that started
+  // before a bump must not repopulate L1 with what may be the old value
+  private generation = 0;
+
+  private l1Hits = 0;
+  private l1Misses = 0;
+  private l2Hits = 0;
+  private l2Misses = 0;
+  private l2Errors = 0;
+
+  constructor() {
+    // Nothing to talk to while `next build` collects page data
+    if (process.env.NEXT_PHASE === 'phase-production-build') {
+      return;
+    }
+
+    try {
+      const options = {
+        lazyConnect: true,
+        enableOfflineQueue: false,
+        maxRetriesPerRequest: 1,
+        retryStrategy: (times: number) => {
+          if (times > 10) return null;
+          return Math.min(times * 200, 5000);
+        },
+      };
+
+      this.redis = process.env.REDIS_URL
+        ? new Redis(process.env.REDIS_URL, options)
+        : new Redis({
+            host: process.env.REDIS_HOST || 'localhost',
+            port: parseInt(process.env.REDIS_PORT || '6379'),
+            password: process.env.REDIS_PASSWORD,
+            ...options,
+          });
+
+      const redis = this.redis;
+      redis.on('error', (err) => {
+        console.warn('Redis cache error:', err.message);
+      });
+      redis.on('ready', () => this.startSubscriber(redis));
+    } catch (error) {
+      console.warn('Redis not available, serving cache from memory only');
+      this.redis = null;
+    }
+  }
+
+  /**
+   * Returns the Redis client once it is ready, connecting on first use.
+   * While Redis is down the engine keeps working as a per-worker cache.
+   */
+  private async client(): Promise<Redis | null> {
+    const redis = this.redis;
+    if (!redis) return null;
+    if (redis.status === 'ready') return redis;
+
+    if (redis.status === 'wait') {
+      if (!this.connecting) {
+        this.connecting = redis
+          .connect()
+          .catch((err) => {
+            console.warn('Redis cache unavailable:', err.message);
+          });
+      }
+      await this.connecting;
+      return redis.status === 'ready' ? redis : null;
+    }
+
+    return null;
+  }
+
+  private startSubscriber(redis: Redis): void {
+    if (this.subscriber) return;
+
+    const subscriber = redis.duplicate({ lazyConnect: false, enableOfflineQueue: true });
+    let subscribedOnce = false;
+
+    subscriber.on('error', (err) => {
+      console.warn('Redis cache subscriber error:', err.message);
+    });
+
+    // Broadcasts sent while we were disconnected are lost, so anything in
+    // memory may be stale after a reconnect
+    subscriber.on('ready', () => {
+      if (subscribedOnce) {
+        this.generation++;
+        this.memory.clear();
+      }
+      subscribedOnce = true;
+    });
+
+    subscriber.on('message', (channel: string, raw: string) => {
+      if (channel === INVALIDATION_CHANNEL) {
+        this.applyRemote(raw);
+        return;
+      }
+      this.channelHandlers.get(channel)?.forEach((handler) => handler(raw));
+    });
+
+    subscriber.subscribe(INVALIDATION_CHANNEL, ...this.channelHandlers.keys()).catch((err) => {
+      console.warn('Redis cache subscribe failed:', err.message);
+    });
+
+    this.subscriber = subscriber;
+  }
+
+  private applyRemote(raw: string): void {
+    let message: InvalidationMessage;
+    try {
+      message = JSON.parse(raw);
+    } catch {
+      return;
+    }
+
+    if (message.origin === this.instanceId) return;
+
+    this.generation++;
+
+    if (message.flush) {
+      this.memory.clear();
+      return;
+    }
+    message.keys?.forEach((key) => this.memory.delete(key));
+    if (message.tags) this.memory.deleteTags(message.tags);
+    if (message.pattern) this.memory.deleteMatching(globToRegExp(message.pattern));
+  }
+
+  private broadcast(redis: Redis | null, message: Omit<InvalidationMessage, 'origin'>): void {
+    if (!redis) return;
+    redis
+      .publish(INVALIDATION_CHANNEL, JSON.stringify({ ...message, origin: this.instanceId }))
+      .catch((err) => console.warn('Cache invalidation broadcast failed:', err.message));
+  }
+
+  private memoryTTL(ttl: number): number {
+    const seconds = ttl > 0 ? Math.min(ttl, L1_MAX_TTL) : L1_MAX_TTL;
+    return seconds * 1000;
+  }
+
+  async get<T>(key: string): Promise<T | null> {
+    const local = this.memory.get(key);
+    if (local !== undefined) {
+      this.l1Hits++;
+      return structuredClone(local) as T;
+    }
+    this.l1Misses++;
+
+    const redis = await this.client();
+    if (!redis) return null;
+
+    const generation = this.generation;
+    try {
+      const raw = await redis.getBuffer(key);
+      if (raw === null) {
+        this.l2Misses++;
+        return null;
+      }
+
+      this.l2Hits++;
+      const { value, rawBytes } = await decodeCacheEntry<T>(raw);
+      if (generation === this.generation) {
+        this.memory.set(key, structuredClone(value), rawBytes, this.memoryTTL(0));
+      }
+      return value;
+    } catch (error) {
+      this.l2Errors++;
+      console.warn('Cache get error:', error);
+      return null;
+    }
+  }
+
+  async mget<T>(keys: string[]): Promise<(T | null)[]> {
+    const results: (T | null)[] = keys.map(() => null);
+    const missing: number[] = [];
+
+    keys.forEach((key, i) => {
+      const local = this.memory.get(key);
+      if (local !== undefined) {
+        this.l1Hits++;
+        results[i] = structuredClone(local) as T;
+      } else {
+        this.l1Misses++;
+        missing.push(i);
+      }
+    });
+
+    if (missing.length === 0) return results;
+
+    const redis = await this.client();
+    if (!redis) return results;
+
+    const generation = this.generation;
+    try {
+      const values = await redis.mgetBuffer(...missing.map((i) => keys[i]));
+      const decoded = await Promise.all(
+        values.map((raw) => (raw === null ? null : decodeCacheEntry<T>(raw)))
+      );
+      decoded.forEach((entry, j) => {
+        if (entry === null) {
+          this.l2Misses++;
+          return;
+        }
+        this.l2Hits++;
+        const index = missing[j];
+        results[index] = entry.value;
+        if (generation === this.generation) {
+          this.memory.set(keys[index], structuredClone(entry.value), entry.rawBytes, this.memoryTTL(0));
+        }
+      });
+    } catch (error) {
+      this.l2Errors++;
+      console.warn('Cache mget error:', error);
+    }
+
+    return results;
+  }
+
+  async set<T>(key: string, value: T, options: CacheSetOptions = {}): Promise<void> {
+    await this.mset([{ key, value, ...options }]);
+  }
+
+  async mset<T>(
+    items: { key: string; value: T; ttl?: number; tags?: string[] }[],
+    options: CacheSetOptions = {}
+  ): Promise<void> {
+    if (items.length === 0) return;
+
+    this.generation++;
+    const redis = await this.client();
+    const pipeline = redis?.pipeline();
+
+    for (const item of items) {
+      const ttl = item.ttl ?? options.ttl ?? DEFAULT_TTL;
+      const tags = [...(options.tags || []), ...(item.tags || [])];
+      const { buffer, rawBytes } = await encodeCacheValue(item.value);
+
+      this.memory.set(item.key, toCachedShape(item.value), rawBytes, this.memoryTTL(ttl), tags);
+
+      if (!pipeline) continue;
+      if (ttl > 0) {
+        pipeline.setex(item.key, ttl, buffer);
+      } else {
+        pipeline.set(item.key, buffer);
+      }
+
+      // Tag sets outlive their longest entry; anything left behind is
+      // swept by cleanupOrphanedTags or expires with the set
+      const tagTTL = Math.max(ttl, TAG_TTL_FLOOR);
+      for (const tag of tags) {
+        pipeline.sadd(`${TAG_PREFIX}${tag}`, item.key).expire(`${TAG_PREFIX}${tag}`, tagTTL);
+      }
+    }
+
+    if (!pipeline) return;
+    try {
+      await pipeline.exec();
+    } catch (error) {
+      this.l2Errors++;
+      console.warn('Cache set error:', error);
+    } finally {
+      this.broadcast(redis, { keys: items.map((item) => item.key) });
+    }
+  }
+
+  async delete(key: string): Promise<boolean> {
+    this.generation++;
+    const removedLocal = this.memory.delete(key);
+
+    const redis = await this.client();
+    if (!redis) return removedLocal;
+
+    try {
+      return (await redis.unlink(key)) > 0 || removedLocal;
+    } catch (error) {
+      this.l2Errors++;
+      console.warn('Cache delete error:', error);
+      return removedLocal;
+    } finally {
+      this.broadcast(redis, { keys: [key] });
+    }
+  }
+
+  /**
+   * Delete keys matching a glob pattern. Redis is walked with SCAN so other
+   * clients are served between batches; prefer invalidateTags when the
+   * entries were written with tags.
+   */
+  async deletePattern(pattern: string): Promise<number> {
+    this.generation++;
+    this.memory.deleteMatching(globToRegExp(pattern));
+
+    const redis = await this.client();
+    if (!redis) return 0;
+
+    const started = performance.now();
+    let slowest = 0;
+    let deleted = 0;
+    const track = (ms: number) => { slowest = Math.max(slowest, ms); };
+
+    try {
+      let cursor = '0';
+      do {
+        const [next, keys] = await timeCommand(
+          () => redis.scan(cursor, 'MATCH', pattern, 'COUNT', SCAN_COUNT),
+          track
+        );
+        cursor = next;
+        if (keys.length > 0) {
+          deleted += await timeCommand(() => redis.unlink(...keys), track);
+        }
+      } while (cursor !== '0');
+    } catch (error) {
+      this.l2Errors++;
+      console.warn('Cache delete error:', error);
+    } finally {
+      this.broadcast(redis, { pattern });
+      recordInvalidation({
+        source: 'cache-engine',
+        target: `pattern:${pattern}`,
+        keys: deleted,
+        duration: performance.now() - started,
+        slowestCommand: slowest,
+      });
+    }
+
+    return deleted;
+  }
+
+  /**
+   * Delete every entry registered under the given tags. The tag sets are
+   * read and cleared in one MULTI, then their members are unlinked in
+   * pipelined batches, so the cost is proportional to the tagged entries
+   * only. Other workers are told both the tags and the member keys, which
+   * also covers L1 copies that were filled from Redis without tags.
+   */
+  async invalidateTags(tags: string[]): Promise<number> {
+    if (tags.length === 0) return 0;
+
+    const uniqueTags = [...new Set(tags)];
+    this.generation++;
+    this.memory.deleteTags(uniqueTags);
+
+    const redis = await this.client();
+    if (!redis) return 0;
+
+    const started = performance.now();
+    let slowest = 0;
+    let deleted = 0;
+    const track = (ms: number) => { slowest = Math.max(slowest, ms); };
+    let members: string[] = [];
+
+    try {
+      const read = redis.multi();
+      for (const tag of uniqueTags) {
+        read.smembers(`${TAG_PREFIX}${tag}`);
+        read.del(`${TAG_PREFIX}${tag}`);
+      }
+      const replies = (await timeCommand(() => read.exec(), track)) || [];
+
+      const keys = new Set<string>();
+      for (let i = 0; i < replies.length; i += 2) {
+        const [err, members] = replies[i];
+        if (err) throw err;
+        for (const key of (members as string[]) || []) {
+          keys.add(key);
+        }
+      }
+
+      members = [...keys];
+      members.forEach((key) => this.memory.delete(key));
+
+      if (members.length > 0) {
+        const pipeline = redis.pipeline();
+        for (let i = 0; i < members.length; i += INVALIDATION_BATCH_SIZE) {
+          pipeline.unlink(...members.slice(i, i + INVALIDATION_BATCH_SIZE));
+        }
+        const results = (await timeCommand(() => pipeline.exec(), track)) || [];
+        deleted = results.reduce((sum, [, count]) => sum + (Number(count) || 0), 0);
+      }
+    } catch (error) {
+      this.l2Errors++;
+      console.warn('Cache tag invalidation error:', error);
+    } finally {
+      this.broadcast(redis, { tags: uniqueTags, keys: members });
+      recordInvalidation({
+        source: 'cache-engine',
+        target: uniqueTags.join(','),
+        keys: deleted,
+        duration: performance.now() - started,
+        slowestCommand: slowest,
+      });
+    }
+
+    return deleted;
+  }
+
+  /**
+   * Drop tag members whose entries have already expired. Tag sets are found
+   * with SCAN and walked with SSCAN, one small batch at a time.
+   */
+  async cleanupOrphanedTags(): Promise<number> {
+    const redis = await this.client();
+    if (!redis) return 0;
+    let removed = 0;
+
+    try {
+      let cursor = '0';
+      do {
+        const [next, tagKeys] = await redis.scan(cursor, 'MATCH', `${TAG_PREFIX}*`, 'COUNT', SCAN_COUNT);
+        cursor = next;
+
+        for (const tagKey of tagKeys) {
+          let memberCursor = '0';
+          do {
+            const [nextMember, members] = await redis.sscan(tagKey, memberCursor, 'COUNT', SCAN_COUNT);
+            memberCursor = nextMember;
+            if (members.length === 0) continue;
+
+            const check = redis.pipeline();
+            members.forEach((member) => check.exists(member));
+            const exists = (await check.exec()) || [];
+
+            const orphans = members.filter((_, i) => Number(exists[i]?.[1]) === 0);
+            if (orphans.length > 0) {
+              removed += await redis.srem(tagKey, ...orphans);
+            }
+          } while (memberCursor !== '0');
+        }
+      } while (cursor !== '0');
+    } catch (error) {
+      console.warn('Cache tag cleanup error:', error);
+    }
+
+    return removed;
+  }
+
+  /**
+   * Run cleanupOrphanedTags periodically. Every write refreshes its tag
+   * sets' expiry, so sets for busy tags never expire on their own and would
+   * keep collecting the keys of expired entries. One worker sweeps per
+   * interval; the others see the lock and skip.
+   */
+  startTagCleanup(interval: number = TAG_CLEANUP_INTERVAL): void {
+    if (this.tagCleanupTimer) return;
+
+    this.tagCleanupTimer = setInterval(() => {
+      this.sweepTags(interval).catch((err) => console.error('Cache tag cleanup failed:', err));
+    }, interval);
+    this.tagCleanupTimer.unref?.();
+  }
+
+  stopTagCleanup(): void {
+    if (this.tagCleanupTimer) {
+      clearInterval(this.tagCleanupTimer);
+      this.tagCleanupTimer = undefined;
+    }
+  }
+
+  private async sweepTags(interval: number): Promise<void> {
+    if (!(await this.client())) return;
+
+    // Held for most of the interval, not released, so a fast sweep is not
+    // repeated by the next worker whose timer fires a moment later
+    const token = await this.tryLock(TAG_CLEANUP_LOCK, Math.floor(interval * 0.9));
+    if (!token) return;
+
+    const removed = await this.cleanupOrphanedTags();
+    if (removed > 0) {
+      console.log(`Cache tag cleanup removed ${removed} orphaned entries`);
+    }
+  }
+
+  async flush(): Promise<void> {
+    this.generation++;
+    this.memory.clear();
+
+    const redis = await this.client();
+    if (!redis) return;
+
+    try {
+      await redis.flushdb();
+    } catch (error) {
+      this.l2Errors++;
+      console.warn('Cache flush error:', error);
+    } finally {
+      this.broadcast(redis, { flush: true });
+    }
+  }
+
+  /**
+   * Take a short-lived cross-worker lock. Returns a token to pass to unlock,
+   * or null if another worker holds it. Without Redis every caller gets the
+   * lock, since in-process coordination is then all there is.
+   */
+  async tryLock(name: string, ttlMs: number): Promise<string | null> {
+    const token = randomUUID();
+    const redis = await this.client();
+    if (!redis) return token;
+
+    try {
+      const acquired = await redis.set(`${LOCK_PREFIX}${name}`, token, 'PX', ttlMs, 'NX');
+      return acquired === 'OK' ? token : null;
+    } catch (error) {
+      this.l2Errors++;
+      console.warn('Cache lock error:', error);
+      return token;
+    }
+  }
+
+  async unlock(name: string, token: string): Promise<void> {
+    const redis = await this.client();
+    if (!redis) return;
+
+    try {
+      // Only release the lock if it is still ours
+      await redis.eval(
+        "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0",
+        1,
+        `${LOCK_PREFIX}${name}`,
+        token
+      );
+    } catch (error) {
+      console.warn('Cache unlock error:', error);
+    }
+  }
+
+  /**
+   * Push the expiry of a lock taken with tryLock, if it is still ours.
+   * Returns false once the lock has been lost.
+   */
+  async extendLock(name: string, token: string, ttlMs: number): Promise<boolean> {
+    const redis = await this.client();
+    if (!redis) return true;
+
+    try {
+      const extended = await redis.eval(
+        "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) end return 0",
+        1,
+        `${LOCK_PREFIX}${name}`,
+        token,
+        ttlMs
+      );
+      return extended === 1;
+    } catch (error) {
+      console.warn('Cache lock extend error:', error);
+      return true;
+    }
+  }
+
+  /**
+   * Whether any worker holds the lock. Without Redis nobody else can.
+   */
+  async isLocked(name: string): Promise<boolean> {
+    const redis = await this.client();
+    if (!redis) return false;
+
+    try {
+      return (await redis.exists(`${LOCK_PREFIX}${name}`)) === 1;
+    } catch (error) {
+      this.l2Errors++;
+      console.warn('Cache lock check error:', error);
+      return false;
+    }
+  }
+
+  /**
+   * Send a message to every worker subscribed to `channel`, this one
+   * included. Dropped silently without Redis.
+   */
+  async publish(channel: string, message: string): Promise<void> {
+    const redis = await this.client();
+    if (!redis) return;
+
+    try {
+      await redis.publish(channel, message);
+    } catch (error) {
+      console.warn(`Cache publish to ${channel} failed:`, error);
+    }
+  }
+
+  /**
+   * Receive messages published on `channel` by any worker. Returns a
+   * function that removes the handler.
+   */
+  subscribe(channel: string, handler: (message: string) => void): () => void {
+    let handlers = this.channelHandlers.get(channel);
+    if (!handlers) {
+      handlers = new Set();
+      this.channelHandlers.set(channel, handlers);
+      // Before the subscriber exists, startSubscriber picks the channel up
+      this.subscriber?.subscribe(channel).catch((err) => {
+        console.warn(`Redis subscribe to ${channel} failed:`, err.message);
+      });
+    }
+    handlers.add(handler);
+    return () => {
+      handlers!.delete(handler);
+    };
+  }
+
+  async ping(): Promise<boolean> {
+    const redis = await this.client();
+    if (!redis) return false;
+    try {
+      await redis.ping();
+      return true;
+    } catch (error) {
+      console.warn('Redis health check failed:', error);
+      return false;
+    }
+  }
+
+  getStats(): CacheEngineStats {
+    const memory = this.memory.getStats();
+    const totalHits = this.l1Hits + this.l2Hits;
+
+    return {
+      l1: {
+        hits: this.l1Hits,
+        misses: this.l1Misses,
+        hitRate: hitRate(this.l1Hits, this.l1Misses),
+        ...memory,
+      },
+      l2: {
+        connected: this.redis?.status === 'ready',
+        hits: this.l2Hits,
+        misses: this.l2Misses,
+        errors: this.l2Errors,
+        hitRate: hitRate(this.l2Hits, this.l2Misses),
+      },
+      // Every lookup starts at L1, so L1 hits + misses is the request count
+      hitRate: hitRate(totalHits, this.l1Hits + this.l1Misses - totalHits),
+    };
+  }
+
+  async close(): Promise<void> {
+    this.stopTagCleanup();
+    this.memory.clear();
+    await Promise.allSettled([this.subscriber?.quit(), this.redis?.quit()]);
+    this.subscriber = null;
+  }
+}
+
+// Export singleton instance
+export const cacheEngine = new CacheEngine();
@@ -1,26 +1,5 @@
-import Redis from 'ioredis';
 import { unstable_cache } from 'next/cache';
-
-// Redis client for API-level caching
-let redis: Redis;
-try {
-  redis = new Redis({
-    host: process.env.REDIS_HOST || 'localhost',
-    port: parseInt(process.env.REDIS_PORT || '6379'),
-    password: process.env.REDIS_PASSWORD,
-    maxRetriesPerRequest: 0,
-    lazyConnect: true,
-    enableOfflineQueue: false,
-    retryStrategy: () => null, // Don't retry during build
-  });
-  
-  redis.on('error', (err) => {
-    console.warn('Redis caching error:', err.message);
-  });
-} catch (error) {
-  console.warn('Redis not available, caching disabled');
-  redis = null as any;
-}
+import { cacheEngine } from './cache-engine';
 
 // Cache key prefixes
 export const CachePrefix = {
@@ -40,59 +19,59 @@ export const CacheTTL = {
   DAILY: 86400, // 24 hours
 } as const;
 
-// Generic cache get/set functions
+export const CacheTag = {
+  student: (studentId: string) => `student:${studentId}`,
+  course: (courseId: string) => `course:${courseId}`,
+  instructor: (instructorId: string) => `instructor:${instructorId}`,
+} as const;
+
+// Generic cache get/set functions, served from the shared two-tier engine
 export async function cacheGet<T>(key: string): Promise<T | null> {
-  if (!redis) return null;
-  try {
-    const cached = await redis.get(key);
-    if (!cached) return null;
-    return JSON.parse(cached) as T;
-  } catch (error) {
-    console.warn('Cache get error:', error);
-    return null;
-  }
+  return cacheEngine.get<T>(key);
 }
 
 export async function cacheSet(
   key: string,
   value: any,
-  ttl: number = CacheTTL.MEDIUM
+  ttl: number = CacheTTL.MEDIUM,
+  tags: string[] = []
 ): Promise<void> {
-  if (!redis) return;
-  try {
-    await redis.setex(key, ttl, JSON.stringify(value));
-  } catch (error) {
-    console.warn('Cache set error:', error);
-  }
+  await cacheEngine.set(key, value, { ttl, tags });
 }
 
+// Pattern deletes walk the keyspace with SCAN; use invalidateTags where the
+// entries were written with tags.
 export async function cacheDelete(pattern: string): Promise<void> {
-  if (!redis) return;
-  try {
-    const keys = await redis.keys(pattern);
-    if (keys.length > 0) {
-      await redis.del(...keys);
-    }
-  } catch (error) {
-    console.warn('Cache delete error:', error);
-  }
+  await cacheEngine.deletePattern(pattern);
+}
+
+export async function invalidateTags(tags: string[]): Promise<number> {
+  return cacheEngine.invalidateTags(tags);
+}
+
+export async function cleanupOrphanedTags(): Promise<number> {
+  return cacheEngine.cleanupOrphanedTags();
 }
 
 // Cached database query wrapper
 export async function cachedQuery<T>(
   key: string,
   queryFn: () => Promise<T>,
-  ttl: number = CacheTTL.MEDIUM
+  ttl: number = CacheTTL.MEDIUM,
+  tags: string[] | ((result: T) => string[]) = []
 ): Promise<T> {
   // Try to get from cache first
   const cached = await cacheGet<T>(key);
-  if (cached) {
+  if (cached !== null) {
     return cached;
   }
 
-  // Execute query and cache result
+  // Execute query and cache result; tags may depend on what the query
+  // returned (e.g. the students in a course), and empty results are not kept
   const result = await queryFn();
-  await cacheSet(key, result, ttl);
+  if (result !== null && result !== undefined) {
+    await cacheSet(key, result, ttl, typeof tags === 'function' ? tags(result) : tags);
+  }
   return result;
 }
 
@@ -120,7 +99,8 @@ export const cachedDashboardStats = unstable_cache(
         const result = await executeQuery(statsQuery, [instructorId]);
         return result.rows[0];
       },
-      CacheTTL.MEDIUM
+      CacheTTL.MEDIUM,
+      [CacheTag.instructor(instructorId)]
     );
   },
   ['dashboard-stats'],
@@ -155,7 +135,8 @@ export const cachedStudentList = unstable_cache(
         const result = await executeQuery(query, [courseId]);
         return result.rows;
       },
-      CacheTTL.LONG
+      CacheTTL.LONG,
+      [CacheTag.course(courseId)]
     );
   },
   ['course-students'],
@@ -191,7 +172,8 @@ export const cachedFeedbackAnalysis = unstable_cache(
         const result = await executeQuery(query, [studentId, `%${program}%`]);
         return result.rows;
       },
-      CacheTTL.LONG
+      CacheTTL.LONG,
+      [CacheTag.student(studentId)]
     );
   },
   ['feedback-analysis'],
@@ -204,7 +186,7 @@ export const cachedFeedbackAnalysis = unstable_cache(
 // Cache invalidation helpers
 export async function invalidateDashboardCache(instructorId?: string) {
   if (instructorId) {
-    await cacheDelete(`${CachePrefix.DASHBOARD}*:${instructorId}`);
+    await invalidateTags([CacheTag.instructor(instructorId)]);
   } else {
     await cacheDelete(`${CachePrefix.DASHBOARD}*`);
   }
@@ -212,7 +194,7 @@ export async function invalidateDashboardCache(instructorId?: string) {
 
 export async function invalidateStudentCache(studentId?: string) {
   if (studentId) {
-    await cacheDelete(`${CachePrefix.STUDENT}*:${studentId}`);
+    await invalidateTags([CacheTag.student(studentId)]);
   } else {
     await cacheDelete(`${CachePrefix.STUDENT}*`);
   }
@@ -220,7 +202,7 @@ export async function invalidateStudentCache(studentId?: string) {
 
 export async function invalidateCourseCache(courseId?: string) {
   if (courseId) {
-    await cacheDelete(`${CachePrefix.COURSE}*:${courseId}`);
+    await invalidateTags([CacheTag.course(courseId)]);
   } else {
     await cacheDelete(`${CachePrefix.COURSE}*`);
   }
@@ -243,19 +225,14 @@ export async function warmupCache(instructorId: string, courseIds: string[]) {
 
 // Redis health check
 export async function checkCacheHealth(): Promise<boolean> {
-  if (!redis) return false;
-  try {
-    await redis.ping();
-    return true;
-  } catch (error) {
-    console.warn('Redis health check failed:', error);
-    return false;
-  }
+  return cacheEngine.ping();
+}
+
+export function getCacheStats() {
+  return cacheEngine.getStats();
 }
 
 // Graceful shutdown
 export async function closeCacheConnection() {
-  if (redis) {
-    await redis.quit();
-  }
-}
\ No newline at end of file
+  await cacheEngine.close();
+}
@@ -1,25 +1,62 @@
-import { NextRequest, NextResponse } from 'next/server';
-import { cacheGet, cacheSet, CacheTTL } from './cache-manager';
+import { NextRequest, NextResponse, after } from 'next/server';
+import { getServerSession } from 'next-auth';
+import { authOptions } from '@/lib/auth';
+import { cacheEngine } from './cache-engine';
+import { CacheTag, CacheTTL } from './cache-manager';
+import { conditionalResponse, etagFor } from './conditional-get';
 
 interface CacheOptions {
   ttl?: number;
-  keyGenerator?: (req: NextRequest) => string;
+  // Seconds past `ttl` during which the stale body is still served while a
+  // single request refreshes it in the background
+  staleTtl?: number;
+  // XFetch beta: values above 1 refresh earlier, 0 disables early refresh
+  beta?: number;
+  keyGenerator?: (req: NextRequest, userId: string) => string;
+  tags?: (req: NextRequest, userId: string) => string[];
   condition?: (req: NextRequest) => boolean;
+  // Label for the conditional-GET metrics; defaults to the request path
+  route?: string;
 }
 
+// The response as it was produced: the body is kept as the handler's own
+// text, so serving it never re-parses or re-serializes the JSON, and its
+// ETag is computed once when the entry is created
+interface CachedResponse {
+  body: string;
+  etag: string;
+  status: number;
+  contentType: string;
+  createdAt: number;
+  freshUntil: number;
+  staleUntil: number;
+  computeMs: number;
+}
+
+const instructorTags = (_req: NextRequest, userId: string) => [CacheTag.instructor(userId)];
+
 // Default cache options for different endpoint patterns
 const cachePatterns: Record<string, CacheOptions> = {
-  '/api/dashboard/stats': { ttl: CacheTTL.MEDIUM },
-  '/api/dashboard/schedule': { ttl: CacheTTL.SHORT },
-  '/api/classes/current': { ttl: CacheTTL.SHORT },
-  '/api/feedback/students': { ttl: CacheTTL.LONG },
-  '/api/growth/analytics': { ttl: CacheTTL.LONG },
+  '/api/dashboard/stats': { ttl: CacheTTL.MEDIUM, staleTtl: CacheTTL.MEDIUM, tags: instructorTags },
+  '/api/dashboard/summary': { ttl: CacheTTL.MEDIUM, staleTtl: CacheTTL.MEDIUM, tags: instructorTags },
+  '/api/dashboard/schedule': { ttl: CacheTTL.SHORT, staleTtl: CacheTTL.SHORT, tags: instructorTags },
+  '/api/classes/current': { ttl: CacheTTL.SHORT, staleTtl: 30 },
+  '/api/feedback/students': { ttl: CacheTTL.LONG, staleTtl: CacheTTL.MEDIUM },
+  '/api/growth/analytics': { ttl: CacheTTL.LONG, staleTtl: CacheTTL.LONG },
 };
 
+// Recomputations currently running in this worker, keyed by cache key, so
+// concurrent misses wait on one handler call instead of each making their own
+const inFlight = new Map<string, Promise<CachedResponse | null>>();
+
 export function withCache(
   handler: (req: NextRequest) => Promise<NextResponse>,
   options?: CacheOptions
 ) {
+  const ttl = options?.ttl || CacheTTL.MEDIUM;
+  const staleTtl = options?.staleTtl ?? 0;
+  const beta = options?.beta ?? 1;
+
   return async (req: NextRequest): Promise<NextResponse> => {
     // Skip caching for non-GET requests
     if (req.method !== 'GET') {
@@ -31,51 +68,153 @@ export function withCache(
       return handler(req);
     }
 
-    // Generate cache key
+    // Responses are per user; without a session there is nothing safe to share
+    const session = await getServerSession(authOptions);
+    const userId = session?.user?.id;
+    if (!userId) {
+      return handler(req);
+    }
+
     const keyGen = options?.keyGenerator || defaultKeyGenerator;
-    const cacheKey = keyGen(req);
-
-    // Try to get from cache
-    const cached = await cacheGet<any>(cacheKey);
-    if (cached) {
-      return NextResponse.json(cached, {
-        headers: {
-          'X-Cache': 'HIT',
-          'X-Cache-TTL': String(options?.ttl || CacheTTL.MEDIUM),
-        },
+    const cacheKey = keyGen(req, userId);
+    const tags = options?.tags?.(req, userId) || [];
+    const route = options?.route || new URL(req.url).pathname;
+    const respond = (entry: CachedResponse, state: string) => respondFromCache(req, route, entry, state, ttl);
+
+    const recompute = async (): Promise<{ entry: CachedResponse | null; response: NextResponse }> => {
+      const started = Date.now();
+      const response = await handler(req);
+      const entry = await toCachedResponse(response, started, ttl, staleTtl);
+      if (entry) {
+        await cacheEngine.set(cacheKey, entry, { ttl: ttl + staleTtl, tags });
+      }
+      return { entry, response };
+    };
+
+    // Background refresh: one request per key across all workers
+    const revalidate = () => {
+      if (inFlight.has(cacheKey)) return;
+      after(async () => {
+        const lockTtl = Math.max(ttl * 1000, 10000);
+        const token = await cacheEngine.tryLock(`swr:${cacheKey}`, lockTtl);
+        if (!token) return;
+        try {
+          await singleFlight(cacheKey, recompute);
+        } catch (error) {
+          console.warn('Cache revalidation failed:', error);
+        } finally {
+          await cacheEngine.unlock(`swr:${cacheKey}`, token);
+        }
       });
-    }
+    };
 
-    // Execute handler
-    const response = await handler(req);
-    
-    // Cache successful responses only
-    if (response.status === 200) {
-      try {
-        const data = await response.json();
-        await cacheSet(cacheKey, data, options?.ttl || CacheTTL.MEDIUM);
-        
-        // Return new response with cache headers
-        return NextResponse.json(data, {
-          headers: {
-            'X-Cache': 'MISS',
-            'X-Cache-TTL': String(options?.ttl || CacheTTL.MEDIUM),
-          },
-        });
-      } catch (error) {
-        // If response is not JSON, return as-is
-        return response;
+    const cached = await cacheEngine.get<CachedResponse>(cacheKey);
+    const now = Date.now();
+
+    if (cached && now < cached.freshUntil) {
+      if (shouldRefreshEarly(cached, now, beta)) {
+        revalidate();
       }
+      return respond(cached, 'HIT');
     }
 
-    return response;
+    if (cached && now < cached.staleUntil) {
+      revalidate();
+      return respond(cached, 'STALE');
+    }
+
+    // Hard miss: the first request computes, concurrent ones share its result
+    const pending = inFlight.get(cacheKey);
+    if (pending) {
+      const entry = await pending.catch(() => null);
+      return entry ? respond(entry, 'COALESCED') : handler(req);
+    }
+
+    const { entry, response } = await singleFlight(cacheKey, recompute);
+    return entry ? respond(entry, 'MISS') : response;
   };
 }
 
+async function singleFlight<R extends { entry: CachedResponse | null }>(
+  key: string,
+  compute: () => Promise<R>
+): Promise<R> {
+  const run = compute();
+  // Waiters fall back to calling the handler themselves if this run fails
+  const shared = run.then(result => result.entry, () => null);
+  inFlight.set(key, shared);
+  try {
+    return await run;
+  } finally {
+    if (inFlight.get(key) === shared) {
+      inFlight.delete(key);
+    }
+  }
+}
+
+/**
+ * XFetch early expiration: each hit refreshes with a probability that rises
+ * as expiry approaches, scaled by how long the value took to compute, so a
+ * hot key is usually refreshed by one request before it ever goes stale.
+ */
+function shouldRefreshEarly(entry: CachedResponse, now: number, beta: number): boolean {
+  if (beta <= 0) return false;
+  return now - entry.computeMs * beta * Math.log(Math.random()) >= entry.freshUntil;
+}
+
+async function toCachedResponse(
+  response: NextResponse,
+  started: number,
+  ttl: number,
+  staleTtl: number
+): Promise<CachedResponse | null> {
+  // Cache successful responses only
+  if (response.status !== 200) return null;
+  if (response.headers.has('set-cookie')) return null;
+  if (response.headers.get('cache-control')?.includes('no-store')) return null;
+
+  const contentType = response.headers.get('content-type') || '';
+  if (!contentType.includes('application/json')) return null;
+
+  const body = await response.clone().text();
+  const createdAt = Date.now();
+
+  return {
+    body,
+    etag: etagFor(body),
+    status: response.status,
+    contentType,
+    createdAt,
+    freshUntil: createdAt + ttl * 1000,
+    staleUntil: createdAt + (ttl + staleTtl) * 1000,
+    computeMs: createdAt - started,
+  };
+}
+
+function respondFromCache(
+  req: NextRequest,
+  route: string,
+  entry: CachedResponse,
+  state: string,
+  ttl: number
+): NextResponse {
+  // Entries written before ETags were stored get one on the way out
+  const etag = entry.etag || etagFor(entry.body);
+
+  return conditionalResponse(req, route, entry.body, etag, {
+    status: entry.status,
+    headers: {
+      'Content-Type': entry.contentType,
+      'X-Cache': state,
+      'X-Cache-TTL': String(ttl),
+      'Age': String(Math.max(0, Math.floor((Date.now() - entry.createdAt) / 1000))),
+    },
+  });
+}
+
 // Default key generator
-function defaultKeyGenerator(req: NextRequest): string {
+function defaultKeyGenerator(req: NextRequest, userId: string): string {
   const url = new URL(req.url);
-  const userId = req.headers.get('x-user-id') || 'anonymous';
   return `api:${userId}:${url.pathname}${url.search}`;
 }
 
@@ -85,16 +224,16 @@ export function withAutoCache(
 ) {
   return async (req: NextRequest): Promise<NextResponse> => {
     const url = new URL(req.url);
-    
+
     // Find matching cache pattern
-    const pattern = Object.keys(cachePatterns).find(p => 
+    const pattern = Object.keys(cachePatterns).find(p =>
       url.pathname.startsWith(p)
     );
-    
+
     if (pattern) {
-      return withCache(handler, cachePatterns[pattern])(req);
+      return withCache(handler, { ...cachePatterns[pattern], route: pattern })(req);
     }
-    
+
     return handler(req);
   };
-}
\ No newline at end of file
+}
@@ -0,0 +1,134 @@
+import { createHash } from 'crypto';
+import { NextRequest, NextResponse } from 'next/server';
+
+// Conditional GET for polled JSON routes.
+//
+// Responses carry a strong ETag derived from the body, and a request whose
+// If-None-Match already names that tag gets an empty 304 instead of the full
+// payload. The dashboard polls the same analytics every few minutes and the
+// answer rarely changes in between, so most polls can be answered with a few
+// hundred bytes of headers. Routes behind withCache store the tag with the
+// cached body, so a hit is answered without hashing anything.
+
+// Browsers must revalidate every time, and shared caches must not keep the
+// per-user bodies at all
+const REVALIDATE = 'private, no-cache';
+
+export interface ConditionalRouteStats {
+  requests: number;
+  conditional: number;
+  notModified: number;
+  notModifiedRatio: number;
+  bytesServed: number;
+  bytesSaved: number;
+}
+
+const routeStats = new Map<string, Omit<ConditionalRouteStats, 'notModifiedRatio'>>();
+
+export function etagFor(body: string | Buffer): string {
+  return `"${createHash('sha1').update(body).digest('base64url')}"`;
+}
+
+/**
+ * Whether an If-None-Match header matches `etag`. Weak comparison, as RFC
+ * 9110 requires for If-None-Match, so a W/ prefix added by a proxy that
+ * re-compressed the body still matches.
+ */
+export function matchesETag(ifNoneMatch: string | null, etag: string): boolean {
+  if (!ifNoneMatch) return false;
+
+  const opaque = etag.replace(/^W\//, '');
+  return ifNoneMatch.split(',').some(candidate => {
+    const value = candidate.trim();
+    return value === '*' || value.replace(/^W\//, '') === opaque;
+  });
+}
+
+export function recordConditional(route: string, req: NextRequest, notModified: boolean, bodyBytes: number): void {
+  let stats = routeStats.get(route);
+  if (!stats) {
+    stats = { requests: 0, conditional: 0, notModified: 0, bytesServed: 0, bytesSaved: 0 };
+    routeStats.set(route, stats);
+  }
+
+  stats.requests++;
+  if (req.headers.has('if-none-match')) stats.conditional++;
+  if (notModified) {
+    stats.notModified++;
+    stats.bytesSaved += bodyBytes;
+  } else {
+    stats.bytesServed += bodyBytes;
+  }
+}
+
+export function getConditionalStats(): Record<string, ConditionalRouteStats> {
+  const result: Record<string, ConditionalRouteStats> = {};
+  for (const [route, stats] of routeStats) {
+    result[route] = {
+      ...stats,
+      notModifiedRatio: stats.requests > 0 ? stats.notModified / stats.requests : 0,
+    };
+  }
+  return result;
+}
+
+export function notModifiedResponse(etag: string, headers: Record<string, string> = {}): NextResponse {
+  return new NextResponse(null, {
+    status: 304,
+    headers: { ...headers, 'ETag': etag, 'Cache-Control': REVALIDATE },
+  });
+}
+
+/**
+ * Answer a request from a body that is already in hand: 304 when the client
+ * holds the same version, otherwise the body with its ETag.
+ */
+export function conditionalResponse(
+  req: NextRequest,
+  route: string,
+  body: string,
+  etag: string,
+  init: { status?: number; headers?: Record<string, string> } = {}
+): NextResponse {
+  const bytes = Buffer.byteLength(body);
+
+  if (matchesETag(req.headers.get('if-none-match'), etag)) {
+    recordConditional(route, req, true, bytes);
+    return notModifiedResponse(etag, init.headers);
+  }
+
+  recordConditional(route, req, false, bytes);
+  return new NextResponse(body, {
+    status: init.status ?? 200,
+    headers: { ...init.headers, 'ETag': etag, 'Cache-Control': REVALIDATE },
+  });
+}
+
+/**
+ * Add ETag/If-None-Match handling to a GET route handler. Only successful
+ * JSON responses take part; errors and responses that opt out with
+ * `no-store` pass through untouched.
+ */
+export function withETag<C = unknown>(
+  route: string,
+  handler: (req: NextRequest, context: C) => Promise<NextResponse>
+) {
+  return async (req: NextRequest, context: C): Promise<NextResponse> => {
+    const response = await handler(req, context);
+
+    if (req.method !== 'GET' || response.status !== 200) return response;
+    if (response.headers.get('cache-control')?.includes('no-store')) return response;
+    if (response.headers.has('set-cookie')) return response;
+    if (!response.headers.get('content-type')?.includes('application/json')) return response;
+
+    const body = await response.text();
+    const etag = response.headers.get('etag') || etagFor(body);
+
+    const headers: Record<string, string> = {};
+    response.headers.forEach((value, key) => {
+      if (key !== 'content-length') headers[key] = value;
+    });
+
+    return conditionalResponse(req, route, body, etag, { headers });
+  };
+}
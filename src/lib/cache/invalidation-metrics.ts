@@ -0,0 +1,89 @@
+// Invalidation timing shared by the Redis cache modules.
+//
+// Each tag/pattern invalidation records its total latency and the slowest
+// single Redis round trip it made. A round trip above REDIS_STALL_THRESHOLD_MS
+// is counted as a stall: while one command runs, every other client of the
+// instance is waiting, so these are the numbers to watch when invalidation
+// traffic grows.
+
+export const REDIS_STALL_THRESHOLD_MS = 50;
+
+const MAX_SAMPLES = 1000;
+
+export interface InvalidationMetrics {
+  source: string;
+  target: string;
+  keys: number;
+  duration: number;
+  slowestCommand: number;
+  timestamp: Date;
+}
+
+export interface InvalidationStats {
+  count: number;
+  keysDeleted: number;
+  avgMs: number;
+  p95Ms: number;
+  maxMs: number;
+  stalls: number;
+}
+
+let samples: InvalidationMetrics[] = [];
+let stallCount = 0;
+
+export function recordInvalidation(metrics: Omit<InvalidationMetrics, 'timestamp'>): void {
+  samples.push({ ...metrics, timestamp: new Date() });
+
+  if (samples.length > MAX_SAMPLES) {
+    samples = samples.slice(-MAX_SAMPLES);
+  }
+
+  if (metrics.slowestCommand > REDIS_STALL_THRESHOLD_MS) {
+    stallCount++;
+    console.warn('[CACHE STALL]', {
+      source: metrics.source,
+      target: metrics.target.substring(0, 200),
+      keys: metrics.keys,
+      slowestCommand: `${metrics.slowestCommand.toFixed(2)}ms`,
+      duration: `${metrics.duration.toFixed(2)}ms`
+    });
+  }
+}
+
+/**
+ * Wraps a single Redis round trip and reports how long it took, so callers
+ * can track the slowest command of a multi-step invalidation.
+ */
+export async function timeCommand<T>(
+  op: () => Promise<T>,
+  onDuration: (ms: number) => void
+): Promise<T> {
+  const start = performance.now();
+  try {
+    return await op();
+  } finally {
+    onDuration(performance.now() - start);
+  }
+}
+
+export function getInvalidationMetrics(): InvalidationMetrics[] {
+  return [...samples];
+}
+
+export function getInvalidationStats(): InvalidationStats {
+  if (samples.length === 0) {
+    return { count: 0, keysDeleted: 0, avgMs: 0, p95Ms: 0, maxMs: 0, stalls: stallCount };
+  }
+
+  const durations = samples.map(s => s.duration).sort((a, b) => a - b);
+  const total = durations.reduce((sum, d) => sum + d, 0);
+
+  return {
+    count: samples.length,
+    keysDeleted: samples.reduce((sum, s) => sum + s.keys, 0),
+    avgMs: total / durations.length,
+    p95Ms: durations[Math.min(durations.length - 1, Math.floor(durations.length * 0.95))],
+    maxMs: durations[durations.length - 1],
+    stalls: stallCount
+  };
+}
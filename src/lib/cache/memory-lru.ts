@@ -0,0 +1,145 @@
+// In-process LRU used as the first cache tier.
+//
+// Bounded by an approximate byte budget rather than an entry count, since a
+// course roster and a single student record differ in size by orders of
+// magnitude. Values are stored and returned as given: callers that keep
+// parsed objects here must copy them on the way in and out (the cache
+// engine does, with structuredClone) or treat hits as read-only.
+
+interface Entry<T> {
+  value: T;
+  bytes: number;
+  expiresAt: number;
+  tags: string[];
+}
+
+export interface MemoryLRUOptions {
+  maxBytes: number;
+  maxEntryBytes?: number;
+}
+
+export class MemoryLRU<T = unknown> {
+  // Map iteration order is insertion order, so the first key is the least
+  // recently used once hits re-insert their entry
+  private entries = new Map<string, Entry<T>>();
+  private tagIndex = new Map<string, Set<string>>();
+  private bytes = 0;
+  private evictions = 0;
+  private readonly maxBytes: number;
+  private readonly maxEntryBytes: number;
+
+  constructor(options: MemoryLRUOptions) {
+    this.maxBytes = options.maxBytes;
+    this.maxEntryBytes = options.maxEntryBytes ?? Math.floor(options.maxBytes / 10);
+  }
+
+  get(key: string): T | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      return undefined;
+    }
+
+    if (entry.expiresAt <= Date.now()) {
+      this.remove(key);
+      return undefined;
+    }
+
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  /**
+   * Store a value. `bytes` is the caller's size estimate, normally the length
+   * of the serialized form it already has in hand. Entries above the
+   * per-entry limit are not kept so one large payload can't flush the tier.
+   */
+  set(key: string, value: T, bytes: number, ttlMs: number, tags: string[] = []): boolean {
+    this.remove(key);
+
+    if (bytes > this.maxEntryBytes || ttlMs <= 0) {
+      return false;
+    }
+
+    this.entries.set(key, { value, bytes, expiresAt: Date.now() + ttlMs, tags });
+    this.bytes += bytes;
+
+    for (const tag of tags) {
+      let keys = this.tagIndex.get(tag);
+      if (!keys) {
+        keys = new Set();
+        this.tagIndex.set(tag, keys);
+      }
+      keys.add(key);
+    }
+
+    while (this.bytes > this.maxBytes) {
+      const oldest = this.entries.keys().next().value;
+      if (oldest === undefined) break;
+      this.remove(oldest);
+      this.evictions++;
+    }
+
+    return true;
+  }
+
+  delete(key: string): boolean {
+    return this.remove(key);
+  }
+
+  deleteTags(tags: string[]): number {
+    let removed = 0;
+    for (const tag of tags) {
+      const keys = this.tagIndex.get(tag);
+      if (!keys) continue;
+      for (const key of [...keys]) {
+        if (this.remove(key)) removed++;
+      }
+    }
+    return removed;
+  }
+
+  deleteMatching(pattern: RegExp): number {
+    let removed = 0;
+    for (const key of [...this.entries.keys()]) {
+      if (pattern.test(key) && this.remove(key)) removed++;
+    }
+    return removed;
+  }
+
+  clear(): void {
+    this.entries.clear();
+    this.tagIndex.clear();
+    this.bytes = 0;
+  }
+
+  getStats(): { entries: number; bytes: number; maxBytes: number; evictions: number } {
+    return {
+      entries: this.entries.size,
+      bytes: this.bytes,
+      maxBytes: this.maxBytes,
+      evictions: this.evictions
+    };
+  }
+
+  private remove(key: string): boolean {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      return false;
+    }
+
+    this.entries.delete(key);
+    this.bytes -= entry.bytes;
+
+    for (const tag of entry.tags) {
+      const keys = this.tagIndex.get(tag);
+      if (!keys) continue;
+      keys.delete(key);
+      if (keys.size === 0) {
+        this.tagIndex.delete(tag);
+      }
+    }
+
+    return true;
+  }
+}
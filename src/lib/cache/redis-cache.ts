@@ -1,4 +1,4 @@
-import Redis from 'ioredis';
+import { cacheEngine } from './cache-engine';
 
 // Cache configuration
 const CACHE_TTL = {
@@ -9,102 +9,45 @@ const CACHE_TTL = {
   DASHBOARD: 600,         // 10 minutes
 } as const;
 
+// Thin facade over the shared two-tier engine, kept for the key helpers and
+// the @Cacheable decorator
 class CacheService {
-  private redis: Redis | null = null;
-  private enabled: boolean = false;
-
-  constructor() {
-    this.initialize();
-  }
-
-  private initialize() {
-    try {
-      // Only enable Redis if configured
-      if (process.env.REDIS_HOST) {
-        this.redis = new Redis({
-          host: process.env.REDIS_HOST || 'localhost',
-          port: parseInt(process.env.REDIS_PORT || '6379'),
-          maxRetriesPerRequest: 3,
-          retryStrategy: (times) => {
-            if (times > 3) return null;
-            return Math.min(times * 100, 3000);
-          }
-        });
-
-        this.redis.on('connect', () => {
-          console.log('✅ Redis cache connected');
-          this.enabled = true;
-        });
-
-        this.redis.on('error', (err) => {
-          console.warn('Redis cache error:', err.message);
-          this.enabled = false;
-        });
-      } else {
-        console.log('ℹ️ Redis cache disabled (no REDIS_HOST configured)');
-      }
-    } catch (error) {
-      console.warn('Failed to initialize Redis cache:', error);
-      this.enabled = false;
-    }
-  }
-
   async get<T>(key: string): Promise<T | null> {
-    if (!this.enabled || !this.redis) return null;
-
-    try {
-      const data = await this.redis.get(key);
-      if (data) {
-        console.log(`Cache HIT: ${key}`);
-        return JSON.parse(data);
-      }
-      console.log(`Cache MISS: ${key}`);
-      return null;
-    } catch (error) {
-      console.warn(`Cache GET error for ${key}:`, error);
-      return null;
+    const data = await cacheEngine.get<T>(key);
+    if (data !== null) {
+      console.log(`Cache HIT: ${key}`);
+      return data;
     }
+    console.log(`Cache MISS: ${key}`);
+    return null;
   }
 
   async set(key: string, value: any, ttl?: number): Promise<void> {
-    if (!this.enabled || !this.redis) return;
-
-    try {
-      const serialized = JSON.stringify(value);
-      if (ttl) {
-        await this.redis.setex(key, ttl, serialized);
-      } else {
-        await this.redis.set(key, serialized);
-      }
-      console.log(`Cache SET: ${key} (TTL: ${ttl || 'none'})`);
-    } catch (error) {
-      console.warn(`Cache SET error for ${key}:`, error);
-    }
+    await cacheEngine.set(key, value, { ttl: ttl || 0 });
+    console.log(`Cache SET: ${key} (TTL: ${ttl || 'none'})`);
   }
 
   async invalidate(pattern: string): Promise<void> {
-    if (!this.enabled || !this.redis) return;
+    const removed = await cacheEngine.deletePattern(pattern);
+    if (removed > 0) {
+      console.log(`Cache INVALIDATED: ${removed} keys matching ${pattern}`);
+    }
+  }
 
-    try {
-      const keys = await this.redis.keys(pattern);
-      if (keys.length > 0) {
-        await this.redis.del(...keys);
-        console.log(`Cache INVALIDATED: ${keys.length} keys matching ${pattern}`);
-      }
-    } catch (error) {
-      console.warn(`Cache invalidation error for ${pattern}:`, error);
+  async invalidateTags(tags: string[]): Promise<void> {
+    const removed = await cacheEngine.invalidateTags(tags);
+    if (removed > 0) {
+      console.log(`Cache INVALIDATED: ${removed} keys tagged ${tags.join(', ')}`);
     }
   }
 
   async flush(): Promise<void> {
-    if (!this.enabled || !this.redis) return;
+    await cacheEngine.flush();
+    console.log('Cache FLUSHED: All keys removed');
+  }
 
-    try {
-      await this.redis.flushdb();
-      console.log('Cache FLUSHED: All keys removed');
-    } catch (error) {
-      console.warn('Cache flush error:', error);
-    }
+  getStats() {
+    return cacheEngine.getStats();
   }
 
   // Convenience methods for common cache keys
@@ -12,6 +12,126 @@ export interface FilterOptions {
   [key: string]: any;
 }
 
+export interface PageOptions {
+  limit?: number;
+  cursor?: string | null;
+}
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+  hasMore: boolean;
+}
+
+/**
+ * Ordered list of SQL expressions a keyset page is sorted by. The last key
+ * must be unique (normally the primary key) so the order is stable and every
+ * row has exactly one position. Keys must never be NULL (wrap nullable
+ * columns in COALESCE), and all keys share a direction so the seek predicate
+ * can use a single row-value comparison.
+ */
+export interface KeysetSort {
+  keys: string[];
+  direction: 'ASC' | 'DESC';
+}
+
+export const DEFAULT_PAGE_SIZE = 50;
+export const MAX_PAGE_SIZE = 200;
+
+const CURSOR_COLUMN_PREFIX = '__cursor_';
+
+// Cursors are opaque to clients: base64url-encoded JSON of the sort key
+// values of the last row on the previous page.
+export function encodeCursor(values: any[]): string {
+  return Buffer.from(JSON.stringify(values), 'utf8').toString('base64url');
+}
+
+export function decodeCursor(cursor: string, expectedLength: number): any[] | null {
+  try {
+    const values = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    if (!Array.isArray(values) || values.length !== expectedLength) return null;
+    return values;
+  } catch {
+    return null;
+  }
+}
+
+export function normalizePageSize(limit?: number | string | null): number {
+  const parsed = typeof limit === 'string' ? parseInt(limit, 10) : limit;
+  if (!parsed || isNaN(parsed) || parsed < 1) return DEFAULT_PAGE_SIZE;
+  return Math.min(parsed, MAX_PAGE_SIZE);
+}
+
+/**
+ * Extra select-list entries carrying the sort key values of each row. They are
+ * read back as text so timestamps keep their full precision in the cursor.
+ */
+export function buildKeysetSelect(sort: KeysetSort): string {
+  return sort.keys
+    .map((key, index) => `(${key})::text AS ${CURSOR_COLUMN_PREFIX}${index}`)
+    .join(', ');
+}
+
+/**
+ * Cursor columns of an inner keyset query (e.g. a CTE selecting the page of
+ * ids) re-selected through its alias, for queries that aggregate around it.
+ */
+export function keysetColumns(sort: KeysetSort, alias: string): string {
+  return sort.keys.map((_, index) => `${alias}.${CURSOR_COLUMN_PREFIX}${index}`).join(', ');
+}
+
+/**
+ * Builds the seek predicate for a keyset page. Returns an empty clause for the
+ * first page, and null when the cursor is malformed.
+ */
+export function buildKeysetClause(
+  sort: KeysetSort,
+  cursor: string | null | undefined,
+  paramStart: number
+): { text: string; values: any[] } | null {
+  if (!cursor) return { text: '', values: [] };
+
+  const values = decodeCursor(cursor, sort.keys.length);
+  if (!values) return null;
+
+  const operator = sort.direction === 'DESC' ? '<' : '>';
+  const placeholders = sort.keys.map((_, index) => `$${paramStart + index}`);
+
+  return {
+    text: `(${sort.keys.join(', ')}) ${operator} (${placeholders.join(', ')})`,
+    values
+  };
+}
+
+export function buildKeysetOrder(sort: KeysetSort): string {
+  return `ORDER BY ${sort.keys.map(key => `${key} ${sort.direction}`).join(', ')}`;
+}
+
+/**
+ * Turns a result fetched with buildKeysetSelect and LIMIT pageSize + 1 into a
+ * page. The extra row only signals that another page exists and is never
+ * returned, and the cursor columns are stripped from the items.
+ */
+export function toPage<R>(rows: any[], pageSize: number, sort: KeysetSort): Page<R> {
+  const hasMore = rows.length > pageSize;
+  const pageRows = hasMore ? rows.slice(0, pageSize) : rows;
+  const last = pageRows[pageRows.length - 1];
+
+  const items = pageRows.map(row => {
+    const item = { ...row };
+    sort.keys.forEach((_, index) => delete item[`${CURSOR_COLUMN_PREFIX}${index}`]);
+    return item as R;
+  });
+
+  return {
+    items,
+    nextCursor: hasMore && last
+      ? encodeCursor(sort.keys.map((_, index) => last[`${CURSOR_COLUMN_PREFIX}${index}`]))
+      : null,
+    hasMore
+  };
+}
+
 export abstract class BaseRepository<T> {
   protected db: DatabaseConnection;
   protected abstract tableName: string;
@@ -111,6 +231,36 @@ export abstract class BaseRepository<T> {
     return result.rows;
   }
 
+  /**
+   * Keyset (cursor) pagination over this repository's table. Unlike
+   * LIMIT/OFFSET the cost of a page does not depend on how deep it is.
+   */
+  async findPage(
+    filter: FilterOptions = {},
+    sort: KeysetSort = { keys: ['id'], direction: 'ASC' },
+    page: PageOptions = {}
+  ): Promise<Page<T>> {
+    const { text: whereClause, values } = this.buildWhereClause(filter);
+    const pageSize = normalizePageSize(page.limit);
+
+    const keyset = buildKeysetClause(sort, page.cursor, values.length + 1);
+    if (!keyset) {
+      throw new Error('Invalid pagination cursor');
+    }
+
+    const conditions = [whereClause.replace(/^WHERE /, ''), keyset.text].filter(Boolean);
+    const query = `
+      SELECT ${this.selectFields.join(', ')}, ${buildKeysetSelect(sort)}
+      FROM ${this.tableName}
+      ${conditions.length > 0 ? `WHERE ${conditions.join(' AND ')}` : ''}
+      ${buildKeysetOrder(sort)}
+      LIMIT ${pageSize + 1}
+    `;
+
+    const result = await this.db.query(query, [...values, ...keyset.values]);
+    return toPage<T>(result.rows, pageSize, sort);
+  }
+
   async count(filter: FilterOptions = {}): Promise<number> {
     const { text: whereClause, values } = this.buildWhereClause(filter);
     const query = `
@@ -70,6 +70,7 @@ export class DataAccessLayer {
 export const dal = DataAccessLayer.getInstance();
 
 // Export types
+export * from './base/BaseRepository';
 export * from './repositories/FeedbackRepository';
 export * from './repositories/StudentRepository';
 export * from './repositories/CourseRepository';
@@ -1,5 +1,6 @@
 import { BaseRepository } from '../base/BaseRepository';
 import { DatabaseConnection } from '../base/DatabaseConnection';
+import { invalidateClassData } from '../../services/class-data';
 
 export interface Course {
   id: string;
@@ -392,6 +393,7 @@ export class CourseRepository extends BaseRepository<Course> {
     `;
 
     const result = await this.db.query<Enrollment>(query, values);
+    await invalidateClassData(enrollments.map(enrollment => enrollment.courseId));
     return result.rows;
   }
 
@@ -524,6 +526,7 @@ export class CourseRepository extends BaseRepository<Course> {
       data.enrollment_date || new Date(),
       data.status || 'active'
     ]);
+    await invalidateClassData([data.course_id]);
 
     return result.rows[0];
   }
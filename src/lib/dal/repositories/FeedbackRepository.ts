@@ -1,4 +1,14 @@
-import { BaseRepository } from '../base/BaseRepository';
+import {
+  BaseRepository,
+  KeysetSort,
+  Page,
+  PageOptions,
+  buildKeysetClause,
+  buildKeysetOrder,
+  buildKeysetSelect,
+  normalizePageSize,
+  toPage
+} from '../base/BaseRepository';
 import { DatabaseConnection } from '../base/DatabaseConnection';
 
 export interface ParsedStudentFeedback {
@@ -57,6 +67,13 @@ export class FeedbackRepository extends BaseRepository<ParsedStudentFeedback> {
     'updated_at'
   ];
 
+  // Newest first; undated legacy rows sort last and id breaks ties between
+  // feedback from the same class date
+  private static readonly RECENT_FIRST: KeysetSort = {
+    keys: ["COALESCE(class_date, DATE '1970-01-01')", 'id'],
+    direction: 'DESC'
+  };
+
   constructor(db: DatabaseConnection) {
     super(db);
   }
@@ -68,30 +85,36 @@ export class FeedbackRepository extends BaseRepository<ParsedStudentFeedback> {
     );
   }
 
-  async findByInstructor(instructorName: string): Promise<ParsedStudentFeedback[]> {
-    return this.findMany(
-      { instructor: instructorName },
-      { orderBy: 'class_date', orderDirection: 'DESC' }
-    );
+  async findByInstructor(instructorName: string, page: PageOptions = {}): Promise<Page<ParsedStudentFeedback>> {
+    return this.findPage({ instructor: instructorName }, FeedbackRepository.RECENT_FIRST, page);
   }
 
-  async findByClassCode(classCode: string): Promise<ParsedStudentFeedback[]> {
-    return this.findMany(
-      { class_code: classCode },
-      { orderBy: 'class_date', orderDirection: 'DESC' }
-    );
+  async findByClassCode(classCode: string, page: PageOptions = {}): Promise<Page<ParsedStudentFeedback>> {
+    return this.findPage({ class_code: classCode }, FeedbackRepository.RECENT_FIRST, page);
   }
 
-  async findByDateRange(startDate: Date, endDate: Date): Promise<ParsedStudentFeedback[]> {
+  async findByDateRange(
+    startDate: Date,
+    endDate: Date,
+    page: PageOptions = {}
+  ): Promise<Page<ParsedStudentFeedback>> {
+    const pageSize = normalizePageSize(page.limit);
+    const keyset = buildKeysetClause(FeedbackRepository.RECENT_FIRST, page.cursor, 3);
+    if (!keyset) {
+      throw new Error('Invalid pagination cursor');
+    }
+
     const query = `
-      SELECT ${this.selectFields.join(', ')}
+      SELECT ${this.selectFields.join(', ')}, ${buildKeysetSelect(FeedbackRepository.RECENT_FIRST)}
       FROM ${this.tableName}
       WHERE class_date >= $1 AND class_date <= $2
-      ORDER BY class_date DESC
+      ${keyset.text ? `AND ${keyset.text}` : ''}
+      ${buildKeysetOrder(FeedbackRepository.RECENT_FIRST)}
+      LIMIT ${pageSize + 1}
     `;
 
-    const result = await this.db.query<ParsedStudentFeedback>(query, [startDate, endDate]);
-    return result.rows;
+    const result = await this.db.query(query, [startDate, endDate, ...keyset.values]);
+    return toPage<ParsedStudentFeedback>(result.rows, pageSize, FeedbackRepository.RECENT_FIRST);
   }
 
   async getStudentFeedbackHistory(studentId: string): Promise<StudentFeedbackHistory | null> {
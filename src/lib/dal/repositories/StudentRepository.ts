@@ -1,4 +1,14 @@
-import { BaseRepository } from '../base/BaseRepository';
+import {
+  BaseRepository,
+  KeysetSort,
+  Page,
+  PageOptions,
+  buildKeysetClause,
+  buildKeysetOrder,
+  buildKeysetSelect,
+  normalizePageSize,
+  toPage
+} from '../base/BaseRepository';
 import { DatabaseConnection } from '../base/DatabaseConnection';
 
 export interface Student {
@@ -150,25 +160,40 @@ export class StudentRepository extends BaseRepository<Student> {
     };
   }
 
-  async findByInstructorCourses(instructorId: string): Promise<StudentWithUser[]> {
+  async findByInstructorCourses(instructorId: string, page: PageOptions = {}): Promise<Page<StudentWithUser>> {
+    const sort: KeysetSort = { keys: ['u.name', 's.id'], direction: 'ASC' };
+    const pageSize = normalizePageSize(page.limit);
+    const keyset = buildKeysetClause(sort, page.cursor, 2);
+    if (!keyset) {
+      throw new Error('Invalid pagination cursor');
+    }
+
+    // EXISTS instead of SELECT DISTINCT over the join so the keyset ORDER BY
+    // can stop after pageSize + 1 students
     const query = `
-      SELECT DISTINCT
+      SELECT
         s.id,
         s.parent_id,
         u.name,
         u.email,
         s.created_at,
-        s.updated_at
+        s.updated_at,
+        ${buildKeysetSelect(sort)}
       FROM students s
       JOIN users u ON u.id = s.id
-      JOIN enrollments e ON e.student_id = s.id
-      JOIN courses c ON c.id = e.course_id
-      WHERE c.instructor_id = $1 AND e.status = 'active'
-      ORDER BY u.name
+      WHERE EXISTS (
+        SELECT 1
+        FROM enrollments e
+        JOIN courses c ON c.id = e.course_id
+        WHERE e.student_id = s.id AND c.instructor_id = $1 AND e.status = 'active'
+      )
+      ${keyset.text ? `AND ${keyset.text}` : ''}
+      ${buildKeysetOrder(sort)}
+      LIMIT ${pageSize + 1}
     `;
 
-    const result = await this.db.query<StudentWithUser>(query, [instructorId]);
-    return result.rows;
+    const result = await this.db.query(query, [instructorId, ...keyset.values]);
+    return toPage<StudentWithUser>(result.rows, pageSize, sort);
   }
 
   async getGrowthMetrics(studentId: string): Promise<StudentGrowthMetrics | null> {
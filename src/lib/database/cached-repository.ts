@@ -1,19 +1,27 @@
-import { cache, CacheOptions } from './cache';
+import { cacheEngine } from '../cache/cache-engine';
+import { getInvalidationStats } from '../cache/invalidation-metrics';
 import { db, DrizzleDb } from './drizzle';
 import * as schema from './schema';
 
 export class CachedRepository {
   protected db: DrizzleDb;
-  protected cache = cache;
+  protected cache = cacheEngine;
   protected defaultTTL = 3600; // 1 hour
+  // Keys and tags share the engine with cache-manager and redis-cache, whose
+  // `course:<id>`-style names hold differently shaped values
+  protected keyPrefix = 'growth_compass:';
 
   constructor(database: DrizzleDb = db) {
     this.db = database;
   }
 
+  protected key(name: string): string {
+    return `${this.keyPrefix}${name}`;
+  }
+
   // Student repository with caching
   async findStudentById(id: string, useCache: boolean = true): Promise<schema.Student | null> {
-    const cacheKey = `student:${id}`;
+    const cacheKey = this.key(`student:${id}`);
     
     if (useCache) {
       const cached = await this.cache.get<schema.Student>(cacheKey);
@@ -31,14 +39,17 @@ export class CachedRepository {
     });
     
     if (student && useCache) {
-      await this.cache.set(cacheKey, student, { ttl: this.defaultTTL });
+      await this.cache.set(cacheKey, student, {
+        ttl: this.defaultTTL,
+        tags: [this.key(`student:${id}`)]
+      });
     }
     
     return student || null;
   }
 
   async findStudentsByGrade(gradeLevel: string, useCache: boolean = true): Promise<schema.Student[]> {
-    const cacheKey = `students:grade:${gradeLevel}`;
+    const cacheKey = this.key(`students:grade:${gradeLevel}`);
     
     if (useCache) {
       const cached = await this.cache.get<schema.Student[]>(cacheKey);
@@ -59,7 +70,7 @@ export class CachedRepository {
 
   // Course repository with caching
   async findCourseById(id: string, useCache: boolean = true): Promise<schema.Course | null> {
-    const cacheKey = `course:${id}`;
+    const cacheKey = this.key(`course:${id}`);
     
     if (useCache) {
       const cached = await this.cache.get<schema.Course>(cacheKey);
@@ -81,14 +92,17 @@ export class CachedRepository {
     });
     
     if (course && useCache) {
-      await this.cache.set(cacheKey, course, { ttl: this.defaultTTL });
+      await this.cache.set(cacheKey, course, {
+        ttl: this.defaultTTL,
+        tags: [this.key(`course:${id}`)]
+      });
     }
     
     return course || null;
   }
 
   async findActiveCourses(useCache: boolean = true): Promise<schema.Course[]> {
-    const cacheKey = 'courses:active';
+    const cacheKey = this.key('courses:active');
     
     if (useCache) {
       const cached = await this.cache.get<schema.Course[]>(cacheKey);
@@ -120,7 +134,7 @@ export class CachedRepository {
     attendanceRate: number;
     averageRating: number;
   }> {
-    const cacheKey = `attendance:stats:${studentId}:${dateFrom.toISOString()}:${dateTo.toISOString()}`;
+    const cacheKey = this.key(`attendance:stats:${studentId}:${dateFrom.toISOString()}:${dateTo.toISOString()}`);
     
     if (useCache) {
       const cached = await this.cache.get<any>(cacheKey);
@@ -163,7 +177,10 @@ export class CachedRepository {
     };
     
     if (useCache) {
-      await this.cache.set(cacheKey, stats, { ttl: 1800 }); // 30 min
+      await this.cache.set(cacheKey, stats, {
+        ttl: 1800, // 30 min
+        tags: [this.key(`student:${studentId}`)]
+      });
     }
     
     return stats;
@@ -175,7 +192,7 @@ export class CachedRepository {
     limit: number = 10,
     useCache: boolean = true
   ): Promise<schema.ParsedStudentFeedback[]> {
-    const cacheKey = `feedback:student:${studentId}:${limit}`;
+    const cacheKey = this.key(`feedback:student:${studentId}:${limit}`);
     
     if (useCache) {
       const cached = await this.cache.get<schema.ParsedStudentFeedback[]>(cacheKey);
@@ -189,7 +206,10 @@ export class CachedRepository {
     });
     
     if (useCache) {
-      await this.cache.set(cacheKey, feedback, { ttl: this.defaultTTL });
+      await this.cache.set(cacheKey, feedback, {
+        ttl: this.defaultTTL,
+        tags: [this.key(`student:${studentId}`)]
+      });
     }
     
     return feedback;
@@ -197,7 +217,7 @@ export class CachedRepository {
 
   // Materialized view data with caching
   async getStudentMetrics(useCache: boolean = true): Promise<any[]> {
-    const cacheKey = 'metrics:students:all';
+    const cacheKey = this.key('metrics:students:all');
     
     if (useCache) {
       const cached = await this.cache.get<any[]>(cacheKey);
@@ -210,7 +230,10 @@ export class CachedRepository {
     );
     
     if (useCache) {
-      await this.cache.set(cacheKey, result, { ttl: 600 }); // 10 min
+      await this.cache.set(cacheKey, result, {
+        ttl: 600, // 10 min
+        tags: [this.key('metrics:students')]
+      });
     }
     
     return result;
@@ -218,18 +241,17 @@ export class CachedRepository {
 
   // Cache invalidation methods
   async invalidateStudent(studentId: string): Promise<void> {
-    await this.cache.invalidateStudent(studentId);
-    // Also invalidate related caches
-    await this.cache.deletePattern('metrics:students:*');
+    // Student entries and the aggregate metrics go in one invalidation
+    await this.cache.invalidateTags([this.key(`student:${studentId}`), this.key('metrics:students')]);
   }
 
   async invalidateCourse(courseId: string): Promise<void> {
-    await this.cache.invalidateCourse(courseId);
-    await this.cache.delete('courses:active');
+    await this.cache.invalidateTags([this.key(`course:${courseId}`)]);
+    await this.cache.delete(this.key('courses:active'));
   }
 
   async invalidateAttendance(studentId: string): Promise<void> {
-    await this.cache.deletePattern(`attendance:*:${studentId}:*`);
+    // Attendance stats are tagged with the student
     await this.invalidateStudent(studentId);
   }
 
@@ -240,7 +262,7 @@ export class CachedRepository {
     }
     
     // Check cache for all keys
-    const cacheKeys = ids.map(id => `student:${id}`);
+    const cacheKeys = ids.map(id => this.key(`student:${id}`));
     const cached = await this.cache.mget<schema.Student>(cacheKeys);
     
     // Identify cache misses
@@ -263,7 +285,7 @@ export class CachedRepository {
       const studentMap = new Map(students.map(s => [s.id, s]));
       
       // Update cache and result array
-      const cacheUpdates: { key: string; value: schema.Student }[] = [];
+      const cacheUpdates: { key: string; value: schema.Student; tags: string[] }[] = [];
       
       misses.forEach(({ index, id }) => {
         const student = studentMap.get(id) || null;
@@ -271,8 +293,9 @@ export class CachedRepository {
         
         if (student) {
           cacheUpdates.push({
-            key: `student:${id}`,
-            value: student
+            key: this.key(`student:${id}`),
+            value: student,
+            tags: [this.key(`student:${id}`)]
           });
         }
       });
@@ -288,7 +311,10 @@ export class CachedRepository {
 
   // Performance monitoring
   async getCacheStats(): Promise<any> {
-    return this.cache.getStats();
+    return {
+      ...this.cache.getStats(),
+      invalidation: getInvalidationStats()
+    };
   }
 }
 
@@ -1,4 +1,4 @@
-import { pgTable, uuid, timestamp, text, integer, pgEnum } from 'drizzle-orm/pg-core';
+import { pgTable, uuid, timestamp, text, integer, jsonb, pgEnum } from 'drizzle-orm/pg-core';
 import { relations } from 'drizzle-orm';
 import { students, instructors } from './users';
 import { classes } from './courses';
@@ -38,6 +38,33 @@ export const studentAnalysisCache = pgTable('student_analysis_cache', {
   createdAt: timestamp('created_at', { withTimezone: true }).defaultNow(),
 });
 
+// Content-addressed AI result cache (see src/lib/ai-result-cache.ts)
+export const aiResultCache = pgTable('ai_result_cache', {
+  cacheKey: text('cache_key').primaryKey(),
+  kind: text('kind').notNull(),
+  model: text('model').notNull(),
+  promptVersion: text('prompt_version').notNull(),
+  result: jsonb('result').notNull(),
+  bytes: integer('bytes').notNull(),
+  estimatedTokens: integer('estimated_tokens').notNull().default(0),
+  callMs: integer('call_ms').notNull().default(0),
+  hitCount: integer('hit_count').notNull().default(0),
+  createdAt: timestamp('created_at', { withTimezone: true }).defaultNow(),
+  lastHitAt: timestamp('last_hit_at', { withTimezone: true }),
+});
+
+// Rolling chronological analysis per student, updated from new feedback only
+export const studentAnalysisState = pgTable('student_analysis_state', {
+  studentName: text('student_name').primaryKey(),
+  promptVersion: text('prompt_version').notNull(),
+  summary: text('summary').notNull(),
+  analysis: jsonb('analysis').notNull(),
+  sessionFingerprints: jsonb('session_fingerprints').notNull().default([]),
+  lastSessionDate: text('last_session_date'),
+  incrementalUpdates: integer('incremental_updates').notNull().default(0),
+  updatedAt: timestamp('updated_at', { withTimezone: true }).defaultNow(),
+});
+
 // Activity log table
 export const activityLog = pgTable('activity_log', {
   activityId: uuid('activity_id').primaryKey().defaultRandom(),
@@ -88,6 +115,10 @@ export type AIRecommendation = typeof aiRecommendations.$inferSelect;
 export type NewAIRecommendation = typeof aiRecommendations.$inferInsert;
 export type StudentAnalysisCache = typeof studentAnalysisCache.$inferSelect;
 export type NewStudentAnalysisCache = typeof studentAnalysisCache.$inferInsert;
+export type AIResultCacheRow = typeof aiResultCache.$inferSelect;
+export type NewAIResultCacheRow = typeof aiResultCache.$inferInsert;
+export type StudentAnalysisState = typeof studentAnalysisState.$inferSelect;
+export type NewStudentAnalysisState = typeof studentAnalysisState.$inferInsert;
 export type ActivityLog = typeof activityLog.$inferSelect;
 export type NewActivityLog = typeof activityLog.$inferInsert;
 export type ProgramMetricsSummary = typeof programMetricsSummary.$inferSelect;
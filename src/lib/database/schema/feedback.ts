@@ -34,6 +34,8 @@ export const parsedStudentFeedback = pgTable('parsed_student_feedback', {
   metadata: text('metadata').default('{}'),
   originalFilePath: text('original_file_path'),
   instructorId: uuid('instructor_id'),
+  recordKey: text('record_key').unique(),
+  rowHash: text('row_hash'),
   
   parsedAt: timestamp('parsed_at', { withTimezone: true }).defaultNow(),
   createdAt: timestamp('created_at', { withTimezone: true }).defaultNow(),
@@ -50,7 +52,28 @@ export const feedbackParsingStatus = pgTable('feedback_parsing_status', {
   parsingCompletedAt: timestamp('parsing_completed_at', { withTimezone: true }),
   parsingErrors: text('parsing_errors').default('[]'),
   isComplete: boolean('is_complete').default(false),
+  mode: text('mode'),
+  phase: text('phase'),
+  filesTotal: integer('files_total').default(0),
+  filesChanged: integer('files_changed').default(0),
+  filesParsed: integer('files_parsed').default(0),
+  filesRemoved: integer('files_removed').default(0),
+  recordsInserted: integer('records_inserted').default(0),
+  recordsUpdated: integer('records_updated').default(0),
+  recordsDeleted: integer('records_deleted').default(0),
   createdAt: timestamp('created_at', { withTimezone: true }).defaultNow(),
+  updatedAt: timestamp('updated_at', { withTimezone: true }).defaultNow(),
+});
+
+// Content hash of every ingested feedback document
+export const feedbackSourceFiles = pgTable('feedback_source_files', {
+  filePath: text('file_path').primaryKey(),
+  feedbackType: text('feedback_type').notNull(),
+  contentHash: text('content_hash').notNull(),
+  size: bigint('size', { mode: 'number' }).notNull(),
+  mtimeMs: doublePrecision('mtime_ms').notNull(),
+  recordCount: integer('record_count').notNull().default(0),
+  ingestedAt: timestamp('ingested_at', { withTimezone: true }).defaultNow(),
 });
 
 // Relations
@@ -66,6 +89,7 @@ export type ParsedStudentFeedback = typeof parsedStudentFeedback.$inferSelect;
 export type NewParsedStudentFeedback = typeof parsedStudentFeedback.$inferInsert;
 export type FeedbackParsingStatus = typeof feedbackParsingStatus.$inferSelect;
 export type NewFeedbackParsingStatus = typeof feedbackParsingStatus.$inferInsert;
+export type FeedbackSourceFile = typeof feedbackSourceFiles.$inferSelect;
 
 // Import for type resolution
-import { integer, boolean } from 'drizzle-orm/pg-core';
\ No newline at end of file
+import { integer, boolean, bigint, doublePrecision } from 'drizzle-orm/pg-core';
\ No newline at end of file
@@ -1,7 +1,13 @@
 import { GoogleGenAI } from '@google/genai'
 import { SchemaType } from '@google/generative-ai'
+import { createHash } from 'crypto'
 import { readFileSync } from 'fs'
 import { join } from 'path'
+import { cachedAIResult } from './ai-result-cache'
+import { promptTemplateVersion } from './prompt-manager'
+import { estimateTokens, geminiBaseUrl, getGeminiScheduler, type GeminiScheduler } from './gemini-scheduler'
+import { db } from './postgres'
+import { JsonArrayFieldScanner } from './streaming-json'
 
 // Enhanced Debate Recommendation Engine for Scientific Analysis
 // Processes chronological feedback to provide evidence-based recommendations
@@ -12,6 +18,18 @@ import { join } from 'path'
 // - Request timeout protection (2 minutes)
 // - JSON parsing error recovery
 // - Comprehensive error logging
+//
+// INCREMENTAL ANALYSIS:
+// - The latest descriptive analysis is kept per student (student_analysis_state)
+//   as a rolling summary, together with the structured result
+// - New feedback is sent to the model as a delta plus that summary, so prompt
+//   size no longer grows with the length of a student's history
+// - A changed prompt version, an edited or removed session, a session older
+//   than the summary, or FULL_REANALYSIS_EVERY incremental updates in a row
+//   fall back to a full re-analysis
+
+const FULL_REANALYSIS_EVERY = parseInt(process.env.FULL_REANALYSIS_EVERY || '20')
+const SUMMARY_WORD_LIMIT = 2000
 
 // Rubric mapping system for proper labeling
 export const RUBRIC_MAPPING = {
@@ -234,19 +252,56 @@ export interface ChronologicalAnalysis {
   recommendations: ScientificRecommendation[]
 }
 
+// Emitted while an analysis runs, for streaming it to the client. Text and
+// recommendations are previews; the resolved analysis is authoritative.
+export type AnalysisProgressEvent =
+  | { type: 'stage'; stage: 'descriptive' | 'structuring'; mode: 'full' | 'incremental' }
+  | { type: 'analysis-text'; delta: string }
+  | { type: 'recommendation'; index: number; recommendation: ScientificRecommendation }
+  // A retry discards what the failed attempt streamed for this stage
+  | { type: 'reset'; stage: 'descriptive' | 'structuring' }
+
+export interface AnalysisProgressOptions {
+  onProgress?: (event: AnalysisProgressEvent) => void
+}
+
+interface StudentAnalysisState {
+  promptVersion: string
+  summary: string
+  analysis: ChronologicalAnalysis
+  sessionFingerprints: string[]
+  lastSessionDate: string | null
+  incrementalUpdates: number
+}
+
 export class DebateRecommendationEngine {
-  private apiKeys: string[]
-  private currentKeyIndex: number = 0
+  private scheduler: GeminiScheduler
   private model: string = 'gemini-2.5-flash'
   private thinkingBudget: number = 20000
+  private readonly descriptiveConfig = {
+    thinkingConfig: {
+      thinkingBudget: -1, // -1 for unlimited thinking
+    },
+    responseMimeType: 'text/plain',
+    temperature: 0.7,
+    maxOutputTokens: 32768,
+  }
+  private readonly conversionConfig = {
+    thinkingConfig: {
+      thinkingBudget: -1, // -1 for unlimited thinking
+    },
+    responseMimeType: 'application/json',
+    temperature: 0.3,
+    maxOutputTokens: 32768,
+  }
 
   constructor() {
     try {
-      this.apiKeys = this.loadApiKeys()
-      if (this.apiKeys.length === 0) {
+      this.scheduler = getGeminiScheduler()
+      if (this.scheduler.keyCount === 0) {
         throw new Error('No Gemini API keys found. Please set GEMINI_API_KEY_1, GEMINI_API_KEY_2, etc.')
       }
-      console.log(`✅ DebateRecommendationEngine initialized with ${this.apiKeys.length} API keys`)
+      console.log(`✅ DebateRecommendationEngine initialized with ${this.scheduler.keyCount} API keys`)
     } catch (error) {
       console.error('❌ Error initializing DebateRecommendationEngine:', error)
       throw error
@@ -430,34 +485,53 @@ export class DebateRecommendationEngine {
   }
 
   /**
-   * Load API keys from environment with cycling support
+   * Stream a response through the scheduler, which picks the key with the
+   * most quota left. Retries stay with the caller's loop, so the scheduler
+   * makes a single attempt.
    */
-  private loadApiKeys(): string[] {
-    const keys: string[] = []
-
-    // Try numbered keys first (GEMINI_API_KEY_1, etc.)
-    for (let i = 1; i <= 4; i++) {
-      const key = process.env[`GEMINI_API_KEY_${i}`]
-      if (key) keys.push(key)
-    }
+  private streamText(
+    prompt: string,
+    config: Record<string, unknown>,
+    label: string,
+    onText?: (delta: string) => void
+  ): Promise<string> {
+    const contents = [
+      {
+        role: 'user',
+        parts: [{ text: prompt }]
+      }
+    ]
 
-    // Fallback to single key if no numbered keys found
-    if (keys.length === 0) {
-      const singleKey = process.env.GEMINI_API_KEY || process.env.GOOGLE_AI_API_KEY
-      if (singleKey) keys.push(singleKey)
-    }
+    return this.scheduler.run(async apiKey => {
+      const baseUrl = geminiBaseUrl()
+      const ai = new GoogleGenAI({
+        apiKey,
+        ...(baseUrl && { httpOptions: { baseUrl } })
+      })
 
-    return keys
-  }
+      // Add timeout to prevent hanging
+      const timeoutPromise = new Promise<never>((_, reject) => {
+        setTimeout(() => reject(new Error('Request timeout after 2 minutes')), 2 * 60 * 1000)
+      })
 
-  /**
-   * Get the next API key in rotation
-   */
-  private getNextApiKey(): string {
-    const key = this.apiKeys[this.currentKeyIndex]
-    this.currentKeyIndex = (this.currentKeyIndex + 1) % this.apiKeys.length
-    console.log(`🔑 Using API key ${this.currentKeyIndex}/${this.apiKeys.length} (rotated from index ${this.currentKeyIndex - 1 < 0 ? this.apiKeys.length - 1 : this.currentKeyIndex - 1})`)
-    return key
+      const response = await Promise.race([
+        ai.models.generateContentStream({
+          model: this.model,
+          config,
+          contents,
+        }),
+        timeoutPromise
+      ])
+
+      let responseText = ''
+      for await (const chunk of response) {
+        if (chunk.text) {
+          responseText += chunk.text
+          onText?.(chunk.text)
+        }
+      }
+      return responseText
+    }, { estimatedTokens: estimateTokens(prompt, 32768), maxAttempts: 1, label })
   }
 
   /**
@@ -484,7 +558,8 @@ export class DebateRecommendationEngine {
    */
   async analyzeChronologicalFeedback(
     studentName: string,
-    feedbackSessions: DebateFeedbackSession[]
+    feedbackSessions: DebateFeedbackSession[],
+    options: AnalysisProgressOptions = {}
   ): Promise<ChronologicalAnalysis> {
     console.log(`🔍 Starting two-step analysis for ${studentName} with ${feedbackSessions.length} sessions`)
     
@@ -493,24 +568,97 @@ export class DebateRecommendationEngine {
       new Date(a.date).getTime() - new Date(b.date).getTime()
     )
 
+    const promptVersion = this.getAnalysisPromptVersion()
+
+    // Both steps are cached together by the feedback they analyze, so the
+    // model only runs again when a student's feedback actually changes
+    return cachedAIResult(
+      {
+        kind: 'chronological-analysis',
+        inputs: {
+          studentName,
+          sessions: sortedSessions.map(session => this.normalizeSession(session))
+        },
+        promptVersion,
+        model: this.model,
+        params: {
+          descriptive: this.descriptiveConfig,
+          conversion: { ...this.conversionConfig, responseSchema: this.getAnalysisSchema() }
+        }
+      },
+      () => this.runTwoStepAnalysis(studentName, sortedSessions, promptVersion, options.onProgress)
+    )
+  }
+
+  private async runTwoStepAnalysis(
+    studentName: string,
+    sortedSessions: DebateFeedbackSession[],
+    promptVersion: string,
+    onProgress?: (event: AnalysisProgressEvent) => void
+  ): Promise<ChronologicalAnalysis> {
     try {
-      // STEP 1: Generate descriptive analysis
-      console.log('📝 Step 1: Generating descriptive analysis...')
-      const descriptiveAnalysis = await this.generateDescriptiveAnalysis(studentName, sortedSessions)
+      const fingerprints = sortedSessions.map(session => this.sessionFingerprint(session))
+      const state = await this.loadAnalysisState(studentName)
+      const newSessions = this.findIncrementalSessions(state, promptVersion, sortedSessions, fingerprints)
+
+      if (state && newSessions && newSessions.length === 0) {
+        console.log(`✅ No new feedback for ${studentName}, reusing stored analysis`)
+        return state.analysis
+      }
+
+      // STEP 1: Generate descriptive analysis, from the rolling summary and
+      // the new sessions when possible
+      let descriptiveAnalysis: string
+      let analysisMode: 'full' | 'incremental'
+      if (state && newSessions) {
+        console.log(`📝 Step 1: Updating analysis with ${newSessions.length} new session(s)...`)
+        analysisMode = 'incremental'
+        onProgress?.({ type: 'stage', stage: 'descriptive', mode: analysisMode })
+        descriptiveAnalysis = await this.generateDescriptiveAnalysis(
+          studentName,
+          sortedSessions,
+          this.buildIncrementalAnalysisPrompt(studentName, state.summary, newSessions, sortedSessions),
+          onProgress
+        )
+      } else {
+        console.log('📝 Step 1: Generating descriptive analysis...')
+        analysisMode = 'full'
+        onProgress?.({ type: 'stage', stage: 'descriptive', mode: analysisMode })
+        descriptiveAnalysis = await this.generateDescriptiveAnalysis(
+          studentName,
+          sortedSessions,
+          this.buildDescriptiveAnalysisPrompt(studentName, sortedSessions),
+          onProgress
+        )
+      }
       
       // STEP 2: Convert to structured format
       console.log('🔄 Step 2: Converting to structured format...')
-      const structuredAnalysis = await this.convertToStructuredFormat(studentName, descriptiveAnalysis, sortedSessions)
+      onProgress?.({ type: 'stage', stage: 'structuring', mode: analysisMode })
+      const structuredAnalysis = await this.convertToStructuredFormat(studentName, descriptiveAnalysis, sortedSessions, onProgress)
       
-      return {
+      const result = {
         analysis: structuredAnalysis,
         prompt: descriptiveAnalysis.substring(0, 1000) + '...', // Preview of descriptive analysis
         feedbackSessionCount: sortedSessions.length,
         totalSessionCount: sortedSessions.length,
+        newSessionCount: analysisMode === 'incremental' ? newSessions!.length : sortedSessions.length,
+        analysisMode,
         promptLength: descriptiveAnalysis.length,
         wasPromptTruncated: false,
         descriptiveAnalysis: descriptiveAnalysis // Include raw analysis for debugging
-      }
+      } as unknown as ChronologicalAnalysis
+
+      await this.saveAnalysisState(studentName, {
+        promptVersion,
+        summary: descriptiveAnalysis,
+        analysis: result,
+        sessionFingerprints: fingerprints,
+        lastSessionDate: sortedSessions.length > 0 ? sortedSessions[sortedSessions.length - 1].date : null,
+        incrementalUpdates: analysisMode === 'incremental' ? state!.incrementalUpdates + 1 : 0
+      })
+
+      return result
     } catch (error) {
       console.error('❌ Error in chronological analysis:', error)
       console.error('❌ Error type:', typeof error)
@@ -534,6 +682,136 @@ export class DebateRecommendationEngine {
     }
   }
 
+  /**
+   * Version of every prompt template the analysis depends on; a change
+   * invalidates cached results and forces a full re-analysis
+   */
+  private getAnalysisPromptVersion(): string {
+    return promptTemplateVersion(
+      this.buildDescriptiveAnalysisPrompt('', []),
+      this.buildConversionPrompt('', '', []),
+      this.buildIncrementalAnalysisPrompt('', '', [], [])
+    )
+  }
+
+  /**
+   * The fields of a session that reach the prompt
+   */
+  private normalizeSession(session: DebateFeedbackSession) {
+    return {
+      date: session.date,
+      unitNumber: session.unitNumber,
+      motion: session.motion || '',
+      content: session.content || '',
+      bestAspects: session.bestAspects || '',
+      improvementAreas: session.improvementAreas || '',
+      teacherComments: session.teacherComments || '',
+      duration: session.duration || '',
+      rubricScores: session.rubricScores || {}
+    }
+  }
+
+  private sessionFingerprint(session: DebateFeedbackSession): string {
+    return createHash('sha256').update(JSON.stringify(this.normalizeSession(session))).digest('hex').substring(0, 16)
+  }
+
+  /**
+   * Sessions not yet covered by the stored analysis, or null when the
+   * analysis has to be rebuilt from the full history
+   */
+  private findIncrementalSessions(
+    state: StudentAnalysisState | null,
+    promptVersion: string,
+    sessions: DebateFeedbackSession[],
+    fingerprints: string[]
+  ): DebateFeedbackSession[] | null {
+    if (!state) {
+      return null
+    }
+    if (state.promptVersion !== promptVersion) {
+      console.log('🔁 Prompt version changed, running full re-analysis')
+      return null
+    }
+
+    const current = new Set(fingerprints)
+    if (state.sessionFingerprints.some(fingerprint => !current.has(fingerprint))) {
+      console.log('🔁 Previously analyzed feedback changed, running full re-analysis')
+      return null
+    }
+
+    const analyzed = new Set(state.sessionFingerprints)
+    const newSessions = sessions.filter((_, index) => !analyzed.has(fingerprints[index]))
+    if (newSessions.length === 0) {
+      return newSessions
+    }
+
+    if (state.incrementalUpdates >= FULL_REANALYSIS_EVERY) {
+      console.log(`🔁 ${state.incrementalUpdates} incremental updates since last full analysis, running full re-analysis`)
+      return null
+    }
+
+    const lastAnalyzed = state.lastSessionDate ? new Date(state.lastSessionDate).getTime() : NaN
+    if (newSessions.some(session => new Date(session.date).getTime() < lastAnalyzed)) {
+      console.log('🔁 New feedback predates the stored analysis, running full re-analysis')
+      return null
+    }
+
+    return newSessions
+  }
+
+  private async loadAnalysisState(studentName: string): Promise<StudentAnalysisState | null> {
+    try {
+      const result = await db.query(`
+        SELECT prompt_version, summary, analysis, session_fingerprints, last_session_date, incremental_updates
+        FROM student_analysis_state
+        WHERE student_name = $1
+      `, [studentName])
+      const row = result.rows[0]
+      if (!row) {
+        return null
+      }
+      return {
+        promptVersion: row.prompt_version,
+        summary: row.summary,
+        analysis: row.analysis,
+        sessionFingerprints: row.session_fingerprints || [],
+        lastSessionDate: row.last_session_date,
+        incrementalUpdates: row.incremental_updates || 0
+      }
+    } catch (error) {
+      console.warn(`Could not load analysis state for ${studentName}:`, error)
+      return null
+    }
+  }
+
+  private async saveAnalysisState(studentName: string, state: StudentAnalysisState): Promise<void> {
+    try {
+      await db.query(`
+        INSERT INTO student_analysis_state
+          (student_name, prompt_version, summary, analysis, session_fingerprints, last_session_date, incremental_updates, updated_at)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, NOW())
+        ON CONFLICT (student_name) DO UPDATE SET
+          prompt_version = EXCLUDED.prompt_version,
+          summary = EXCLUDED.summary,
+          analysis = EXCLUDED.analysis,
+          session_fingerprints = EXCLUDED.session_fingerprints,
+          last_session_date = EXCLUDED.last_session_date,
+          incremental_updates = EXCLUDED.incremental_updates,
+          updated_at = EXCLUDED.updated_at
+      `, [
+        studentName,
+        state.promptVersion,
+        state.summary,
+        JSON.stringify(state.analysis),
+        JSON.stringify(state.sessionFingerprints),
+        state.lastSessionDate,
+        state.incrementalUpdates
+      ])
+    } catch (error) {
+      console.warn(`Could not save analysis state for ${studentName}:`, error)
+    }
+  }
+
   /**
    * Load prompt template from markdown file
    */
@@ -634,7 +912,9 @@ Focus on providing evidence-based recommendations that will genuinely help impro
    */
   private async generateDescriptiveAnalysis(
     studentName: string, 
-    sessions: DebateFeedbackSession[]
+    sessions: DebateFeedbackSession[],
+    prompt: string = this.buildDescriptiveAnalysisPrompt(studentName, sessions),
+    onProgress?: (event: AnalysisProgressEvent) => void
   ): Promise<string> {
     console.log('🧠 Step 1: Starting descriptive analysis...')
     
@@ -644,51 +924,19 @@ Focus on providing evidence-based recommendations that will genuinely help impro
     for (let attempt = 1; attempt <= maxRetries; attempt++) {
       try {
         console.log(`🔄 Attempt ${attempt}/${maxRetries}`)
-        
-        const ai = new GoogleGenAI({
-          apiKey: this.getNextApiKey(),
-        })
-        
-        const config = {
-          thinkingConfig: {
-            thinkingBudget: -1, // -1 for unlimited thinking
-          },
-          responseMimeType: 'text/plain',
-          temperature: 0.7,
-          maxOutputTokens: 32768,
+        if (attempt > 1) {
+          onProgress?.({ type: 'reset', stage: 'descriptive' })
         }
         
-        const model = 'gemini-2.5-flash'
-        const prompt = this.buildDescriptiveAnalysisPrompt(studentName, sessions)
-        
         console.log('🚀 Sending descriptive analysis request...')
         console.log('📝 Prompt length:', prompt.length, 'characters')
         
-        const contents = [
-          {
-            role: 'user',
-            parts: [{ text: prompt }]
-          }
-        ]
-        
-        // Add timeout to prevent hanging
-        const timeoutPromise = new Promise((_, reject) => {
-          setTimeout(() => reject(new Error('Request timeout after 2 minutes')), 2 * 60 * 1000)
-        })
-        
-        const response = await Promise.race([
-          ai.models.generateContentStream({
-            model,
-            config,
-            contents,
-          }),
-          timeoutPromise
-        ])
-        
-        let responseText = ''
-        for await (const chunk of response) {
-          responseText += chunk.text
-        }
+        const responseText = await this.streamText(
+          prompt,
+          this.descriptiveConfig,
+          'descriptive analysis',
+          onProgress && (delta => onProgress({ type: 'analysis-text', delta }))
+        )
         
         if (!responseText) {
           throw new Error('No response text received from AI model')
@@ -705,7 +953,7 @@ Focus on providing evidence-based recommendations that will genuinely help impro
           // Use different API key on network errors
           if (error instanceof Error && this.isNetworkError(error)) {
             console.log('🔄 Network error detected, trying with different API key...')
-            // The next iteration will automatically use the next API key
+            // The scheduler gives the next attempt the key with the most quota left
           }
           
           const delay = Math.pow(2, attempt) * 1000 // Exponential backoff: 2s, 4s, 8s
@@ -724,7 +972,8 @@ Focus on providing evidence-based recommendations that will genuinely help impro
   private async convertToStructuredFormat(
     studentName: string,
     descriptiveAnalysis: string,
-    sessions: DebateFeedbackSession[]
+    sessions: DebateFeedbackSession[],
+    onProgress?: (event: AnalysisProgressEvent) => void
   ): Promise<ChronologicalAnalysis> {
     console.log('🔄 Step 2: Converting to structured format...')
     
@@ -735,51 +984,33 @@ Focus on providing evidence-based recommendations that will genuinely help impro
       try {
         console.log(`🔄 Attempt ${attempt}/${maxRetries}`)
         
-        const ai = new GoogleGenAI({
-          apiKey: this.getNextApiKey(),
-        })
-        
         const config = {
-          thinkingConfig: {
-            thinkingBudget: -1, // -1 for unlimited thinking
-          },
-          responseMimeType: 'application/json',
+          ...this.conversionConfig,
           responseSchema: this.getAnalysisSchema(),
-          temperature: 0.3,
-          maxOutputTokens: 32768,
         }
         
-        const model = 'gemini-2.5-flash'
         const conversionPrompt = this.buildConversionPrompt(studentName, descriptiveAnalysis, sessions)
         
         console.log('🚀 Sending conversion request...')
         console.log('📝 Conversion prompt length:', conversionPrompt.length, 'characters')
-        
-        const contents = [
-          {
-            role: 'user',
-            parts: [{ text: conversionPrompt }]
-          }
-        ]
-        
-        // Add timeout to prevent hanging
-        const timeoutPromise = new Promise((_, reject) => {
-          setTimeout(() => reject(new Error('Request timeout after 2 minutes')), 2 * 60 * 1000)
-        })
-        
-        const response = await Promise.race([
-          ai.models.generateContentStream({
-            model,
-            config,
-            contents,
-          }),
-          timeoutPromise
-        ])
-        
-        let responseText = ''
-        for await (const chunk of response) {
-          responseText += chunk.text
+
+        if (attempt > 1) {
+          onProgress?.({ type: 'reset', stage: 'structuring' })
         }
+        // Surface each recommendation as soon as its JSON object is complete
+        const scanner = new JsonArrayFieldScanner<ScientificRecommendation>('recommendations')
+        let recommendationCount = 0
+        
+        const responseText = await this.streamText(
+          conversionPrompt,
+          config,
+          'structured conversion',
+          onProgress && (delta => {
+            for (const recommendation of scanner.push(delta)) {
+              onProgress({ type: 'recommendation', index: recommendationCount++, recommendation })
+            }
+          })
+        )
         
         if (!responseText) {
           throw new Error('No response text received from AI model')
@@ -827,7 +1058,7 @@ Focus on providing evidence-based recommendations that will genuinely help impro
           // Use different API key on network errors
           if (error instanceof Error && this.isNetworkError(error)) {
             console.log('🔄 Network error detected, trying with different API key...')
-            // The next iteration will automatically use the next API key
+            // The scheduler gives the next attempt the key with the most quota left
           }
           
           const delay = Math.pow(2, attempt) * 1000 // Exponential backoff: 2s, 4s, 8s
@@ -844,33 +1075,7 @@ Focus on providing evidence-based recommendations that will genuinely help impro
    * Build descriptive analysis prompt (Step 1)
    */
   private buildDescriptiveAnalysisPrompt(studentName: string, sessions: DebateFeedbackSession[]): string {
-    const sessionData = sessions.map((session, index) => {
-      const content = session.content?.substring(0, 1000) || 'No content available'
-      const bestAspects = session.bestAspects?.substring(0, 300) || ''
-      const improvementAreas = session.improvementAreas?.substring(0, 300) || ''
-      const teacherComments = session.teacherComments?.substring(0, 300) || ''
-      
-      // Format rubric scores with proper labels
-      const rubricScoresFormatted = formatRubricScores(session.rubricScores || {})
-      
-      return `
-## SESSION ${index + 1} - ${session.date}
-**Unit:** ${session.unitNumber}
-${session.motion ? `**Motion:** ${session.motion.substring(0, 100)}` : ''}
-${session.duration ? `**Duration:** ${session.duration}` : ''}
-
-**Rubric Scores:**
-${rubricScoresFormatted}
-
-**Qualitative Feedback:**
-${content}
-
-${bestAspects ? `**Best Aspects:** ${bestAspects}` : ''}
-${improvementAreas ? `**Areas for Improvement:** ${improvementAreas}` : ''}
-${teacherComments ? `**Teacher Comments:** ${teacherComments}` : ''}
-`
-    }).join('\n---\n')
-
+    const sessionData = this.formatSessionData(sessions)
     const timeSpan = sessions.length > 0 ? `${sessions[0].date} to ${sessions[sessions.length - 1].date}` : ''
     
     return `# Comprehensive Debate Analysis for ${studentName}
@@ -968,6 +1173,84 @@ ${sessionData}
 Think carefully through each session chronologically. Identify strengths to build upon, diagnose root causes of challenges, and provide evidence-based recommendations that address WHY issues occur, not just what to do about them.`
   }
 
+  /**
+   * Session blocks for the analysis prompts, numbered from firstNumber
+   */
+  private formatSessionData(sessions: DebateFeedbackSession[], firstNumber: number = 1): string {
+    return sessions.map((session, index) => {
+      const content = session.content?.substring(0, 1000) || 'No content available'
+      const bestAspects = session.bestAspects?.substring(0, 300) || ''
+      const improvementAreas = session.improvementAreas?.substring(0, 300) || ''
+      const teacherComments = session.teacherComments?.substring(0, 300) || ''
+      
+      // Format rubric scores with proper labels
+      const rubricScoresFormatted = formatRubricScores(session.rubricScores || {})
+      
+      return `
+## SESSION ${firstNumber + index} - ${session.date}
+**Unit:** ${session.unitNumber}
+${session.motion ? `**Motion:** ${session.motion.substring(0, 100)}` : ''}
+${session.duration ? `**Duration:** ${session.duration}` : ''}
+
+**Rubric Scores:**
+${rubricScoresFormatted}
+
+**Qualitative Feedback:**
+${content}
+
+${bestAspects ? `**Best Aspects:** ${bestAspects}` : ''}
+${improvementAreas ? `**Areas for Improvement:** ${improvementAreas}` : ''}
+${teacherComments ? `**Teacher Comments:** ${teacherComments}` : ''}
+`
+    }).join('\n---\n')
+  }
+
+  /**
+   * Build the Step 1 prompt for an incremental update: the rolling summary
+   * plus only the sessions it does not cover yet
+   */
+  private buildIncrementalAnalysisPrompt(
+    studentName: string,
+    summary: string,
+    newSessions: DebateFeedbackSession[],
+    allSessions: DebateFeedbackSession[]
+  ): string {
+    const previousCount = allSessions.length - newSessions.length
+    const sessionData = this.formatSessionData(newSessions, previousCount + 1)
+    const timeSpan = allSessions.length > 0 ? `${allSessions[0].date} to ${allSessions[allSessions.length - 1].date}` : ''
+
+    return `# Updated Debate Analysis for ${studentName}
+
+You are an expert debate coach maintaining a running chronological analysis of ${studentName}'s performance. Below is your existing analysis of sessions 1-${previousCount}, followed by ${newSessions.length} new feedback session(s). Update the analysis so it covers all ${allSessions.length} sessions spanning ${timeSpan}.
+
+Each session includes rubric scores (1-5, or 0 for N/A) across 8 categories: Duration Management, Point of Information, Style/Persuasion, Argument Completeness, Theory Application, Rebuttal Effectiveness, Teammate Support and Feedback Application. Use both the scores and the qualitative feedback.
+
+## Existing Analysis (sessions 1-${previousCount})
+${summary}
+
+## NEW FEEDBACK DATA (${newSessions.length} sessions):
+${sessionData}
+
+## Required Output
+
+Rewrite the complete analysis, keeping the same five sections:
+
+### 1. KEY STRENGTHS IDENTIFICATION
+### 2. SKILL ASSESSMENT
+### 3. DIAGNOSTIC PATTERN ANALYSIS
+### 4. OVERALL PROGRESSION
+### 5. DIAGNOSTIC-BASED RECOMMENDATIONS
+
+## Guidelines
+- Carry forward findings and quotes from the existing analysis that still hold
+- Add evidence from the new sessions, quoting the feedback directly
+- Update skill levels, progress patterns, trends and breakthrough moments in light of the new sessions
+- Note whether the student applied feedback from earlier sessions
+- Revise or drop recommendations the new sessions show are resolved, and diagnose root causes of any new issues
+- Summarize older session-by-session detail as trends so the whole analysis stays under ${SUMMARY_WORD_LIMIT} words
+- The output replaces the existing analysis, so it must stand on its own`
+  }
+
   /**
    * Build conversion prompt (Step 2)
    */
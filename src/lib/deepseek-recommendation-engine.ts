@@ -102,7 +102,7 @@ export interface ChronologicalAnalysis {
 
 export class DeepSeekRecommendationEngine {
   private apiKey: string
-  private baseUrl: string = 'https://openrouter.ai/api/v1/chat/completions'
+  private baseUrl: string = process.env.OPENROUTER_API_URL || 'https://openrouter.ai/api/v1/chat/completions'
   private model: string = 'deepseek/deepseek-r1-0528:free'
 
   constructor() {
@@ -0,0 +1,118 @@
+import mammoth from 'mammoth';
+
+// Reads a .docx once for both its plain text and its HTML.
+//
+// mammoth.extractRawText and mammoth.convertToHtml each unzip the file,
+// parse every XML part and build mammoth's document tree before producing
+// their output; for secondary feedback the parser needs both, so each file
+// was unzipped and walked twice. This runs mammoth's pipeline once and
+// derives both outputs from the same document tree, using the very
+// functions the two public calls end with, so text and HTML are identical
+// to what they return.
+//
+// The pipeline pieces are internal to mammoth. If they cannot be loaded
+// (a mammoth release that moved them), readDocx falls back to the two
+// public calls.
+
+export interface DocxContent {
+  text: string;
+  // null when HTML was not requested or could not be produced
+  html: string | null;
+  htmlError?: unknown;
+}
+
+interface MammothInternals {
+  openZip: (input: { path: string }) => Promise<any>;
+  readDocument: (docxFile: any, input?: { path: string }, options?: any) => Promise<any>;
+  readEmbeddedStyleMap: (docxFile: any) => Promise<string | null>;
+  readOptions: (options?: any) => any;
+  toRawText: (element: any) => string;
+  readStyle: (style: string) => any;
+  combineResults: (results: any[]) => any;
+  DocumentConverter: new (options: any) => { convertToHtml: (document: any) => any };
+}
+
+let internals: MammothInternals | null | undefined;
+
+function loadInternals(): MammothInternals | null {
+  if (internals !== undefined) return internals;
+
+  try {
+    /* eslint-disable @typescript-eslint/no-require-imports */
+    internals = {
+      openZip: require('mammoth/lib/unzip').openZip,
+      readDocument: require('mammoth/lib/docx/docx-reader').read,
+      readEmbeddedStyleMap: require('mammoth/lib/docx/style-map').readStyleMap,
+      readOptions: require('mammoth/lib/options').readOptions,
+      toRawText: require('mammoth/lib/raw-text').convertElementToRawText,
+      readStyle: require('mammoth/lib/style-reader').readStyle,
+      combineResults: require('mammoth/lib/results').Result.combine,
+      DocumentConverter: require('mammoth/lib/document-to-html').DocumentConverter,
+    };
+    /* eslint-enable @typescript-eslint/no-require-imports */
+
+    if (Object.values(internals).some(value => typeof value !== 'function')) {
+      internals = null;
+    }
+  } catch {
+    internals = null;
+  }
+
+  if (!internals) {
+    console.warn('mammoth internals unavailable; .docx files will be read twice');
+  }
+  return internals;
+}
+
+export function isSinglePassAvailable(): boolean {
+  return loadInternals() !== null;
+}
+
+/**
+ * The same steps as mammoth.convertToHtml after the document is read:
+ * default style map plus the document's embedded one, then conversion.
+ */
+async function documentToHtml(m: MammothInternals, documentResult: any, options: any): Promise<string> {
+  const styleMapResult = m.combineResults((options.readStyleMap() || []).map(m.readStyle))
+    .map((styleMap: any[]) => styleMap.filter(mapping => !!mapping));
+  const converter = new m.DocumentConverter({ ...options, styleMap: styleMapResult.value });
+
+  const result = await documentResult
+    .map(options.transformDocument)
+    .flatMapThen((document: any) => styleMapResult.flatMapThen(() => converter.convertToHtml(document)));
+  return result.value;
+}
+
+export async function readDocx(filePath: string, options: { html?: boolean } = {}): Promise<DocxContent> {
+  const m = loadInternals();
+
+  if (!m) {
+    const text = (await mammoth.extractRawText({ path: filePath })).value;
+    if (!options.html) return { text, html: null };
+    try {
+      return { text, html: (await mammoth.convertToHtml({ path: filePath })).value };
+    } catch (htmlError) {
+      return { text, html: null, htmlError };
+    }
+  }
+
+  const input = { path: filePath };
+  const docxFile = await m.openZip(input);
+
+  if (!options.html) {
+    const documentResult = await m.readDocument(docxFile);
+    return { text: documentResult.map(m.toRawText).value, html: null };
+  }
+
+  const mammothOptions = m.readOptions({});
+  mammothOptions.embeddedStyleMap = await m.readEmbeddedStyleMap(docxFile);
+
+  const documentResult = await m.readDocument(docxFile, input, mammothOptions);
+  const text = documentResult.map(m.toRawText).value;
+
+  try {
+    return { text, html: await documentToHtml(m, documentResult, mammothOptions) };
+  } catch (htmlError) {
+    return { text, html: null, htmlError };
+  }
+}
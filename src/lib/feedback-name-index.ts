@@ -0,0 +1,395 @@
+import fs from 'fs';
+import path from 'path';
+import type { FeedbackExtractionResult } from './feedback-parser';
+
+// Inverted index from student name to the feedback documents that mention
+// them.
+//
+// Without it a lookup opens every consolidated file under data/Overall to
+// find out who is in it. The index records, for each document, the names of
+// the students whose sections it contains, so a lookup only compares the
+// search against the few hundred distinct names and opens the files behind
+// the ones that match. It is built once from the parse cache, persisted next
+// to it, kept current by a recursive watcher on the data directory, and can
+// be rebuilt explicitly with scripts/reindex-feedback.ts.
+
+const INDEX_VERSION = 1;
+const INDEX_DIR = process.env.FEEDBACK_PARSE_CACHE_DIR || path.join(process.cwd(), '.cache', 'feedback-parse');
+const BUILD_CONCURRENCY = 4;
+const WATCH_DEBOUNCE_MS = 2000;
+
+type FeedbackType = 'primary' | 'secondary';
+type ParseFile = (filePath: string, feedbackType: FeedbackType) => Promise<FeedbackExtractionResult>;
+
+interface IndexedFile {
+  feedbackType: FeedbackType;
+  size: number;
+  mtimeMs: number;
+  // Normalized (lowercased, trimmed) names of the students in the file
+  names: string[];
+}
+
+interface PersistedIndex {
+  version: number;
+  dataPath: string;
+  files: Record<string, IndexedFile>;
+}
+
+export interface IndexedDocument {
+  filePath: string;
+  feedbackType: FeedbackType;
+}
+
+export interface NameIndexStats {
+  files: number;
+  names: number;
+  lookups: number;
+  filesOpened: number;
+  lastBuildMs: number | null;
+  watching: boolean;
+}
+
+export function normalizeStudentName(name: string): string {
+  return name.toLowerCase().trim();
+}
+
+export class FeedbackNameIndex {
+  private files = new Map<string, IndexedFile>();
+  private postings = new Map<string, Set<string>>();
+  private ready: Promise<void> | null = null;
+  private watchers: fs.FSWatcher[] = [];
+  private pending = new Map<string, NodeJS.Timeout>();
+  private lookups = 0;
+  private filesOpened = 0;
+  private lastBuildMs: number | null = null;
+  private readonly indexPath: string;
+
+  constructor(
+    private dataPath: string,
+    private parseFile: ParseFile,
+    indexDir: string = INDEX_DIR
+  ) {
+    this.dataPath = path.resolve(dataPath);
+    const id = Buffer.from(this.dataPath).toString('base64url').slice(-48);
+    this.indexPath = path.join(indexDir, `name-index-${id}.json`);
+  }
+
+  /**
+   * Load the persisted index, or build it on first use, then bring it up to
+   * date with the files on disk. Concurrent callers share one build.
+   */
+  ensureReady(): Promise<void> {
+    if (!this.ready) {
+      this.ready = this.load().catch(error => {
+        this.ready = null;
+        throw error;
+      });
+    }
+    return this.ready;
+  }
+
+  /**
+   * Documents that may hold feedback for `studentName`. `matches` is the
+   * parser's name comparison, applied to every distinct indexed name.
+   */
+  async lookup(
+    studentName: string,
+    matches: (indexedName: string, searchName: string) => boolean
+  ): Promise<IndexedDocument[]> {
+    await this.ensureReady();
+    this.lookups++;
+
+    const filePaths = new Set<string>();
+    for (const [name, postings] of this.postings) {
+      if (!matches(name, studentName)) continue;
+      for (const filePath of postings) {
+        filePaths.add(filePath);
+      }
+    }
+
+    const documents: IndexedDocument[] = [];
+    for (const filePath of filePaths) {
+      const file = this.files.get(filePath);
+      if (file) {
+        documents.push({ filePath, feedbackType: file.feedbackType });
+      }
+    }
+
+    // Primary before secondary, then by path, so results come back in the
+    // same order as a directory walk would produce them
+    documents.sort((a, b) =>
+      a.feedbackType === b.feedbackType
+        ? a.filePath.localeCompare(b.filePath)
+        : a.feedbackType === 'primary' ? -1 : 1
+    );
+
+    this.filesOpened += documents.length;
+    return documents;
+  }
+
+  /**
+   * Re-read every document. With the parse cache warm this only stats the
+   * files and decodes their cached records.
+   */
+  async rebuild(): Promise<NameIndexStats> {
+    const started = Date.now();
+    this.files.clear();
+    this.postings.clear();
+
+    const documents = await this.listDocuments();
+    await this.indexDocuments(documents);
+    await this.persist();
+
+    this.lastBuildMs = Date.now() - started;
+    this.ready ??= Promise.resolve();
+    console.log(`Feedback name index built in ${this.lastBuildMs}ms: ${this.files.size} files, ${this.postings.size} names`);
+    return this.getStats();
+  }
+
+  /**
+   * Watch the data directory and re-index files as they change. Events are
+   * debounced per file since editors and copies emit several in a row.
+   */
+  watch(): void {
+    if (this.watchers.length > 0) return;
+
+    for (const feedbackType of ['primary', 'secondary'] as const) {
+      const root = this.typeRoot(feedbackType);
+      if (!fs.existsSync(root)) continue;
+
+      try {
+        const watcher = fs.watch(root, { recursive: true }, (_event, filename) => {
+          if (!filename) return;
+          this.schedule(path.join(root, filename.toString()), feedbackType);
+        });
+        watcher.on('error', error => console.warn('Feedback index watcher error:', error));
+        watcher.unref();
+        this.watchers.push(watcher);
+      } catch (error) {
+        // Recursive watching is not available everywhere; an explicit
+        // reindex still keeps the index current
+        console.warn(`Could not watch ${root} for feedback changes:`, error);
+      }
+    }
+  }
+
+  close(): void {
+    for (const watcher of this.watchers) {
+      watcher.close();
+    }
+    this.watchers = [];
+    for (const timer of this.pending.values()) {
+      clearTimeout(timer);
+    }
+    this.pending.clear();
+  }
+
+  getStats(): NameIndexStats {
+    return {
+      files: this.files.size,
+      names: this.postings.size,
+      lookups: this.lookups,
+      filesOpened: this.filesOpened,
+      lastBuildMs: this.lastBuildMs,
+      watching: this.watchers.length > 0
+    };
+  }
+
+  private async load(): Promise<void> {
+    let persisted: PersistedIndex | null = null;
+    try {
+      persisted = JSON.parse(await fs.promises.readFile(this.indexPath, 'utf8'));
+    } catch {
+      // Not built yet
+    }
+
+    if (!persisted || persisted.version !== INDEX_VERSION || persisted.dataPath !== this.dataPath) {
+      await this.rebuild();
+      return;
+    }
+
+    for (const [filePath, file] of Object.entries(persisted.files)) {
+      this.setFile(filePath, file);
+    }
+
+    // Catch up with changes made while nothing was watching: only files
+    // whose size or mtime moved are parsed again
+    const started = Date.now();
+    const documents = await this.listDocuments();
+    const seen = new Set(documents.map(document => document.filePath));
+    const changed: IndexedDocument[] = [];
+
+    for (const document of documents) {
+      const known = this.files.get(document.filePath);
+      if (!known) {
+        changed.push(document);
+        continue;
+      }
+      const stat = await fs.promises.stat(document.filePath).catch(() => null);
+      if (!stat || stat.size !== known.size || stat.mtimeMs !== known.mtimeMs) {
+        changed.push(document);
+      }
+    }
+
+    let removed = 0;
+    for (const filePath of [...this.files.keys()]) {
+      if (!seen.has(filePath)) {
+        this.removeFile(filePath);
+        removed++;
+      }
+    }
+
+    if (changed.length > 0 || removed > 0) {
+      await this.indexDocuments(changed);
+      await this.persist();
+      console.log(`Feedback name index refreshed in ${Date.now() - started}ms: ${changed.length} changed, ${removed} removed`);
+    }
+  }
+
+  private typeRoot(feedbackType: FeedbackType): string {
+    return path.join(this.dataPath, feedbackType === 'primary' ? 'Primary' : 'Secondary');
+  }
+
+  private async listDocuments(): Promise<IndexedDocument[]> {
+    const documents: IndexedDocument[] = [];
+
+    const walk = async (dirPath: string, feedbackType: FeedbackType) => {
+      let entries: fs.Dirent[];
+      try {
+        entries = await fs.promises.readdir(dirPath, { withFileTypes: true });
+      } catch {
+        return;
+      }
+
+      for (const entry of entries) {
+        const entryPath = path.join(dirPath, entry.name);
+        if (entry.isDirectory()) {
+          await walk(entryPath, feedbackType);
+        } else if (isIndexableFile(entry.name)) {
+          documents.push({ filePath: entryPath, feedbackType });
+        }
+      }
+    };
+
+    await walk(this.typeRoot('primary'), 'primary');
+    await walk(this.typeRoot('secondary'), 'secondary');
+    return documents;
+  }
+
+  private async indexDocuments(documents: IndexedDocument[]): Promise<void> {
+    let next = 0;
+    const workers = Array.from({ length: Math.min(BUILD_CONCURRENCY, documents.length) }, async () => {
+      while (next < documents.length) {
+        const document = documents[next++];
+        await this.indexFile(document.filePath, document.feedbackType);
+      }
+    });
+    await Promise.all(workers);
+  }
+
+  private async indexFile(filePath: string, feedbackType: FeedbackType): Promise<void> {
+    const stat = await fs.promises.stat(filePath).catch(() => null);
+    if (!stat || !stat.isFile()) {
+      this.removeFile(filePath);
+      return;
+    }
+
+    const result = await this.parseFile(filePath, feedbackType);
+    const names = [...new Set(result.feedbacks.map(feedback => normalizeStudentName(feedback.studentName)))];
+    // A file that failed to parse is recorded with an impossible mtime so
+    // the next load tries it again
+    const mtimeMs = result.errors.length > 0 ? -1 : stat.mtimeMs;
+    this.setFile(filePath, { feedbackType, size: stat.size, mtimeMs, names });
+  }
+
+  private setFile(filePath: string, file: IndexedFile): void {
+    this.removeFile(filePath);
+    this.files.set(filePath, file);
+    for (const name of file.names) {
+      let postings = this.postings.get(name);
+      if (!postings) {
+        postings = new Set();
+        this.postings.set(name, postings);
+      }
+      postings.add(filePath);
+    }
+  }
+
+  private removeFile(filePath: string): void {
+    const file = this.files.get(filePath);
+    if (!file) return;
+
+    this.files.delete(filePath);
+    for (const name of file.names) {
+      const postings = this.postings.get(name);
+      if (!postings) continue;
+      postings.delete(filePath);
+      if (postings.size === 0) {
+        this.postings.delete(name);
+      }
+    }
+  }
+
+  private schedule(filePath: string, feedbackType: FeedbackType): void {
+    if (!isIndexableFile(filePath)) return;
+
+    clearTimeout(this.pending.get(filePath));
+    const timer = setTimeout(async () => {
+      this.pending.delete(filePath);
+      try {
+        await this.ensureReady();
+        await this.indexFile(filePath, feedbackType);
+        await this.persist();
+      } catch (error) {
+        console.warn(`Could not re-index ${filePath}:`, error);
+      }
+    }, WATCH_DEBOUNCE_MS);
+    timer.unref?.();
+    this.pending.set(filePath, timer);
+  }
+
+  private async persist(): Promise<void> {
+    const persisted: PersistedIndex = {
+      version: INDEX_VERSION,
+      dataPath: this.dataPath,
+      files: Object.fromEntries(this.files)
+    };
+
+    try {
+      await fs.promises.mkdir(path.dirname(this.indexPath), { recursive: true });
+      const temp = `${this.indexPath}.${process.pid}.tmp`;
+      await fs.promises.writeFile(temp, JSON.stringify(persisted));
+      await fs.promises.rename(temp, this.indexPath);
+    } catch (error) {
+      console.warn('Could not persist feedback name index:', error);
+    }
+  }
+}
+
+function isIndexableFile(fileName: string): boolean {
+  const ext = path.extname(fileName).toLowerCase();
+  return ext === '.docx' || ext === '.txt';
+}
+
+const indexes = new Map<string, FeedbackNameIndex>();
+
+/**
+ * The shared index for a data directory, created on first use and watched
+ * from then on. Returns null when disabled with FEEDBACK_NAME_INDEX=off.
+ */
+export function getFeedbackNameIndex(dataPath: string, parseFile: ParseFile): FeedbackNameIndex | null {
+  if (process.env.FEEDBACK_NAME_INDEX === 'off') {
+    return null;
+  }
+
+  const key = path.resolve(dataPath);
+  let index = indexes.get(key);
+  if (!index) {
+    index = new FeedbackNameIndex(key, parseFile);
+    if (process.env.FEEDBACK_NAME_INDEX_WATCH !== 'off') {
+      index.watch();
+    }
+    indexes.set(key, index);
+  }
+  return index;
+}
@@ -0,0 +1,288 @@
+import fs from 'fs';
+import path from 'path';
+import { createHash } from 'crypto';
+import { decodeCacheValue, encodeCacheValue } from './cache/cache-codec';
+import { MemoryLRU } from './cache/memory-lru';
+import type { StudentFeedback } from './feedback-parser';
+
+// Persistent cache of FeedbackParser results, one entry per source document.
+//
+// Parsing a .docx with mammoth (twice for secondary files, which also need
+// the HTML for rubric scores) dominates every feedback lookup, while the
+// documents themselves almost never change. Entries are validated against
+// the file's size and mtime; when those differ the content hash decides, so
+// a copied or touched file is not re-parsed. Entries are stored with the
+// cache codec (packed + brotli) under FEEDBACK_PARSE_CACHE_DIR and loaded
+// lazily, with the most recently used kept decoded in memory.
+//
+// Bump PARSER_VERSION whenever extraction logic changes the records a file
+// produces; every entry written by an older version is then re-parsed.
+
+const PARSER_VERSION = 1;
+
+const CACHE_DIR = process.env.FEEDBACK_PARSE_CACHE_DIR || path.join(process.cwd(), '.cache', 'feedback-parse');
+const MEMORY_BYTES = parseInt(process.env.FEEDBACK_PARSE_CACHE_MEMORY_BYTES || String(64 * 1024 * 1024));
+
+export interface ParsedFileResult {
+  feedbacks: StudentFeedback[];
+  errors: string[];
+}
+
+interface ParseCacheEntry extends ParsedFileResult {
+  parserVersion: number;
+  filePath: string;
+  feedbackType: 'primary' | 'secondary';
+  size: number;
+  mtimeMs: number;
+  contentHash: string;
+}
+
+export interface ParseCacheStats {
+  memoryHits: number;
+  diskHits: number;
+  // Size or mtime changed but the content hash still matched
+  revalidated: number;
+  misses: number;
+  invalidated: number;
+  writes: number;
+  errors: number;
+  hitRate: number;
+  memory: ReturnType<MemoryLRU['getStats']>;
+}
+
+// Callers get their own record objects, so filtering or annotating them
+// cannot change what later lookups see
+function toResult(entry: ParseCacheEntry): ParsedFileResult {
+  return {
+    feedbacks: entry.feedbacks.map(feedback => ({ ...feedback })),
+    errors: []
+  };
+}
+
+export class FeedbackParseCache {
+  private memory: MemoryLRU<ParseCacheEntry>;
+  private stats = { memoryHits: 0, diskHits: 0, revalidated: 0, misses: 0, invalidated: 0, writes: 0, errors: 0 };
+
+  constructor(private cacheDir: string = CACHE_DIR, memoryBytes: number = MEMORY_BYTES) {
+    this.memory = new MemoryLRU<ParseCacheEntry>({ maxBytes: memoryBytes });
+  }
+
+  /**
+   * Parsed records for `filePath`, from the cache when the file is unchanged
+   * and otherwise from `parse`, whose result is then stored. Results that
+   * carry errors are returned but not cached, so a transient read failure
+   * is retried next time.
+   */
+  async getOrParse(
+    filePath: string,
+    feedbackType: 'primary' | 'secondary',
+    parse: () => Promise<ParsedFileResult>
+  ): Promise<ParsedFileResult> {
+    const absolutePath = path.resolve(filePath);
+    const key = this.keyFor(absolutePath, feedbackType);
+
+    let stat: fs.Stats;
+    try {
+      stat = await fs.promises.stat(absolutePath);
+    } catch {
+      return parse();
+    }
+
+    let entry = this.memory.get(key) ?? null;
+    const fromMemory = entry !== null;
+    if (!entry) {
+      entry = await this.readEntry(key);
+    }
+
+    if (entry && entry.parserVersion === PARSER_VERSION) {
+      if (entry.size === stat.size && entry.mtimeMs === stat.mtimeMs) {
+        if (fromMemory) this.stats.memoryHits++;
+        else this.stats.diskHits++;
+        this.remember(key, entry);
+        return toResult(entry);
+      }
+
+      // Touched or copied but possibly identical: compare content before
+      // paying for a parse
+      const contentHash = await this.hashFile(absolutePath);
+      if (contentHash === entry.contentHash) {
+        this.stats.revalidated++;
+        const refreshed = { ...entry, size: stat.size, mtimeMs: stat.mtimeMs };
+        this.remember(key, refreshed);
+        await this.writeEntry(key, refreshed);
+        return toResult(refreshed);
+      }
+    }
+
+    if (entry) {
+      this.stats.invalidated++;
+      this.memory.delete(key);
+    }
+    this.stats.misses++;
+
+    const result = await parse();
+    if (result.errors.length === 0) {
+      const fresh: ParseCacheEntry = {
+        feedbacks: result.feedbacks.map(feedback => ({ ...feedback })),
+        errors: [],
+        parserVersion: PARSER_VERSION,
+        filePath: absolutePath,
+        feedbackType,
+        size: stat.size,
+        mtimeMs: stat.mtimeMs,
+        contentHash: await this.hashFile(absolutePath),
+      };
+      this.remember(key, fresh);
+      await this.writeEntry(key, fresh);
+    }
+    return result;
+  }
+
+  /**
+   * Drop the cached records for one file, e.g. after it is replaced by an
+   * upload with the same size and mtime resolution.
+   */
+  async invalidate(filePath: string): Promise<void> {
+    const absolutePath = path.resolve(filePath);
+    for (const feedbackType of ['primary', 'secondary'] as const) {
+      const key = this.keyFor(absolutePath, feedbackType);
+      this.memory.delete(key);
+      await fs.promises.rm(this.entryPath(key), { force: true }).catch(() => undefined);
+    }
+  }
+
+  async clear(): Promise<void> {
+    this.memory.clear();
+    await fs.promises.rm(this.cacheDir, { recursive: true, force: true });
+  }
+
+  getStats(): ParseCacheStats {
+    const hits = this.stats.memoryHits + this.stats.diskHits + this.stats.revalidated;
+    const lookups = hits + this.stats.misses;
+    return {
+      ...this.stats,
+      hitRate: lookups > 0 ? hits / lookups : 0,
+      memory: this.memory.getStats()
+    };
+  }
+
+  private keyFor(absolutePath: string, feedbackType: string): string {
+    return createHash('sha1').update(`${feedbackType}\0${absolutePath}`).digest('hex');
+  }
+
+  private entryPath(key: string): string {
+    // Two-character fan-out keeps directories small for a few thousand files
+    return path.join(this.cacheDir, key.slice(0, 2), `${key}.bin`);
+  }
+
+  private remember(key: string, entry: ParseCacheEntry): void {
+    let bytes = 0;
+    for (const feedback of entry.feedbacks) {
+      bytes += feedback.rawContent.length + feedback.content.length + (feedback.htmlContent?.length || 0);
+    }
+    this.memory.set(key, entry, bytes * 2, Number.MAX_SAFE_INTEGER);
+  }
+
+  private async readEntry(key: string): Promise<ParseCacheEntry | null> {
+    let buffer: Buffer;
+    try {
+      buffer = await fs.promises.readFile(this.entryPath(key));
+    } catch {
+      return null;
+    }
+
+    try {
+      const entry = await decodeCacheValue<ParseCacheEntry>(buffer);
+      // Dates come back as ISO strings
+      for (const feedback of entry.feedbacks) {
+        feedback.extractedAt = new Date(feedback.extractedAt);
+      }
+      return entry;
+    } catch (error) {
+      this.stats.errors++;
+      console.warn(`Discarding unreadable parse cache entry ${key}:`, error);
+      return null;
+    }
+  }
+
+  private async writeEntry(key: string, entry: ParseCacheEntry): Promise<void> {
+    const target = this.entryPath(key);
+    try {
+      const { buffer } = await encodeCacheValue(entry);
+      await fs.promises.mkdir(path.dirname(target), { recursive: true });
+      // Write then rename so a concurrent reader never sees half an entry
+      const temp = `${target}.${process.pid}.tmp`;
+      await fs.promises.writeFile(temp, buffer);
+      await fs.promises.rename(temp, target);
+      this.stats.writes++;
+    } catch (error) {
+      this.stats.errors++;
+      console.warn(`Could not write parse cache entry for ${entry.filePath}:`, error);
+    }
+  }
+
+  private hashFile(filePath: string): Promise<string> {
+    return hashFileContents(filePath);
+  }
+}
+
+/**
+ * sha256 of a file's bytes, the content hash parse cache entries are
+ * validated against
+ */
+export async function hashFileContents(filePath: string): Promise<string> {
+  const hash = createHash('sha256');
+  for await (const chunk of fs.createReadStream(filePath)) {
+    hash.update(chunk);
+  }
+  return hash.digest('hex');
+}
+
+/**
+ * Counters of several caches added together, e.g. the main thread's and
+ * each parse worker's. Null when given none.
+ */
+export function combineParseCacheStats(all: ParseCacheStats[]): ParseCacheStats | null {
+  if (all.length === 0) return null;
+
+  const sum = (pick: (stats: ParseCacheStats) => number) =>
+    all.reduce((total, stats) => total + pick(stats), 0);
+  const memoryHits = sum(stats => stats.memoryHits);
+  const diskHits = sum(stats => stats.diskHits);
+  const revalidated = sum(stats => stats.revalidated);
+  const misses = sum(stats => stats.misses);
+  const hits = memoryHits + diskHits + revalidated;
+
+  return {
+    memoryHits,
+    diskHits,
+    revalidated,
+    misses,
+    invalidated: sum(stats => stats.invalidated),
+    writes: sum(stats => stats.writes),
+    errors: sum(stats => stats.errors),
+    hitRate: hits + misses > 0 ? hits / (hits + misses) : 0,
+    memory: {
+      entries: sum(stats => stats.memory.entries),
+      bytes: sum(stats => stats.memory.bytes),
+      maxBytes: sum(stats => stats.memory.maxBytes),
+      evictions: sum(stats => stats.memory.evictions)
+    }
+  };
+}
+
+let sharedCache: FeedbackParseCache | null = null;
+
+/**
+ * The process-wide parse cache, or null when disabled with
+ * FEEDBACK_PARSE_CACHE=off.
+ */
+export function getFeedbackParseCache(): FeedbackParseCache | null {
+  if (process.env.FEEDBACK_PARSE_CACHE === 'off') {
+    return null;
+  }
+  if (!sharedCache) {
+    sharedCache = new FeedbackParseCache();
+  }
+  return sharedCache;
+}
@@ -0,0 +1,287 @@
+import os from 'os';
+import { Worker, type WorkerOptions } from 'worker_threads';
+import type { StudentFeedback } from './feedback-parser';
+import { combineParseCacheStats, type ParseCacheStats } from './feedback-parse-cache';
+
+// Worker thread pool for parsing feedback documents.
+//
+// mammoth and the section parsing regexes are CPU bound, so a full re-parse
+// on the main thread blocks every request the server is handling while it
+// runs. The pool shards files across worker threads (one per core by
+// default) and hands results back in input order as they complete. Each
+// file has its own timeout; a file that hangs or crashes its worker only
+// fails itself, and the worker is replaced. If workers cannot be started at
+// all (e.g. a bundler that does not emit the worker entry), the remaining
+// files are parsed in-process so callers always get a result.
+
+const DEFAULT_TIMEOUT_MS = parseInt(process.env.FEEDBACK_PARSE_TIMEOUT_MS || '60000');
+// Worker-only flag that registers tsx's loader; see workerOptions
+const TS_LOADER_ARGS = ['--import', 'tsx'];
+
+export type FeedbackType = 'primary' | 'secondary';
+
+export interface FileToParse {
+  filePath: string;
+  feedbackType: FeedbackType;
+}
+
+export interface FileParseResult extends FileToParse {
+  feedbacks: StudentFeedback[];
+  errors: string[];
+  durationMs: number;
+}
+
+export interface ParseTask extends FileToParse {
+  id: number;
+  dataPath: string;
+}
+
+export interface ParseTaskResult {
+  id: number;
+  feedbacks: StudentFeedback[];
+  errors: string[];
+  // The worker's parse cache counters after this task
+  cacheStats?: ParseCacheStats | null;
+}
+
+export interface FeedbackParsePoolOptions {
+  size?: number;
+  timeoutMs?: number;
+  dataPath?: string;
+  // Used for every file once workers turn out to be unavailable
+  fallback?: (file: FileToParse) => Promise<{ feedbacks: StudentFeedback[]; errors: string[] }>;
+}
+
+interface Slot {
+  worker: Worker;
+  online: boolean;
+  task: { index: number; started: number; timer: NodeJS.Timeout } | null;
+  cacheStats: ParseCacheStats | null;
+}
+
+/**
+ * Options for a parse worker. A bundled build emits the worker entry as
+ * JavaScript, but when this module runs from source (tsx scripts, jest) the
+ * entry is the .ts file itself, which a plain Node worker can't load. Such
+ * workers get tsx's loader, unless the parent's own flags, which workers
+ * inherit, already register it.
+ */
+export function workerOptions(moduleUrl: string = import.meta.url): WorkerOptions {
+  if (!moduleUrl.endsWith('.ts')) return {};
+  if (process.execArgv.some(arg => /(^|[\\/])tsx([\\/]|$)/.test(arg))) return {};
+  return { execArgv: [...process.execArgv, ...TS_LOADER_ARGS] };
+}
+
+export function defaultPoolSize(): number {
+  const configured = parseInt(process.env.FEEDBACK_PARSE_WORKERS || '');
+  if (Number.isFinite(configured)) return Math.max(0, configured);
+  return os.availableParallelism?.() ?? os.cpus().length;
+}
+
+export class FeedbackParsePool {
+  private readonly size: number;
+  private readonly timeoutMs: number;
+  private readonly dataPath: string;
+  private readonly fallback?: FeedbackParsePoolOptions['fallback'];
+  private slots: Slot[] = [];
+  private workersUnavailable = false;
+  private closed = false;
+  // Cache counters of workers that have been replaced or closed
+  private retiredCacheStats: ParseCacheStats[] = [];
+
+  // State of the parse() call in progress
+  private files: FileToParse[] = [];
+  private queue: number[] = [];
+  private results = new Map<number, FileParseResult>();
+  private wake: (() => void) | null = null;
+
+  constructor(options: FeedbackParsePoolOptions = {}) {
+    this.size = Math.max(1, options.size ?? defaultPoolSize());
+    this.timeoutMs = options.timeoutMs ?? DEFAULT_TIMEOUT_MS;
+    this.dataPath = options.dataPath || './data/Overall';
+    this.fallback = options.fallback;
+  }
+
+  /**
+   * Parse `files`, yielding each result in input order as soon as it and
+   * every file before it are done.
+   */
+  async *parse(files: FileToParse[]): AsyncGenerator<FileParseResult> {
+    if (this.closed) {
+      throw new Error('Feedback parse pool is closed');
+    }
+
+    this.files = files;
+    this.queue = files.map((_, index) => index);
+    this.results.clear();
+
+    for (let i = 0; i < Math.min(this.size, files.length); i++) {
+      if (!this.slots[i]) this.slots[i] = this.spawn();
+    }
+    this.dispatch();
+
+    for (let next = 0; next < files.length; next++) {
+      while (!this.results.has(next)) {
+        await new Promise<void>(resolve => { this.wake = resolve; });
+      }
+      const result = this.results.get(next)!;
+      this.results.delete(next);
+      yield result;
+    }
+  }
+
+  async close(): Promise<void> {
+    this.closed = true;
+    const slots = this.slots;
+    this.slots = [];
+    await Promise.all(slots.map(slot => {
+      if (slot.task) clearTimeout(slot.task.timer);
+      this.retire(slot);
+      return slot.worker.terminate();
+    }));
+  }
+
+  /**
+   * Parse cache counters of every worker this pool has run, combined; null
+   * until a worker has reported
+   */
+  getCacheStats(): ParseCacheStats | null {
+    const live = this.slots.flatMap(slot => (slot.cacheStats ? [slot.cacheStats] : []));
+    return combineParseCacheStats([...this.retiredCacheStats, ...live]);
+  }
+
+  private spawn(): Slot {
+    const worker = new Worker(new URL('./feedback-parse-worker.ts', import.meta.url), workerOptions());
+    const slot: Slot = { worker, online: false, task: null, cacheStats: null };
+
+    worker.on('message', (message: ParseTaskResult | { ready: true }) => {
+      // Sent once the worker's modules have loaded; 'online' fires before
+      // that, so a missing worker entry would look like a crash mid-task
+      if ('ready' in message) {
+        slot.online = true;
+        return;
+      }
+      this.onResult(slot, message);
+    });
+    worker.on('error', error => this.onWorkerFailure(slot, error));
+    worker.on('exit', code => {
+      if (code !== 0 && !this.closed) {
+        this.onWorkerFailure(slot, new Error(`Parse worker exited with code ${code}`));
+      }
+    });
+
+    return slot;
+  }
+
+  private dispatch(): void {
+    if (this.workersUnavailable) {
+      this.drainInProcess();
+      return;
+    }
+
+    for (const slot of this.slots) {
+      if (slot.task || this.queue.length === 0) continue;
+
+      const index = this.queue.shift()!;
+      const file = this.files[index];
+      const started = Date.now();
+
+      const timer = setTimeout(() => {
+        this.finish(index, started, [], [`Timed out parsing ${file.filePath} after ${this.timeoutMs}ms`]);
+        // mammoth can't be interrupted; the only way out is a new worker
+        slot.task = null;
+        this.replace(slot);
+      }, this.timeoutMs);
+
+      slot.task = { index, started, timer };
+      const task: ParseTask = { id: index, dataPath: this.dataPath, ...file };
+      slot.worker.postMessage(task);
+    }
+  }
+
+  private onResult(slot: Slot, message: ParseTaskResult): void {
+    const task = slot.task;
+    if (!task || task.index !== message.id) return;
+
+    clearTimeout(task.timer);
+    slot.task = null;
+    if (message.cacheStats) slot.cacheStats = message.cacheStats;
+    this.finish(task.index, task.started, message.feedbacks, message.errors);
+    this.dispatch();
+  }
+
+  private onWorkerFailure(slot: Slot, error: Error): void {
+    if (!this.slots.includes(slot)) return;
+
+    const task = slot.task;
+    slot.task = null;
+    if (task) clearTimeout(task.timer);
+
+    if (!slot.online) {
+      // The worker never started, so neither will its replacements
+      if (!this.workersUnavailable) {
+        console.warn('Feedback parse workers unavailable, parsing in-process:', error.message);
+      }
+      this.workersUnavailable = true;
+      if (task) this.queue.unshift(task.index);
+      this.slots = this.slots.filter(other => other !== slot);
+      this.dispatch();
+      return;
+    }
+
+    if (task) {
+      this.finish(task.index, task.started, [], [`Worker failed parsing ${this.files[task.index].filePath}: ${error.message}`]);
+    }
+    this.replace(slot);
+  }
+
+  private replace(slot: Slot): void {
+    const position = this.slots.indexOf(slot);
+    this.retire(slot);
+    slot.worker.removeAllListeners();
+    slot.worker.terminate().catch(() => undefined);
+
+    if (position === -1 || this.closed) return;
+    this.slots[position] = this.spawn();
+    this.dispatch();
+  }
+
+  private retire(slot: Slot): void {
+    if (slot.cacheStats) this.retiredCacheStats.push(slot.cacheStats);
+    slot.cacheStats = null;
+  }
+
+  private drainInProcess(): void {
+    if (this.queue.length === 0) return;
+    const pending = this.queue.splice(0);
+
+    (async () => {
+      for (const index of pending) {
+        const file = this.files[index];
+        const started = Date.now();
+        try {
+          if (!this.fallback) throw new Error('No in-process parser configured');
+          const result = await this.fallback(file);
+          this.finish(index, started, result.feedbacks, result.errors);
+        } catch (error) {
+          this.finish(index, started, [], [`Error parsing file ${file.filePath}: ${error}`]);
+        }
+      }
+    })();
+  }
+
+  private finish(index: number, started: number, feedbacks: StudentFeedback[], errors: string[]): void {
+    if (this.results.has(index)) return;
+
+    this.results.set(index, {
+      ...this.files[index],
+      feedbacks,
+      errors,
+      durationMs: Date.now() - started
+    });
+
+    const wake = this.wake;
+    this.wake = null;
+    wake?.();
+  }
+}
@@ -0,0 +1,32 @@
+import { parentPort } from 'worker_threads';
+import { FeedbackParser } from './feedback-parser';
+import { getFeedbackParseCache } from './feedback-parse-cache';
+import type { ParseTask, ParseTaskResult } from './feedback-parse-pool';
+
+// Entry point for FeedbackParsePool workers: parses one document per message
+// and posts the records back. Goes through the parse cache like the main
+// thread, so files parsed here are not parsed again on the next lookup, and
+// reports this worker's cache counters with every result.
+
+const parsers = new Map<string, FeedbackParser>();
+
+parentPort?.on('message', async (task: ParseTask) => {
+  let parser = parsers.get(task.dataPath);
+  if (!parser) {
+    parser = new FeedbackParser(task.dataPath);
+    parsers.set(task.dataPath, parser);
+  }
+
+  let reply: ParseTaskResult;
+  try {
+    const result = await parser.parseDocumentFile(task.filePath, task.feedbackType);
+    reply = { id: task.id, feedbacks: result.feedbacks, errors: result.errors };
+  } catch (error) {
+    reply = { id: task.id, feedbacks: [], errors: [`Error parsing file ${task.filePath}: ${error}`] };
+  }
+
+  reply.cacheStats = getFeedbackParseCache()?.getStats() ?? null;
+  parentPort!.postMessage(reply);
+});
+
+parentPort?.postMessage({ ready: true });
@@ -1,6 +1,10 @@
 import fs from 'fs';
 import path from 'path';
 import mammoth from 'mammoth';
+import { readDocx } from './docx-reader';
+import { combineParseCacheStats, getFeedbackParseCache, type ParseCacheStats } from './feedback-parse-cache';
+import { FeedbackNameIndex, getFeedbackNameIndex } from './feedback-name-index';
+import { defaultPoolSize, FeedbackParsePool, type FileParseResult, type FileToParse } from './feedback-parse-pool';
 
 export interface StudentFeedback {
   studentName: string;
@@ -26,6 +30,13 @@ export interface StudentFeedback {
   rubricScores?: { [key: string]: number };
 }
 
+export interface StreamFeedbackOptions {
+  workers?: number;
+  timeoutMs?: number;
+  // Called once the pool has closed with its workers' parse cache counters
+  onWorkerCacheStats?: (stats: ParseCacheStats | null) => void;
+}
+
 export interface FeedbackExtractionResult {
   success: boolean;
   feedbacks: StudentFeedback[];
@@ -40,9 +51,16 @@ export class FeedbackParser {
   }
 
   /**
-   * Parse all feedback files and extract individual student feedback
+   * Parse all feedback files and extract individual student feedback.
+   * With `workers` above zero (default: FEEDBACK_PARSE_WORKERS, else the
+   * core count) files are parsed on a worker thread pool.
    */
-  async parseAllFeedback(): Promise<FeedbackExtractionResult> {
+  async parseAllFeedback(options: { workers?: number } = {}): Promise<FeedbackExtractionResult> {
+    const workers = options.workers ?? defaultPoolSize();
+    if (workers > 0) {
+      return this.parseAllFeedbackParallel(workers);
+    }
+
     const result: FeedbackExtractionResult = {
       success: true,
       feedbacks: [],
@@ -79,6 +97,43 @@ export class FeedbackParser {
 
       const endTime = Date.now();
       console.log(`Total parsing completed in ${endTime - startTime}ms: ${result.feedbacks.length} total feedbacks`);
+      this.logParseCacheStats();
+
+    } catch (error) {
+      result.success = false;
+      result.errors.push(`Failed to parse feedback: ${error}`);
+    }
+
+    return result;
+  }
+
+  private async parseAllFeedbackParallel(workers: number): Promise<FeedbackExtractionResult> {
+    const result: FeedbackExtractionResult = {
+      success: true,
+      feedbacks: [],
+      errors: []
+    };
+
+    try {
+      console.log(`Starting feedback parsing from Overall folder on ${workers} workers...`);
+      const startTime = Date.now();
+      let workerCacheStats: ParseCacheStats | null = null;
+
+      const files = this.streamAllFeedback({
+        workers,
+        onWorkerCacheStats: stats => { workerCacheStats = stats; }
+      });
+      for await (const fileResult of files) {
+        result.feedbacks.push(...fileResult.feedbacks);
+        result.errors.push(...fileResult.errors);
+      }
+
+      // Sort feedback chronologically
+      result.feedbacks.sort((a, b) => this.compareUnits(a.unitNumber, b.unitNumber));
+
+      const endTime = Date.now();
+      console.log(`Total parsing completed in ${endTime - startTime}ms: ${result.feedbacks.length} total feedbacks`);
+      this.logParseCacheStats(workerCacheStats);
 
     } catch (error) {
       result.success = false;
@@ -88,6 +143,76 @@ export class FeedbackParser {
     return result;
   }
 
+  /**
+   * Parse every document on a worker pool, yielding one result per file in
+   * directory order (primary first) as soon as it is available. Parsing
+   * happens off the main thread, so the event loop stays free while it runs.
+   */
+  async *streamAllFeedback(options: StreamFeedbackOptions = {}): AsyncGenerator<FileParseResult> {
+    yield* this.streamFeedbackFiles(await this.listDocumentFiles(), options);
+  }
+
+  /**
+   * Every feedback document under the data directory, primary first, in
+   * directory order
+   */
+  async listDocumentFiles(): Promise<FileToParse[]> {
+    const files: FileToParse[] = [];
+    for (const feedbackType of ['primary', 'secondary'] as const) {
+      const root = path.join(this.dataPath, feedbackType === 'primary' ? 'Primary' : 'Secondary');
+      if (fs.existsSync(root)) {
+        await this.collectDocumentFiles(root, feedbackType, files);
+      }
+    }
+    return files;
+  }
+
+  /**
+   * Parse the given documents on a worker pool, yielding results in input
+   * order like streamAllFeedback. With `workers` set to 0 they are parsed
+   * in-process, one at a time.
+   */
+  async *streamFeedbackFiles(
+    files: FileToParse[],
+    options: StreamFeedbackOptions = {}
+  ): AsyncGenerator<FileParseResult> {
+    const workers = options.workers ?? defaultPoolSize();
+    if (workers <= 0) {
+      for (const file of files) {
+        const started = Date.now();
+        const { feedbacks, errors } = await this.parseDocumentFile(file.filePath, file.feedbackType);
+        yield { ...file, feedbacks, errors, durationMs: Date.now() - started };
+      }
+      return;
+    }
+
+    const pool = new FeedbackParsePool({
+      size: Math.min(workers, Math.max(files.length, 1)),
+      timeoutMs: options.timeoutMs,
+      dataPath: this.dataPath,
+      fallback: file => this.parseDocumentFile(file.filePath, file.feedbackType)
+    });
+
+    try {
+      yield* pool.parse(files);
+    } finally {
+      await pool.close();
+      options.onWorkerCacheStats?.(pool.getCacheStats());
+    }
+  }
+
+  private async collectDocumentFiles(dirPath: string, feedbackType: 'primary' | 'secondary', files: FileToParse[]): Promise<void> {
+    const entries = await fs.promises.readdir(dirPath, { withFileTypes: true });
+    for (const entry of entries) {
+      const entryPath = path.join(dirPath, entry.name);
+      if (entry.isDirectory()) {
+        await this.collectDocumentFiles(entryPath, feedbackType, files);
+      } else if (this.isDocumentFile(entry.name)) {
+        files.push({ filePath: entryPath, feedbackType });
+      }
+    }
+  }
+
   /**
    * Get feedback for a specific student in chronological order (optimized)
    */
@@ -110,6 +235,7 @@ export class FeedbackParser {
     
     const endTime = Date.now();
     console.log(`Student feedback retrieval completed in ${endTime - startTime}ms: ${result.length} feedbacks found`);
+    this.logParseCacheStats();
     
     return result;
   }
@@ -118,6 +244,18 @@ export class FeedbackParser {
    * Search for a specific student's feedback more efficiently
    */
   private async searchStudentFeedback(studentName: string): Promise<StudentFeedback[]> {
+    const index = getFeedbackNameIndex(
+      this.dataPath,
+      (filePath, feedbackType) => this.parseDocumentFile(filePath, feedbackType)
+    );
+    if (index) {
+      try {
+        return await this.searchIndexedFeedback(index, studentName);
+      } catch (error) {
+        console.warn('Feedback name index unavailable, scanning directories:', error);
+      }
+    }
+
     const feedbacks: StudentFeedback[] = [];
     
     try {
@@ -145,6 +283,39 @@ export class FeedbackParser {
     }
   }
 
+  /**
+   * Search using the name index: only documents that contain a matching
+   * student are opened. The same file rules as searchInDirectory apply, so
+   * results are identical to a full scan.
+   */
+  private async searchIndexedFeedback(index: FeedbackNameIndex, studentName: string): Promise<StudentFeedback[]> {
+    const documents = await index.lookup(studentName, (name, search) => this.isNameMatch(name, search));
+    const feedbacks: StudentFeedback[] = [];
+
+    for (const { filePath, feedbackType } of documents) {
+      const fileName = path.basename(filePath);
+      if (!this.filenameContainsStudent(fileName, studentName) && !this.isConsolidatedFile(fileName)) {
+        continue;
+      }
+
+      const fileResult = await this.parseDocumentFile(filePath, feedbackType);
+      feedbacks.push(...fileResult.feedbacks.filter(f => this.isNameMatch(f.studentName, studentName)));
+    }
+
+    return feedbacks.sort((a, b) => this.compareUnits(a.unitNumber, b.unitNumber));
+  }
+
+  /**
+   * Rebuild the student name index from the documents on disk
+   */
+  async reindex() {
+    const index = getFeedbackNameIndex(
+      this.dataPath,
+      (filePath, feedbackType) => this.parseDocumentFile(filePath, feedbackType)
+    );
+    return index ? index.rebuild() : null;
+  }
+
   /**
    * Search for student feedback in a specific directory
    */
@@ -156,13 +327,13 @@ export class FeedbackParser {
     const feedbacks: StudentFeedback[] = [];
     
     try {
-      const items = fs.readdirSync(dirPath);
+      const entries = await fs.promises.readdir(dirPath, { withFileTypes: true });
       
-      for (const item of items) {
+      for (const entry of entries) {
+        const item = entry.name;
         const itemPath = path.join(dirPath, item);
-        const stat = fs.statSync(itemPath);
 
-        if (stat.isDirectory()) {
+        if (entry.isDirectory()) {
           // Recursively search subdirectories
           const subFeedbacks = await this.searchInDirectory(itemPath, feedbackType, studentName);
           feedbacks.push(...subFeedbacks);
@@ -239,13 +410,13 @@ export class FeedbackParser {
     };
 
     try {
-      const items = fs.readdirSync(dirPath);
+      const entries = await fs.promises.readdir(dirPath, { withFileTypes: true });
 
-      for (const item of items) {
+      for (const entry of entries) {
+        const item = entry.name;
         const itemPath = path.join(dirPath, item);
-        const stat = fs.statSync(itemPath);
 
-        if (stat.isDirectory()) {
+        if (entry.isDirectory()) {
           // Recursively parse subdirectories
           const subResult = await this.parseDirectoryRecursive(itemPath, feedbackType);
           result.feedbacks.push(...subResult.feedbacks);
@@ -265,11 +436,47 @@ export class FeedbackParser {
   }
 
   /**
-   * Parse a single document file
+   * Parse a single document file, reusing the persisted result while the
+   * file is unchanged. `success` is false when the file could not be read
+   * or parsed; the reason is in `errors`.
    */
   async parseDocumentFile(
     filePath: string, 
     feedbackType: 'primary' | 'secondary'
+  ): Promise<FeedbackExtractionResult> {
+    const cache = getFeedbackParseCache();
+    if (!cache) {
+      return this.parseDocumentFileUncached(filePath, feedbackType);
+    }
+
+    const { feedbacks, errors } = await cache.getOrParse(
+      filePath,
+      feedbackType,
+      () => this.parseDocumentFileUncached(filePath, feedbackType)
+    );
+    return { success: errors.length === 0, feedbacks, errors };
+  }
+
+  getParseCacheStats() {
+    return getFeedbackParseCache()?.getStats() ?? null;
+  }
+
+  // Worker threads have their own cache instances, so a pooled parse passes
+  // their counters in to be reported with this thread's
+  private logParseCacheStats(workerStats: ParseCacheStats | null = null): void {
+    const local = this.getParseCacheStats();
+    const stats = combineParseCacheStats([local, workerStats].filter((s): s is ParseCacheStats => s !== null));
+    if (!stats) return;
+    console.log(
+      `Parse cache: ${stats.memoryHits + stats.diskHits + stats.revalidated} hits ` +
+      `(${stats.memoryHits} memory, ${stats.diskHits} disk, ${stats.revalidated} revalidated), ` +
+      `${stats.misses} misses, ${stats.invalidated} invalidated, hit rate ${(stats.hitRate * 100).toFixed(1)}%`
+    );
+  }
+
+  private async parseDocumentFileUncached(
+    filePath: string, 
+    feedbackType: 'primary' | 'secondary'
   ): Promise<FeedbackExtractionResult> {
     const result: FeedbackExtractionResult = {
       success: true,
@@ -284,19 +491,8 @@ export class FeedbackParser {
       // Extract instructor info from path
       const instructor = this.extractInstructorFromPath(filePath);
       
-      // Read document content (plain text)
-      const content = await this.readDocumentContent(filePath);
-      
-      // For secondary feedback, also read HTML content to extract bold formatting
-      let htmlContent = '';
-      if (feedbackType === 'secondary') {
-        try {
-          htmlContent = await this.readDocumentContentWithFormatting(filePath);
-        } catch (error) {
-          console.warn(`Could not extract HTML formatting from ${filePath}:`, error);
-        }
-      }
-      
+      const { content, htmlContent } = await this.readFeedbackDocument(filePath, feedbackType);
+
       // Parse student feedback from content
       const studentFeedbacks = this.extractStudentFeedbacks(
         content, 
@@ -310,12 +506,45 @@ export class FeedbackParser {
       result.feedbacks.push(...studentFeedbacks);
 
     } catch (error) {
+      result.success = false;
       result.errors.push(`Error parsing file ${filePath}: ${error}`);
     }
 
     return result;
   }
 
+  /**
+   * Read document content (plain text). Secondary feedback also needs the
+   * HTML to extract bold formatting; for .docx both come from a single read
+   * of the file
+   */
+  private async readFeedbackDocument(
+    filePath: string,
+    feedbackType: 'primary' | 'secondary'
+  ): Promise<{ content: string; htmlContent: string }> {
+    let content: string;
+    let htmlContent = '';
+    if (path.extname(filePath).toLowerCase() === '.docx') {
+      const docx = await readDocx(filePath, { html: feedbackType === 'secondary' });
+      content = docx.text;
+      if (docx.html !== null) {
+        htmlContent = docx.html;
+      } else if (docx.htmlError) {
+        console.warn(`Could not extract HTML formatting from ${filePath}:`, docx.htmlError);
+      }
+    } else {
+      content = await this.readDocumentContent(filePath);
+      if (feedbackType === 'secondary') {
+        try {
+          htmlContent = await this.readDocumentContentWithFormatting(filePath);
+        } catch (error) {
+          console.warn(`Could not extract HTML formatting from ${filePath}:`, error);
+        }
+      }
+    }
+    return { content, htmlContent };
+  }
+
   /**
    * Read document content using mammoth for .docx files
    */
@@ -865,13 +1094,7 @@ export class FeedbackParser {
     const cleanContent = this.cleanFeedbackContent(section, feedbackType, htmlSection);
 
     // Generate unique ID combining student name, feedback type, class code, file info, content hash, and timestamp
-    const fileBaseName = path.basename(filePath, path.extname(filePath));
-    const contentHash = require('crypto').createHash('md5').update(section + filePath).digest('hex').substring(0, 8);
-    const instructorName = instructor || 'unknown';
-    const timestamp = Date.now().toString(36); // Base36 timestamp for shorter string
-    const motionStr = motion || 'no-motion';
-    const topicStr = topic || 'no-topic';
-    const uniqueId = `${studentName}_${feedbackType}_${classInfo.classCode}_${classInfo.lessonNumber}_${fileBaseName}_${instructorName}_${motionStr.substring(0, 10)}_${topicStr.substring(0, 10)}_${contentHash}_${timestamp}`.toLowerCase().replace(/\s+/g, '_').replace(/[^a-z0-9_]/g, '');
+    const uniqueId = this.buildUniqueId(studentName, feedbackType, classInfo, filePath, section, instructor, motion, topic);
     
     // Extract rubric scores for secondary feedback
     let rubricScores = {};
@@ -1020,6 +1243,29 @@ export class FeedbackParser {
       .trim();
   }
 
+  /**
+   * Build the unique ID for a feedback record from its student, class, file
+   * info, a hash of the source section and a timestamp
+   */
+  private buildUniqueId(
+    studentName: string,
+    feedbackType: 'primary' | 'secondary',
+    classInfo: any,
+    filePath: string,
+    section: string,
+    instructor?: string,
+    motion?: string,
+    topic?: string
+  ): string {
+    const fileBaseName = path.basename(filePath, path.extname(filePath));
+    const contentHash = require('crypto').createHash('md5').update(section + filePath).digest('hex').substring(0, 8);
+    const instructorName = instructor || 'unknown';
+    const timestamp = Date.now().toString(36); // Base36 timestamp for shorter string
+    const motionStr = motion || 'no-motion';
+    const topicStr = topic || 'no-topic';
+    return `${studentName}_${feedbackType}_${classInfo.classCode}_${classInfo.lessonNumber}_${fileBaseName}_${instructorName}_${motionStr.substring(0, 10)}_${topicStr.substring(0, 10)}_${contentHash}_${timestamp}`.toLowerCase().replace(/\s+/g, '_').replace(/[^a-z0-9_]/g, '');
+  }
+
   /**
    * Extract instructor name from file path
    */
@@ -1343,13 +1589,7 @@ export class FeedbackParser {
     const rubricScores = htmlContent ? this.extractRubricScores(htmlContent, studentName) : {};
     
     // Generate unique ID combining student name, feedback type, class code, file info, content hash, and timestamp
-    const fileBaseName = path.basename(filePath, path.extname(filePath));
-    const contentHash = require('crypto').createHash('md5').update(section + filePath).digest('hex').substring(0, 8);
-    const instructorName = instructor || 'unknown';
-    const timestamp = Date.now().toString(36); // Base36 timestamp for shorter string
-    const motionStr = motion || 'no-motion';
-    const topicStr = topic || 'no-topic';
-    const uniqueId = `${studentName}_${feedbackType}_${classInfo.classCode}_${classInfo.lessonNumber}_${fileBaseName}_${instructorName}_${motionStr.substring(0, 10)}_${topicStr.substring(0, 10)}_${contentHash}_${timestamp}`.toLowerCase().replace(/\s+/g, '_').replace(/[^a-z0-9_]/g, '');
+    const uniqueId = this.buildUniqueId(studentName, feedbackType, classInfo, filePath, section, instructor, motion, topic);
     
     const feedback: StudentFeedback = {
       studentName,
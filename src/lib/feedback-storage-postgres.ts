@@ -1,6 +1,12 @@
+import fs from 'fs';
+import path from 'path';
+import { createHash } from 'crypto';
+import type { PoolClient } from 'pg';
 import { db, executeQuery, findMany, insertOne, deleteMany } from './postgres';
 import { FeedbackParser, StudentFeedback } from './feedback-parser';
-import path from 'path';
+import { hashFileContents } from './feedback-parse-cache';
+import { normalizeStudentName } from './feedback-name-index';
+import { CacheTag, invalidateTags } from './cache/cache-manager';
 
 export interface StoredStudentFeedback {
   id: string;
@@ -38,6 +44,63 @@ export interface StudentSummary {
   last_updated: string;
 }
 
+const UPSERT_BATCH_SIZE = 200;
+const DELETE_BATCH_SIZE = 1000;
+const PROGRESS_INTERVAL_MS = 1000;
+const STATUS_HISTORY = 20;
+// Serializes ingest transactions across app instances
+const INGEST_LOCK_ID = 0x46424b31;
+
+// Columns written from a parsed record. best_aspects, improvement_areas and
+// teacher_comments are filled in later by analysis, so ingestion leaves them
+// alone once a row exists.
+const FEEDBACK_COLUMNS = [
+  'student_name', 'student_id', 'class_code', 'class_name', 'unit_number', 'lesson_number',
+  'topic', 'motion', 'feedback_type', 'content', 'raw_content', 'html_content', 'duration',
+  'file_path', 'instructor', 'rubric_scores'
+] as const;
+
+type FeedbackRow = Record<(typeof FEEDBACK_COLUMNS)[number] | 'unique_id' | 'record_key' | 'row_hash', any>;
+
+export interface IngestOptions {
+  // Parse every document, not only those whose content changed
+  full?: boolean;
+  // Parse worker threads; defaults to FEEDBACK_PARSE_WORKERS, else the core count
+  workers?: number;
+}
+
+export interface IngestResult {
+  success: boolean;
+  totalProcessed: number;
+  totalStudents: number;
+  errors: string[];
+  filesTotal: number;
+  filesChanged: number;
+  filesRemoved: number;
+  inserted: number;
+  updated: number;
+  deleted: number;
+  durationMs: number;
+}
+
+interface SourceFile {
+  filePath: string;
+  feedbackType: 'primary' | 'secondary';
+  contentHash: string;
+  size: number;
+  mtimeMs: number;
+  recordCount: number;
+}
+
+interface StoredRow {
+  id: string;
+  record_key: string | null;
+  row_hash: string | null;
+  student_id: string | null;
+}
+
+let activeIngest: Promise<IngestResult> | null = null;
+
 export class FeedbackStoragePostgres {
   private parser: FeedbackParser;
 
@@ -48,87 +111,411 @@ export class FeedbackStoragePostgres {
   }
 
   /**
-   * Parse and store all feedback from the data directory
+   * Bring parsed_student_feedback in line with the documents in the data
+   * directory.
+   *
+   * Only documents whose content hash differs from the one recorded at their
+   * last ingest are parsed. Their records are diffed against the stored rows
+   * by record key and row hash, and the resulting inserts, updates and
+   * deletes (plus rows of documents that no longer exist) are applied in
+   * batches inside a single transaction, so readers see either the previous
+   * data or the new data, never an empty or half-written table. Progress is
+   * recorded in feedback_parsing_status as the run goes (see
+   * getParsingStatus). A call made while a run is in flight joins that run.
    */
-  async parseAndStoreFeedback(): Promise<{
-    success: boolean;
-    totalProcessed: number;
-    totalStudents: number;
-    errors: string[];
-  }> {
-    console.log('Starting feedback parsing and storage...');
-    
+  async parseAndStoreFeedback(options: IngestOptions = {}): Promise<IngestResult> {
+    if (!activeIngest) {
+      activeIngest = this.ingest(options).finally(() => {
+        activeIngest = null;
+      });
+    }
+    return activeIngest;
+  }
+
+  private async ingest(options: IngestOptions): Promise<IngestResult> {
+    const started = Date.now();
+    const mode = options.full ? 'full' : 'incremental';
+    const errors: string[] = [];
+    const counts = { filesTotal: 0, filesChanged: 0, filesRemoved: 0, inserted: 0, updated: 0, deleted: 0 };
+    console.log(`Starting ${mode} feedback ingestion...`);
+
+    let statusId: string | null = null;
+    let lastProgress = 0;
+    const progress = async (fields: Record<string, any>, force = false) => {
+      if (!statusId || (!force && Date.now() - lastProgress < PROGRESS_INTERVAL_MS)) return;
+      lastProgress = Date.now();
+      await this.updateParsingStatus(statusId, fields);
+    };
+
     try {
-      // Clear existing data
-      await this.clearExistingData();
-      
-      // Parse feedback from files
-      const feedbackData = await this.parser.parseAllFeedback();
-      console.log(`Parsed ${feedbackData.length} feedback records`);
-
-      // Store in database with progress tracking
-      let processedCount = 0;
-      const errors: string[] = [];
-      const batchSize = 50;
-
-      for (let i = 0; i < feedbackData.length; i += batchSize) {
-        const batch = feedbackData.slice(i, i + batchSize);
-        
-        for (const feedback of batch) {
-          try {
-            await this.storeFeedback(feedback);
-            processedCount++;
-            
-            if (processedCount % 100 === 0) {
-              console.log(`Processed ${processedCount}/${feedbackData.length} feedback records`);
-            }
-          } catch (error) {
-            const errorMsg = `Error storing feedback for ${feedback.studentName}: ${error instanceof Error ? error.message : 'Unknown error'}`;
-            console.error(errorMsg);
-            errors.push(errorMsg);
-          }
+      statusId = await this.startParsingStatus(mode);
+
+      // Find the documents whose content changed since they were ingested
+      const files = await this.parser.listDocumentFiles();
+      if (files.length === 0) {
+        throw new Error('No feedback documents found; refusing to replace stored feedback with nothing');
+      }
+
+      const known = await this.loadSourceFiles();
+      const changed: SourceFile[] = [];
+      const touched: SourceFile[] = [];
+
+      for (const file of files) {
+        const stat = await fs.promises.stat(file.filePath).catch(() => null);
+        if (!stat) continue;
+
+        const previous = options.full ? undefined : known.get(file.filePath);
+        const sameType = previous?.feedbackType === file.feedbackType;
+        if (previous && sameType && previous.size === stat.size && previous.mtimeMs === stat.mtimeMs) {
+          continue;
+        }
+
+        const contentHash = await hashFileContents(file.filePath);
+        const current = { ...file, contentHash, size: stat.size, mtimeMs: stat.mtimeMs, recordCount: 0 };
+        if (previous && sameType && previous.contentHash === contentHash) {
+          // Copied or touched, same bytes: only the recorded stat moves
+          touched.push({ ...current, recordCount: previous.recordCount });
+        } else {
+          changed.push(current);
+        }
+      }
+
+      const present = new Set(files.map(file => file.filePath));
+      const removed = [...known.keys()].filter(filePath => !present.has(filePath));
+      counts.filesTotal = files.length;
+      counts.filesChanged = changed.length;
+      counts.filesRemoved = removed.length;
+
+      await progress({
+        phase: 'parsing',
+        files_total: counts.filesTotal,
+        files_changed: counts.filesChanged,
+        files_removed: counts.filesRemoved
+      }, true);
+
+      // Parse them, off the main thread
+      const parsed: { file: SourceFile; feedbacks: StudentFeedback[] }[] = [];
+      let filesParsed = 0;
+
+      for await (const result of this.parser.streamFeedbackFiles(changed, { workers: options.workers })) {
+        const file = changed[filesParsed++];
+        if (result.errors.length > 0) {
+          // Keep what is stored for this document; it is retried next run
+          errors.push(...result.errors);
+        } else {
+          parsed.push({ file: { ...file, recordCount: result.feedbacks.length }, feedbacks: result.feedbacks });
         }
+        await progress({ files_parsed: filesParsed });
       }
 
-      // Get unique students count
-      const studentsResult = await executeQuery(
-        'SELECT COUNT(DISTINCT student_name) as count FROM parsed_student_feedback'
+      // Diff the parsed records against the stored rows of the same files
+      await progress({ phase: 'diffing', files_parsed: filesParsed }, true);
+
+      const studentIds = await this.lookupStudentIds(
+        parsed.flatMap(({ feedbacks }) => feedbacks.map(feedback => feedback.studentName))
       );
-      const totalStudents = studentsResult.rows[0]?.count || 0;
+      const stored = await this.loadStoredRows(parsed.map(({ file }) => file.filePath));
+
+      const upserts: FeedbackRow[] = [];
+      const deleteIds: string[] = [];
+      const affectedStudents = new Set<string>();
 
-      // Update parsing status
-      await this.updateParsingStatus(processedCount, totalStudents, errors);
+      for (const { file, feedbacks } of parsed) {
+        const existing = stored.get(file.filePath) ?? new Map<string, StoredRow>();
 
-      console.log(`✅ Parsing completed: ${processedCount} records, ${totalStudents} students, ${errors.length} errors`);
+        for (const row of this.toRows(file.filePath, feedbacks, studentIds)) {
+          const current = existing.get(row.record_key);
+          existing.delete(row.record_key);
+          if (current?.row_hash === row.row_hash) continue;
+
+          if (current) counts.updated++;
+          else counts.inserted++;
+          upserts.push(row);
+          if (row.student_id) affectedStudents.add(row.student_id);
+          if (current?.student_id) affectedStudents.add(current.student_id);
+        }
+
+        // Whatever is left no longer appears in the document
+        for (const row of existing.values()) {
+          deleteIds.push(row.id);
+          if (row.student_id) affectedStudents.add(row.student_id);
+        }
+      }
+
+      await progress({ phase: 'applying' }, true);
+
+      await db.transaction(async client => {
+        await client.query('SELECT pg_advisory_xact_lock($1)', [INGEST_LOCK_ID]);
+
+        for (let i = 0; i < deleteIds.length; i += DELETE_BATCH_SIZE) {
+          const result = await client.query(
+            'DELETE FROM parsed_student_feedback WHERE id = ANY($1::uuid[])',
+            [deleteIds.slice(i, i + DELETE_BATCH_SIZE)]
+          );
+          counts.deleted += result.rowCount ?? 0;
+        }
+
+        // Rows of documents that were removed, or that predate source
+        // tracking and whose file is gone
+        const orphans = await client.query(
+          'DELETE FROM parsed_student_feedback WHERE NOT (file_path = ANY($1::text[])) RETURNING student_id',
+          [files.map(file => file.filePath)]
+        );
+        counts.deleted += orphans.rowCount ?? 0;
+        for (const row of orphans.rows) {
+          if (row.student_id) affectedStudents.add(row.student_id);
+        }
+
+        for (let i = 0; i < upserts.length; i += UPSERT_BATCH_SIZE) {
+          await this.upsertRows(client, upserts.slice(i, i + UPSERT_BATCH_SIZE));
+        }
+
+        await this.saveSourceFiles(client, [...touched, ...parsed.map(({ file }) => file)]);
+        if (removed.length > 0) {
+          await client.query('DELETE FROM feedback_source_files WHERE file_path = ANY($1::text[])', [removed]);
+        }
+      });
+
+      if (affectedStudents.size > 0) {
+        await invalidateTags([...affectedStudents].map(CacheTag.student)).catch(error => {
+          console.warn('Could not invalidate student caches after feedback ingest:', error);
+        });
+      }
+
+      const totals = await db.query(
+        'SELECT COUNT(*) AS records, COUNT(DISTINCT student_name) AS students FROM parsed_student_feedback'
+      );
+      const totalRecords = parseInt(totals.rows[0]?.records) || 0;
+      const totalStudents = parseInt(totals.rows[0]?.students) || 0;
+
+      await this.updateParsingStatus(statusId, {
+        phase: 'complete',
+        is_complete: true,
+        parsing_completed_at: new Date().toISOString(),
+        total_files_processed: filesParsed,
+        total_feedback_records: totalRecords,
+        total_students: totalStudents,
+        files_parsed: filesParsed,
+        records_inserted: counts.inserted,
+        records_updated: counts.updated,
+        records_deleted: counts.deleted,
+        parsing_errors: JSON.stringify(errors)
+      });
+      await this.pruneParsingStatus();
+
+      const durationMs = Date.now() - started;
+      console.log(
+        `✅ Feedback ingest (${mode}) completed in ${durationMs}ms: ${counts.filesChanged}/${counts.filesTotal} files changed, ` +
+        `${counts.filesRemoved} removed; ${counts.inserted} inserted, ${counts.updated} updated, ${counts.deleted} deleted, ` +
+        `${errors.length} errors`
+      );
 
       return {
         success: true,
-        totalProcessed: processedCount,
-        totalStudents: parseInt(totalStudents),
-        errors
+        totalProcessed: counts.inserted + counts.updated,
+        totalStudents,
+        errors,
+        ...counts,
+        durationMs
       };
 
     } catch (error) {
       console.error('Error in parseAndStoreFeedback:', error);
+      errors.push(error instanceof Error ? error.message : 'Unknown error');
+
+      if (statusId) {
+        await this.updateParsingStatus(statusId, {
+          phase: 'failed',
+          parsing_completed_at: new Date().toISOString(),
+          parsing_errors: JSON.stringify(errors)
+        }).catch(statusError => console.error('Could not record failed feedback ingest:', statusError));
+      }
+
       return {
         success: false,
         totalProcessed: 0,
         totalStudents: 0,
-        errors: [error instanceof Error ? error.message : 'Unknown error']
+        errors,
+        ...counts,
+        inserted: 0,
+        updated: 0,
+        deleted: 0,
+        durationMs: Date.now() - started
       };
     }
   }
 
   /**
-   * Clear existing feedback data
+   * Rows for one document's records. The record key identifies a record
+   * across re-parses of the file (the parser's uniqueId embeds a timestamp,
+   * so it cannot); the row hash tells whether anything stored changed.
    */
-  private async clearExistingData(): Promise<void> {
-    console.log('Clearing existing feedback data...');
-    
-    await executeQuery('DELETE FROM parsed_student_feedback');
-    await executeQuery('DELETE FROM feedback_parsing_status');
-    
-    console.log('Existing data cleared');
+  private toRows(
+    filePath: string,
+    feedbacks: StudentFeedback[],
+    studentIds: Map<string, string>
+  ): FeedbackRow[] {
+    const occurrences = new Map<string, number>();
+
+    return feedbacks.map(feedback => {
+      const identity = [
+        filePath,
+        feedback.feedbackType,
+        normalizeStudentName(feedback.studentName),
+        feedback.unitNumber || '',
+        feedback.lessonNumber || ''
+      ].join('\0');
+      const occurrence = occurrences.get(identity) ?? 0;
+      occurrences.set(identity, occurrence + 1);
+
+      const columns = this.toColumns(feedback, studentIds.get(normalizeStudentName(feedback.studentName)) ?? null);
+      return {
+        ...columns,
+        unique_id: feedback.uniqueId,
+        record_key: createHash('sha1').update(`${identity}\0${occurrence}`).digest('hex'),
+        row_hash: createHash('sha1').update(JSON.stringify(FEEDBACK_COLUMNS.map(column => columns[column]))).digest('hex')
+      };
+    });
+  }
+
+  private toColumns(feedback: StudentFeedback, studentId: string | null): Record<(typeof FEEDBACK_COLUMNS)[number], any> {
+    return {
+      student_name: feedback.studentName,
+      student_id: studentId, // Link to student record
+      class_code: feedback.classCode || '',
+      class_name: feedback.className || '',
+      unit_number: feedback.unitNumber || '',
+      lesson_number: feedback.lessonNumber || null,
+      topic: feedback.topic || null,
+      motion: feedback.motion || null,
+      feedback_type: feedback.feedbackType,
+      content: feedback.content,
+      raw_content: feedback.rawContent || null,
+      html_content: feedback.htmlContent || null,
+      duration: feedback.duration || null,
+      file_path: feedback.filePath,
+      instructor: feedback.instructor || 'Unknown', // CRITICAL: Store instructor
+      rubric_scores: feedback.rubricScores ? JSON.stringify(feedback.rubricScores) : null
+    };
+  }
+
+  private async upsertRows(client: PoolClient, rows: FeedbackRow[]): Promise<void> {
+    const columns = [...FEEDBACK_COLUMNS, 'unique_id', 'record_key', 'row_hash'] as const;
+    const params: any[] = [];
+    const values = rows.map(row => {
+      const placeholders = columns.map(column => {
+        params.push(row[column]);
+        return `$${params.length}`;
+      });
+      return `(${placeholders.join(', ')}, NOW())`;
+    });
+
+    // unique_id keeps the value from the first insert; record_key is what
+    // identifies the row from then on
+    const updates = [...FEEDBACK_COLUMNS, 'row_hash', 'parsed_at']
+      .map(column => `${column} = EXCLUDED.${column}`)
+      .join(', ');
+
+    await client.query(
+      `INSERT INTO parsed_student_feedback (${columns.join(', ')}, parsed_at)
+       VALUES ${values.join(', ')}
+       ON CONFLICT (record_key) DO UPDATE SET ${updates}`,
+      params
+    );
+  }
+
+  private async loadSourceFiles(): Promise<Map<string, SourceFile>> {
+    const result = await db.query(
+      'SELECT file_path, feedback_type, content_hash, size, mtime_ms, record_count FROM feedback_source_files'
+    );
+
+    const files = new Map<string, SourceFile>();
+    for (const row of result.rows) {
+      files.set(row.file_path, {
+        filePath: row.file_path,
+        feedbackType: row.feedback_type,
+        contentHash: row.content_hash,
+        size: Number(row.size),
+        mtimeMs: Number(row.mtime_ms),
+        recordCount: row.record_count
+      });
+    }
+    return files;
+  }
+
+  private async saveSourceFiles(client: PoolClient, files: SourceFile[]): Promise<void> {
+    for (let i = 0; i < files.length; i += UPSERT_BATCH_SIZE) {
+      const batch = files.slice(i, i + UPSERT_BATCH_SIZE);
+      const params: any[] = [];
+      const values = batch.map(file => {
+        params.push(file.filePath, file.feedbackType, file.contentHash, file.size, file.mtimeMs, file.recordCount);
+        const base = params.length - 6;
+        return `($${base + 1}, $${base + 2}, $${base + 3}, $${base + 4}, $${base + 5}, $${base + 6}, NOW())`;
+      });
+
+      await client.query(
+        `INSERT INTO feedback_source_files (file_path, feedback_type, content_hash, size, mtime_ms, record_count, ingested_at)
+         VALUES ${values.join(', ')}
+         ON CONFLICT (file_path) DO UPDATE SET
+           feedback_type = EXCLUDED.feedback_type,
+           content_hash = EXCLUDED.content_hash,
+           size = EXCLUDED.size,
+           mtime_ms = EXCLUDED.mtime_ms,
+           record_count = EXCLUDED.record_count,
+           ingested_at = EXCLUDED.ingested_at`,
+        params
+      );
+    }
+  }
+
+  /**
+   * Stored rows of the given documents, grouped by file and keyed by record
+   * key. Rows written before record keys existed are keyed by id so they
+   * never match and get replaced.
+   */
+  private async loadStoredRows(filePaths: string[]): Promise<Map<string, Map<string, StoredRow>>> {
+    const stored = new Map<string, Map<string, StoredRow>>();
+    if (filePaths.length === 0) return stored;
+
+    const result = await db.query(
+      `SELECT id, file_path, record_key, row_hash, student_id
+       FROM parsed_student_feedback
+       WHERE file_path = ANY($1::text[])`,
+      [filePaths]
+    );
+
+    for (const row of result.rows) {
+      let rows = stored.get(row.file_path);
+      if (!rows) {
+        rows = new Map();
+        stored.set(row.file_path, rows);
+      }
+      rows.set(row.record_key ?? `legacy:${row.id}`, row);
+    }
+    return stored;
+  }
+
+  /**
+   * Student ids by normalized name, resolved in one query instead of one
+   * per record
+   */
+  private async lookupStudentIds(names: string[]): Promise<Map<string, string>> {
+    const ids = new Map<string, string>();
+    const keys = [...new Set(names.map(normalizeStudentName))];
+    if (keys.length === 0) return ids;
+
+    try {
+      const result = await db.query(
+        'SELECT id, LOWER(TRIM(name)) AS name_key FROM students WHERE LOWER(TRIM(name)) = ANY($1::text[])',
+        [keys]
+      );
+      for (const row of result.rows) {
+        if (!ids.has(row.name_key)) ids.set(row.name_key, row.id);
+      }
+    } catch (error) {
+      console.log('Could not look up student IDs for feedback records:', error);
+    }
+    return ids;
   }
 
   /**
@@ -150,26 +537,11 @@ export class FeedbackStoragePostgres {
     }
 
     const data = {
-      student_name: feedback.studentName,
-      student_id: studentId, // Link to student record
-      class_code: feedback.classCode || '',
-      class_name: feedback.className || '',
-      unit_number: feedback.unitNumber || '',
-      lesson_number: feedback.lessonNumber || null,
-      topic: feedback.topic || null,
-      motion: feedback.motion || null,
-      feedback_type: feedback.feedbackType,
-      content: feedback.content,
-      raw_content: feedback.rawContent || null,
-      html_content: feedback.htmlContent || null,
+      ...this.toColumns(feedback, studentId),
       best_aspects: null, // Will be extracted from content during analysis
       improvement_areas: null, // Will be extracted from content during analysis  
       teacher_comments: null, // Will be extracted from content during analysis
-      duration: feedback.duration || null,
-      file_path: feedback.filePath,
       unique_id: feedback.uniqueId || null,
-      instructor: feedback.instructor || 'Unknown', // CRITICAL: Store instructor
-      rubric_scores: feedback.rubricScores ? JSON.stringify(feedback.rubricScores) : null,
       parsed_at: new Date().toISOString()
     };
 
@@ -234,10 +606,12 @@ export class FeedbackStoragePostgres {
    */
   async isDataReady(): Promise<boolean> {
     try {
+      // Any completed ingest will do: while a later one runs, the rows it
+      // replaces stay readable until it commits
       const result = await executeQuery(
-        'SELECT is_complete FROM feedback_parsing_status ORDER BY created_at DESC LIMIT 1'
+        'SELECT EXISTS (SELECT 1 FROM feedback_parsing_status WHERE is_complete) AS ready'
       );
-      return result.rows[0]?.is_complete || false;
+      return result.rows[0]?.ready || false;
     } catch (error) {
       console.error('Error checking data readiness:', error);
       return false;
@@ -245,34 +619,51 @@ export class FeedbackStoragePostgres {
   }
 
   /**
-   * Get parsing status
+   * Get parsing status: the latest ingest, finished or in flight. `progress`
+   * is the share of changed files parsed so far (1 once complete).
    */
   async getParsingStatus() {
     const result = await executeQuery(
       'SELECT * FROM feedback_parsing_status ORDER BY created_at DESC LIMIT 1'
     );
-    return result.rows[0] || null;
+    const status = result.rows[0];
+    if (!status) return null;
+
+    const progress = status.is_complete
+      ? 1
+      : status.files_changed > 0 ? status.files_parsed / status.files_changed : 0;
+    return { ...status, progress };
+  }
+
+  private async startParsingStatus(mode: 'full' | 'incremental'): Promise<string> {
+    const result = await db.query(
+      `INSERT INTO feedback_parsing_status (mode, phase, parsing_started_at, is_complete)
+       VALUES ($1, 'scanning', NOW(), false)
+       RETURNING id`,
+      [mode]
+    );
+    return result.rows[0].id;
   }
 
   /**
    * Update parsing status
    */
-  private async updateParsingStatus(
-    totalProcessed: number, 
-    totalStudents: number, 
-    errors: string[]
-  ): Promise<void> {
-    const data = {
-      total_files_processed: totalProcessed,
-      total_feedback_records: totalProcessed,
-      total_students: totalStudents,
-      parsing_started_at: new Date().toISOString(),
-      parsing_completed_at: new Date().toISOString(),
-      parsing_errors: errors,
-      is_complete: true
-    };
+  private async updateParsingStatus(statusId: string, fields: Record<string, any>): Promise<void> {
+    const columns = Object.keys(fields);
+    const assignments = columns.map((column, index) => `${column} = $${index + 2}`);
 
-    await insertOne('feedback_parsing_status', data);
+    await db.query(
+      `UPDATE feedback_parsing_status SET ${assignments.join(', ')}, updated_at = NOW() WHERE id = $1`,
+      [statusId, ...columns.map(column => fields[column])]
+    );
+  }
+
+  private async pruneParsingStatus(): Promise<void> {
+    await db.query(
+      `DELETE FROM feedback_parsing_status
+       WHERE id NOT IN (SELECT id FROM feedback_parsing_status ORDER BY created_at DESC LIMIT $1)`,
+      [STATUS_HISTORY]
+    );
   }
 
   /**
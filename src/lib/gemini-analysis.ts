@@ -1,6 +1,8 @@
 import { GoogleGenAI } from '@google/genai';
 import { StoredStudentFeedback } from './feedback-storage';
-import { db } from './postgres';
+import { type AIResultKeyParts, cachedAIResult, getAIResultCache } from './ai-result-cache';
+import { promptTemplateVersion } from './prompt-manager';
+import { estimateTokens, geminiBaseUrl, getGeminiScheduler, type GeminiScheduler } from './gemini-scheduler';
 import fs from 'fs';
 import path from 'path';
 
@@ -67,146 +69,117 @@ export interface ClassInsightsResult {
 }
 
 export class GeminiAnalyzer {
-  private apiKeys: string[];
-  private currentKeyIndex: number = 0;
+  protected scheduler: GeminiScheduler;
   private prompts: Map<string, string>;
-  private analysisCache: Map<string, { analysis: StudentAnalysisResult; timestamp: number }>;
+  protected readonly model = 'gemini-2.5-flash';
+  private readonly generationConfig = {
+    thinkingConfig: {
+      thinkingBudget: -1,
+    },
+    responseMimeType: 'application/json',
+  };
 
   constructor() {
-    // Get all 4 API keys
-    this.apiKeys = [
-      process.env.GEMINI_API_KEY_1,
-      process.env.GEMINI_API_KEY_2, 
-      process.env.GEMINI_API_KEY_3,
-      process.env.GEMINI_API_KEY_4
-    ].filter(key => key) as string[];
+    // Calls are spread over all configured API keys by the shared scheduler
+    this.scheduler = getGeminiScheduler();
     
-    if (this.apiKeys.length === 0) {
+    if (this.scheduler.keyCount === 0) {
       throw new Error('No Gemini API keys found. Please set GEMINI_API_KEY_1, GEMINI_API_KEY_2, GEMINI_API_KEY_3, GEMINI_API_KEY_4 environment variables.');
     }
     
-    console.log(`🔑 Initialized with ${this.apiKeys.length} API keys`);
+    console.log(`🔑 Initialized with ${this.scheduler.keyCount} API keys`);
     
-    // Load prompts and initialize in-memory cache (for this session only)
+    // Load prompts
     this.prompts = this.loadPrompts();
-    this.analysisCache = new Map();
-    
-    // Ensure database cache table exists
-    this.ensureCacheTable();
-  }
-
-  /**
-   * Get next API key in rotation
-   */
-  private getNextApiKey(): string {
-    const key = this.apiKeys[this.currentKeyIndex];
-    this.currentKeyIndex = (this.currentKeyIndex + 1) % this.apiKeys.length;
-    console.log(`🔄 Using API key ${this.currentKeyIndex + 1}/${this.apiKeys.length}`);
-    return key;
   }
 
   /**
-   * Create AI client instance with current API key
+   * Create AI client instance for a scheduled API key
    */
-  private createClient() {
-    const apiKey = this.getNextApiKey();
+  protected createClient(apiKey: string) {
+    const baseUrl = geminiBaseUrl();
     return new GoogleGenAI({
-      apiKey: apiKey
+      apiKey: apiKey,
+      ...(baseUrl && { httpOptions: { baseUrl } })
     });
   }
 
   /**
-   * Get cached analysis from database if available and recent
+   * Send a prompt through the scheduler and return the response text
    */
-  private async getCachedAnalysis(studentName: string): Promise<StudentAnalysisResult | null> {
-    try {
-      const result = await db.query(`
-        SELECT analysis_data, created_at, feedback_hash
-        FROM student_analysis_cache 
-        WHERE student_name = $1 
-        AND created_at > NOW() - INTERVAL '24 hours'
-        ORDER BY created_at DESC 
-        LIMIT 1
-      `, [studentName]);
-
-      if (result.rows.length > 0) {
-        const cached = result.rows[0];
-        console.log(`📦 Using cached analysis for ${studentName} from ${cached.created_at}`);
-        return JSON.parse(cached.analysis_data);
+  private async generateText(prompt: string, label: string): Promise<string | undefined> {
+    const contents = [{
+      role: 'user',
+      parts: [{ text: prompt }]
+    }];
+
+    // Generate content with Gemini 2.5 Flash
+    const response = await this.scheduler.run(
+      apiKey => this.createClient(apiKey).models.generateContent({
+        model: this.model,
+        config: this.generationConfig,
+        contents
+      }),
+      {
+        estimatedTokens: estimateTokens(prompt, 8192),
+        usedTokens: result => result.usageMetadata?.totalTokenCount,
+        label
       }
-    } catch (error) {
-      console.error(`Error getting cached analysis for ${studentName}:`, error);
-    }
-    return null;
+    );
+    return response.text;
   }
 
   /**
-   * Cache analysis result in database
+   * The feedback fields the analysis prompt uses, in chronological order,
+   * so the same feedback always produces the same input data and cache key
    */
-  private async cacheAnalysis(studentName: string, analysis: StudentAnalysisResult, feedbackHash: string): Promise<void> {
-    try {
-      await db.query(`
-        INSERT INTO student_analysis_cache (student_name, analysis_data, feedback_hash, created_at)
-        VALUES ($1, $2, $3, NOW())
-        ON CONFLICT (student_name) 
-        DO UPDATE SET 
-          analysis_data = EXCLUDED.analysis_data,
-          feedback_hash = EXCLUDED.feedback_hash,
-          created_at = EXCLUDED.created_at
-      `, [studentName, JSON.stringify(analysis), feedbackHash]);
-      
-      console.log(`💾 Cached analysis for ${studentName} in database`);
-    } catch (error) {
-      console.error(`Error caching analysis for ${studentName}:`, error);
-    }
+  protected buildStudentInput(studentName: string, feedbacks: StoredStudentFeedback[]) {
+    const sessions = [...feedbacks].sort((a, b) =>
+      new Date(a.parsed_at).getTime() - new Date(b.parsed_at).getTime() ||
+      String(a.unit_number).localeCompare(String(b.unit_number), undefined, { numeric: true })
+    );
+    return {
+      studentName,
+      level: sessions[0].feedback_type === 'primary' ? 'primary' : 'secondary',
+      feedbackSessions: sessions.map(f => ({
+        unitNumber: f.unit_number,
+        date: f.parsed_at,
+        feedbackType: f.feedback_type,
+        motion: (f.motion || '').trim(),
+        content: (f.content || '').trim(),
+        bestAspects: (f.best_aspects || '').trim(),
+        improvementAreas: (f.improvement_areas || '').trim(),
+        teacherComments: (f.teacher_comments || '').trim(),
+        duration: f.duration || ''
+      }))
+    };
   }
 
   /**
-   * Create hash of feedback content to detect changes
+   * AI result cache key of a student analysis
    */
-  private createFeedbackHash(feedbacks: StoredStudentFeedback[]): string {
-    const content = feedbacks
-      .map(f => `${f.unit_number}:${f.content}:${f.parsed_at}`)
-      .sort()
-      .join('|');
-    
-    // Simple hash function
-    let hash = 0;
-    for (let i = 0; i < content.length; i++) {
-      const char = content.charCodeAt(i);
-      hash = ((hash << 5) - hash) + char;
-      hash = hash & hash; // Convert to 32-bit integer
-    }
-    return hash.toString();
+  protected studentAnalysisKey(inputData: ReturnType<GeminiAnalyzer['buildStudentInput']>): AIResultKeyParts {
+    return {
+      kind: 'student-analysis',
+      inputs: inputData,
+      promptVersion: promptTemplateVersion(this.prompts.get('studentAnalysis') || this.getDefaultStudentPrompt()),
+      model: this.model,
+      params: this.generationConfig
+    };
   }
 
   /**
-   * Ensure cache table exists
+   * Cached analysis for exactly this feedback, if the model has seen it
    */
-  private async ensureCacheTable(): Promise<void> {
-    try {
-      await db.query(`
-        CREATE TABLE IF NOT EXISTS student_analysis_cache (
-          id SERIAL PRIMARY KEY,
-          student_name VARCHAR(255) UNIQUE NOT NULL,
-          analysis_data JSONB NOT NULL,
-          feedback_hash VARCHAR(255) NOT NULL,
-          created_at TIMESTAMP DEFAULT NOW()
-        )
-      `);
-      
-      await db.query(`
-        CREATE INDEX IF NOT EXISTS idx_student_analysis_cache_name 
-        ON student_analysis_cache(student_name)
-      `);
-      
-      await db.query(`
-        CREATE INDEX IF NOT EXISTS idx_student_analysis_cache_created 
-        ON student_analysis_cache(created_at)
-      `);
-    } catch (error) {
-      console.error('Error ensuring cache table exists:', error);
+  protected async getCachedAnalysis(
+    studentName: string,
+    feedbacks: StoredStudentFeedback[]
+  ): Promise<StudentAnalysisResult | null> {
+    const cache = getAIResultCache();
+    if (!cache || feedbacks.length === 0) {
+      return null;
     }
+    return cache.get<StudentAnalysisResult>(this.studentAnalysisKey(this.buildStudentInput(studentName, feedbacks)));
   }
 
   /**
@@ -245,7 +218,8 @@ export class GeminiAnalyzer {
   }
 
   /**
-   * Analyze individual student performance
+   * Analyze individual student performance. The result is cached by the
+   * feedback content, so the model is only called again when it changes.
    */
   async analyzeStudent(
     studentName: string,
@@ -256,65 +230,27 @@ export class GeminiAnalyzer {
       return null;
     }
 
-    // Create feedback hash to detect changes
-    const feedbackHash = this.createFeedbackHash(feedbacks);
+    // Prepare input data
+    const inputData = this.buildStudentInput(studentName, feedbacks);
 
-    // Check database cache first
-    const cached = await this.getCachedAnalysis(studentName);
-    if (cached) {
-      return cached;
-    }
+    // Get the prompt
+    const basePrompt = this.prompts.get('studentAnalysis') || this.getDefaultStudentPrompt();
+    
+    // Construct the full prompt
+    const prompt = `${basePrompt}\n\nInput Data:\n${JSON.stringify(inputData, null, 2)}\n\nPlease analyze this student's performance and provide the structured output as specified.`;
+
+    return cachedAIResult(
+      this.studentAnalysisKey(inputData),
+      () => this.requestStudentAnalysis(studentName, prompt),
+      { promptLength: prompt.length }
+    );
+  }
 
+  private async requestStudentAnalysis(studentName: string, prompt: string): Promise<StudentAnalysisResult | null> {
     console.log(`🤖 Analyzing ${studentName} with Gemini AI...`);
 
-    // Prepare input data
-    const level = feedbacks[0].feedback_type === 'primary' ? 'primary' : 'secondary';
-    const inputData = {
-      studentName,
-      level,
-      feedbackSessions: feedbacks.map(f => ({
-        unitNumber: f.unit_number,
-        date: f.parsed_at,
-        feedbackType: f.feedback_type,
-        motion: f.motion || '',
-        content: f.content,
-        bestAspects: f.best_aspects || '',
-        improvementAreas: f.improvement_areas || '',
-        teacherComments: f.teacher_comments || '',
-        duration: f.duration || ''
-      }))
-    };
-
     try {
-      // Get the prompt
-      const basePrompt = this.prompts.get('studentAnalysis') || this.getDefaultStudentPrompt();
-      
-      // Construct the full prompt
-      const prompt = `${basePrompt}\n\nInput Data:\n${JSON.stringify(inputData, null, 2)}\n\nPlease analyze this student's performance and provide the structured output as specified.`;
-
-      // Create fresh AI client with next API key
-      const ai = this.createClient();
-
-      const config = {
-        thinkingConfig: {
-          thinkingBudget: -1,
-        },
-        responseMimeType: 'application/json',
-      };
-
-      const contents = [{
-        role: 'user',
-        parts: [{ text: prompt }]
-      }];
-
-      // Generate content with Gemini 2.5 Flash
-      const response = await ai.models.generateContent({
-        model: 'gemini-2.5-flash',
-        config,
-        contents
-      });
-
-      const text = response.text;
+      const text = await this.generateText(prompt, `analysis of ${studentName}`);
       
       // Check if response is empty or invalid
       if (!text || text.trim().length === 0) {
@@ -331,9 +267,6 @@ export class GeminiAnalyzer {
           return null;
         }
         
-        // Cache successful result in database
-        await this.cacheAnalysis(studentName, analysis, feedbackHash);
-        
         console.log(`✅ Successfully analyzed ${studentName} with AI`);
         return analysis;
       } catch (parseError) {
@@ -384,61 +317,42 @@ export class GeminiAnalyzer {
     let cachedCount = 0;
     let failedCount = 0;
     
-    for (const studentName of batch) {
+    // All students are submitted at once; the scheduler paces the calls to
+    // the keys' quotas and retries rate-limited ones on another key
+    const outcomes = await Promise.all(batch.map(async studentName => {
       try {
         const feedbacks = studentsData.get(studentName) || [];
         
         // Check if we have cached result
-        const cached = this.getCachedAnalysis(studentName);
+        const cached = await this.getCachedAnalysis(studentName, feedbacks);
         if (cached) {
-          analyses.push({ studentName, analysis: cached });
-          cachedCount++;
-        } else {
-          // Process with AI with retry logic
-          let analysis = null;
-          let retryCount = 0;
-          const maxRetries = 2;
-          
-          while (!analysis && retryCount < maxRetries) {
-            try {
-              analysis = await this.analyzeStudent(studentName, feedbacks);
-              
-              // Check if we got a proper analysis
-              if (analysis && analysis.studentMetrics) {
-                analyses.push({ studentName, analysis });
-                processedCount++;
-                break;
-              } else {
-                // AI analysis failed - don't add to results
-                console.log(`⚠️ No analysis available for ${studentName} - skipping`);
-                failedCount++;
-                break;
-              }
-            } catch (retryError) {
-              retryCount++;
-              console.log(`🔄 Retry ${retryCount}/${maxRetries} for ${studentName}`);
-              
-              if (retryCount >= maxRetries) {
-                // Max retries reached - don't add to results
-                console.log(`❌ Max retries reached for ${studentName} - no analysis available`);
-                failedCount++;
-              } else {
-                // Wait longer before retry
-                await new Promise(resolve => setTimeout(resolve, 2000));
-              }
-            }
-          }
-          
-          // Add longer delay between API calls to avoid rate limiting and quota exhaustion
-          if (processedCount > 0) {
-            console.log(`⏱️ Waiting 3 seconds before next API call...`);
-            await new Promise(resolve => setTimeout(resolve, 3000));
-          }
+          return { studentName, analysis: cached, cached: true };
         }
+
+        const analysis = await this.analyzeStudent(studentName, feedbacks);
+        if (!analysis || !analysis.studentMetrics) {
+          // AI analysis failed - don't add to results
+          console.log(`⚠️ No analysis available for ${studentName} - skipping`);
+          return null;
+        }
+        return { studentName, analysis, cached: false };
       } catch (error) {
         console.error(`❌ Failed to analyze ${studentName}:`, error);
-        failedCount++;
         // Don't add any analysis for failed students
+        return null;
+      }
+    }));
+
+    for (const outcome of outcomes) {
+      if (!outcome) {
+        failedCount++;
+        continue;
+      }
+      analyses.push({ studentName: outcome.studentName, analysis: outcome.analysis });
+      if (outcome.cached) {
+        cachedCount++;
+      } else {
+        processedCount++;
       }
     }
     
@@ -476,45 +390,35 @@ export class GeminiAnalyzer {
       }))
     };
 
-    try {
-      const basePrompt = this.prompts.get('classInsights') || this.getDefaultClassPrompt();
-      const prompt = `${basePrompt}\n\nInput Data:\n${JSON.stringify(inputData, null, 2)}\n\nPlease analyze the class performance and provide insights.`;
-
-      // Create fresh AI client with next API key
-      const ai = this.createClient();
-
-      const config = {
-        thinkingConfig: {
-          thinkingBudget: -1,
-        },
-        responseMimeType: 'application/json',
-      };
-
-      const contents = [{
-        role: 'user',
-        parts: [{ text: prompt }]
-      }];
-
-      // Generate content with Gemini 2.5 Flash
-      const response = await ai.models.generateContent({
-        model: 'gemini-2.5-flash',
-        config,
-        contents
-      });
-
-      const text = response.text;
-      
-      if (!text || text.trim().length === 0) {
-        console.error(`❌ Empty response from Gemini for class analysis`);
-        return null;
-      }
-      
-      return JSON.parse(text) as ClassInsightsResult;
+    const basePrompt = this.prompts.get('classInsights') || this.getDefaultClassPrompt();
+    const prompt = `${basePrompt}\n\nInput Data:\n${JSON.stringify(inputData, null, 2)}\n\nPlease analyze the class performance and provide insights.`;
+
+    return cachedAIResult(
+      {
+        kind: 'class-insights',
+        inputs: inputData,
+        promptVersion: promptTemplateVersion(basePrompt),
+        model: this.model,
+        params: this.generationConfig
+      },
+      async () => {
+        try {
+          const text = await this.generateText(prompt, `class insights for ${className}`);
+          
+          if (!text || text.trim().length === 0) {
+            console.error(`❌ Empty response from Gemini for class analysis`);
+            return null;
+          }
+          
+          return JSON.parse(text) as ClassInsightsResult;
 
-    } catch (error) {
-      console.error('Error in class analysis:', error);
-      return null;
-    }
+        } catch (error) {
+          console.error('Error in class analysis:', error);
+          return null;
+        }
+      },
+      { promptLength: prompt.length }
+    );
   }
 
   /**
@@ -1,6 +1,10 @@
 import { GoogleGenAI } from '@google/genai';
 import { StoredStudentFeedback } from './feedback-storage';
 import { StudentAnalysisResult, ClassInsightsResult, GeminiAnalyzer } from './gemini-analysis';
+import { type AIResultKeyParts, aiResultKey, getAIResultCache } from './ai-result-cache';
+import { aiSingleFlight } from './ai-single-flight';
+import { promptTemplateVersion } from './prompt-manager';
+import { estimateTokens } from './gemini-scheduler';
 
 export interface BatchAnalysisResult {
   analyses: Array<{
@@ -15,7 +19,19 @@ export interface BatchAnalysisResult {
 
 export class GeminiBatchAnalyzer extends GeminiAnalyzer {
   private readonly BATCH_SIZE = 10; // Process 10 students at once
-  private readonly MAX_CONCURRENT_BATCHES = 4; // Use all 4 API keys concurrently
+  private readonly batchConfig = {
+    thinkingConfig: {
+      thinkStyle: 'detailed' as any,
+      maxThinkingTokens: 8192
+    },
+    generationConfig: {
+      temperature: 0.7,
+      topK: 40,
+      topP: 0.95,
+      maxOutputTokens: 8192,
+      responseMimeType: "application/json"
+    }
+  };
 
   /**
    * Analyze multiple students in parallel batches
@@ -32,8 +48,8 @@ export class GeminiBatchAnalyzer extends GeminiAnalyzer {
     const students = Array.from(studentsData.entries());
     
     // Check cache for all students first
-    const cachePromises = students.map(async ([studentName]) => {
-      const cached = await this.getCachedAnalysis(studentName);
+    const cachePromises = students.map(async ([studentName, feedbacks]) => {
+      const cached = await this.getCachedBatchAnalysis(studentName, feedbacks);
       if (cached) {
         totalCached++;
         return { studentName, analysis: cached, fromCache: true };
@@ -58,20 +74,15 @@ export class GeminiBatchAnalyzer extends GeminiAnalyzer {
     // Process uncached students in batches
     const batches = this.createBatches(uncachedStudents, this.BATCH_SIZE);
     
-    // Process batches concurrently (up to MAX_CONCURRENT_BATCHES at a time)
-    for (let i = 0; i < batches.length; i += this.MAX_CONCURRENT_BATCHES) {
-      const concurrentBatches = batches.slice(i, i + this.MAX_CONCURRENT_BATCHES);
-      
-      const batchPromises = concurrentBatches.map((batch, index) => 
-        this.processBatch(batch, i + index)
-      );
+    // Submit every batch at once; the scheduler runs as many concurrently
+    // as the keys' quotas allow and retries rate-limited calls on other keys
+    const batchResults = await Promise.all(
+      batches.map((batch, index) => this.runBatch(batch, index))
+    );
 
-      const batchResults = await Promise.all(batchPromises);
-      
-      for (const batchResult of batchResults) {
-        results.push(...batchResult.successes);
-        totalFailed += batchResult.failures;
-      }
+    for (const batchResult of batchResults) {
+      results.push(...batchResult.successes);
+      totalFailed += batchResult.failures;
     }
 
     const processingTime = Date.now() - startTime;
@@ -87,15 +98,70 @@ export class GeminiBatchAnalyzer extends GeminiAnalyzer {
   }
 
   /**
-   * Process a batch of students with a single AI call
+   * Run one batch with each student registered under the single-student
+   * analysis key, so a concurrent analyzeStudent for the same feedback waits
+   * for this batch, and a student already being analyzed elsewhere is
+   * awaited rather than analyzed twice. If the whole batch call fails, its
+   * students are analyzed individually.
    */
-  private async processBatch(
+  private async runBatch(
     batch: Array<[string, StoredStudentFeedback[]]>,
     batchIndex: number
   ): Promise<{ successes: Array<{ studentName: string; analysis: StudentAnalysisResult }>; failures: number }> {
+    let call = null as Promise<{ analyses: Map<string, StudentAnalysisResult>; failed: boolean }> | null;
+    const batchCall = () => {
+      if (!call) {
+        call = this.processBatch(batch, batchIndex);
+      }
+      return call;
+    };
+
+    const analyses = await Promise.all(batch.map(async ([studentName, feedbacks]) => {
+      const key = aiResultKey(this.studentAnalysisKey(this.buildStudentInput(studentName, feedbacks)));
+      try {
+        return await aiSingleFlight.run(key, async () => (await batchCall()).analyses.get(studentName) ?? null);
+      } catch (error) {
+        console.error(`Failed to analyze ${studentName}:`, error);
+        return null;
+      }
+    }));
+
+    const batchFailed = call !== null && (await call).failed;
     const successes: Array<{ studentName: string; analysis: StudentAnalysisResult }> = [];
     let failures = 0;
 
+    for (let i = 0; i < batch.length; i++) {
+      const [studentName, feedbacks] = batch[i];
+      let analysis = analyses[i];
+
+      // Fallback: Process individually
+      if (!analysis && batchFailed) {
+        try {
+          analysis = await this.analyzeStudent(studentName, feedbacks);
+        } catch (individualError) {
+          console.error(`Failed to analyze ${studentName} individually:`, individualError);
+        }
+      }
+
+      if (analysis) {
+        successes.push({ studentName, analysis });
+      } else {
+        failures++;
+      }
+    }
+
+    return { successes, failures };
+  }
+
+  /**
+   * Process a batch of students with a single AI call
+   */
+  private async processBatch(
+    batch: Array<[string, StoredStudentFeedback[]]>,
+    batchIndex: number
+  ): Promise<{ analyses: Map<string, StudentAnalysisResult>; failed: boolean }> {
+    const analyses = new Map<string, StudentAnalysisResult>();
+
     try {
       // Prepare batch input
       const batchInput = batch.map(([studentName, feedbacks]) => ({
@@ -118,23 +184,12 @@ export class GeminiBatchAnalyzer extends GeminiAnalyzer {
       const batchPrompt = this.getBatchPrompt();
       const prompt = `${batchPrompt}\n\nAnalyze these ${batch.length} students:\n${JSON.stringify(batchInput, null, 2)}`;
 
-      // Use rotating API key
-      const ai = this.createClient();
-      const config = {
-        thinkingConfig: {
-          thinkStyle: 'detailed' as any,
-          maxThinkingTokens: 8192
-        },
-        generationConfig: {
-          temperature: 0.7,
-          topK: 40,
-          topP: 0.95,
-          maxOutputTokens: 8192,
-          responseMimeType: "application/json"
-        }
-      };
+      const config = this.batchConfig;
 
-      const result = await ai.think(prompt, config);
+      const result = await this.scheduler.run(
+        apiKey => this.createClient(apiKey).think(prompt, config),
+        { estimatedTokens: estimateTokens(prompt, 8192), label: `batch ${batchIndex}` }
+      );
       const response = JSON.parse(result.response);
 
       // Process each student's analysis
@@ -143,38 +198,54 @@ export class GeminiBatchAnalyzer extends GeminiAnalyzer {
         const analysis = studentAnalysis.analysis;
 
         if (this.validateAnalysisResult(analysis)) {
-          successes.push({ studentName, analysis });
+          analyses.set(studentName, analysis);
           
           // Cache the result
-          await this.cacheAnalysis(studentName, analysis);
-        } else {
-          failures++;
+          const feedbacks = batch.find(([name]) => name === studentName)?.[1];
+          if (feedbacks) {
+            await getAIResultCache()?.set(this.batchAnalysisKey(studentName, feedbacks), analysis, {
+              promptLength: Math.round(prompt.length / batch.length)
+            });
+          }
         }
       }
 
-      console.log(`📦 Batch ${batchIndex}: Processed ${successes.length} students successfully`);
+      console.log(`📦 Batch ${batchIndex}: Processed ${analyses.size} students successfully`);
+      return { analyses, failed: false };
 
     } catch (error) {
       console.error(`❌ Batch ${batchIndex} failed:`, error);
-      failures = batch.length;
-
-      // Fallback: Process individually
-      for (const [studentName, feedbacks] of batch) {
-        try {
-          const analysis = await this.analyzeStudent(studentName, feedbacks);
-          if (analysis) {
-            successes.push({ studentName, analysis });
-          } else {
-            failures++;
-          }
-        } catch (individualError) {
-          console.error(`Failed to analyze ${studentName} individually:`, individualError);
-          failures++;
-        }
-      }
+      return { analyses, failed: true };
     }
+  }
 
-    return { successes, failures };
+  /**
+   * AI result cache key of one student's analysis produced by a batch call
+   */
+  private batchAnalysisKey(studentName: string, feedbacks: StoredStudentFeedback[]): AIResultKeyParts {
+    return {
+      kind: 'student-analysis-batch',
+      inputs: this.buildStudentInput(studentName, feedbacks),
+      promptVersion: promptTemplateVersion(this.getBatchPrompt()),
+      model: this.model,
+      params: this.batchConfig
+    };
+  }
+
+  /**
+   * Cached analysis for this feedback from either an individual or a batch
+   * call
+   */
+  private async getCachedBatchAnalysis(
+    studentName: string,
+    feedbacks: StoredStudentFeedback[]
+  ): Promise<StudentAnalysisResult | null> {
+    const cache = getAIResultCache();
+    if (!cache || feedbacks.length === 0) {
+      return null;
+    }
+    return (await this.getCachedAnalysis(studentName, feedbacks)) ??
+      cache.get<StudentAnalysisResult>(this.batchAnalysisKey(studentName, feedbacks));
   }
 
   /**
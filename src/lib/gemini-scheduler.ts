@@ -0,0 +1,386 @@
+// Rate-aware scheduler for Gemini calls across the GEMINI_API_KEY_* keys.
+//
+// Every key has two token buckets, requests and tokens per minute
+// (GEMINI_RPM / GEMINI_TPM per key), and is put on a cooldown after a 429
+// that doubles while the 429s continue. A call goes to the available key
+// with the most headroom; when no key has room it waits in a FIFO queue
+// until one refills. The number of calls in flight is limited by an AIMD
+// window: it grows by one call per window of successes and halves on a 429
+// or a call slower than GEMINI_LATENCY_TARGET_MS. Failed calls that can be
+// retried (429, 5xx, network) go back on the queue after a jittered
+// exponential backoff and prefer a different key.
+
+const REQUESTS_PER_MINUTE = parseInt(process.env.GEMINI_RPM || '10');
+const TOKENS_PER_MINUTE = parseInt(process.env.GEMINI_TPM || '250000');
+const LATENCY_TARGET_MS = parseInt(process.env.GEMINI_LATENCY_TARGET_MS || '90000');
+const MAX_CONCURRENCY_PER_KEY = parseInt(process.env.GEMINI_MAX_CONCURRENCY_PER_KEY || '4');
+
+const MINUTE_MS = 60_000;
+const COOLDOWN_BASE_MS = 15_000;
+const COOLDOWN_MAX_MS = 5 * MINUTE_MS;
+const BACKOFF_BASE_MS = 1_000;
+const BACKOFF_MAX_MS = 30_000;
+const DEFAULT_MAX_ATTEMPTS = 4;
+
+export interface ScheduleOptions<T> {
+  // Prompt plus expected output tokens, charged to the key's token bucket
+  estimatedTokens?: number;
+  // Tokens the call really used, if the response reports them
+  usedTokens?: (result: T) => number | undefined;
+  maxAttempts?: number;
+  // Shown in logs
+  label?: string;
+}
+
+export interface KeyUtilization {
+  key: string;
+  inFlight: number;
+  requests: number;
+  rateLimited: number;
+  errors: number;
+  // Share of the per-minute budget used right now, 0..1
+  requestUtilization: number;
+  tokenUtilization: number;
+  coolingDownMs: number;
+  averageLatencyMs: number;
+}
+
+export interface SchedulerStats {
+  queueDepth: number;
+  inFlight: number;
+  concurrencyLimit: number;
+  maxConcurrency: number;
+  completed: number;
+  failed: number;
+  retried: number;
+  keys: KeyUtilization[];
+}
+
+class TokenBucket {
+  private available: number;
+  private updatedAt = Date.now();
+
+  constructor(readonly capacity: number) {
+    this.available = capacity;
+  }
+
+  level(): number {
+    const now = Date.now();
+    this.available = Math.min(this.capacity, this.available + ((now - this.updatedAt) * this.capacity) / MINUTE_MS);
+    this.updatedAt = now;
+    return this.available;
+  }
+
+  /** Milliseconds until `amount` is available */
+  waitFor(amount: number): number {
+    const missing = Math.min(amount, this.capacity) - this.level();
+    return missing <= 0 ? 0 : Math.ceil((missing * MINUTE_MS) / this.capacity);
+  }
+
+  take(amount: number): void {
+    this.level();
+    this.available -= Math.min(amount, this.capacity);
+  }
+
+  // Corrections may push the level below zero, which simply delays the key
+  adjust(amount: number): void {
+    this.level();
+    this.available = Math.min(this.capacity, this.available - amount);
+  }
+}
+
+interface KeyState {
+  apiKey: string;
+  label: string;
+  requests: TokenBucket;
+  tokens: TokenBucket;
+  inFlight: number;
+  cooldownUntil: number;
+  consecutive429s: number;
+  stats: { requests: number; rateLimited: number; errors: number; latencyMs: number };
+}
+
+interface Job {
+  run: (apiKey: string) => Promise<unknown>;
+  options: ScheduleOptions<unknown>;
+  attempt: number;
+  notBefore: number;
+  avoidKey?: KeyState;
+  resolve: (value: any) => void;
+  reject: (error: unknown) => void;
+}
+
+export function isRateLimitError(error: unknown): boolean {
+  const err = error as { status?: number; code?: number; message?: string } | null;
+  if (err?.status === 429 || err?.code === 429) return true;
+  const message = String(err?.message ?? error);
+  return /\b429\b|RESOURCE_EXHAUSTED|rate limit|quota/i.test(message);
+}
+
+function isRetryableError(error: unknown): boolean {
+  if (isRateLimitError(error)) return true;
+  const err = error as { status?: number; message?: string } | null;
+  if (typeof err?.status === 'number' && err.status >= 500) return true;
+  const message = String(err?.message ?? error);
+  return /\b5\d\d\b|UNAVAILABLE|INTERNAL|timeout|fetch failed|ECONNRESET|ETIMEDOUT|ENOTFOUND|socket hang up/i.test(message);
+}
+
+function jitteredBackoff(attempt: number): number {
+  const ceiling = Math.min(BACKOFF_MAX_MS, BACKOFF_BASE_MS * 2 ** (attempt - 1));
+  // Full jitter: retries from a class-wide run must not arrive together
+  return Math.round(Math.random() * ceiling);
+}
+
+export class GeminiScheduler {
+  private keys: KeyState[];
+  private queue: Job[] = [];
+  private inFlight = 0;
+  private window: number;
+  private readonly maxConcurrency: number;
+  private timer: NodeJS.Timeout | null = null;
+  private counters = { completed: 0, failed: 0, retried: 0 };
+
+  constructor(
+    apiKeys: string[],
+    private limits = { requestsPerMinute: REQUESTS_PER_MINUTE, tokensPerMinute: TOKENS_PER_MINUTE }
+  ) {
+    this.keys = apiKeys.map((apiKey, index) => ({
+      apiKey,
+      label: `key ${index + 1}`,
+      requests: new TokenBucket(limits.requestsPerMinute),
+      tokens: new TokenBucket(limits.tokensPerMinute),
+      inFlight: 0,
+      cooldownUntil: 0,
+      consecutive429s: 0,
+      stats: { requests: 0, rateLimited: 0, errors: 0, latencyMs: 0 }
+    }));
+    this.maxConcurrency = Math.max(1, apiKeys.length * MAX_CONCURRENCY_PER_KEY);
+    this.window = Math.max(1, apiKeys.length);
+  }
+
+  get keyCount(): number {
+    return this.keys.length;
+  }
+
+  /**
+   * Run `fn` with an API key once one has quota, retrying retryable
+   * failures on another key. Resolves with fn's result or rejects with the
+   * last error.
+   */
+  run<T>(fn: (apiKey: string) => Promise<T>, options: ScheduleOptions<T> = {}): Promise<T> {
+    if (this.keys.length === 0) {
+      return Promise.reject(new Error('No Gemini API keys configured'));
+    }
+    return new Promise<T>((resolve, reject) => {
+      this.queue.push({
+        run: fn,
+        options: options as ScheduleOptions<unknown>,
+        attempt: 1,
+        notBefore: 0,
+        resolve,
+        reject
+      });
+      this.pump();
+    });
+  }
+
+  getStats(): SchedulerStats {
+    const now = Date.now();
+    return {
+      queueDepth: this.queue.length,
+      inFlight: this.inFlight,
+      concurrencyLimit: Math.floor(this.window),
+      maxConcurrency: this.maxConcurrency,
+      ...this.counters,
+      keys: this.keys.map(key => ({
+        key: key.label,
+        inFlight: key.inFlight,
+        requests: key.stats.requests,
+        rateLimited: key.stats.rateLimited,
+        errors: key.stats.errors,
+        requestUtilization: 1 - Math.max(0, key.requests.level()) / key.requests.capacity,
+        tokenUtilization: 1 - Math.max(0, key.tokens.level()) / key.tokens.capacity,
+        coolingDownMs: Math.max(0, key.cooldownUntil - now),
+        averageLatencyMs: Math.round(key.stats.latencyMs)
+      }))
+    };
+  }
+
+  private pump(): void {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+
+    let earliestWait = Infinity;
+    while (this.queue.length > 0 && this.inFlight < Math.floor(this.window)) {
+      const now = Date.now();
+      // First job whose backoff has elapsed; FIFO otherwise
+      const index = this.queue.findIndex(job => job.notBefore <= now);
+      if (index === -1) {
+        earliestWait = Math.min(...this.queue.map(job => job.notBefore - now));
+        break;
+      }
+
+      const job = this.queue[index];
+      const tokens = job.options.estimatedTokens ?? 0;
+      const { key, waitMs } = this.pickKey(tokens, job.avoidKey);
+      if (!key) {
+        earliestWait = waitMs;
+        break;
+      }
+
+      this.queue.splice(index, 1);
+      this.start(job, key, tokens);
+    }
+
+    if (this.queue.length > 0 && Number.isFinite(earliestWait)) {
+      this.timer = setTimeout(() => this.pump(), Math.max(10, earliestWait));
+      this.timer.unref?.();
+    }
+  }
+
+  /**
+   * Available key with the most remaining request budget, or how long until
+   * one will have room
+   */
+  private pickKey(tokens: number, avoid?: KeyState): { key: KeyState | null; waitMs: number } {
+    const now = Date.now();
+    let best: KeyState | null = null;
+    let bestScore = -Infinity;
+    let waitMs = Infinity;
+
+    for (const key of this.keys) {
+      const wait = Math.max(key.cooldownUntil - now, key.requests.waitFor(1), key.tokens.waitFor(tokens));
+      if (wait > 0) {
+        waitMs = Math.min(waitMs, wait);
+        continue;
+      }
+      const score = key.requests.level() / key.requests.capacity - key.inFlight
+        - (key === avoid && this.keys.length > 1 ? 1000 : 0);
+      if (score > bestScore) {
+        best = key;
+        bestScore = score;
+      }
+    }
+    return { key: best, waitMs };
+  }
+
+  private start(job: Job, key: KeyState, tokens: number): void {
+    key.requests.take(1);
+    key.tokens.take(tokens);
+    key.inFlight++;
+    key.stats.requests++;
+    this.inFlight++;
+
+    const startedAt = Date.now();
+    job.run(key.apiKey).then(
+      result => {
+        this.finish(key, startedAt, null);
+        const used = job.options.usedTokens?.(result);
+        if (typeof used === 'number' && used > 0) {
+          key.tokens.adjust(used - tokens);
+        }
+        this.counters.completed++;
+        job.resolve(result);
+      },
+      error => {
+        this.finish(key, startedAt, error);
+        const maxAttempts = job.options.maxAttempts ?? DEFAULT_MAX_ATTEMPTS;
+        if (job.attempt < maxAttempts && isRetryableError(error)) {
+          const delay = jitteredBackoff(job.attempt);
+          console.warn(
+            `⏳ Gemini ${job.options.label ?? 'call'} failed on ${key.label} ` +
+            `(attempt ${job.attempt}/${maxAttempts}), retrying in ${delay}ms on another key`
+          );
+          this.counters.retried++;
+          job.attempt++;
+          job.notBefore = Date.now() + delay;
+          job.avoidKey = key;
+          this.queue.unshift(job);
+        } else {
+          this.counters.failed++;
+          job.reject(error);
+        }
+      }
+    ).finally(() => this.pump());
+  }
+
+  private finish(key: KeyState, startedAt: number, error: unknown): void {
+    const latency = Date.now() - startedAt;
+    key.inFlight--;
+    this.inFlight--;
+    key.stats.latencyMs = key.stats.latencyMs === 0 ? latency : key.stats.latencyMs * 0.8 + latency * 0.2;
+
+    if (error && isRateLimitError(error)) {
+      key.stats.rateLimited++;
+      key.consecutive429s++;
+      key.cooldownUntil = Date.now() + Math.min(COOLDOWN_MAX_MS, COOLDOWN_BASE_MS * 2 ** (key.consecutive429s - 1));
+      this.decrease();
+      return;
+    }
+
+    if (error) {
+      key.stats.errors++;
+      return;
+    }
+
+    key.consecutive429s = 0;
+    if (latency > LATENCY_TARGET_MS) {
+      this.decrease();
+    } else {
+      // Additive increase: about one more slot per full window of successes
+      this.window = Math.min(this.maxConcurrency, this.window + 1 / Math.floor(this.window));
+    }
+  }
+
+  private decrease(): void {
+    this.window = Math.max(1, this.window / 2);
+  }
+}
+
+/**
+ * Gemini API endpoint override from GEMINI_API_BASE_URL, e.g. the local
+ * stand-in server (scripts/llm-standin-server.ts). Undefined means the
+ * SDK default.
+ */
+export function geminiBaseUrl(): string | undefined {
+  return process.env.GEMINI_API_BASE_URL || undefined;
+}
+
+/**
+ * GEMINI_API_KEY_1..4, or GEMINI_API_KEY / GOOGLE_AI_API_KEY when none of
+ * the numbered keys is set
+ */
+export function loadGeminiApiKeys(): string[] {
+  const keys: string[] = [];
+  for (let i = 1; i <= 4; i++) {
+    const key = process.env[`GEMINI_API_KEY_${i}`];
+    if (key) keys.push(key);
+  }
+  if (keys.length === 0) {
+    const singleKey = process.env.GEMINI_API_KEY || process.env.GOOGLE_AI_API_KEY;
+    if (singleKey) keys.push(singleKey);
+  }
+  return keys;
+}
+
+let sharedScheduler: GeminiScheduler | null = null;
+
+/**
+ * The process-wide scheduler over the configured keys, so every Gemini
+ * caller draws on the same per-key budgets
+ */
+export function getGeminiScheduler(): GeminiScheduler {
+  if (!sharedScheduler) {
+    sharedScheduler = new GeminiScheduler(loadGeminiApiKeys());
+  }
+  return sharedScheduler;
+}
+
+/**
+ * Rough token count of a prompt, for ScheduleOptions.estimatedTokens
+ */
+export function estimateTokens(text: string, expectedOutputTokens: number = 0): number {
+  return Math.ceil(text.length / 4) + expectedOutputTokens;
+}
@@ -0,0 +1,245 @@
+import { estimateTokens } from './gemini-scheduler'
+
+// Token-budgeted assembly of a student's feedback history for a prompt.
+//
+// Histories grow with every class, so long-tenured students would otherwise
+// produce prompts that are slow, expensive and eventually truncated by the
+// model. Within the budget the most recent sessions are kept in full, then
+// the older sessions with the most signal (improvement areas, teacher
+// comments, substantive content). The rest are compressed into one summary
+// line per unit, and the oldest unit summaries are dropped if even those do
+// not fit. Lines that repeat across most sessions (the rubric item list and
+// headings FeedbackParser leaves in the content) are removed first, since
+// they say nothing about the individual session.
+
+// Sessions always shown in full, newest first, budget permitting
+const MIN_RECENT_SESSIONS = 3
+// A line is boilerplate when at least this many sessions, and at least
+// BOILERPLATE_SHARE of them, contain it
+const BOILERPLATE_MIN_SESSIONS = 3
+const BOILERPLATE_SHARE = 0.5
+// Smallest useful slice of a truncated session
+const MIN_TRUNCATED_TOKENS = 150
+const TRUNCATION_MARK = '\n[...truncated]'
+// Budget kept back for unit summaries: this many tokens per unit, at most
+// SUMMARY_RESERVE_SHARE of the budget
+const SUMMARY_RESERVE_PER_UNIT = 80
+const SUMMARY_RESERVE_SHARE = 0.25
+const SUMMARY_SNIPPET_CHARS = 160
+const SUMMARY_SNIPPETS_PER_FIELD = 3
+const CHARS_PER_TOKEN = 4
+
+export interface FeedbackHistorySession {
+  unitNumber: string
+  date: string
+  content: string
+  bestAspects?: string
+  improvementAreas?: string
+  teacherComments?: string
+}
+
+export interface FeedbackHistoryAssembly {
+  text: string
+  tokens: number
+  totalSessions: number
+  sessionsInFull: number
+  sessionsTruncated: number
+  sessionsSummarized: number
+  // "Unit 1 (2024-01-08 to 2024-02-05, 4 sessions)" for each dropped summary
+  dropped: string[]
+  boilerplateLinesRemoved: number
+}
+
+/**
+ * Token count of prompt text, with the same estimate the scheduler charges
+ * against the per-key token budget
+ */
+export function countTokens(text: string): number {
+  return estimateTokens(text)
+}
+
+function normalizeLine(line: string): string {
+  return line.trim().toLowerCase().replace(/\s+/g, ' ')
+}
+
+function findBoilerplate(sessions: FeedbackHistorySession[]): Set<string> {
+  const threshold = Math.max(BOILERPLATE_MIN_SESSIONS, Math.ceil(sessions.length * BOILERPLATE_SHARE))
+  const counts = new Map<string, number>()
+  for (const session of sessions) {
+    const lines = new Set((session.content || '').split('\n').map(normalizeLine).filter(Boolean))
+    lines.forEach(line => counts.set(line, (counts.get(line) || 0) + 1))
+  }
+
+  const boilerplate = new Set<string>()
+  counts.forEach((count, line) => {
+    if (count >= threshold) boilerplate.add(line)
+  })
+  return boilerplate
+}
+
+function stripBoilerplate(content: string, boilerplate: Set<string>): { content: string; removed: number } {
+  if (boilerplate.size === 0) return { content, removed: 0 }
+  let removed = 0
+  const kept = content.split('\n').filter(line => {
+    if (boilerplate.has(normalizeLine(line))) {
+      removed++
+      return false
+    }
+    return true
+  })
+  return { content: kept.join('\n').replace(/\n{3,}/g, '\n\n').trim(), removed }
+}
+
+// 0..1: how much a session tells the model beyond its date
+function signal(session: FeedbackHistorySession): number {
+  return (session.improvementAreas?.trim() ? 0.4 : 0)
+    + (session.teacherComments?.trim() ? 0.3 : 0)
+    + Math.min(1, countTokens(session.content || '') / 200) * 0.3
+}
+
+function firstSentence(text: string): string {
+  const flat = text.trim().replace(/\s+/g, ' ')
+  const sentence = flat.match(/^.*?[.!?](?= |$)/)?.[0] ?? flat
+  return sentence.length > SUMMARY_SNIPPET_CHARS ? `${sentence.slice(0, SUMMARY_SNIPPET_CHARS - 1)}…` : sentence
+}
+
+// Unit "3.2" belongs to unit 3
+function unitGroup(unitNumber: string): string {
+  return String(unitNumber || '?').split('.')[0]
+}
+
+function summarizeUnit(unit: string, sessions: FeedbackHistorySession[]): string {
+  const snippets = (field: 'bestAspects' | 'improvementAreas' | 'teacherComments') => {
+    const distinct = new Map<string, string>()
+    for (const session of sessions) {
+      const snippet = session[field] ? firstSentence(session[field]!) : ''
+      if (snippet && !distinct.has(snippet.toLowerCase())) {
+        distinct.set(snippet.toLowerCase(), snippet)
+      }
+    }
+    return Array.from(distinct.values()).slice(0, SUMMARY_SNIPPETS_PER_FIELD)
+  }
+  const parts = [
+    ['Strengths', snippets('bestAspects')],
+    ['To improve', snippets('improvementAreas')],
+    ['Teacher', snippets('teacherComments')]
+  ] as const
+  const detail = parts
+    .filter(([, values]) => values.length > 0)
+    .map(([label, values]) => `${label}: ${values.join('; ')}`)
+    .join(' | ')
+  return `- ${unitLabel(unit, sessions)}: ${detail || 'no written comments'}`
+}
+
+function unitLabel(unit: string, sessions: FeedbackHistorySession[]): string {
+  const first = sessions[0].date
+  const last = sessions[sessions.length - 1].date
+  const span = first === last ? first : `${first} to ${last}`
+  return `Unit ${unit} (${span}, ${sessions.length} session${sessions.length === 1 ? '' : 's'})`
+}
+
+/**
+ * Render `sessions` (chronological) within `budgetTokens`. `renderSession`
+ * formats one session and receives its position in the full history, so
+ * session numbers stay stable whatever is left out; full sessions are
+ * joined with separator, after a summary of the older units if any were
+ * compressed.
+ */
+export function assembleFeedbackHistory<T extends FeedbackHistorySession>(
+  sessions: T[],
+  renderSession: (session: T, index: number) => string,
+  budgetTokens: number,
+  separator: string = '\n---\n'
+): FeedbackHistoryAssembly {
+  const boilerplate = sessions.length >= BOILERPLATE_MIN_SESSIONS ? findBoilerplate(sessions) : new Set<string>()
+  let boilerplateLinesRemoved = 0
+  const cleaned = sessions.map(session => {
+    const stripped = stripBoilerplate(session.content || '', boilerplate)
+    boilerplateLinesRemoved += stripped.removed
+    return stripped.removed > 0 ? { ...session, content: stripped.content } : session
+  })
+
+  const rendered = cleaned.map((session, index) => renderSession(session, index))
+  const separatorTokens = countTokens(separator)
+
+  // Newest sessions first, then the rest by recency and signal
+  const last = cleaned.length - 1
+  const order = cleaned.map((_, index) => index).sort((a, b) => {
+    const aRecent = a > last - MIN_RECENT_SESSIONS
+    const bRecent = b > last - MIN_RECENT_SESSIONS
+    if (aRecent !== bRecent) return aRecent ? -1 : 1
+    if (aRecent) return b - a
+    const score = (index: number) => 0.6 * (last > 0 ? index / last : 1) + 0.4 * signal(cleaned[index])
+    return score(b) - score(a) || b - a
+  })
+
+  // When the history does not fit, part of the budget is kept back for
+  // the summaries of the sessions left out
+  const totalTokens = rendered.reduce((sum, text) => sum + countTokens(text) + separatorTokens, 0)
+  const unitCount = new Set(cleaned.map(session => unitGroup(session.unitNumber))).size
+  const fullBudget = totalTokens <= budgetTokens
+    ? budgetTokens
+    : budgetTokens - Math.min(budgetTokens * SUMMARY_RESERVE_SHARE, unitCount * SUMMARY_RESERVE_PER_UNIT)
+
+  const full = new Map<number, string>()
+  let sessionsTruncated = 0
+  let used = 0
+  for (const index of order) {
+    const cost = countTokens(rendered[index]) + separatorTokens
+    if (used + cost <= fullBudget) {
+      full.set(index, rendered[index])
+      used += cost
+      continue
+    }
+
+    // A recent session that does not fit whole is cut rather than summarized
+    const room = fullBudget - used - separatorTokens - countTokens(TRUNCATION_MARK)
+    if (index > last - MIN_RECENT_SESSIONS && room >= MIN_TRUNCATED_TOKENS) {
+      full.set(index, `${rendered[index].slice(0, room * CHARS_PER_TOKEN).trimEnd()}${TRUNCATION_MARK}`)
+      used += countTokens(full.get(index)!) + separatorTokens
+      sessionsTruncated++
+    }
+  }
+
+  // Everything else is summarized per unit, newest units first while they fit
+  const units = new Map<string, T[]>()
+  cleaned.forEach((session, index) => {
+    if (full.has(index)) return
+    const unit = unitGroup(session.unitNumber)
+    if (!units.has(unit)) units.set(unit, [])
+    units.get(unit)!.push(session)
+  })
+
+  const summaries: string[] = []
+  const dropped: string[] = []
+  const header = 'SESSIONS NOT SHOWN IN FULL (summarized by unit):\n'
+  let summarized = 0
+  if (units.size > 0) {
+    used += countTokens(header)
+    for (const [unit, unitSessions] of Array.from(units.entries()).reverse()) {
+      const summary = summarizeUnit(unit, unitSessions)
+      const cost = countTokens(summary) + 1
+      if (used + cost <= budgetTokens) {
+        summaries.unshift(summary)
+        used += cost
+        summarized += unitSessions.length
+      } else {
+        dropped.unshift(unitLabel(unit, unitSessions))
+      }
+    }
+  }
+
+  const body = Array.from(full.keys()).sort((a, b) => a - b).map(index => full.get(index)!).join(separator)
+  const text = summaries.length > 0 ? `${header}${summaries.join('\n')}\n${separator}${body}` : body
+
+  return {
+    text,
+    tokens: countTokens(text),
+    totalSessions: sessions.length,
+    sessionsInFull: full.size - sessionsTruncated,
+    sessionsTruncated,
+    sessionsSummarized: summarized,
+    dropped,
+    boilerplateLinesRemoved
+  }
+}
@@ -1,8 +1,17 @@
+import { createHash } from 'crypto'
 import { readFileSync } from 'fs'
 import { join } from 'path'
+import { assembleFeedbackHistory, countTokens, type FeedbackHistoryAssembly } from './prompt-budget'
 
 // Prompt Manager for loading and managing AI prompts from ai-prompts.md
 
+// Most tokens a student analysis prompt may use, template included. Longer
+// feedback histories are compressed to fit (see prompt-budget.ts).
+const PROMPT_TOKEN_BUDGET = parseInt(process.env.PROMPT_TOKEN_BUDGET || '16000')
+// The feedback history always gets at least this much, however long the
+// template grows
+const MIN_HISTORY_TOKENS = 2000
+
 interface StudentAnalysisInput {
   studentName: string
   level: 'primary' | 'secondary'
@@ -51,11 +60,22 @@ interface ComparisonInput {
   }
 }
 
+/**
+ * Version of a prompt template: a short hash of its text, so editing a
+ * template changes the version and with it every AI result cache key that
+ * depends on it
+ */
+export function promptTemplateVersion(...templates: string[]): string {
+  const hash = createHash('sha256')
+  templates.forEach(template => hash.update(template).update('\0'))
+  return hash.digest('hex').substring(0, 16)
+}
+
 export class PromptManager {
   private prompts: Map<string, string> = new Map()
   private promptsLoaded: boolean = false
 
-  constructor() {
+  constructor(private tokenBudget: number = PROMPT_TOKEN_BUDGET) {
     this.loadPrompts()
   }
 
@@ -331,18 +351,25 @@ Return response in JSON format:
   }
 
   /**
-   * Get student analysis prompt with substituted values
+   * Get student analysis prompt with substituted values. The feedback
+   * history is fitted into the token budget: repeated template lines are
+   * removed, recent and high-signal sessions are kept in full and the rest
+   * are summarized per unit.
    */
   getStudentAnalysisPrompt(input: StudentAnalysisInput): string {
     const basePrompt = this.prompts.get('student-analysis') || ''
     
-    // Build the input data section
-    const inputData = `
+    const header = `
 STUDENT: ${input.studentName}
 LEVEL: ${input.level}
 FEEDBACK SESSIONS (${input.feedbackSessions.length} total):
 
-${input.feedbackSessions.map((session, index) => `
+`
+    const historyBudget = Math.max(
+      MIN_HISTORY_TOKENS,
+      this.tokenBudget - countTokens(header) - countTokens(basePrompt)
+    )
+    const history = assembleFeedbackHistory(input.feedbackSessions, (session, index) => `
 Session ${index + 1}:
 - Unit: ${session.unitNumber}
 - Date: ${session.date}
@@ -356,8 +383,11 @@ ${session.content}
 ${session.bestAspects ? `Best Aspects: ${session.bestAspects}` : ''}
 ${session.improvementAreas ? `Areas for Improvement: ${session.improvementAreas}` : ''}
 ${session.teacherComments ? `Teacher Comments: ${session.teacherComments}` : ''}
-`).join('\n---\n')}
-`
+`, historyBudget)
+
+    // Build the input data section
+    const inputData = `${header}${history.text}\n`
+    this.logAssembly('student-analysis', input.studentName, { header, history: history.text, instructions: basePrompt }, history)
 
     return inputData + '\n\n' + basePrompt
   }
@@ -442,6 +472,45 @@ Top Performers: ${JSON.stringify(input.peerGroup.topPerformers, null, 2)}
     return prompt
   }
 
+  /**
+   * Version of a prompt template, for AI result cache keys. The student
+   * analysis version includes the token budget, which decides how much of
+   * the history the prompt contains.
+   */
+  getPromptVersion(promptKey: string): string {
+    const template = this.prompts.get(promptKey) || ''
+    const version = promptKey === 'student-analysis'
+      ? promptTemplateVersion(template, `budget:${this.tokenBudget}`)
+      : promptTemplateVersion(template)
+    return `${promptKey}@${version}`
+  }
+
+  /**
+   * Log the size of an assembled prompt per section and what was left out
+   */
+  private logAssembly(
+    promptKey: string,
+    subject: string,
+    sections: Record<string, string>,
+    history: FeedbackHistoryAssembly
+  ): void {
+    const sizes = Object.entries(sections).map(([name, text]) => `${name} ${countTokens(text)}`)
+    const total = Object.values(sections).reduce((sum, text) => sum + countTokens(text), 0)
+    console.log(`📏 ${promptKey} prompt for ${subject}: ~${total} tokens (budget ${this.tokenBudget}; ${sizes.join(', ')})`)
+
+    const omitted = history.totalSessions - history.sessionsInFull
+    if (omitted > 0 || history.boilerplateLinesRemoved > 0) {
+      console.log(
+        `   ${history.sessionsInFull}/${history.totalSessions} sessions in full, ` +
+        `${history.sessionsTruncated} truncated, ${history.sessionsSummarized} summarized, ` +
+        `${history.boilerplateLinesRemoved} repeated template lines removed`
+      )
+    }
+    if (history.dropped.length > 0) {
+      console.warn(`   ⚠️ Dropped from the ${promptKey} prompt for ${subject}: ${history.dropped.join(', ')}`)
+    }
+  }
+
   /**
    * Check if prompts are loaded successfully
    */
@@ -24,6 +24,60 @@ export const queryClient = new QueryClient({
 // API base URL
 export const API_BASE = process.env.NEXT_PUBLIC_API_URL || '/api'
 
+// Last body and ETag seen per GET URL. Polling hooks send the ETag back
+// with If-None-Match and the server answers 304 when nothing changed, so the
+// body is only downloaded when it actually differs.
+const MAX_VALIDATED_RESPONSES = 50
+const validatedResponses = new Map<string, { etag: string; body: string; contentType: string }>()
+
+/**
+ * fetch() for GET endpoints that send ETags. Resolves to a normal 200
+ * Response either way: on 304 it is rebuilt from the stored body.
+ */
+export async function fetchWithETag(url: string, options: RequestInit = {}): Promise<Response> {
+  const method = (options.method || 'GET').toUpperCase()
+  if (method !== 'GET') {
+    return fetch(url, options)
+  }
+
+  const stored = validatedResponses.get(url)
+  const headers = new Headers(options.headers)
+  if (stored) {
+    headers.set('If-None-Match', stored.etag)
+  }
+
+  // Validators are handled here, so keep the browser cache out of the way
+  const response = await fetch(url, { ...options, headers, cache: 'no-store' })
+
+  if (response.status === 304 && stored) {
+    // Refresh recency so frequently polled URLs are kept
+    validatedResponses.delete(url)
+    validatedResponses.set(url, stored)
+    return new Response(stored.body, {
+      status: 200,
+      headers: { 'Content-Type': stored.contentType, 'ETag': stored.etag },
+    })
+  }
+
+  const etag = response.headers.get('etag')
+  if (response.ok && etag) {
+    const body = await response.clone().text()
+    validatedResponses.delete(url)
+    validatedResponses.set(url, {
+      etag,
+      body,
+      contentType: response.headers.get('content-type') || 'application/json',
+    })
+    if (validatedResponses.size > MAX_VALIDATED_RESPONSES) {
+      validatedResponses.delete(validatedResponses.keys().next().value!)
+    }
+  } else if (!response.ok) {
+    validatedResponses.delete(url)
+  }
+
+  return response
+}
+
 // Utility function for API calls
 export async function fetchAPI<T>(
   endpoint: string,
@@ -31,12 +85,12 @@ export async function fetchAPI<T>(
 ): Promise<T> {
   const url = `${API_BASE}${endpoint}`
   
-  const response = await fetch(url, {
+  const response = await fetchWithETag(url, {
+    ...options,
     headers: {
       'Content-Type': 'application/json',
       ...options.headers,
     },
-    ...options,
   })
 
   if (!response.ok) {
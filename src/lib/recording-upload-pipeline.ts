@@ -0,0 +1,203 @@
+import { v4 as uuidv4 } from 'uuid';
+import { db } from './postgres';
+import { UploadResult } from './storage-service';
+import { transcriptionService } from './transcription-service';
+import { aiFeedbackGenerator } from './ai-feedback-generator';
+import { transcriptStorage } from './transcript-storage';
+
+// Steps shared by the single-request upload (/api/recording/upload) and the
+// resumable one (/api/recording/upload/sessions): the speech_recordings row
+// created before the audio arrives, and what happens once it is stored
+// (live transcript, transcription, optional AI feedback).
+
+export const ALLOWED_AUDIO_TYPES = ['audio/wav', 'audio/mp3', 'audio/mp4', 'audio/webm', 'audio/ogg'];
+export const MAX_RECORDING_BYTES = 100 * 1024 * 1024; // 100MB
+
+export interface RecordingUploadFields {
+  studentId: string;
+  studentName: string;
+  sessionId: string | null;
+  speechTopic: string;
+  motion: string;
+  speechType: string;
+  programType: string;
+  transcriptionProvider: string;
+  fullTranscript: string;
+  speakerSegments: any[];
+  duration: number;
+  autoGenerateFeedback: boolean;
+  feedbackType: string;
+}
+
+export interface RecordingFileInfo {
+  filename: string;
+  sizeBytes: number;
+  mimeType: string;
+}
+
+/**
+ * Whether `mimeType` is an accepted audio type; codec parameters
+ * ("audio/webm;codecs=opus") are ignored
+ */
+export function isAllowedAudioType(mimeType: string): boolean {
+  return ALLOWED_AUDIO_TYPES.includes((mimeType || '').split(';')[0].trim().toLowerCase());
+}
+
+/**
+ * Upload form fields, read through `get` from FormData or a JSON object of
+ * the same (string) fields
+ */
+export function readUploadFields(get: (name: string) => string | null): RecordingUploadFields {
+  let speakerSegments = [];
+  try {
+    speakerSegments = JSON.parse(get('speakerSegments') || '[]');
+  } catch (e) {
+    console.error('Failed to parse speaker segments:', e);
+  }
+
+  return {
+    studentId: get('studentId') || '',
+    studentName: get('studentName') || '',
+    sessionId: get('sessionId') || null,
+    speechTopic: get('speechTopic') || '',
+    motion: get('motion') || '',
+    speechType: get('speechType') || 'debate',
+    programType: get('programType') || 'PSD',
+    transcriptionProvider: get('transcriptionProvider') || 'openai',
+    fullTranscript: get('fullTranscript') || '',
+    speakerSegments,
+    duration: parseInt(get('duration') || '0') || 0,
+    autoGenerateFeedback: get('autoGenerateFeedback') === 'true',
+    feedbackType: get('feedbackType') || 'secondary',
+  };
+}
+
+/**
+ * Create the speech_recordings row, in status 'uploading', for audio that
+ * is about to be stored
+ */
+export async function createRecordingRecord(
+  instructorId: string,
+  fields: RecordingUploadFields,
+  file: RecordingFileInfo,
+  userAgent: string | null
+): Promise<any> {
+  const result = await db.query(
+    `INSERT INTO speech_recordings (
+      id, student_id, session_id, instructor_id, audio_file_path,
+      original_filename, file_size_bytes, mime_type, speech_topic,
+      motion, speech_type, program_type, status, transcription_provider,
+      recording_metadata
+    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
+    RETURNING *`,
+    [
+      uuidv4(),
+      fields.studentId,
+      fields.sessionId,
+      instructorId,
+      '', // Will be updated after upload
+      file.filename,
+      file.sizeBytes,
+      file.mimeType,
+      fields.speechTopic,
+      fields.motion,
+      fields.speechType,
+      fields.programType,
+      'uploading',
+      fields.transcriptionProvider,
+      JSON.stringify({
+        uploadedAt: new Date().toISOString(),
+        userAgent,
+        contentLength: file.sizeBytes,
+      }),
+    ]
+  );
+  return result.rows[0];
+}
+
+/**
+ * Mark a stored recording as uploaded, save its live transcript, transcribe
+ * it and generate AI feedback if requested. Returns the upload response
+ * body.
+ */
+export async function finishRecordingUpload(
+  recording: any,
+  uploadResult: UploadResult,
+  fields: RecordingUploadFields
+): Promise<Record<string, any>> {
+  // Update recording with file path and duration
+  await db.query(
+    'UPDATE speech_recordings SET audio_file_path = $1, status = $2, duration_seconds = $3 WHERE id = $4',
+    [uploadResult.file!.filePath, 'uploaded', fields.duration, recording.id]
+  );
+
+  // Save transcript if provided from live transcription
+  if (fields.fullTranscript) {
+    await transcriptStorage.saveTranscript(
+      recording.id,
+      fields.fullTranscript,
+      {
+        studentId: fields.studentId,
+        studentName: fields.studentName,
+        speechTopic: fields.speechTopic,
+        motion: fields.motion,
+        speechType: fields.speechType,
+        duration: fields.duration,
+        wordCount: fields.fullTranscript.split(/\s+/).length,
+        speakerSegments: fields.speakerSegments,
+        provider: 'gpt-4o-mini-live',
+        confidence: 0.95
+      }
+    );
+  }
+
+  // Start transcription process
+  const transcriptionResult = await transcriptionService.transcribeRecording(
+    recording.id,
+    fields.transcriptionProvider as any
+  );
+
+  let feedbackResult = null;
+
+  // Generate AI feedback if requested and transcription succeeded
+  if (fields.autoGenerateFeedback && transcriptionResult.success) {
+    try {
+      feedbackResult = await aiFeedbackGenerator.generateFeedbackFromRecording(
+        recording.id,
+        {
+          feedbackType: fields.feedbackType as 'primary' | 'secondary',
+          includeTranscript: true,
+        }
+      );
+    } catch (error) {
+      console.error('AI feedback generation failed:', error);
+      // Don't fail the entire request if feedback generation fails
+    }
+  }
+
+  return {
+    success: true,
+    recording: {
+      id: recording.id,
+      status: recording.status,
+      originalFilename: recording.original_filename,
+      fileSizeBytes: recording.file_size_bytes,
+      speechTopic: recording.speech_topic,
+      motion: recording.motion,
+      fileUrl: uploadResult.url,
+    },
+    transcription: transcriptionResult.success ? {
+      id: transcriptionResult.transcriptionId,
+      text: transcriptionResult.text,
+      confidence: transcriptionResult.confidence,
+      wordCount: transcriptionResult.wordCount,
+      speakingRate: transcriptionResult.speakingRate,
+    } : null,
+    feedback: feedbackResult?.success ? {
+      id: feedbackResult.feedbackId,
+      type: fields.feedbackType,
+      generated: true,
+    } : null,
+    message: 'Recording uploaded successfully',
+  };
+}
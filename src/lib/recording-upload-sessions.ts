@@ -0,0 +1,440 @@
+import { createHash, Hash } from 'crypto';
+import fs from 'fs';
+import path from 'path';
+import { v4 as uuidv4 } from 'uuid';
+import { db } from './postgres';
+import { storageService, UploadResult } from './storage-service';
+import {
+  MAX_RECORDING_BYTES,
+  RecordingUploadFields,
+  createRecordingRecord,
+  isAllowedAudioType
+} from './recording-upload-pipeline';
+
+// Resumable, chunked recording uploads.
+//
+// A client opens a session with the recording's metadata and size, appends
+// the audio in chunks at explicit byte offsets, and completes the session
+// once every byte has arrived. Each chunk is streamed from the request body
+// straight into a partial file on the upload volume and into a running
+// SHA-256, so the server never holds more than one chunk of a recording in
+// memory, and completing the upload moves the file into storage without
+// reading it again. A dropped connection loses at most the unacknowledged
+// part of one chunk: the client asks for the session's progress and resumes
+// from received_bytes.
+//
+// The running hash lives in this process; if a chunk lands on another
+// worker or after a restart, the hash is rebuilt from the partial file.
+// Sessions idle past RECORDING_UPLOAD_TTL_HOURS are removed with their
+// partial file and the recording row that was waiting for the audio.
+
+export const UPLOAD_CHUNK_BYTES = parseInt(process.env.RECORDING_UPLOAD_CHUNK_BYTES || String(4 * 1024 * 1024));
+const SESSION_TTL_MS = parseFloat(process.env.RECORDING_UPLOAD_TTL_HOURS || '24') * 60 * 60 * 1000;
+const EXPIRE_INTERVAL_MS = 10 * 60 * 1000;
+const EXPIRE_BATCH = 100;
+const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
+export type UploadSessionStatus = 'uploading' | 'completing' | 'completed';
+
+export interface UploadProgress {
+  uploadId: string;
+  recordingId: string;
+  status: UploadSessionStatus;
+  totalBytes: number;
+  receivedBytes: number;
+  chunkBytes: number;
+  expiresAt: string;
+}
+
+// `status` is the HTTP status for the route to answer with
+export interface UploadSessionResult {
+  success: boolean;
+  status: number;
+  progress?: UploadProgress;
+  error?: string;
+}
+
+export interface UploadCompletion extends UploadSessionResult {
+  recording?: any;
+  upload?: UploadResult;
+  fields?: RecordingUploadFields;
+}
+
+export interface CreateUploadSession {
+  filename: string;
+  mimeType: string;
+  totalBytes: number;
+  fields: RecordingUploadFields;
+  userAgent: string | null;
+}
+
+interface SessionRow {
+  id: string;
+  recording_id: string;
+  original_filename: string;
+  mime_type: string;
+  total_bytes: string | number;
+  received_bytes: string | number;
+  partial_path: string;
+  options: RecordingUploadFields;
+  status: UploadSessionStatus;
+  expires_at: Date;
+}
+
+function toProgress(row: SessionRow): UploadProgress {
+  return {
+    uploadId: row.id,
+    recordingId: row.recording_id,
+    status: row.status,
+    totalBytes: Number(row.total_bytes),
+    receivedBytes: Number(row.received_bytes),
+    chunkBytes: UPLOAD_CHUNK_BYTES,
+    expiresAt: new Date(row.expires_at).toISOString(),
+  };
+}
+
+function failure(status: number, error: string, row?: SessionRow): UploadSessionResult {
+  return { success: false, status, error, progress: row ? toProgress(row) : undefined };
+}
+
+async function hashFilePrefix(filePath: string, bytes: number): Promise<Hash> {
+  const hash = createHash('sha256');
+  if (bytes > 0) {
+    for await (const chunk of fs.createReadStream(filePath, { start: 0, end: bytes - 1 })) {
+      hash.update(chunk as Buffer);
+    }
+  }
+  return hash;
+}
+
+export class RecordingUploadSessions {
+  // Running hash per session, valid while `bytes` equals received_bytes
+  private hashes = new Map<string, { hash: Hash; bytes: number }>();
+  // Requests for one session run one at a time in this process
+  private locks = new Map<string, Promise<unknown>>();
+  private lastExpiry = 0;
+  private sweepTimer: ReturnType<typeof setInterval> | null = null;
+
+  async create(instructorId: string, request: CreateUploadSession): Promise<UploadSessionResult> {
+    if (!request.fields.studentId) {
+      return failure(400, 'Student ID is required');
+    }
+    if (!isAllowedAudioType(request.mimeType)) {
+      return failure(400, 'Invalid file type. Please upload audio files only.');
+    }
+    if (!Number.isInteger(request.totalBytes) || request.totalBytes <= 0) {
+      return failure(400, 'totalBytes must be a positive integer');
+    }
+    if (request.totalBytes > MAX_RECORDING_BYTES) {
+      return failure(400, 'File too large. Maximum size is 100MB.');
+    }
+
+    this.expireInBackground();
+
+    const recording = await createRecordingRecord(
+      instructorId,
+      request.fields,
+      { filename: request.filename, sizeBytes: request.totalBytes, mimeType: request.mimeType },
+      request.userAgent
+    );
+
+    const uploadId = uuidv4();
+    const partialPath = storageService.getPartialUploadPath(uploadId);
+    try {
+      await fs.promises.mkdir(path.dirname(partialPath), { recursive: true });
+      await fs.promises.writeFile(partialPath, '');
+
+      const result = await db.query(
+        `INSERT INTO recording_upload_sessions (
+          id, recording_id, instructor_id, original_filename, mime_type,
+          total_bytes, partial_path, options, expires_at
+        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW() + make_interval(secs => $9::float8))
+        RETURNING *`,
+        [
+          uploadId,
+          recording.id,
+          instructorId,
+          request.filename,
+          request.mimeType,
+          request.totalBytes,
+          partialPath,
+          JSON.stringify(request.fields),
+          SESSION_TTL_MS / 1000,
+        ]
+      );
+      this.hashes.set(uploadId, { hash: createHash('sha256'), bytes: 0 });
+      return { success: true, status: 201, progress: toProgress(result.rows[0]) };
+    } catch (error) {
+      await fs.promises.unlink(partialPath).catch(() => {});
+      await db.query('DELETE FROM speech_recordings WHERE id = $1', [recording.id]);
+      throw error;
+    }
+  }
+
+  async getProgress(uploadId: string, instructorId: string): Promise<UploadSessionResult> {
+    this.expireInBackground();
+    const row = await this.load(uploadId, instructorId);
+    if (!row) return failure(404, 'Upload session not found');
+    return { success: true, status: 200, progress: toProgress(row) };
+  }
+
+  /**
+   * Append `body` at byte `offset`, which must equal the bytes received so
+   * far; otherwise the answer is 409 with the current progress, for the
+   * client to resume from. Bytes that arrived before the client
+   * disconnected are kept.
+   */
+  async append(
+    uploadId: string,
+    instructorId: string,
+    offset: number,
+    body: ReadableStream<Uint8Array> | null,
+    contentLength: number | null
+  ): Promise<UploadSessionResult> {
+    this.expireInBackground();
+    return this.withLock(uploadId, async () => {
+      const row = await this.load(uploadId, instructorId);
+      if (!row) return failure(404, 'Upload session not found');
+      if (row.status !== 'uploading') return failure(409, `Upload is ${row.status}`, row);
+      if (new Date(row.expires_at).getTime() < Date.now()) return failure(410, 'Upload session expired', row);
+
+      const received = Number(row.received_bytes);
+      const total = Number(row.total_bytes);
+      if (offset !== received) return failure(409, 'Offset does not match bytes received', row);
+      if (contentLength !== null && contentLength > UPLOAD_CHUNK_BYTES) {
+        return failure(413, `Chunks are limited to ${UPLOAD_CHUNK_BYTES} bytes`, row);
+      }
+      if (contentLength !== null && received + contentLength > total) {
+        return failure(400, 'Chunk extends past the declared file size', row);
+      }
+      if (!body) return failure(400, 'Chunk body is required', row);
+
+      let state = this.hashes.get(uploadId);
+      if (!state || state.bytes !== received) {
+        state = { hash: await hashFilePrefix(row.partial_path, received), bytes: received };
+      }
+      this.hashes.delete(uploadId);
+
+      const handle = await fs.promises.open(row.partial_path, 'r+');
+      const reader = body.getReader();
+      let written = 0;
+      let rejected: UploadSessionResult | null = null;
+      let interrupted = false;
+      try {
+        while (true) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          if (written + value.length > UPLOAD_CHUNK_BYTES) {
+            rejected = failure(413, `Chunks are limited to ${UPLOAD_CHUNK_BYTES} bytes`, row);
+            break;
+          }
+          if (received + written + value.length > total) {
+            rejected = failure(400, 'Chunk extends past the declared file size', row);
+            break;
+          }
+          await handle.write(value, 0, value.length, received + written);
+          state.hash.update(value);
+          written += value.length;
+        }
+      } catch (error) {
+        // Client went away mid-chunk (or a write failed); the bytes written
+        // before that are still acknowledged
+        interrupted = true;
+        console.warn(`Upload ${uploadId} interrupted after ${written} bytes of a chunk:`, error);
+      } finally {
+        await handle.close();
+        if (rejected) await reader.cancel().catch(() => {});
+      }
+
+      // A rejected chunk is dropped whole; its bytes past received_bytes are
+      // overwritten by the next append
+      if (rejected) return rejected;
+
+      const updated = await db.query(
+        `UPDATE recording_upload_sessions
+         SET received_bytes = $2, updated_at = NOW(),
+             expires_at = NOW() + make_interval(secs => $4::float8)
+         WHERE id = $1 AND received_bytes = $3 AND status = 'uploading'
+         RETURNING *`,
+        [uploadId, received + written, received, SESSION_TTL_MS / 1000]
+      );
+      if (updated.rows.length === 0) {
+        // Another worker appended at the same offset first
+        const current = await this.load(uploadId, instructorId);
+        return failure(409, 'Offset does not match bytes received', current || row);
+      }
+
+      this.hashes.set(uploadId, { hash: state.hash, bytes: received + written });
+      const progress = toProgress(updated.rows[0]);
+      return interrupted
+        ? { success: false, status: 400, error: 'Chunk interrupted', progress }
+        : { success: true, status: 200, progress };
+    });
+  }
+
+  /**
+   * Move a fully received upload into storage. `expectedSha256`, when
+   * given, must match the received bytes; a mismatch discards the upload.
+   * Returns the recording row and the form fields for
+   * finishRecordingUpload.
+   */
+  async complete(uploadId: string, instructorId: string, expectedSha256?: string): Promise<UploadCompletion> {
+    return this.withLock(uploadId, async () => {
+      const row = await this.load(uploadId, instructorId);
+      if (!row) return failure(404, 'Upload session not found');
+      if (row.status !== 'uploading') return failure(409, `Upload is ${row.status}`, row);
+
+      const total = Number(row.total_bytes);
+      if (Number(row.received_bytes) !== total) {
+        return failure(409, 'Upload is incomplete', row);
+      }
+
+      const claimed = await db.query(
+        `UPDATE recording_upload_sessions SET status = 'completing', updated_at = NOW()
+         WHERE id = $1 AND status = 'uploading'`,
+        [uploadId]
+      );
+      if (claimed.rowCount === 0) return failure(409, 'Upload is already being completed', row);
+
+      let state = this.hashes.get(uploadId);
+      if (!state || state.bytes !== total) {
+        state = { hash: await hashFilePrefix(row.partial_path, total), bytes: total };
+      }
+      this.hashes.delete(uploadId);
+      const contentHash = state.hash.digest('hex');
+
+      if (expectedSha256 && expectedSha256.toLowerCase() !== contentHash) {
+        await this.discard(row);
+        return failure(422, 'Uploaded content does not match the expected SHA-256; start a new upload');
+      }
+
+      // Drop anything written past the end by a rejected final chunk
+      await fs.promises.truncate(row.partial_path, total);
+
+      const upload = await storageService.storeAudioFileFromPath(
+        row.recording_id,
+        row.partial_path,
+        row.original_filename,
+        contentHash,
+        total
+      );
+      if (!upload.success) {
+        // storeAudioFileFromPath leaves the partial file in place on
+        // failure, so completing can be retried
+        await db.query(
+          `UPDATE recording_upload_sessions SET status = 'uploading', updated_at = NOW() WHERE id = $1`,
+          [uploadId]
+        );
+        return failure(500, upload.error || 'Upload failed', row);
+      }
+
+      await db.query(
+        `UPDATE recording_upload_sessions SET status = 'completed', updated_at = NOW() WHERE id = $1`,
+        [uploadId]
+      );
+      const recording = await db.query('SELECT * FROM speech_recordings WHERE id = $1', [row.recording_id]);
+
+      return {
+        success: true,
+        status: 200,
+        progress: toProgress({ ...row, status: 'completed' }),
+        recording: recording.rows[0],
+        upload,
+        fields: row.options,
+      };
+    });
+  }
+
+  /**
+   * Abandon an upload: its partial file and recording row are removed
+   */
+  async abort(uploadId: string, instructorId: string): Promise<UploadSessionResult> {
+    return this.withLock(uploadId, async () => {
+      const row = await this.load(uploadId, instructorId);
+      if (!row) return failure(404, 'Upload session not found');
+      if (row.status !== 'uploading') return failure(409, `Upload is ${row.status}`, row);
+      await this.discard(row);
+      return { success: true, status: 200 };
+    });
+  }
+
+  /**
+   * Remove sessions idle past their expiry, and completed sessions older
+   * than the TTL. Returns the number of sessions removed.
+   */
+  async expireStale(): Promise<number> {
+    this.lastExpiry = Date.now();
+    let removed = 0;
+    try {
+      const stale = await db.query(
+        `SELECT * FROM recording_upload_sessions
+         WHERE status <> 'completed' AND expires_at < NOW()
+         ORDER BY expires_at
+         LIMIT $1`,
+        [EXPIRE_BATCH]
+      );
+      for (const row of stale.rows as SessionRow[]) {
+        await this.discard(row);
+        removed++;
+      }
+
+      const completed = await db.query(
+        `DELETE FROM recording_upload_sessions
+         WHERE status = 'completed' AND updated_at < NOW() - make_interval(secs => $1::float8)`,
+        [SESSION_TTL_MS / 1000]
+      );
+      removed += completed.rowCount || 0;
+    } catch (error) {
+      console.warn('Could not expire recording upload sessions:', error);
+    }
+    return removed;
+  }
+
+  // Runs from every session request, at most every EXPIRE_INTERVAL_MS. The
+  // first call also starts a timer, so sessions abandoned after the last
+  // upload activity are still swept.
+  private expireInBackground(): void {
+    if (!this.sweepTimer) {
+      this.sweepTimer = setInterval(() => {
+        this.lastExpiry = 0;
+        this.expireInBackground();
+      }, EXPIRE_INTERVAL_MS);
+      this.sweepTimer.unref?.();
+    }
+    if (Date.now() - this.lastExpiry < EXPIRE_INTERVAL_MS) return;
+    this.lastExpiry = Date.now();
+    this.expireStale().then(removed => {
+      if (removed > 0) console.log(`🧹 Removed ${removed} expired recording upload sessions`);
+    });
+  }
+
+  private async discard(row: SessionRow): Promise<void> {
+    this.hashes.delete(row.id);
+    await fs.promises.unlink(row.partial_path).catch(() => {});
+    // The recording row only goes if its audio never arrived
+    await db.query(`DELETE FROM speech_recordings WHERE id = $1 AND status = 'uploading'`, [row.recording_id]);
+    await db.query('DELETE FROM recording_upload_sessions WHERE id = $1', [row.id]);
+  }
+
+  private async load(uploadId: string, instructorId: string): Promise<SessionRow | null> {
+    if (!UUID_PATTERN.test(uploadId)) return null;
+    const result = await db.query(
+      'SELECT * FROM recording_upload_sessions WHERE id = $1 AND instructor_id = $2',
+      [uploadId, instructorId]
+    );
+    return result.rows[0] || null;
+  }
+
+  private async withLock<T>(uploadId: string, task: () => Promise<T>): Promise<T> {
+    const previous = this.locks.get(uploadId) || Promise.resolve();
+    const run = previous.catch(() => {}).then(task);
+    this.locks.set(uploadId, run);
+    try {
+      return await run;
+    } finally {
+      if (this.locks.get(uploadId) === run) this.locks.delete(uploadId);
+    }
+  }
+}
+
+export const recordingUploadSessions = new RecordingUploadSessions();
@@ -4,6 +4,7 @@
  */
 
 import { getPool } from './postgres';
+import { invalidateClassData } from './services/class-data';
 
 export interface SampleClassSession {
   courseCode: string;
@@ -217,6 +218,7 @@ export class SampleClassGenerator {
    */
   async populateSampleData(): Promise<void> {
     const client = await this.pool.connect();
+    const touchedCourseIds = new Set<string>();
     
     try {
       await client.query('BEGIN');
@@ -326,10 +328,12 @@ export class SampleClassGenerator {
               VALUES ($1, $2, $3, $4)
             `, [userId, courseId, new Date(), 'active']);
           }
+          touchedCourseIds.add(courseId);
         }
       }
 
       await client.query('COMMIT');
+      await invalidateClassData(Array.from(touchedCourseIds));
       console.log('Sample data populated successfully');
     } catch (error) {
       await client.query('ROLLBACK');
@@ -345,6 +349,7 @@ export class SampleClassGenerator {
    */
   async generateAndStoreWeeklyClasses(): Promise<void> {
     const client = await this.pool.connect();
+    const touchedCourseIds = new Set<string>();
     
     try {
       await client.query('BEGIN');
@@ -404,10 +409,12 @@ export class SampleClassGenerator {
               session.status === 'upcoming' ? 'scheduled' : session.status
             ]);
           }
+          touchedCourseIds.add(courseId);
         }
       }
 
       await client.query('COMMIT');
+      await invalidateClassData(Array.from(touchedCourseIds));
       console.log('Weekly class sessions generated and stored successfully');
     } catch (error) {
       await client.query('ROLLBACK');
@@ -0,0 +1,133 @@
+// Server-Sent Events for long-running API routes (AI analysis) and the
+// components that consume them.
+//
+// sseResponse runs a handler that emits named events as work progresses and
+// returns immediately with a text/event-stream body, so the client sees the
+// first event instead of waiting for the whole computation. A comment line is
+// sent every HEARTBEAT_MS so proxies do not time out a quiet stream.
+// readServerSentEvents is the browser side, for fetch() responses (POST
+// requests cannot use EventSource).
+
+const HEARTBEAT_MS = 15000
+
+export type SendEvent = (event: string, data: unknown) => void
+
+const SSE_HEADERS = {
+  'Content-Type': 'text/event-stream; charset=utf-8',
+  'Cache-Control': 'no-cache, no-transform',
+  Connection: 'keep-alive',
+  // Stop nginx from buffering the stream
+  'X-Accel-Buffering': 'no'
+}
+
+/**
+ * Stream the events `handler` sends. An exception from the handler is sent
+ * as an `error` event; the stream closes when the handler settles. Events
+ * sent after the client disconnects are dropped, but the handler runs to
+ * completion so its results are still persisted.
+ */
+export function sseResponse(handler: (send: SendEvent) => Promise<void>): Response {
+  const encoder = new TextEncoder()
+  let closed = false
+  let heartbeat: ReturnType<typeof setInterval> | undefined
+
+  const stream = new ReadableStream<Uint8Array>({
+    start(controller) {
+      const write = (chunk: string) => {
+        if (closed) return
+        try {
+          controller.enqueue(encoder.encode(chunk))
+        } catch {
+          closed = true
+        }
+      }
+      const send: SendEvent = (event, data) => {
+        write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`)
+      }
+
+      heartbeat = setInterval(() => write(': ping\n\n'), HEARTBEAT_MS)
+
+      handler(send)
+        .catch((error) => {
+          console.error('Event stream handler failed:', error)
+          send('error', { error: error instanceof Error ? error.message : 'Internal server error' })
+        })
+        .finally(() => {
+          clearInterval(heartbeat)
+          if (!closed) {
+            closed = true
+            controller.close()
+          }
+        })
+    },
+    cancel() {
+      closed = true
+      clearInterval(heartbeat)
+    }
+  })
+
+  return new Response(stream, { headers: SSE_HEADERS })
+}
+
+/**
+ * Whether a response is an event stream rather than a JSON body (e.g. a
+ * validation error returned before streaming started)
+ */
+export function isEventStream(response: Response): boolean {
+  return (response.headers.get('content-type') || '').includes('text/event-stream')
+}
+
+/**
+ * Call `onEvent` for each event of a fetch() response body, in order, until
+ * the stream ends
+ */
+export async function readServerSentEvents(
+  response: Response,
+  onEvent: (event: string, data: any) => void
+): Promise<void> {
+  if (!response.body) return
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  const dispatch = (block: string) => {
+    let event = 'message'
+    const dataLines: string[] = []
+    for (const line of block.split('\n')) {
+      if (line.startsWith('event:')) {
+        event = line.slice(6).trim()
+      } else if (line.startsWith('data:')) {
+        dataLines.push(line.slice(5).replace(/^ /, ''))
+      }
+    }
+    if (dataLines.length === 0) return
+
+    const raw = dataLines.join('\n')
+    let data: unknown = raw
+    try {
+      data = JSON.parse(raw)
+    } catch {
+      // Plain-text data
+    }
+    onEvent(event, data)
+  }
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true }).replace(/\r/g, '')
+
+    let boundary = buffer.indexOf('\n\n')
+    while (boundary !== -1) {
+      dispatch(buffer.slice(0, boundary))
+      buffer = buffer.slice(boundary + 2)
+      boundary = buffer.indexOf('\n\n')
+    }
+  }
+
+  buffer += decoder.decode()
+  if (buffer.trim()) {
+    dispatch(buffer)
+  }
+}
@@ -0,0 +1,282 @@
+import { executeQuery } from '@/lib/postgres';
+import { cacheEngine } from '@/lib/cache/cache-engine';
+import {
+  ClassCacheKey,
+  getAttendanceRoster,
+  getCourseDetail,
+  getMakeupCandidates,
+} from './class-data';
+
+// Predictive cache warming driven by the class schedule.
+//
+// Instructors open the class page, the attendance sheet and the makeup list
+// in the minutes before a class starts, which is exactly when those caches
+// tend to be cold. The warmer reads the same schedule as /api/classes/today
+// and, shortly before each class, recomputes that course's entries so the
+// first request of the class is a hit. One worker warms each class: the
+// others see the lock and skip it.
+
+const LEAD_MINUTES = parseInt(process.env.CACHE_WARM_LEAD_MINUTES || '15');
+const CONCURRENCY = parseInt(process.env.CACHE_WARM_CONCURRENCY || '3');
+const CHECK_INTERVAL_MS = 60 * 1000;
+
+interface ScheduledClass {
+  courseId: string;
+  code: string;
+  instructorId: string | null;
+  startTime: string; // HH:MM
+}
+
+export interface WarmItemResult {
+  name: string;
+  ok: boolean;
+  ms: number;
+  error?: string;
+}
+
+export interface WarmCourseResult {
+  courseId: string;
+  code: string;
+  startTime: string;
+  items: WarmItemResult[];
+}
+
+export interface WarmReport {
+  startedAt: string;
+  durationMs: number;
+  courses: WarmCourseResult[];
+  skipped: string[];
+}
+
+function toMinutes(time: string): number {
+  const [hours, minutes] = time.split(':').map(Number);
+  return hours * 60 + minutes;
+}
+
+function formatTime(value: any): string | null {
+  if (!value) return null;
+  return typeof value === 'string'
+    ? value.substring(0, 5)
+    : value.toTimeString?.().substring(0, 5) || null;
+}
+
+// Class times are local, so dates are too: YYYY-MM-DD of `date` in the
+// server's time zone, matching getDay() and getHours()
+function localDate(date: Date): string {
+  const month = String(date.getMonth() + 1).padStart(2, '0');
+  const day = String(date.getDate()).padStart(2, '0');
+  return `${date.getFullYear()}-${month}-${day}`;
+}
+
+function runsOn(dayOfWeek: any, date: Date, dayName: string): boolean {
+  if (typeof dayOfWeek === 'string') {
+    return dayOfWeek.toLowerCase() === dayName.toLowerCase();
+  }
+  if (Array.isArray(dayOfWeek)) {
+    return dayOfWeek.includes(date.getDay());
+  }
+  return false;
+}
+
+/**
+ * Classes running on `date`, using the same rules as /api/classes/today:
+ * no classes on Sunday or Monday, intensive courses excluded, and an explicit
+ * class_sessions row overrides the course's regular start time.
+ */
+export async function getScheduledClasses(date: Date): Promise<ScheduledClass[]> {
+  const day = date.getDay();
+  if (day === 0 || day === 1) {
+    return [];
+  }
+
+  const dayName = date.toLocaleDateString('en-US', { weekday: 'long' });
+  const classes = new Map<string, ScheduledClass>();
+
+  const courseResult = await executeQuery(`
+    SELECT id, code, instructor_id, start_time, day_of_week
+    FROM courses
+    WHERE status = 'active'
+      AND start_time IS NOT NULL
+      AND COALESCE(is_intensive, FALSE) = FALSE
+  `);
+
+  for (const row of courseResult.rows) {
+    const startTime = formatTime(row.start_time);
+    if (!startTime || !runsOn(row.day_of_week, date, dayName)) continue;
+
+    classes.set(row.id, {
+      courseId: row.id,
+      code: row.code,
+      instructorId: row.instructor_id,
+      startTime,
+    });
+  }
+
+  const sessionResult = await executeQuery(`
+    SELECT c.id, c.code, c.instructor_id, TO_CHAR(cs.start_time, 'HH24:MI') as start_time
+    FROM class_sessions cs
+    JOIN courses c ON cs.course_id = c.id
+    WHERE cs.session_date = $1
+      AND cs.start_time IS NOT NULL
+      AND COALESCE(c.is_intensive, FALSE) = FALSE
+  `, [localDate(date)]);
+
+  for (const row of sessionResult.rows) {
+    classes.set(row.id, {
+      courseId: row.id,
+      code: row.code,
+      instructorId: row.instructor_id,
+      startTime: row.start_time,
+    });
+  }
+
+  return [...classes.values()].sort((a, b) => a.startTime.localeCompare(b.startTime));
+}
+
+async function timed(name: string, fn: () => Promise<unknown>): Promise<WarmItemResult> {
+  const started = Date.now();
+  try {
+    await fn();
+    return { name, ok: true, ms: Date.now() - started };
+  } catch (error) {
+    return {
+      name,
+      ok: false,
+      ms: Date.now() - started,
+      error: error instanceof Error ? error.message : String(error),
+    };
+  }
+}
+
+async function warmCourse(scheduled: ScheduledClass): Promise<WarmCourseResult> {
+  const { courseId, code, instructorId } = scheduled;
+
+  // Drop the current entries first so the class starts with a full TTL
+  // rather than one that may run out halfway through
+  await Promise.all([
+    cacheEngine.delete(ClassCacheKey.courseDetail(code)),
+    cacheEngine.delete(ClassCacheKey.attendanceRoster(courseId)),
+    instructorId ? cacheEngine.delete(ClassCacheKey.makeupCandidates(instructorId)) : null,
+  ]);
+
+  const items = await Promise.all([
+    // Course detail carries each student's attendance and growth metrics
+    timed('courseDetail', () => getCourseDetail(code)),
+    timed('attendanceRoster', () => getAttendanceRoster(courseId)),
+    ...(instructorId ? [timed('makeupCandidates', () => getMakeupCandidates(instructorId))] : []),
+  ]);
+
+  return { courseId, code, startTime: scheduled.startTime, items };
+}
+
+async function runPool<T, R>(items: T[], limit: number, worker: (item: T) => Promise<R>): Promise<R[]> {
+  const results: R[] = new Array(items.length);
+  let next = 0;
+
+  const runners = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await worker(items[index]);
+    }
+  });
+
+  await Promise.all(runners);
+  return results;
+}
+
+export class ScheduleCacheWarmer {
+  private timer: NodeJS.Timeout | null = null;
+  private running: Promise<WarmReport> | null = null;
+  private warmed = new Set<string>();
+  private warmedDate = '';
+  private lastReport: WarmReport | null = null;
+
+  start(intervalMs: number = CHECK_INTERVAL_MS): void {
+    if (this.timer) return;
+
+    this.timer = setInterval(() => {
+      this.runOnce().catch(error => console.error('Cache warmer failed:', error));
+    }, intervalMs);
+    this.timer.unref?.();
+
+    console.log(`🔥 Cache warmer started (lead ${LEAD_MINUTES}m, concurrency ${CONCURRENCY})`);
+  }
+
+  stop(): void {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+  }
+
+  getLastReport(): WarmReport | null {
+    return this.lastReport;
+  }
+
+  /**
+   * Warm every class starting within the lead window that has not been
+   * warmed yet today. With `force`, warm all of today's remaining classes
+   * regardless of the window or of earlier runs.
+   */
+  runOnce(options: { now?: Date; force?: boolean } = {}): Promise<WarmReport> {
+    if (!this.running) {
+      this.running = this.run(options.now || new Date(), options.force || false)
+        .finally(() => { this.running = null; });
+    }
+    return this.running;
+  }
+
+  private async run(now: Date, force: boolean): Promise<WarmReport> {
+    const started = Date.now();
+    const date = localDate(now);
+    if (date !== this.warmedDate) {
+      this.warmed.clear();
+      this.warmedDate = date;
+    }
+
+    const nowMinutes = now.getHours() * 60 + now.getMinutes();
+    const due = (await getScheduledClasses(now)).filter(scheduled => {
+      const minutesUntil = toMinutes(scheduled.startTime) - nowMinutes;
+      if (minutesUntil < 0) return false;
+      return force || (minutesUntil <= LEAD_MINUTES && !this.warmed.has(scheduled.courseId));
+    });
+
+    const skipped: string[] = [];
+    const results = await runPool(due, CONCURRENCY, async scheduled => {
+      const lock = `warm:${date}:${scheduled.courseId}`;
+      const token = force || await cacheEngine.tryLock(lock, LEAD_MINUTES * 60 * 1000);
+      if (!token) {
+        // Another worker has this class
+        this.warmed.add(scheduled.courseId);
+        skipped.push(scheduled.code);
+        return null;
+      }
+
+      // The lock is left to expire so no other worker re-warms this class
+      this.warmed.add(scheduled.courseId);
+      return warmCourse(scheduled);
+    });
+
+    const report: WarmReport = {
+      startedAt: new Date(started).toISOString(),
+      durationMs: Date.now() - started,
+      courses: results.filter((result): result is WarmCourseResult => result !== null),
+      skipped,
+    };
+
+    if (report.courses.length > 0) {
+      this.lastReport = report;
+      for (const course of report.courses) {
+        const summary = course.items
+          .map(item => `${item.name} ${item.ok ? `${item.ms}ms` : `failed (${item.error})`}`)
+          .join(', ');
+        console.log(`🔥 Warmed ${course.code} for ${course.startTime}: ${summary}`);
+      }
+      console.log(`🔥 Cache warm run finished: ${report.courses.length} classes in ${report.durationMs}ms`);
+    }
+
+    return report;
+  }
+}
+
+export const scheduleCacheWarmer = new ScheduleCacheWarmer();
@@ -0,0 +1,437 @@
+import { PoolClient } from 'pg';
+import { performance } from 'perf_hooks';
+import { db } from '../database/connection';
+
+/**
+ * In-process autocomplete index for student search.
+ *
+ * Student names, external ids and course codes are indexed by prefix (for
+ * as-you-type matching) and by trigram (for substrings and typos). Feedback
+ * counts and enrollments are precomputed when a student is loaded, so a
+ * keystroke is answered from memory without touching Postgres.
+ *
+ * The index is loaded once per process and kept current through the
+ * `student_search_changed` NOTIFY channel (see the
+ * add_student_search_notify migration), with a periodic full rebuild as a
+ * safety net for missed notifications.
+ */
+
+export interface AutocompleteCourse {
+  id: string;
+  code: string;
+  name: string;
+}
+
+export interface AutocompleteStudent {
+  id: string;
+  externalId: string | null;
+  name: string;
+  grade: string | null;
+  school: string | null;
+  parentEmail: string | null;
+  feedbackCount: number;
+  courses: AutocompleteCourse[];
+}
+
+export interface AutocompleteMatch {
+  student: AutocompleteStudent;
+  score: number;
+}
+
+const NOTIFY_CHANNEL = 'student_search_changed';
+const MAX_PREFIX_LENGTH = 12;
+const MIN_TRIGRAM_SIMILARITY = 0.4;
+const FLUSH_DELAY_MS = 250;
+const FULL_RELOAD_THRESHOLD = 500; // pending ids above which a full reload is cheaper
+const FULL_RELOAD_INTERVAL_MS = 15 * 60 * 1000;
+const LISTEN_RETRY_MS = 5000;
+
+function normalize(text: string): string {
+  return text
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .toLowerCase()
+    .replace(/[^a-z0-9]+/g, ' ')
+    .trim();
+}
+
+function trigrams(text: string): Set<string> {
+  const grams = new Set<string>();
+  const padded = `  ${text} `;
+  for (let i = 0; i < padded.length - 2; i++) {
+    grams.add(padded.slice(i, i + 3));
+  }
+  return grams;
+}
+
+function addToIndex(index: Map<string, Set<string>>, key: string, id: string) {
+  let ids = index.get(key);
+  if (!ids) {
+    ids = new Set();
+    index.set(key, ids);
+  }
+  ids.add(id);
+}
+
+function removeFromIndex(index: Map<string, Set<string>>, key: string, id: string) {
+  const ids = index.get(key);
+  if (!ids) return;
+  ids.delete(id);
+  if (ids.size === 0) index.delete(key);
+}
+
+interface IndexedEntry {
+  student: AutocompleteStudent;
+  normalizedName: string;
+  prefixKeys: string[];
+  trigramKeys: string[];
+}
+
+export class StudentAutocompleteService {
+  private entries = new Map<string, IndexedEntry>();
+  private prefixIndex = new Map<string, Set<string>>();
+  private trigramIndex = new Map<string, Set<string>>();
+
+  private loading: Promise<void> | null = null;
+  private loaded = false;
+  private lastFullLoad = 0;
+
+  private listener: PoolClient | null = null;
+  private listenerStarting = false;
+  private pendingIds = new Set<string>();
+  private flushTimer: NodeJS.Timeout | null = null;
+
+  private stats = {
+    searches: 0,
+    totalSearchMs: 0,
+    maxSearchMs: 0,
+    incrementalRefreshes: 0,
+    fullReloads: 0
+  };
+
+  /**
+   * Answer an autocomplete query from the in-memory index. The first call in
+   * a process waits for the initial load.
+   */
+  async search(query: string, limit: number = 15): Promise<AutocompleteMatch[]> {
+    await this.ensureLoaded();
+
+    const start = performance.now();
+    const results = this.searchIndex(normalize(query), limit);
+    const duration = performance.now() - start;
+
+    this.stats.searches++;
+    this.stats.totalSearchMs += duration;
+    this.stats.maxSearchMs = Math.max(this.stats.maxSearchMs, duration);
+
+    return results;
+  }
+
+  getStats() {
+    return {
+      students: this.entries.size,
+      prefixKeys: this.prefixIndex.size,
+      trigramKeys: this.trigramIndex.size,
+      listening: this.listener !== null,
+      lastFullLoad: this.lastFullLoad ? new Date(this.lastFullLoad) : null,
+      searches: this.stats.searches,
+      avgSearchMs: this.stats.searches > 0 ? this.stats.totalSearchMs / this.stats.searches : 0,
+      maxSearchMs: this.stats.maxSearchMs,
+      incrementalRefreshes: this.stats.incrementalRefreshes,
+      fullReloads: this.stats.fullReloads
+    };
+  }
+
+  /**
+   * Queue students for re-indexing. Called from the NOTIFY listener, and can
+   * be called directly by code that knows it just changed a student.
+   */
+  invalidate(studentIds: string[]) {
+    studentIds.forEach(id => this.pendingIds.add(id));
+    if (!this.flushTimer) {
+      this.flushTimer = setTimeout(() => {
+        this.flushTimer = null;
+        this.flushPending().catch(error => {
+          console.error('[Autocomplete] Incremental refresh failed:', error);
+        });
+      }, FLUSH_DELAY_MS);
+    }
+  }
+
+  private async ensureLoaded(): Promise<void> {
+    if (this.loaded && Date.now() - this.lastFullLoad < FULL_RELOAD_INTERVAL_MS) {
+      return;
+    }
+
+    if (!this.loading) {
+      this.loading = this.fullReload().finally(() => {
+        this.loading = null;
+      });
+
+      // Serve from the existing (slightly stale) index during periodic rebuilds
+      if (this.loaded) {
+        this.loading.catch(error => {
+          console.error('[Autocomplete] Periodic rebuild failed:', error);
+        });
+        return;
+      }
+    }
+
+    await this.loading;
+  }
+
+  private searchIndex(query: string, limit: number): AutocompleteMatch[] {
+    if (!query) {
+      return Array.from(this.entries.values())
+        .map(entry => ({ student: entry.student, score: 0 }))
+        .sort((a, b) => a.student.name.localeCompare(b.student.name))
+        .slice(0, limit);
+    }
+
+    const tokens = query.split(' ');
+    const scores = new Map<string, number>();
+
+    // Every query token must prefix-match some indexed token
+    let candidates: Set<string> | null = null;
+    for (const token of tokens) {
+      const matches = this.prefixMatches(token);
+      candidates = candidates
+        ? new Set(Array.from(candidates).filter(id => matches.has(id)))
+        : matches;
+      if (candidates.size === 0) break;
+    }
+
+    (candidates || new Set<string>()).forEach(id => {
+      const entry = this.entries.get(id)!;
+      // Whole-name prefix beats a later-token prefix
+      scores.set(id, entry.normalizedName.startsWith(query) ? 2 : 1.5);
+    });
+
+    // Substring and typo tolerance through trigram overlap
+    if (scores.size < limit && query.length >= 3) {
+      const queryGrams = trigrams(query);
+      const overlap = new Map<string, number>();
+
+      queryGrams.forEach(gram => {
+        this.trigramIndex.get(gram)?.forEach(id => {
+          overlap.set(id, (overlap.get(id) || 0) + 1);
+        });
+      });
+
+      overlap.forEach((shared, id) => {
+        if (scores.has(id)) return;
+        const similarity = shared / queryGrams.size;
+        if (similarity >= MIN_TRIGRAM_SIMILARITY) {
+          scores.set(id, similarity);
+        }
+      });
+    }
+
+    return Array.from(scores.entries())
+      .map(([id, score]) => ({ student: this.entries.get(id)!.student, score }))
+      .sort((a, b) => b.score - a.score || a.student.name.localeCompare(b.student.name))
+      .slice(0, limit);
+  }
+
+  private prefixMatches(token: string): Set<string> {
+    if (token.length <= MAX_PREFIX_LENGTH) {
+      return this.prefixIndex.get(token) || new Set();
+    }
+
+    // Longer tokens: look up the longest indexed prefix, then verify
+    const ids = this.prefixIndex.get(token.slice(0, MAX_PREFIX_LENGTH)) || new Set<string>();
+    return new Set(
+      Array.from(ids).filter(id => {
+        const entry = this.entries.get(id)!;
+        return this.searchKeys(entry.student).some(key => key.startsWith(token));
+      })
+    );
+  }
+
+  private searchKeys(student: AutocompleteStudent): string[] {
+    const name = normalize(student.name);
+    const keys = name.split(' ').filter(Boolean);
+    if (student.externalId) keys.push(normalize(student.externalId).replace(/ /g, ''));
+    student.courses.forEach(course => {
+      if (course.code) keys.push(normalize(course.code).replace(/ /g, ''));
+    });
+    keys.push(student.id.toLowerCase());
+    return keys;
+  }
+
+  private indexStudent(student: AutocompleteStudent) {
+    this.unindexStudent(student.id);
+
+    const keys = this.searchKeys(student);
+    const prefixKeys = new Set<string>();
+    keys.forEach(key => {
+      for (let length = 1; length <= Math.min(key.length, MAX_PREFIX_LENGTH); length++) {
+        prefixKeys.add(key.slice(0, length));
+      }
+    });
+
+    const normalizedName = normalize(student.name);
+    const trigramKeys = trigrams(normalizedName);
+    if (student.externalId) {
+      trigrams(normalize(student.externalId)).forEach(gram => trigramKeys.add(gram));
+    }
+
+    prefixKeys.forEach(key => addToIndex(this.prefixIndex, key, student.id));
+    trigramKeys.forEach(key => addToIndex(this.trigramIndex, key, student.id));
+
+    this.entries.set(student.id, {
+      student,
+      normalizedName,
+      prefixKeys: Array.from(prefixKeys),
+      trigramKeys: Array.from(trigramKeys)
+    });
+  }
+
+  private unindexStudent(id: string) {
+    const existing = this.entries.get(id);
+    if (!existing) return;
+
+    existing.prefixKeys.forEach(key => removeFromIndex(this.prefixIndex, key, id));
+    existing.trigramKeys.forEach(key => removeFromIndex(this.trigramIndex, key, id));
+    this.entries.delete(id);
+  }
+
+  private async fullReload(): Promise<void> {
+    const start = performance.now();
+    const students = await this.loadStudents();
+
+    this.entries.clear();
+    this.prefixIndex.clear();
+    this.trigramIndex.clear();
+    students.forEach(student => this.indexStudent(student));
+
+    this.loaded = true;
+    this.lastFullLoad = Date.now();
+    this.stats.fullReloads++;
+
+    console.log(
+      `[Autocomplete] Indexed ${students.length} students in ${(performance.now() - start).toFixed(0)}ms`
+    );
+
+    this.startListening().catch(error => {
+      console.error('[Autocomplete] Failed to start change listener:', error);
+    });
+  }
+
+  private async flushPending(): Promise<void> {
+    if (!this.loaded || this.pendingIds.size === 0) {
+      this.pendingIds.clear();
+      return;
+    }
+
+    const ids = Array.from(this.pendingIds);
+    this.pendingIds.clear();
+
+    if (ids.length > FULL_RELOAD_THRESHOLD) {
+      await this.fullReload();
+      return;
+    }
+
+    const students = await this.loadStudents(ids);
+    const found = new Set(students.map(student => student.id));
+
+    students.forEach(student => this.indexStudent(student));
+    ids.filter(id => !found.has(id)).forEach(id => this.unindexStudent(id));
+
+    this.stats.incrementalRefreshes++;
+  }
+
+  /**
+   * Load students with their precomputed feedback counts and enrollments.
+   * With no ids, loads everyone (initial build and periodic rebuild).
+   */
+  private async loadStudents(ids?: string[]): Promise<AutocompleteStudent[]> {
+    const filter = ids ? 'WHERE s.id = ANY($1)' : '';
+    const params = ids ? [ids] : [];
+
+    const [studentsResult, feedbackResult, coursesResult] = await Promise.all([
+      db.query(
+        `SELECT s.id, s.student_number, u.name, s.grade_level, s.school, s.email
+         FROM students s
+         INNER JOIN users u ON s.id = u.id
+         ${filter}`,
+        params
+      ),
+      db.query(
+        `SELECT f.student_id, COUNT(*) as feedback_count
+         FROM parsed_student_feedback f
+         ${ids ? 'WHERE f.student_id = ANY($1)' : 'WHERE f.student_id IS NOT NULL'}
+         GROUP BY f.student_id`,
+        params
+      ),
+      db.query(
+        `SELECT e.student_id, c.id, c.course_code as code, c.course_name as name
+         FROM enrollments e
+         JOIN courses c ON c.id = e.course_id
+         ${ids ? 'WHERE e.student_id = ANY($1)' : ''}`,
+        params
+      )
+    ]);
+
+    const feedbackCounts = new Map<string, number>();
+    feedbackResult.rows.forEach((row: any) => {
+      feedbackCounts.set(row.student_id, parseInt(row.feedback_count) || 0);
+    });
+
+    const coursesByStudent = new Map<string, AutocompleteCourse[]>();
+    coursesResult.rows.forEach((row: any) => {
+      if (!coursesByStudent.has(row.student_id)) {
+        coursesByStudent.set(row.student_id, []);
+      }
+      coursesByStudent.get(row.student_id)!.push({ id: row.id, code: row.code, name: row.name });
+    });
+
+    return studentsResult.rows.map((row: any) => ({
+      id: row.id,
+      externalId: row.student_number || null,
+      name: row.name || '',
+      grade: row.grade_level || null,
+      school: row.school || null,
+      parentEmail: row.email || null,
+      feedbackCount: feedbackCounts.get(row.id) || 0,
+      courses: coursesByStudent.get(row.id) || []
+    }));
+  }
+
+  private async startListening(): Promise<void> {
+    if (this.listener || this.listenerStarting) return;
+
+    this.listenerStarting = true;
+    let client: PoolClient;
+    try {
+      client = await db.getClient();
+    } finally {
+      this.listenerStarting = false;
+    }
+    this.listener = client;
+
+    const reconnect = () => {
+      if (this.listener !== client) return;
+      this.listener = null;
+      client.release(true);
+      setTimeout(() => {
+        this.startListening().catch(error => {
+          console.error('[Autocomplete] Change listener reconnect failed:', error);
+        });
+      }, LISTEN_RETRY_MS);
+    };
+
+    client.on('notification', message => {
+      if (message.channel === NOTIFY_CHANNEL && message.payload) {
+        this.invalidate([message.payload]);
+      }
+    });
+    client.on('error', reconnect);
+    client.on('end', reconnect);
+
+    await client.query(`LISTEN ${NOTIFY_CHANNEL}`);
+  }
+}
+
+// Export singleton instance
+export const studentAutocomplete = new StudentAutocompleteService();
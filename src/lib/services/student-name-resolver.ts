@@ -0,0 +1,160 @@
+import { db } from '../database/connection';
+
+/**
+ * Ranked student-name lookup for name-keyed routes.
+ *
+ * Names arrive from URLs, parsed feedback files and teacher input, so an
+ * exact match on `students.name` often misses on case, extra whitespace, a
+ * missing surname or a typo. Candidates are found and scored in Postgres
+ * through the trigram indexes on lower(name) (see the
+ * add_student_name_trigram_index migration), so resolving one name reads a
+ * handful of index entries instead of the whole students table.
+ *
+ * StudentAutocompleteService's in-memory trigram index is not reused here:
+ * it loads every student (with enrollments and feedback counts) into each
+ * process, which is what this lookup must avoid, and it only covers the
+ * students table, whereas feedback routes resolve against the names in
+ * parsed_student_feedback. Autocomplete keeps its index because answering
+ * every keystroke from memory is its point.
+ *
+ * Imports deliberately keep matching exactly: merging two different
+ * students on a similar name is worse than creating a duplicate.
+ */
+
+export type NameMatchKind = 'exact' | 'prefix' | 'contains' | 'fuzzy';
+
+export type NameSource = 'students' | 'feedback';
+
+export interface NameCandidate {
+  // students.id; null for names that only exist in parsed feedback
+  id: string | null;
+  name: string;
+  score: number;
+  match: NameMatchKind;
+}
+
+export interface ResolveOptions {
+  source?: NameSource;
+  limit?: number;
+}
+
+export interface ResolveBestOptions {
+  source?: NameSource;
+  minScore?: number;
+}
+
+const SOURCES: Record<NameSource, { table: string; id: string; name: string }> = {
+  students: { table: 'students', id: 'id::text', name: 'name' },
+  feedback: { table: 'parsed_student_feedback', id: 'NULL::text', name: 'student_name' }
+};
+
+const DEFAULT_LIMIT = 5;
+const MAX_LIMIT = 50;
+// Score bands; fuzzy matches are scaled into [0, FUZZY_WEIGHT] so that any
+// substring match outranks any misspelling
+const SCORE_EXACT = 1;
+const SCORE_PREFIX = 0.9;
+const SCORE_CONTAINS = 0.8;
+const FUZZY_WEIGHT = 0.75;
+// Lowest score resolveBest accepts: a substring match, or a misspelling
+// with trigram similarity of roughly 0.65 and above
+const DEFAULT_MIN_SCORE = 0.5;
+const UNDEFINED_FUNCTION = '42883';
+
+function normalize(name: string): string {
+  return name.trim().replace(/\s+/g, ' ').toLowerCase();
+}
+
+function escapeLike(text: string): string {
+  return text.replace(/[\\%_]/g, '\\$&');
+}
+
+function matchKind(score: number): NameMatchKind {
+  if (score >= SCORE_EXACT) return 'exact';
+  if (score >= SCORE_PREFIX) return 'prefix';
+  if (score >= SCORE_CONTAINS) return 'contains';
+  return 'fuzzy';
+}
+
+export class StudentNameResolver {
+  private trigramAvailable = true;
+
+  /**
+   * Candidates for `name`, best first, at most one per distinct name
+   * (case-insensitive). Returns an empty list for a blank name.
+   */
+  async resolve(name: string, options: ResolveOptions = {}): Promise<NameCandidate[]> {
+    const query = normalize(name || '');
+    if (!query) return [];
+
+    const source = SOURCES[options.source ?? 'students'];
+    const limit = Math.min(Math.max(1, options.limit ?? DEFAULT_LIMIT), MAX_LIMIT);
+    const params = [query, `${escapeLike(query)}%`, `%${escapeLike(query)}%`, limit];
+
+    let rows: Array<{ id: string | null; name: string; score: string | number }>;
+    try {
+      rows = (await db.query(this.buildQuery(source, this.trigramAvailable), params)).rows;
+    } catch (error) {
+      if ((error as { code?: string }).code !== UNDEFINED_FUNCTION || !this.trigramAvailable) {
+        throw error;
+      }
+      // pg_trgm is not installed: fall back to substring matching only
+      console.warn('pg_trgm unavailable, student name resolution limited to substring matches');
+      this.trigramAvailable = false;
+      rows = (await db.query(this.buildQuery(source, false), params)).rows;
+    }
+
+    return rows.map(row => {
+      const score = Number(row.score);
+      return { id: row.id, name: row.name, score, match: matchKind(score) };
+    });
+  }
+
+  /**
+   * The single best candidate for `name`, or null when nothing scores at
+   * least `minScore` or the top candidates tie (e.g. "Alex" with both
+   * "Alex Chen" and "Alex Wong" on file) and picking one would be a guess.
+   */
+  async resolveBest(name: string, options: ResolveBestOptions = {}): Promise<NameCandidate | null> {
+    const candidates = await this.resolve(name, { source: options.source, limit: 2 });
+    const [best, runnerUp] = candidates;
+    if (!best || best.score < (options.minScore ?? DEFAULT_MIN_SCORE)) return null;
+    if (best.match !== 'exact' && runnerUp && runnerUp.score === best.score) return null;
+    return best;
+  }
+
+  // $1 normalized name, $2 prefix pattern, $3 substring pattern, $4 limit.
+  // Every branch of the WHERE clause is served by the lower(name) trigram
+  // index, so Postgres can combine them in one bitmap scan.
+  private buildQuery(source: { table: string; id: string; name: string }, trigram: boolean): string {
+    const column = `lower(${source.name})`;
+    const fuzzyFilter = trigram ? ` OR ${column} % $1 OR $1 <% ${column}` : '';
+    const fuzzyScore = trigram
+      ? `${FUZZY_WEIGHT} * GREATEST(similarity(lower(name), $1), word_similarity($1, lower(name)))`
+      : '0';
+
+    return `
+      SELECT id, name, score
+      FROM (
+        SELECT DISTINCT ON (lower(name)) id, name,
+          CASE
+            WHEN lower(name) = $1 THEN ${SCORE_EXACT}
+            WHEN lower(name) LIKE $2 THEN ${SCORE_PREFIX}
+            WHEN lower(name) LIKE $3 THEN ${SCORE_CONTAINS}
+            ELSE ${fuzzyScore}
+          END AS score
+        FROM (
+          SELECT ${source.id} AS id, ${source.name} AS name
+          FROM ${source.table}
+          WHERE ${source.name} IS NOT NULL
+            AND (${column} = $1 OR ${column} LIKE $3${fuzzyFilter})
+        ) candidates
+        ORDER BY lower(name), score DESC
+      ) ranked
+      ORDER BY score DESC, name
+      LIMIT $4
+    `;
+  }
+}
+
+export const studentNameResolver = new StudentNameResolver();
@@ -52,8 +52,15 @@ export interface UploadResult {
   url?: string;
 }
 
+// Recording id -> local file path, so the range requests a browser makes
+// while seeking do not each query audio_file_storage
+const LOCAL_PATH_CACHE_TTL_MS = 5 * 60 * 1000;
+const LOCAL_PATH_CACHE_MAX = 500;
+const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
 export class StorageService {
   private config: StorageConfig;
+  private localPathCache = new Map<string, { filePath: string; expiresAt: number }>();
 
   constructor(config?: Partial<StorageConfig>) {
     this.config = {
@@ -158,6 +165,67 @@ export class StorageService {
     }
   }
 
+  /**
+   * Store an audio file already written to local disk (a completed
+   * resumable upload), without reading it into memory. `sourcePath` is
+   * moved into storage, so it should be on the upload volume (see
+   * getPartialUploadPath).
+   */
+  async storeAudioFileFromPath(
+    recordingId: string,
+    sourcePath: string,
+    originalFilename: string,
+    contentHash: string,
+    fileSizeBytes: number
+  ): Promise<UploadResult> {
+    try {
+      const storedFilename = `${uuidv4()}${path.extname(originalFilename)}`;
+
+      let uploadResult: UploadResult;
+      switch (this.config.provider) {
+        case 'local':
+          uploadResult = await this.moveToLocal(
+            recordingId,
+            sourcePath,
+            originalFilename,
+            storedFilename,
+            contentHash,
+            fileSizeBytes
+          );
+          break;
+        default:
+          throw new Error(`Storing uploads from disk is not yet implemented for ${this.config.provider}.`);
+      }
+
+      if (uploadResult.success && uploadResult.file) {
+        try {
+          await this.storeFileMetadata(uploadResult.file);
+        } catch (error) {
+          // Put the file back so the caller can retry from sourcePath
+          await fs.rename(uploadResult.file.filePath, sourcePath);
+          throw error;
+        }
+      }
+
+      return uploadResult;
+    } catch (error) {
+      console.error('Error storing audio file:', error);
+      return {
+        success: false,
+        error: error instanceof Error ? error.message : 'Upload failed',
+      };
+    }
+  }
+
+  /**
+   * Where the partial file of a resumable upload is written while chunks
+   * arrive: on the local upload volume, so completing it is a rename
+   */
+  getPartialUploadPath(uploadId: string): string {
+    const uploadPath = path.resolve(process.cwd(), this.config.local!.uploadPath);
+    return path.join(uploadPath, '.partial', `${path.basename(uploadId)}.part`);
+  }
+
   /**
    * Get file URL for playback or download
    */
@@ -184,6 +252,41 @@ export class StorageService {
     }
   }
 
+  /**
+   * Absolute path of a locally stored audio file, given either its stored
+   * filename or `<recordingId>.<ext>` (how the recordings library links to
+   * audio). Returns null for unknown files and files in remote storage.
+   */
+  async resolveLocalAudioPath(filename: string): Promise<string | null> {
+    const requested = path.basename(filename);
+    const uploadPath = path.resolve(process.cwd(), this.config.local!.uploadPath);
+    const direct = path.join(uploadPath, requested);
+    try {
+      await fs.access(direct);
+      return direct;
+    } catch {
+      // Not a stored filename; try it as a recording id
+    }
+
+    const recordingId = path.basename(requested, path.extname(requested));
+    if (!UUID_PATTERN.test(recordingId)) return null;
+
+    const cached = this.localPathCache.get(recordingId);
+    if (cached && cached.expiresAt > Date.now()) return cached.filePath;
+
+    const file = await this.getFileMetadata(recordingId);
+    if (!file || file.storageType !== 'local') return null;
+
+    if (this.localPathCache.size >= LOCAL_PATH_CACHE_MAX) {
+      this.localPathCache.delete(this.localPathCache.keys().next().value!);
+    }
+    this.localPathCache.set(recordingId, {
+      filePath: file.filePath,
+      expiresAt: Date.now() + LOCAL_PATH_CACHE_TTL_MS,
+    });
+    return file.filePath;
+  }
+
   /**
    * Delete a file from storage
    */
@@ -210,6 +313,7 @@ export class StorageService {
       }
 
       if (deleted) {
+        this.localPathCache.delete(recordingId);
         // Remove from database
         await executeQuery(
           'DELETE FROM audio_file_storage WHERE recording_id = $1',
@@ -322,6 +426,41 @@ export class StorageService {
     };
   }
 
+  private async moveToLocal(
+    recordingId: string,
+    sourcePath: string,
+    originalFilename: string,
+    storedFilename: string,
+    contentHash: string,
+    fileSizeBytes: number
+  ): Promise<UploadResult> {
+    const uploadPath = path.resolve(process.cwd(), this.config.local!.uploadPath);
+    await fs.mkdir(uploadPath, { recursive: true });
+
+    const filePath = path.join(uploadPath, storedFilename);
+    await fs.rename(sourcePath, filePath);
+
+    console.log(`📁 Audio file saved to: ${filePath}`);
+
+    const file: StoredFile = {
+      id: uuidv4(),
+      recordingId,
+      storageType: 'local',
+      filePath,
+      originalFilename,
+      storedFilename,
+      fileSizeBytes,
+      contentHash,
+      isPublic: false,
+    };
+
+    return {
+      success: true,
+      file,
+      url: `${this.config.local!.baseUrl}/${storedFilename}`,
+    };
+  }
+
   private async uploadToS3(
     recordingId: string,
     fileBuffer: Buffer,
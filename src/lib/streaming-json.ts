@@ -0,0 +1,88 @@
+// Incremental reader for JSON that is still being generated, so elements of
+// an array field can be shown before the model finishes the whole document.
+
+/**
+ * Scans a streamed top-level JSON object and returns each element of the
+ * array under `field` as soon as the element is complete. Feed it the
+ * response text chunk by chunk; every call returns only the elements that
+ * completed in that chunk. Elements that do not parse are skipped; the final
+ * document should still be parsed (and validated) as a whole.
+ */
+export class JsonArrayFieldScanner<T = unknown> {
+  private buffer = ''
+  private position = 0
+  private depth = 0
+  private inString = false
+  private escaped = false
+  private stringStart = -1
+  private lastString = ''
+  private key: string | null = null
+  // Depth inside the target array while it is open, otherwise -1
+  private arrayDepth = -1
+  private elementStart = -1
+
+  constructor(private readonly field: string) {}
+
+  push(chunk: string): T[] {
+    this.buffer += chunk
+    const elements: T[] = []
+
+    for (; this.position < this.buffer.length; this.position++) {
+      const char = this.buffer[this.position]
+
+      if (this.inString) {
+        if (this.escaped) {
+          this.escaped = false
+        } else if (char === '\\') {
+          this.escaped = true
+        } else if (char === '"') {
+          this.inString = false
+          this.lastString = this.buffer.slice(this.stringStart + 1, this.position)
+        }
+        continue
+      }
+
+      switch (char) {
+        case '"':
+          this.inString = true
+          this.stringStart = this.position
+          break
+        case ':':
+          if (this.depth === 1) {
+            this.key = this.lastString
+          }
+          break
+        case ',':
+          if (this.depth === 1) {
+            this.key = null
+          }
+          break
+        case '{':
+        case '[':
+          this.depth++
+          if (char === '[' && this.depth === 2 && this.key === this.field && this.arrayDepth < 0) {
+            this.arrayDepth = this.depth
+          } else if (this.arrayDepth > 0 && this.depth === this.arrayDepth + 1) {
+            this.elementStart = this.position
+          }
+          break
+        case '}':
+        case ']':
+          if (this.arrayDepth > 0 && this.depth === this.arrayDepth + 1 && this.elementStart >= 0) {
+            try {
+              elements.push(JSON.parse(this.buffer.slice(this.elementStart, this.position + 1)) as T)
+            } catch {
+              // Incomplete or malformed element; the final parse decides
+            }
+            this.elementStart = -1
+          } else if (char === ']' && this.depth === this.arrayDepth) {
+            this.arrayDepth = -1
+          }
+          this.depth--
+          break
+      }
+    }
+
+    return elements
+  }
+}
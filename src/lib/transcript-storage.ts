@@ -1,6 +1,16 @@
 import fs from 'fs/promises';
 import path from 'path';
 import { executeQuery } from './postgres';
+import {
+  KeysetSort,
+  Page,
+  buildKeysetClause,
+  buildKeysetOrder,
+  buildKeysetSelect,
+  decodeCursor,
+  normalizePageSize,
+  toPage
+} from './dal/base/BaseRepository';
 import { v4 as uuidv4 } from 'uuid';
 
 export interface TranscriptMetadata {
@@ -22,6 +32,46 @@ export interface TranscriptMetadata {
   }>;
 }
 
+export interface TranscriptSearchResult {
+  recordingId: string;
+  transcriptId: string;
+  studentName: string;
+  speechTopic: string;
+  motion: string;
+  speechType: string;
+  recordingDate: Date;
+  rank: number;
+  excerpt: string;
+  snippet: string; // HTML-escaped excerpt with matches wrapped in <mark></mark>
+  wordCount: number;
+  confidence: number;
+}
+
+// Best match first; transcript id keeps equally ranked results in a stable order
+const SEARCH_SORT: KeysetSort = { keys: ['m.rank', 'm.id'], direction: 'DESC' };
+
+// Trigram indexes cannot serve patterns shorter than one trigram
+const MIN_TRIGRAM_LENGTH = 3;
+
+// ts_headline copies transcript text verbatim, so it marks matches with
+// private-use characters that are swapped for <mark> only after escaping
+const HIGHLIGHT_START = '\uE000';
+const HIGHLIGHT_STOP = '\uE001';
+const HEADLINE_OPTIONS = `StartSel="${HIGHLIGHT_START}", StopSel="${HIGHLIGHT_STOP}", ` +
+  'MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=" ... "';
+
+const HTML_ESCAPES: Record<string, string> = {
+  '&': '&amp;',
+  '<': '&lt;',
+  '>': '&gt;',
+  '"': '&quot;',
+  "'": '&#39;'
+};
+
+function escapeHtml(text: string): string {
+  return text.replace(/[&<>"']/g, char => HTML_ESCAPES[char]);
+}
+
 export class TranscriptStorage {
   private basePath: string;
 
@@ -288,7 +338,9 @@ export class TranscriptStorage {
   }
 
   /**
-   * Search transcripts by keyword
+   * Ranked transcript search. Whole words go through the search_vector GIN
+   * index; partial words fall back to the trigram index. Filters are applied
+   * inside the same indexed query and results are paged with a keyset cursor.
    */
   async searchTranscripts(
     keyword: string,
@@ -297,68 +349,156 @@ export class TranscriptStorage {
       startDate?: Date;
       endDate?: Date;
       speechType?: string;
+    },
+    page: { limit?: number; cursor?: string | null } = {}
+  ): Promise<Page<TranscriptSearchResult>> {
+    const emptyPage: Page<TranscriptSearchResult> = { items: [], nextCursor: null, hasMore: false };
+    const term = keyword.trim();
+    if (!term) return emptyPage;
+
+    if (page.cursor && !this.isValidSearchCursor(page.cursor)) {
+      throw new Error('Invalid pagination cursor');
     }
-  ): Promise<any[]> {
+
     try {
-      let query = `
-        SELECT st.*, sr.student_id, sr.speech_topic, sr.motion, 
-               sr.speech_type, sr.created_at as recording_date,
-               s.name as student_name
-        FROM speech_transcriptions st
-        JOIN speech_recordings sr ON st.recording_id = sr.id
-        LEFT JOIN students s ON sr.student_id = s.id
-        WHERE st.transcription_text ILIKE $1
-      `;
-      
-      const params: any[] = [`%${keyword}%`];
-      let paramCount = 1;
+      const pageSize = normalizePageSize(page.limit);
+      const useTrigram = term.length >= MIN_TRIGRAM_LENGTH;
+
+      // $1 = raw search text, $2 = ILIKE pattern for the trigram fallback,
+      // $3 = ts_headline options
+      const params: any[] = [term, `%${term.replace(/[%_\\]/g, '\\$&')}%`, HEADLINE_OPTIONS];
+      let paramCount = 3;
+      const conditions: string[] = [
+        useTrigram
+          ? '(st.search_vector @@ q.query OR st.transcription_text ILIKE $2)'
+          : 'st.search_vector @@ q.query'
+      ];
 
       if (filters?.studentId) {
         paramCount++;
-        query += ` AND sr.student_id = $${paramCount}`;
+        conditions.push(`sr.student_id = $${paramCount}`);
         params.push(filters.studentId);
       }
 
       if (filters?.startDate) {
         paramCount++;
-        query += ` AND sr.created_at >= $${paramCount}`;
+        conditions.push(`sr.created_at >= $${paramCount}`);
         params.push(filters.startDate);
       }
 
       if (filters?.endDate) {
         paramCount++;
-        query += ` AND sr.created_at <= $${paramCount}`;
+        conditions.push(`sr.created_at <= $${paramCount}`);
         params.push(filters.endDate);
       }
 
       if (filters?.speechType) {
         paramCount++;
-        query += ` AND sr.speech_type = $${paramCount}`;
+        conditions.push(`sr.speech_type = $${paramCount}`);
         params.push(filters.speechType);
       }
 
-      query += ' ORDER BY sr.created_at DESC';
+      const keyset = buildKeysetClause(SEARCH_SORT, page.cursor, paramCount + 1)!;
+      params.push(...keyset.values);
+
+      // Full-text matches always outrank trigram-only matches. Snippets are
+      // only built for the rows on this page since ts_headline re-parses text.
+      const query = `
+        WITH q AS (
+          SELECT websearch_to_tsquery('english', $1) AS query
+        ),
+        matches AS (
+          SELECT
+            st.id,
+            st.recording_id,
+            (st.search_vector @@ q.query) AS fulltext_match,
+            CASE
+              WHEN st.search_vector @@ q.query
+                THEN 1 + ts_rank_cd(st.search_vector, q.query, 32)
+              ELSE ${useTrigram ? 'word_similarity($1, st.transcription_text)' : '0'}
+            END::real AS rank
+          FROM speech_transcriptions st
+          JOIN speech_recordings sr ON st.recording_id = sr.id
+          CROSS JOIN q
+          WHERE ${conditions.join(' AND ')}
+        ),
+        page AS (
+          SELECT m.*, ${buildKeysetSelect(SEARCH_SORT)}
+          FROM matches m
+          ${keyset.text ? `WHERE ${keyset.text}` : ''}
+          ${buildKeysetOrder(SEARCH_SORT)}
+          LIMIT ${pageSize + 1}
+        )
+        SELECT
+          page.*,
+          st.transcription_text, st.word_count, st.confidence_score,
+          sr.speech_topic, sr.motion, sr.speech_type,
+          sr.created_at as recording_date,
+          s.name as student_name,
+          CASE WHEN page.fulltext_match THEN
+            ts_headline('english', st.transcription_text, q.query, $3)
+          END AS headline
+        FROM page
+        JOIN speech_transcriptions st ON st.id = page.id
+        JOIN speech_recordings sr ON st.recording_id = sr.id
+        LEFT JOIN students s ON sr.student_id = s.id
+        CROSS JOIN q
+        ORDER BY page.rank DESC, page.id DESC
+      `;
 
       const result = await executeQuery(query, params);
-
-      return result.rows.map(row => ({
-        recordingId: row.recording_id,
-        transcriptId: row.id,
-        studentName: row.student_name,
-        speechTopic: row.speech_topic,
-        motion: row.motion,
-        speechType: row.speech_type,
-        recordingDate: row.recording_date,
-        excerpt: this.getExcerpt(row.transcription_text, keyword),
-        wordCount: row.word_count,
-        confidence: row.confidence_score
-      }));
+      const rows = toPage<any>(result.rows, pageSize, SEARCH_SORT);
+
+      return {
+        ...rows,
+        items: rows.items.map(row => {
+          const excerpt = this.getExcerpt(row.transcription_text, term);
+          return {
+            recordingId: row.recording_id,
+            transcriptId: row.id,
+            studentName: row.student_name,
+            speechTopic: row.speech_topic,
+            motion: row.motion,
+            speechType: row.speech_type,
+            recordingDate: row.recording_date,
+            rank: parseFloat(row.rank),
+            excerpt,
+            snippet: row.headline ? this.markHeadline(row.headline) : this.highlight(excerpt, term),
+            wordCount: row.word_count,
+            confidence: row.confidence_score
+          };
+        })
+      };
     } catch (error) {
       console.error('Error searching transcripts:', error);
-      return [];
+      throw error;
     }
   }
 
+  /**
+   * Whether `cursor` is a nextCursor that searchTranscripts could have
+   * returned; anything else is rejected before querying
+   */
+  isValidSearchCursor(cursor: string): boolean {
+    return decodeCursor(cursor, SEARCH_SORT.keys.length) !== null;
+  }
+
+  // Escape the headline, then turn ts_headline's markers into <mark> tags
+  private markHeadline(headline: string): string {
+    return escapeHtml(headline)
+      .split(HIGHLIGHT_START).join('<mark>')
+      .split(HIGHLIGHT_STOP).join('</mark>');
+  }
+
+  private highlight(text: string, keyword: string): string {
+    const escaped = keyword.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+    // Split with a capture group: odd entries are the matches
+    return text
+      .split(new RegExp(`(${escaped})`, 'gi'))
+      .map((part, index) => (index % 2 === 1 ? `<mark>${escapeHtml(part)}</mark>` : escapeHtml(part)))
+      .join('');
+  }
+
   private getExcerpt(text: string, keyword: string): string {
     const index = text.toLowerCase().indexOf(keyword.toLowerCase());
     if (index === -1) return text.substring(0, 150) + '...';